@@ -0,0 +1,66 @@
+"""
+Benchmark PyPISearchEngine metadata fetching against a local stand-in server
+
+Compares probing name variants one at a time (one worker, one connection,
+as before) with the concurrent pooled fetch, using a fixed simulated
+round-trip latency so it runs offline.
+
+Usage:
+    python scripts/benchmark_pypi_search.py [--queries 10] [--latency 0.1]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.level2.walk.local_pypi_server import LocalPyPIServer, make_metadata  # noqa: E402
+from src.level2.walk.pypi_search_engine import PyPISearchEngine  # noqa: E402
+
+# Queries whose exact name and python- prefixed variant exist
+QUERIES = [f"topic {i}" for i in range(100)]
+
+
+def make_packages():
+    packages = {}
+    for query in QUERIES:
+        name = query.replace(' ', '-')
+        packages[name] = make_metadata(name)
+        packages[f"python-{name}"] = make_metadata(f"python-{name}")
+    return packages
+
+
+def run(label: str, server: LocalPyPIServer, queries: int, **engine_kwargs) -> float:
+    """Search `queries` queries; return queries/sec"""
+    server.reset_stats()
+    with PyPISearchEngine(base_url=server.url, **engine_kwargs) as engine:
+        start = time.perf_counter()
+        found = sum(len(engine._search_pypi(query)) for query in QUERIES[:queries])
+        elapsed = time.perf_counter() - start
+
+    rate = queries / elapsed
+    print(
+        f"{label:<30} {queries:>4} queries  {found:>4} hits  {len(server.requests):>5} requests  "
+        f"{server.connections:>3} conns  {elapsed:>6.2f}s  {rate:>7.1f} queries/sec"
+    )
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated round trip (seconds)")
+    args = parser.parse_args()
+    queries = min(args.queries, len(QUERIES))
+
+    with LocalPyPIServer(make_packages(), latency=args.latency) as server:
+        before = run("sequential (before)", server, queries, max_workers=1, max_connections=1)
+        after = run("concurrent pool", server, queries)
+
+    print(f"\nSpeedup (concurrent): {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark ToolMemorySystem.record_usage throughput
+
+Compares the previous write path (a new connection and a commit per row in
+the default rollback-journal mode) against the shared WAL connection and the
+write-behind queue (reported with and without the final flush).
+
+Usage:
+    python scripts/benchmark_tool_memory.py [--records 2000] [--threads 4]
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.common.time_buckets import to_epoch  # noqa: E402
+from src.level2.walk.tool_memory_system import (  # noqa: E402
+    INSERT_USAGE_SQL,
+    ToolMemorySystem,
+    ToolUsageRecord
+)
+
+
+def make_record(i: int) -> ToolUsageRecord:
+    return ToolUsageRecord(
+        tool_name=f"Tool{i % 10}",
+        pattern_name=f"Pattern{i % 5}",
+        query=f"benchmark query {i}",
+        success=i % 7 != 0,
+        latency_ms=100.0 + i % 50,
+        cost=0.001,
+        score=0.8
+    )
+
+
+def record_per_call_connection(db_path: Path, record: ToolUsageRecord):
+    """The write path before the shared connection"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(INSERT_USAGE_SQL, (
+            record.tool_name,
+            record.pattern_name,
+            record.query,
+            1 if record.success else 0,
+            record.latency_ms,
+            record.cost,
+            record.score,
+            record.error,
+            record.timestamp.isoformat(),
+            to_epoch(record.timestamp)
+        ))
+        conn.commit()
+
+
+def run(label: str, write, records: int, threads: int) -> float:
+    """Insert `records` rows split across `threads`; return inserts/sec"""
+    per_thread = records // threads
+
+    def worker(offset: int):
+        for i in range(offset, offset + per_thread):
+            write(make_record(i))
+
+    workers = [threading.Thread(target=worker, args=(t * per_thread,)) for t in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    rows = per_thread * threads
+    rate = rows / elapsed
+    print(f"{label:<32} {rows:>7} rows  {elapsed:>7.2f}s  {rate:>10.0f} inserts/sec")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        # Schema only; the old path then writes through its own connections
+        before_db = tmp / "before.db"
+        ToolMemorySystem(db_path=before_db, synchronous="FULL").close()
+        with sqlite3.connect(before_db) as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+
+        before = run(
+            "per-call connection (before)",
+            lambda record: record_per_call_connection(before_db, record),
+            args.records, args.threads
+        )
+
+        memory = ToolMemorySystem(db_path=tmp / "after.db")
+        after = run(
+            "shared WAL connection (after)", memory.record_usage, args.records, args.threads
+        )
+        memory.close()
+
+        buffered = ToolMemorySystem(db_path=tmp / "write_behind.db", write_behind=True)
+        start = time.perf_counter()
+        queued = run(
+            "write-behind (record_usage only)", buffered.record_usage, args.records, args.threads
+        )
+        buffered.close()
+        elapsed = time.perf_counter() - start
+        total = args.records // args.threads * args.threads
+        rate = total / elapsed
+        print(
+            f"{'write-behind (incl. flush)':<32} {total:>7} rows  "
+            f"{elapsed:>7.2f}s  {rate:>10.0f} inserts/sec"
+        )
+
+    print(f"\nSpeedup (shared connection): {after / before:.1f}x")
+    print(f"Speedup (write-behind, call latency): {queued / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Circuit Breaker - Stops calling a failing dependency until it recovers
+
+Closed:    requests flow; consecutive failures are counted
+Open:      requests are rejected immediately until recovery_timeout passes
+Half-open: a limited number of probe requests decide whether to close
+           (probe succeeds) or re-open (probe fails)
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker with trip/rejection metrics.
+
+    Usage:
+        breaker = CircuitBreaker(failure_threshold=5, recovery_timeout=30.0)
+        if breaker.allow_request():
+            try:
+                result = call()
+                breaker.record_success()
+            except Exception:
+                breaker.record_failure()
+                raise
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_timeout: Seconds to stay open before allowing probes
+            half_open_max_calls: Concurrent probe requests allowed while half-open
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._consecutive_failures = 0
+        self._probes_in_flight = 0
+
+        # Metrics
+        self.trips = 0
+        self.rejected = 0
+        self.total_successes = 0
+        self.total_failures = 0
+
+    @property
+    def state(self) -> str:
+        """Current state (open transitions to half-open once the timeout passes)"""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be attempted.
+
+        Every allowed request must be followed by record_success(),
+        record_failure() or release().
+        """
+        with self._lock:
+            self._maybe_half_open()
+
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        """Record a successful request (closes a half-open circuit)"""
+        with self._lock:
+            self.total_successes += 1
+            self._consecutive_failures = 0
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._state = self.CLOSED
+
+    def record_failure(self):
+        """Record a failed request (may open the circuit)"""
+        with self._lock:
+            self.total_failures += 1
+            self._consecutive_failures += 1
+
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._trip()
+            elif self._state == self.CLOSED and \
+                    self._consecutive_failures >= self.failure_threshold:
+                self._trip()
+
+    def release(self):
+        """Give back an allowed request that ended without an outcome (e.g. cancelled)"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def reset(self):
+        """Force the circuit closed"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._probes_in_flight = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return state and counters"""
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                'state': self._state,
+                'trips': self.trips,
+                'rejected': self.rejected,
+                'consecutive_failures': self._consecutive_failures,
+                'total_successes': self.total_successes,
+                'total_failures': self.total_failures
+            }
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self.trips += 1
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and \
+                self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
@@ -0,0 +1,114 @@
+"""
+Keyword Automaton - Aho-Corasick multi-pattern matcher for keyword detection
+
+Compiles a fixed set of keywords/phrases into a single automaton so that one
+linear pass over a query reports every term it contains, instead of running a
+separate substring scan per term.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed vocabulary of terms.
+
+    Matching semantics are identical to ``term in text`` for every term:
+    overlapping and nested occurrences are all reported.
+
+    Example:
+        >>> automaton = KeywordAutomaton(["worth", "worth the", "is it worth"])
+        >>> sorted(automaton.find("is it worth the effort?"))
+        ['is it worth', 'worth', 'worth the']
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        """
+        Build the automaton.
+
+        Args:
+            terms: Terms to match (duplicates and empty strings are ignored)
+        """
+        # Unique terms, in first-seen order
+        self.terms: List[str] = list(dict.fromkeys(t for t in terms if t))
+
+        # Trie transitions, failure links, and terms ending at each state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for term in self.terms:
+            self._insert(term)
+        self._build_failure_links()
+
+    def _insert(self, term: str):
+        """Add a term to the trie."""
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(term)
+
+    def _build_failure_links(self):
+        """
+        Compute failure links breadth-first and merge outputs along them.
+
+        Failure transitions are then folded into each state's goto table, so
+        matching is a single dict lookup per character (a DFA; missing
+        entries mean "back to the root").
+        """
+        queue = deque(self._goto[0].values())
+        order = []
+
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+
+                self._fail[next_state] = target
+                self._output[next_state] = self._output[next_state] + self._output[target]
+
+        # BFS order guarantees a state's failure target is already resolved
+        for state in order:
+            for char, next_state in self._goto[self._fail[state]].items():
+                self._goto[state].setdefault(char, next_state)
+
+        # Bound lookups avoid an attribute fetch per character in find()
+        self._step = [transitions.get for transitions in self._goto]
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Return every term that occurs in ``text``.
+
+        Args:
+            text: Text to scan (callers are responsible for case normalization)
+
+        Returns:
+            Set of matched terms
+        """
+        step = self._step
+        visited: Set[int] = set()
+        visit = visited.add
+        state = 0
+
+        for char in text:
+            state = step[state](char, 0)
+            visit(state)
+
+        found: Set[str] = set()
+        for state in visited:
+            found.update(self._output[state])
+        return found
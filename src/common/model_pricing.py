@@ -0,0 +1,82 @@
+"""
+Model Pricing - Estimate the cost of a model call from its token usage
+
+Prices are USD per million tokens (input, output), from the providers'
+published list prices. Dated model ids ("gpt-4.1-2025-04-14") match their
+family by longest prefix; fine-tuned OpenAI ids ("ft:gpt-4.1-2025-04-14:org::id")
+use the fine-tuned inference price of their base model.
+"""
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (input, output) USD per 1M tokens
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+}
+
+FINETUNED_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4.1": (3.00, 12.00),
+    "gpt-4.1-mini": (0.80, 3.20),
+    "gpt-4o": (3.75, 15.00),
+    "gpt-4o-mini": (0.30, 1.20),
+}
+
+# Used for models missing from the tables (e.g. an ft: id of an unknown base)
+DEFAULT_PRICE = MODEL_PRICES["gpt-4.1"]
+
+
+def model_price(model: str) -> Tuple[float, float]:
+    """(input, output) USD per 1M tokens for a model id"""
+    table = MODEL_PRICES
+    if model.startswith("ft:"):
+        table = FINETUNED_PRICES
+        model = model.split(":")[1]
+
+    matches = [name for name in table if model.startswith(name)]
+    if not matches:
+        logger.debug(f"No price for {model!r}; using the default")
+        return DEFAULT_PRICE
+    return table[max(matches, key=len)]
+
+
+def call_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    """USD cost of one call"""
+    input_price, output_price = model_price(model)
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def usage_cost(model: str, usage: Any) -> Optional[float]:
+    """
+    USD cost of a call from the usage object of its response.
+
+    Args:
+        model: Model id the call was made with
+        usage: OpenAI `response.usage` (prompt_tokens, completion_tokens) or
+            Gemini `response.usage_metadata` (prompt_token_count,
+            candidates_token_count, thoughts_token_count)
+
+    Returns:
+        Cost in USD, or None if the response reported no usage
+    """
+    if usage is None:
+        return None
+
+    if getattr(usage, "prompt_tokens", None) is not None:
+        return call_cost(model, usage.prompt_tokens, usage.completion_tokens or 0)
+
+    if getattr(usage, "prompt_token_count", None) is not None:
+        output_tokens = (
+            (getattr(usage, "candidates_token_count", None) or 0)
+            + (getattr(usage, "thoughts_token_count", None) or 0)
+        )
+        return call_cost(model, usage.prompt_token_count, output_tokens)
+
+    return None
@@ -0,0 +1,376 @@
+"""
+Pattern Engine - Shared, precompiled pattern detection for all pattern matchers
+
+Holds the keyword tables for the 10 learned patterns and compiles them once per
+process into a single keyword index (one Aho-Corasick automaton over every
+table) plus precompiled indicator predicates.
+
+Users:
+- level1.runtime.PatternMatcher: scored detection (PATTERN_RULES)
+- level1.crawl.PatternMatcher: trigger keywords from patterns.json
+- level2.crawl.UnifiedAgentPipeline: tool routing (TOOL_ROUTING_KEYWORDS)
+- level1.run.parse_real_conversations: response scoring (CONVERSATION_KEYWORDS)
+"""
+
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Set
+
+from src.common.keyword_automaton import KeywordAutomaton
+
+
+# Pattern detection rules (keywords, phrases, linguistic patterns) used to
+# score user queries
+PATTERN_RULES: Dict[str, Dict] = {
+    "Hint-Based Learning": {
+        "keywords": [
+            "help", "debug", "wrong", "error", "issue", "problem",
+            "not working", "fails", "broken", "bug", "what could",
+            "where should i look", "how do i troubleshoot"
+        ],
+        "question_words": ["what", "where", "how"],
+        "weight": 1.0
+    },
+
+    "Diminishing Returns": {
+        "keywords": [
+            "worth", "should i", "is it worth", "optimize",
+            "improve", "better performance", "faster", "worth the",
+            "necessary", "overkill", "too much"
+        ],
+        "phrases": [
+            "is it worth",
+            "should i optimize",
+            "worth the effort",
+            "worth implementing"
+        ],
+        "weight": 1.0
+    },
+
+    "Multi-Dimensional Evaluation": {
+        "keywords": [
+            "evaluate", "review", "assess", "compare", "analysis",
+            "pros and cons", "tradeoffs", "consider", "decision",
+            "approach"
+        ],
+        "phrases": [
+            "review my",
+            "evaluate this",
+            "assess my",
+            "what do you think"
+        ],
+        "weight": 1.0
+    },
+
+    "Precision Policing": {
+        "keywords": [
+            "explain", "difference", "what is", "how does",
+            "what's the difference", "how do", "definition"
+        ],
+        "phrases": [
+            "what's the difference between",
+            "difference between",
+            "explain how",
+            "how does",
+            "what is"
+        ],
+        "weight": 1.0
+    },
+
+    "Brutal Accuracy": {
+        "keywords": [
+            "always", "never", "best practice", "right",
+            "correct", "true", "agree", "better than",
+            "superior", "guarantees"
+        ],
+        "phrases": [
+            "is always",
+            "always better",
+            "never use",
+            "best practice"
+        ],
+        "indicators": [
+            "ending_with_question_confirmation"  # "Right?", "Agree?", etc.
+        ],
+        "weight": 1.0
+    },
+
+    "Tradeoff Analysis": {
+        "keywords": [
+            "vs", "versus", "or", "which", "choose", "better",
+            "comparison", "alternative", "options"
+        ],
+        "phrases": [
+            " vs ",
+            " or ",
+            "which should i",
+            "should i use"
+        ],
+        "indicators": [
+            "contains_vs_comparison"
+        ],
+        "weight": 1.0
+    },
+
+    "Gap Analysis": {
+        "keywords": [
+            "building", "planning", "designing", "creating",
+            "missing", "overlooking", "consider", "gaps",
+            "what should i", "what am i missing"
+        ],
+        "phrases": [
+            "what should i consider",
+            "what am i missing",
+            "what gaps",
+            "i'm building"
+        ],
+        "weight": 1.0
+    },
+
+    "Production Readiness": {
+        "keywords": [
+            "write", "create", "implement", "build a function",
+            "endpoint", "api", "production", "robust",
+            "handle errors", "logging"
+        ],
+        "phrases": [
+            "write a",
+            "create a",
+            "implement a",
+            "build a function"
+        ],
+        "indicators": [
+            "requests_code_implementation"
+        ],
+        "weight": 1.0
+    },
+
+    "Mechanistic Understanding": {
+        "keywords": [
+            "how does", "explain how", "why does", "mechanism",
+            "works", "internally", "under the hood", "process"
+        ],
+        "phrases": [
+            "how does",
+            "explain how",
+            "how do",
+            "why does"
+        ],
+        "weight": 1.0
+    },
+
+    "Context-Dependent Recommendations": {
+        "keywords": [
+            "best", "should i use", "which is better",
+            "recommend", "what's the best", "for my",
+            "in my case"
+        ],
+        "phrases": [
+            "what's the best",
+            "which is best",
+            "should i use",
+            "for my application"
+        ],
+        "indicators": [
+            "asks_for_recommendation_without_context"
+        ],
+        "weight": 1.0
+    }
+}
+
+
+# Keywords that route a query to the pattern's registered tools
+TOOL_ROUTING_KEYWORDS: Dict[str, List[str]] = {
+    'Production Readiness': [
+        'test', 'production', 'ready', 'deploy',
+        'error handling', 'type hint', 'documentation'
+    ],
+    'Gap Analysis': [
+        'missing', 'gap', 'what about', 'incomplete',
+        'forgot', 'overlooked'
+    ],
+    'Tradeoff Analysis': [
+        'vs', 'versus', 'compare', 'alternative',
+        'option', 'tradeoff', 'pros', 'cons'
+    ],
+}
+
+# Keywords that show a pattern being applied in an assistant response
+# (from 01_extracted_patterns.md)
+CONVERSATION_KEYWORDS: Dict[str, List[str]] = {
+    "Gap Analysis": ["missing", "not addressed", "gap", "✓", "✗", "⚠️", "completeness"],
+    "Tradeoff Analysis": [
+        "tradeoff", "vs", "versus", "pros", "cons", "alternative", "option a", "option b"
+    ],
+    "Production Readiness": [
+        "error handling", "edge case", "test", "monitoring", "logging", "production"
+    ],
+    "Brutal Accuracy": ["connection", "how does", "what does", "have to do with", "address"],
+    "Multi-Dimensional Evaluation": ["dimension", "criteria", "score", "separate", "aspect"],
+    "Hint-Based Learning": ["hint", "question to consider", "examine", "trace", "debug"],
+    "Diminishing Returns": ["roi", "marginal", "worth it", "effort", "value"],
+    "Mechanistic Understanding": [
+        "how it works", "step-by-step", "trace", "execution", "mechanism"
+    ],
+    "Context-Dependent": ["depends on", "context", "scenario", "use case", "constraint"],
+    "Precision Policing": ["caveat", "note:", "however", "specifically", "precisely", "exactly"]
+}
+
+DEFAULT_KEYWORD_TABLES: Dict[str, Dict[str, List[str]]] = {
+    "tool_routing": TOOL_ROUTING_KEYWORDS,
+    "conversation": CONVERSATION_KEYWORDS,
+}
+
+
+# Linguistic indicators, compiled once at import
+_QUESTION_CONFIRMATION = re.compile(r'\b(right|agree|true|correct|yes)\?$')
+_VS_COMPARISON = re.compile(r'\w+\s+(vs|versus|or)\s+\w+')
+_BEST_QUESTION = re.compile(r"what'?s\s+the\s+best|which\s+is\s+best")
+_IMPERATIVE_VERBS = ("write", "create", "implement", "build", "make", "develop")
+
+
+def _ending_with_question_confirmation(query_lower: str) -> bool:
+    # Ends with "Right?", "Agree?", "True?", "Correct?", "Yes?"
+    return _QUESTION_CONFIRMATION.search(query_lower) is not None
+
+
+def _contains_vs_comparison(query_lower: str) -> bool:
+    # Contains "X vs Y" or "X or Y" pattern
+    return _VS_COMPARISON.search(query_lower) is not None
+
+
+def _requests_code_implementation(query_lower: str) -> bool:
+    # Starts with imperative verb
+    return query_lower.startswith(_IMPERATIVE_VERBS)
+
+
+def _asks_for_recommendation_without_context(query_lower: str) -> bool:
+    # Asks "what's best" or "which should I" without specifics
+    has_best_question = _BEST_QUESTION.search(query_lower) is not None
+    lacks_specifics = len(query_lower.split()) < 15  # Short, vague question
+    return has_best_question and lacks_specifics
+
+
+INDICATORS: Dict[str, Callable[[str], bool]] = {
+    "ending_with_question_confirmation": _ending_with_question_confirmation,
+    "contains_vs_comparison": _contains_vs_comparison,
+    "requests_code_implementation": _requests_code_implementation,
+    "asks_for_recommendation_without_context": _asks_for_recommendation_without_context,
+}
+
+
+def _lowercase(table: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    # Tables match case-insensitively, so index them lowercased
+    return {
+        pattern: [keyword.lower() for keyword in keywords]
+        for pattern, keywords in table.items()
+    }
+
+
+class PatternEngine:
+    """
+    One keyword index over pattern rules and named keyword tables.
+
+    Scanning a text once returns every indexed term it contains; each caller
+    then reads its own table against that hit set.
+
+    Example:
+        >>> engine = get_pattern_engine()
+        >>> hits = engine.scan("compare redis vs memcached")
+        >>> engine.table_matches("tool_routing", hits)["Tradeoff Analysis"]
+        ['vs', 'compare']
+    """
+
+    def __init__(
+        self,
+        pattern_rules: Optional[Dict[str, Dict]] = None,
+        keyword_tables: Optional[Dict[str, Dict[str, List[str]]]] = None
+    ):
+        """
+        Compile the keyword index.
+
+        Args:
+            pattern_rules: Scoring rules (defaults to PATTERN_RULES)
+            keyword_tables: Named {pattern: keywords} tables
+                            (defaults to DEFAULT_KEYWORD_TABLES)
+        """
+        self.pattern_rules = PATTERN_RULES if pattern_rules is None else pattern_rules
+        tables = DEFAULT_KEYWORD_TABLES if keyword_tables is None else keyword_tables
+
+        self.keyword_tables = {name: _lowercase(table) for name, table in tables.items()}
+        self._lock = threading.Lock()
+        self.automaton = self._compile()
+
+    def _compile(self) -> KeywordAutomaton:
+        terms = []
+        for rules in self.pattern_rules.values():
+            terms.extend(rules.get("keywords", []))
+            terms.extend(rules.get("phrases", []))
+        for table in self.keyword_tables.values():
+            for keywords in table.values():
+                terms.extend(keywords)
+        return KeywordAutomaton(terms)
+
+    def register_table(self, name: str, table: Dict[str, List[str]]):
+        """
+        Add (or replace) a named keyword table and recompile the index.
+
+        Registering a table identical to the one already held is a no-op, so
+        callers can register on every construction.
+
+        Args:
+            name: Table name for table_matches()
+            table: {pattern: keywords}
+        """
+        table = _lowercase(table)
+        with self._lock:
+            if self.keyword_tables.get(name) == table:
+                return
+            tables = dict(self.keyword_tables)
+            tables[name] = table
+            self.keyword_tables = tables
+            self.automaton = self._compile()
+
+    def scan(self, text_lower: str) -> Set[str]:
+        """
+        Return every indexed term occurring in text_lower.
+
+        Args:
+            text_lower: Lowercased text
+
+        Returns:
+            Set of matched terms
+        """
+        return self.automaton.find(text_lower)
+
+    def table_matches(self, table: str, hits: Set[str]) -> Dict[str, List[str]]:
+        """
+        Matched keywords per pattern for one keyword table.
+
+        Args:
+            table: Name of the keyword table
+            hits: Result of scan()
+
+        Returns:
+            Dict of pattern name -> matched keywords (in table order)
+        """
+        return {
+            pattern: [keyword for keyword in keywords if keyword in hits]
+            for pattern, keywords in self.keyword_tables[table].items()
+        }
+
+    def check_indicator(self, indicator: str, query_lower: str) -> bool:
+        """Evaluate a precompiled linguistic indicator (unknown names are False)"""
+        predicate = INDICATORS.get(indicator)
+        return predicate(query_lower) if predicate else False
+
+
+_default_engine: Optional[PatternEngine] = None
+
+
+def get_pattern_engine() -> PatternEngine:
+    """Process-wide engine over PATTERN_RULES and DEFAULT_KEYWORD_TABLES"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = PatternEngine()
+    return _default_engine
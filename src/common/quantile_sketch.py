@@ -0,0 +1,156 @@
+"""
+Quantile Sketch - Mergeable streaming percentiles with bounded relative error
+
+DDSketch (Masson et al., VLDB 2019): values are counted in logarithmically
+sized buckets, so any quantile is returned within `relative_accuracy` of the
+true value (1% by default) using memory proportional to the log of the value
+range, not the number of values. Two sketches with the same accuracy merge by
+adding bucket counts, so per-batch or per-hour sketches can be combined
+exactly.
+"""
+
+import json
+import math
+from typing import Dict, Iterable, Optional
+
+
+class DDSketch:
+    """
+    Streaming quantile sketch for non-negative values (e.g. latencies).
+
+    Example:
+        >>> sketch = DDSketch()
+        >>> for latency in latencies:
+        ...     sketch.add(latency)
+        >>> sketch.quantile(0.99)
+    """
+
+    # Values at or below this are counted as zero
+    MIN_INDEXABLE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        """
+        Args:
+            relative_accuracy: Max relative error of returned quantiles
+            max_buckets: Bucket cap; the lowest buckets are collapsed beyond
+                it, which only affects accuracy of the lowest quantiles
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        """Representative value of a bucket (within relative_accuracy of all its values)"""
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        """Add a value (negative values are counted as zero)"""
+        if value > self.MIN_INDEXABLE:
+            key = self._key(value)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        else:
+            value = max(value, 0.0)
+            self.zero_count += count
+
+        self.count += count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def update(self, values: Iterable[float]):
+        """Add every value"""
+        for value in values:
+            self.add(value)
+
+    def _collapse(self):
+        """Fold the lowest buckets together to respect max_buckets"""
+        keys = sorted(self.buckets)
+        excess = keys[:len(keys) - self.max_buckets + 1]
+        folded = sum(self.buckets.pop(k) for k in excess)
+        target = keys[len(excess)]
+        self.buckets[target] = self.buckets.get(target, 0) + folded
+
+    def merge(self, other: "DDSketch"):
+        """Add another sketch's counts into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if not other.count:
+            return
+
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the q-quantile.
+
+        Args:
+            q: Quantile in [0, 1] (0.99 for p99)
+
+        Returns:
+            Estimated value, or None for an empty sketch
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        if q == 0 or q == 1:
+            return self.min if q == 0 else self.max
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Clamp to the observed range
+                return min(max(self._value(key), self.min), self.max)
+        return self.max
+
+    def to_json(self) -> str:
+        """Compact JSON encoding (see from_json)"""
+        return json.dumps({
+            'a': self.relative_accuracy,
+            'z': self.zero_count,
+            'n': self.count,
+            'min': self.min,
+            'max': self.max,
+            'b': {str(k): c for k, c in sorted(self.buckets.items())}
+        }, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, data: str, max_buckets: int = 2048) -> "DDSketch":
+        """Decode a sketch written by to_json"""
+        raw = json.loads(data)
+        sketch = cls(relative_accuracy=raw['a'], max_buckets=max_buckets)
+        sketch.zero_count = raw['z']
+        sketch.count = raw['n']
+        sketch.min = raw['min']
+        sketch.max = raw['max']
+        sketch.buckets = {int(k): c for k, c in raw['b'].items()}
+        return sketch
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,340 @@
+"""
+Response Cache - Reuse LLM answers for repeated or near-identical queries
+
+Entries are keyed on (model, system prompt hash, normalized query) and kept
+in a SQLite file (WAL mode), so every worker process pointed at the same
+file shares hits.
+
+Two lookup tiers:
+1. Exact: same model, same system prompt, same normalized query
+2. Semantic (optional): same model and system prompt, and the query embedding
+   is within `similarity_threshold` cosine similarity of a cached query
+
+Entries expire after `ttl_seconds`; beyond `max_entries` the least recently
+used entries are evicted. Each hit is reported as a saving to the cost
+tracker (CostManagementSystem.record_savings) when one is attached.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from src.common.config import Config
+
+
+# Maps text to an embedding vector (e.g. a sentence-transformer's encode)
+EmbedFn = Callable[[str], Sequence[float]]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return _WHITESPACE.sub(" ", query.lower()).strip().rstrip("?!.").rstrip()
+
+
+def hash_text(text: str) -> str:
+    """SHA-256 hex digest of a string"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """
+    A cache hit.
+
+    Attributes:
+        response: Cached response text
+        model: Model the entry was stored under
+        tier: "exact" or "semantic"
+        similarity: Cosine similarity to the cached query (1.0 for exact hits)
+        cost_saved: Estimated cost of the call that was avoided
+        metadata: Caller metadata stored with the entry
+    """
+    response: str
+    model: str
+    tier: str
+    similarity: float
+    cost_saved: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class ResponseCache:
+    """
+    Persistent exact + semantic response cache shared across processes.
+
+    Example:
+        >>> cache = ResponseCache(embed_fn=model.encode, similarity_threshold=0.92)
+        >>> hit = cache.get("gpt-4.1", system_prompt, query)
+        >>> if hit is None:
+        ...     answer = call_llm(...)
+        ...     cache.put("gpt-4.1", system_prompt, query, answer, cost=0.02)
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        ttl_seconds: float = 24 * 3600,
+        max_entries: int = 10_000,
+        embed_fn: Optional[EmbedFn] = None,
+        similarity_threshold: float = 0.95,
+        cost_tracker: Optional[Any] = None,
+        default_cost: float = 0.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            db_path: SQLite file (default: data/response_cache.db)
+            ttl_seconds: Entry lifetime
+            max_entries: Entries kept before least-recently-used eviction
+            embed_fn: Enables the semantic tier when set
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            cost_tracker: Object with record_savings() (e.g. CostManagementSystem)
+            default_cost: Estimated cost of one call, used when put() gets no cost
+            clock: Wall-clock time source (injectable for tests)
+        """
+        if db_path is None:
+            db_path = Config.DATA_DIR / "response_cache.db"
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.cost_tracker = cost_tracker
+        self.default_cost = default_cost
+        self._clock = clock
+
+        # Per-instance counters (the table itself is shared)
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.cost_saved = 0.0
+
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30.0)
+
+    def _init_database(self):
+        """Create the cache table (WAL lets readers in other processes run during writes)"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    system_hash TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    embedding BLOB,
+                    cost REAL DEFAULT 0.0,
+                    metadata TEXT,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    hit_count INTEGER DEFAULT 0
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_response_cache_scope
+                ON response_cache(model, system_hash)
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_response_cache_last_used
+                ON response_cache(last_used_at)
+            """)
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, query: str) -> str:
+        """Exact-match key for (model, system prompt, normalized query)"""
+        return hash_text(
+            "\x00".join((model, hash_text(system_prompt), normalize_query(query)))
+        )
+
+    def get(self, model: str, system_prompt: str, query: str) -> Optional[CachedResponse]:
+        """
+        Look up a cached response.
+
+        Args:
+            model: Model the response would come from
+            system_prompt: System prompt (or other context) the answer depends on
+            query: User query
+
+        Returns:
+            CachedResponse, or None on a miss
+        """
+        now = self._clock()
+        cutoff = now - self.ttl_seconds
+        key = self.make_key(model, system_prompt, query)
+
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("""
+                SELECT cache_key, response, cost, metadata, 1.0
+                FROM response_cache
+                WHERE cache_key = ? AND created_at >= ?
+            """, (key, cutoff)).fetchone()
+            tier = "exact"
+
+            if row is None and self.embed_fn is not None:
+                row = self._semantic_lookup(conn, model, hash_text(system_prompt), query, cutoff)
+                tier = "semantic"
+
+            if row is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+
+            conn.execute("""
+                UPDATE response_cache
+                SET last_used_at = ?, hit_count = hit_count + 1
+                WHERE cache_key = ?
+            """, (now, row[0]))
+
+        hit = CachedResponse(
+            response=row[1],
+            model=model,
+            tier=tier,
+            similarity=float(row[4]),
+            cost_saved=row[2] or 0.0,
+            metadata=json.loads(row[3]) if row[3] else {}
+        )
+        self._record_hit(hit)
+        return hit
+
+    def _semantic_lookup(
+        self,
+        conn: sqlite3.Connection,
+        model: str,
+        system_hash: str,
+        query: str,
+        cutoff: float
+    ) -> Optional[tuple]:
+        """Best unexpired entry in the same (model, system prompt) scope above the threshold"""
+        rows = conn.execute("""
+            SELECT cache_key, response, cost, metadata, embedding
+            FROM response_cache
+            WHERE model = ? AND system_hash = ? AND created_at >= ? AND embedding IS NOT NULL
+        """, (model, system_hash, cutoff)).fetchall()
+        if not rows:
+            return None
+
+        query_vector = self._embed(query)
+        matrix = np.vstack([np.frombuffer(r[4], dtype=np.float32) for r in rows])
+        similarities = matrix @ query_vector
+
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        return rows[best][:4] + (float(similarities[best]),)
+
+    def put(
+        self,
+        model: str,
+        system_prompt: str,
+        query: str,
+        response: str,
+        cost: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Store a response.
+
+        Args:
+            model: Model that produced the response
+            system_prompt: System prompt (or other context) the answer depends on
+            query: User query
+            response: Response text
+            cost: Cost of the call, saved again on every hit (default: default_cost)
+            metadata: JSON-serializable extras returned with hits
+        """
+        now = self._clock()
+        embedding = self._embed(query).tobytes() if self.embed_fn is not None else None
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO response_cache
+                (cache_key, model, system_hash, query, response, embedding,
+                 cost, metadata, created_at, last_used_at, hit_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+            """, (
+                self.make_key(model, system_prompt, query),
+                model,
+                hash_text(system_prompt),
+                normalize_query(query),
+                response,
+                embedding,
+                self.default_cost if cost is None else cost,
+                json.dumps(metadata) if metadata else None,
+                now,
+                now
+            ))
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then least recently used entries beyond max_entries"""
+        conn.execute(
+            "DELETE FROM response_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        conn.execute("""
+            DELETE FROM response_cache WHERE cache_key IN (
+                SELECT cache_key FROM response_cache
+                ORDER BY last_used_at DESC
+                LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Unit-normalized float32 embedding of the normalized query"""
+        vector = np.asarray(self.embed_fn(normalize_query(text)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _record_hit(self, hit: CachedResponse):
+        with self._lock:
+            if hit.tier == "exact":
+                self.exact_hits += 1
+            else:
+                self.semantic_hits += 1
+            self.cost_saved += hit.cost_saved
+
+        if self.cost_tracker is not None and hit.cost_saved > 0:
+            self.cost_tracker.record_savings(
+                amount=hit.cost_saved,
+                category="response_cache",
+                description=f"{hit.tier} cache hit ({hit.model})",
+                metadata={"tier": hit.tier, "similarity": hit.similarity}
+            )
+
+    def clear(self):
+        """Remove every entry (for all processes sharing the file)"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM response_cache")
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return this instance's hit/miss counters and the shared entry count"""
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                'entries': len(self),
+                'exact_hits': self.exact_hits,
+                'semantic_hits': self.semantic_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'cost_saved': self.cost_saved
+            }
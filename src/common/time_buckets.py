@@ -0,0 +1,51 @@
+"""
+Time Buckets - Integer epoch timestamps and hourly/daily bucket boundaries
+
+History tables store event times as integer epoch seconds so range queries
+compare integers and results need no per-row ISO parsing. Rollup tables key
+their rows on the epoch start of the local hour or day a bucket covers.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+# Supported rollup granularities
+HOUR = "hour"
+DAY = "day"
+GRANULARITIES = (HOUR, DAY)
+
+
+def to_epoch(dt: datetime) -> int:
+    """Epoch seconds for a datetime (naive datetimes are local time)"""
+    return int(dt.timestamp())
+
+
+def from_epoch(ts: int) -> datetime:
+    """Naive local datetime for epoch seconds"""
+    return datetime.fromtimestamp(ts)
+
+
+def bucket_start(dt: datetime, granularity: str) -> int:
+    """
+    Epoch start of the local hour or day containing dt.
+
+    Args:
+        dt: Any datetime in the bucket
+        granularity: HOUR or DAY
+
+    Returns:
+        Epoch seconds of the bucket start
+
+    Raises:
+        ValueError: If granularity is unknown
+    """
+    if granularity == HOUR:
+        return to_epoch(dt.replace(minute=0, second=0, microsecond=0))
+    if granularity == DAY:
+        return to_epoch(dt.replace(hour=0, minute=0, second=0, microsecond=0))
+    raise ValueError(f"Unknown granularity: {granularity!r} (expected one of {GRANULARITIES})")
+
+
+def parse_iso_epoch(value: Optional[str]) -> Optional[int]:
+    """Epoch seconds for an ISO-8601 string (used to migrate text timestamps)"""
+    return to_epoch(datetime.fromisoformat(value)) if value else None
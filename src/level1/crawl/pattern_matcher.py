@@ -10,6 +10,10 @@ from typing import List, Dict
 from pathlib import Path
 
 from src.common.config import Config
+from src.common.pattern_engine import get_pattern_engine
+
+# Applied to every query (patterns.json key, or name in the list format)
+ALWAYS_APPLY = ('precision_policing', 'Precision Policing')
 
 
 class PatternMatcher:
@@ -40,9 +44,32 @@ class PatternMatcher:
         if patterns_file is None:
             patterns_file = Config.PATTERNS_FILE
 
-        # TODO: Implement pattern loading
-        # See: 06_detailed_implementation_roadmap.md - Milestone 1.2
-        self.patterns = {}
+        self.patterns = self._load_patterns(Path(patterns_file))
+
+        # Trigger keywords are registered with the shared pattern engine, so
+        # a query is scanned once for all patterns
+        self.engine = get_pattern_engine()
+        self.table = f"triggers:{Path(patterns_file).resolve()}"
+        self.engine.register_table(self.table, {
+            name: pattern.get('trigger_keywords', [])
+            for name, pattern in self.patterns.items()
+        })
+
+    def _load_patterns(self, patterns_file: Path) -> Dict[str, Dict]:
+        """
+        Load patterns.json (a list of patterns or a {name: pattern} dict).
+
+        Returns an empty dict if the file hasn't been created yet (Milestone 1.1).
+        """
+        if not patterns_file.exists():
+            return {}
+
+        with open(patterns_file, 'r') as f:
+            data = json.load(f)
+
+        if isinstance(data, dict):
+            return {name: {'name': name, **pattern} for name, pattern in data.items()}
+        return {pattern['name']: pattern for pattern in data}
 
     def match(self, query: str) -> List[Dict]:
         """
@@ -52,37 +79,30 @@ class PatternMatcher:
             query: User's question/request
 
         Returns:
-            List of pattern dictionaries, sorted by priority
-
-        TODO: Implement keyword matching logic
-        See: 06_detailed_implementation_roadmap.md - Milestone 1.2
+            List of pattern dictionaries whose trigger keywords appear in the
+            query, plus precision_policing, sorted by priority (lower number
+            first; ties keep patterns.json order)
         """
-        # Placeholder implementation
-        matched = []
-        query_lower = query.lower()
-
-        # TODO: Implement actual matching logic
-        # - Check if any trigger keywords match
-        # - Always include precision_policing (priority 3)
-        # - Sort by priority (lower number = higher priority)
-
+        hits = self.engine.scan(query.lower())
+        triggered = self.engine.table_matches(self.table, hits)
+
+        matched = [
+            pattern for name, pattern in self.patterns.items()
+            if triggered[name] or name in ALWAYS_APPLY
+        ]
+        matched.sort(key=lambda pattern: pattern.get('priority', float('inf')))
         return matched
 
     def get_pattern_names(self, patterns: List[Dict]) -> List[str]:
         """Extract pattern names for display."""
         return [p['name'] for p in patterns]
 
-    def _has_keyword_match(self, query: str, keywords: List[str]) -> bool:
-        """
-        Check if any keyword appears in query.
-
-        TODO: Implement keyword matching
-        """
-        # Placeholder
-        return False
-
 
 if __name__ == '__main__':
     # Test pattern matcher
     print("Testing PatternMatcher...")
-    print("⚠️  This is a placeholder - implement according to Milestone 1.2")
+    matcher = PatternMatcher()
+    print(f"Loaded {len(matcher.patterns)} patterns")
+
+    for query in ["Implement a cache", "Debug this code", "Review my design"]:
+        print(f"  {query}: {matcher.get_pattern_names(matcher.match(query))}")
@@ -14,22 +14,13 @@ from pathlib import Path
 from typing import List, Dict, Tuple
 from dotenv import load_dotenv
 
+from src.common.pattern_engine import CONVERSATION_KEYWORDS, get_pattern_engine
+
 load_dotenv(override=True)
 
 
 # The 10 patterns we're looking for (from 01_extracted_patterns.md)
-PATTERN_KEYWORDS = {
-    "Gap Analysis": ["missing", "not addressed", "gap", "✓", "✗", "⚠️", "completeness"],
-    "Tradeoff Analysis": ["tradeoff", "vs", "versus", "pros", "cons", "alternative", "option a", "option b"],
-    "Production Readiness": ["error handling", "edge case", "test", "monitoring", "logging", "production"],
-    "Brutal Accuracy": ["connection", "how does", "what does", "have to do with", "address"],
-    "Multi-Dimensional Evaluation": ["dimension", "criteria", "score", "separate", "aspect"],
-    "Hint-Based Learning": ["hint", "question to consider", "examine", "trace", "debug"],
-    "Diminishing Returns": ["roi", "marginal", "worth it", "effort", "value"],
-    "Mechanistic Understanding": ["how it works", "step-by-step", "trace", "execution", "mechanism"],
-    "Context-Dependent": ["depends on", "context", "scenario", "use case", "constraint"],
-    "Precision Policing": ["caveat", "note:", "however", "specifically", "precisely", "exactly"]
-}
+PATTERN_KEYWORDS = CONVERSATION_KEYWORDS
 
 
 def parse_markdown_conversation(md_file: Path) -> Dict:
@@ -103,9 +94,13 @@ def score_conversation_against_patterns(conversation: Dict) -> Dict[str, float]:
         if msg["role"] == "assistant"
     ])
 
+    # One pass over the text finds every keyword of every pattern
+    engine = get_pattern_engine()
+    keyword_hits = engine.table_matches("conversation", engine.scan(assistant_text))
+
     for pattern_name, keywords in PATTERN_KEYWORDS.items():
         # Count keyword matches
-        matches = sum(1 for keyword in keywords if keyword.lower() in assistant_text)
+        matches = len(keyword_hits[pattern_name])
 
         # Normalize score (0-1)
         # More matches = higher score, but cap at number of keywords
@@ -5,16 +5,30 @@ Integrates pattern detection, prompt augmentation, and fine-tuned model inferenc
 to provide pattern-aware responses.
 """
 
+import asyncio
 import os
-from typing import Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
 
-from src.level1.runtime.pattern_matcher import PatternMatcher
+from src.common.circuit_breaker import CircuitBreaker
+from src.common.model_pricing import usage_cost
+from src.common.response_cache import ResponseCache
+from src.level1.runtime.pattern_matcher import PatternMatch, PatternMatcher
 from src.level1.runtime.prompt_generator import PromptGenerator
 
 
+# Base model used when no fine-tuned model is available (or it fails)
+BASE_MODEL = "gpt-4.1-2025-04-14"
+FALLBACK_LABEL = f"{BASE_MODEL} (fallback)"
+HEDGED_LABEL = f"{BASE_MODEL} (hedged)"
+
+
 @dataclass
 class AgentResponse:
     """Response from the Level 1 agent"""
@@ -22,6 +36,48 @@ class AgentResponse:
     detected_patterns: list
     augmentations_applied: list
     model_used: str
+    stats: Optional[dict] = None  # Streaming timings, or response cache hit details
+
+
+@dataclass
+class StreamEvent:
+    """
+    One event from a streaming query.
+
+    Types, in order:
+        "metadata": data = {"detected_patterns", "augmentations_applied", "model"}
+        "chunk":    data = next piece of response text
+        "done":     data = final AgentResponse (with stats)
+    """
+    type: str
+    data: Any
+
+
+class _StreamRecorder:
+    """Accumulates streamed text and timing stats"""
+
+    def __init__(self, start_time: float):
+        self.start_time = start_time
+        self.first_chunk_time: Optional[float] = None
+        self.chunks: List[str] = []
+
+    def add(self, text: str):
+        if self.first_chunk_time is None:
+            self.first_chunk_time = time.perf_counter()
+        self.chunks.append(text)
+
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    def stats(self) -> Dict[str, Any]:
+        end_time = time.perf_counter()
+        first = self.first_chunk_time if self.first_chunk_time is not None else end_time
+        return {
+            "time_to_first_token_ms": (first - self.start_time) * 1000,
+            "total_time_ms": (end_time - self.start_time) * 1000,
+            "chunks": len(self.chunks),
+            "characters": sum(len(c) for c in self.chunks)
+        }
 
 
 class Level1Agent:
@@ -41,7 +97,13 @@ class Level1Agent:
         self,
         finetuned_model_id: Optional[str] = None,
         use_pattern_augmentation: bool = True,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        cache_size: int = 1024,
+        breaker_failure_threshold: int = 5,
+        breaker_recovery_timeout: float = 30.0,
+        hedge_after: Optional[float] = None,
+        response_cache: Optional[ResponseCache] = None,
+        hedge_workers: int = 8
     ):
         """
         Initialize the Level 1 Agent.
@@ -51,6 +113,14 @@ class Level1Agent:
                               If None, will try to load from data/finetuned_model_info.json
             use_pattern_augmentation: Whether to use pattern-based prompt augmentation
             api_key: OpenAI API key (if None, reads from OPENAI_API_KEY env var)
+            cache_size: Max queries whose pattern detection is cached (0 disables)
+            breaker_failure_threshold: Consecutive fine-tuned failures that open the circuit
+            breaker_recovery_timeout: Seconds before a probe request retries the fine-tuned model
+            hedge_after: If set, also ask the base model once the fine-tuned model has
+                         taken this many seconds, and keep whichever answers first
+            response_cache: Serves repeated (or similar) queries without a model call
+            hedge_workers: Threads for hedged fine-tuned calls, and separately
+                           for the base model hedges
         """
         # Initialize OpenAI client
         self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
@@ -60,9 +130,24 @@ class Level1Agent:
 
         # Initialize pattern matching and prompt generation
         self.use_pattern_augmentation = use_pattern_augmentation
-        self.pattern_matcher = PatternMatcher()
+        self.pattern_matcher = PatternMatcher(cache_size=cache_size)
         self.prompt_generator = PromptGenerator()
 
+        # During a fine-tuned outage, skip straight to the base model
+        self.finetuned_breaker = CircuitBreaker(
+            failure_threshold=breaker_failure_threshold,
+            recovery_timeout=breaker_recovery_timeout
+        )
+
+        # Hedged requests (latency budget for the fine-tuned model)
+        self.hedge_after = hedge_after
+        self.hedge_stats = {"fired": 0, "fallback_wins": 0}
+        self.hedge_workers = hedge_workers
+        self._hedge_lock = threading.Lock()
+        self._hedge_executors: Dict[str, ThreadPoolExecutor] = {}
+
+        self.response_cache = response_cache
+
     def _load_model_id(self) -> Optional[str]:
         """Load fine-tuned model ID from data/finetuned_model_info.json"""
         try:
@@ -103,78 +188,427 @@ class Level1Agent:
         Returns:
             AgentResponse with the model's response and metadata
         """
-        # Step 1: Detect patterns in the query
-        detected_patterns = []
-        augmentations_applied = []
-
-        if self.use_pattern_augmentation:
-            detected_patterns = self.pattern_matcher.detect_patterns(user_query)
-
-            # Step 2: Generate augmented prompt
-            augmented_prompt = self.prompt_generator.generate_augmented_prompt(
-                user_query=user_query,
-                detected_patterns=detected_patterns,
-                top_n=top_patterns
-            )
+        # Steps 1-2: Detect patterns and generate augmented prompt
+        system_prompt, user_prompt, detected_patterns, augmentations_applied = \
+            self._prepare_prompts(user_query, top_patterns)
+        messages = self._build_messages(system_prompt, user_prompt)
 
-            system_prompt = augmented_prompt.system_prompt
-            user_prompt = augmented_prompt.user_prompt
-            augmentations_applied = augmented_prompt.augmentation_applied
-        else:
-            # Use simple prompt without pattern augmentation
-            simple_prompt = self.prompt_generator.generate_simple_prompt(user_query)
-            system_prompt = simple_prompt.system_prompt
-            user_prompt = simple_prompt.user_prompt
+        # Step 3: Serve a cached answer for the same model and system prompt
+        cached = self._cached_response(
+            system_prompt, user_query, detected_patterns, augmentations_applied, top_patterns
+        )
+        if cached is not None:
+            return cached
 
-        # Step 3: Call fine-tuned model (or base GPT-4.1 if no fine-tuned model available)
-        model_to_use = self.finetuned_model_id or "gpt-4.1-2025-04-14"
+        # Step 4: Call fine-tuned model (or base GPT-4.1 if no fine-tuned model available)
+        response_text, cost, model_to_use = self._complete_with_fallback(
+            messages, temperature, max_tokens
+        )
+        self._cache_response(system_prompt, user_query, response_text, model_to_use, cost)
 
-        try:
-            response = self.client.chat.completions.create(
-                model=model_to_use,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens
+        # Step 5: Return structured response
+        return self._build_response(
+            response_text, detected_patterns, augmentations_applied, top_patterns, model_to_use
+        )
+
+    def _cached_response(
+        self,
+        system_prompt: str,
+        user_query: str,
+        detected_patterns: List[PatternMatch],
+        augmentations_applied: List[str],
+        top_patterns: int
+    ) -> Optional[AgentResponse]:
+        """Response built from a cache hit, or None on a miss (or without a cache)"""
+        if self.response_cache is None:
+            return None
+
+        hit = self.response_cache.get(
+            self.finetuned_model_id or BASE_MODEL, system_prompt, user_query
+        )
+        if hit is None:
+            return None
+
+        response = self._build_response(
+            hit.response, detected_patterns, augmentations_applied, top_patterns,
+            hit.metadata.get("model_used", hit.model)
+        )
+        response.stats = {"cache_tier": hit.tier, "similarity": hit.similarity}
+        return response
+
+    def _cache_response(
+        self,
+        system_prompt: str,
+        user_query: str,
+        response_text: str,
+        model_used: str,
+        cost: Optional[float]
+    ):
+        """
+        Store a model answer with the cost of the call that produced it.
+
+        Only answers from the model the cache is keyed on are stored; a
+        fallback or hedged base-model answer would otherwise be served as a
+        fine-tuned one until it expires.
+        """
+        model = self.finetuned_model_id or BASE_MODEL
+        if self.response_cache is not None and model_used == model:
+            self.response_cache.put(
+                model, system_prompt, user_query, response_text,
+                cost=cost, metadata={"model_used": model_used}
             )
 
-            response_text = response.choices[0].message.content
+    def _complete(
+        self,
+        model: str,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int
+    ) -> Tuple[str, Optional[float]]:
+        """One chat completion; returns (text, cost or None without usage)"""
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return (
+            response.choices[0].message.content,
+            usage_cost(model, getattr(response, "usage", None))
+        )
 
+    def _complete_with_fallback(
+        self,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int
+    ) -> Tuple[str, Optional[float], str]:
+        """
+        Call the fine-tuned model, falling back to base GPT-4.1.
+
+        The fine-tuned call is skipped while its circuit is open, and hedged
+        against the base model when hedge_after is set.
+
+        Returns:
+            Tuple of (response_text, cost of the answering call, model_used)
+        """
+        if not self.finetuned_model_id:
+            return (*self._complete(BASE_MODEL, messages, temperature, max_tokens), BASE_MODEL)
+
+        if not self.finetuned_breaker.allow_request():
+            return (*self._complete(BASE_MODEL, messages, temperature, max_tokens), FALLBACK_LABEL)
+
+        if self.hedge_after is not None:
+            return self._complete_hedged(messages, temperature, max_tokens)
+
+        try:
+            completion = self._complete(
+                self.finetuned_model_id, messages, temperature, max_tokens
+            )
         except Exception as e:
             # Fallback to base GPT-4.1 if fine-tuned model fails
-            if self.finetuned_model_id:
+            self.finetuned_breaker.record_failure()
+            print(f"⚠️  Fine-tuned model failed, falling back to base GPT-4.1: {e}")
+            return (*self._complete(BASE_MODEL, messages, temperature, max_tokens), FALLBACK_LABEL)
+
+        self.finetuned_breaker.record_success()
+        return (*completion, self.finetuned_model_id)
+
+    def _complete_hedged(
+        self,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int
+    ) -> Tuple[str, Optional[float], str]:
+        """
+        Fire the base model if the fine-tuned model misses the hedge_after
+        budget; return whichever succeeds first.
+
+        Hedges run on their own pool, so fine-tuned calls hung in an outage
+        can't queue them. A losing fine-tuned call that hasn't started is
+        cancelled; one already running keeps going in the background so its
+        outcome still reaches the circuit breaker.
+        """
+        args = (messages, temperature, max_tokens)
+
+        primary = self._get_hedge_executor("primary").submit(
+            self._complete, self.finetuned_model_id, *args
+        )
+        primary.add_done_callback(self._record_finetuned_outcome)
+
+        wait([primary], timeout=self.hedge_after)
+        if primary.done():
+            try:
+                return (*primary.result(), self.finetuned_model_id)
+            except Exception as e:
                 print(f"⚠️  Fine-tuned model failed, falling back to base GPT-4.1: {e}")
-                response = self.client.chat.completions.create(
-                    model="gpt-4.1-2025-04-14",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=temperature,
-                    max_tokens=max_tokens
+                return (*self._complete(BASE_MODEL, *args), FALLBACK_LABEL)
+
+        with self._hedge_lock:
+            self.hedge_stats["fired"] += 1
+        hedge = self._get_hedge_executor("hedge").submit(self._complete, BASE_MODEL, *args)
+
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in (primary, hedge):
+                if future not in done:
+                    continue
+                try:
+                    completion = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+
+                if future is hedge:
+                    primary.cancel()
+                    with self._hedge_lock:
+                        self.hedge_stats["fallback_wins"] += 1
+                    return (*completion, HEDGED_LABEL)
+                return (*completion, self.finetuned_model_id)
+
+        raise error
+
+    def _record_finetuned_outcome(self, future: Future):
+        """Report a finished fine-tuned call to the circuit breaker"""
+        if future.cancelled():
+            self.finetuned_breaker.release()
+        elif future.exception() is not None:
+            self.finetuned_breaker.record_failure()
+        else:
+            self.finetuned_breaker.record_success()
+
+    def _get_hedge_executor(self, role: str) -> ThreadPoolExecutor:
+        """Thread pool for hedged fine-tuned calls ('primary') or base model hedges ('hedge')"""
+        with self._hedge_lock:
+            if role not in self._hedge_executors:
+                self._hedge_executors[role] = ThreadPoolExecutor(
+                    max_workers=max(1, self.hedge_workers),
+                    thread_name_prefix=f"level1-{role}"
                 )
-                response_text = response.choices[0].message.content
-                model_to_use = "gpt-4.1-2025-04-14 (fallback)"
+            return self._hedge_executors[role]
+
+    def close(self):
+        """Shut down the hedge pools without waiting for abandoned calls"""
+        with self._hedge_lock:
+            executors, self._hedge_executors = self._hedge_executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_model_metrics(self) -> dict:
+        """
+        Circuit breaker and hedging metrics for the fine-tuned model path.
+
+        Returns:
+            dict with 'finetuned_breaker' (state, trips, ...) and 'hedging' counters
+        """
+        with self._hedge_lock:
+            hedging = dict(self.hedge_stats)
+        return {
+            "finetuned_breaker": self.finetuned_breaker.metrics(),
+            "hedging": hedging
+        }
+
+    def query_stream(
+        self,
+        user_query: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        top_patterns: int = 2
+    ) -> Iterator[StreamEvent]:
+        """
+        Process a query, yielding response text as the model generates it.
+
+        Pattern metadata is yielded first (before the model call), then text
+        chunks, then a final AgentResponse whose stats include time to first
+        token. Falls back to base GPT-4.1 only if the fine-tuned model fails
+        before producing any text.
+
+        Args:
+            user_query: The user's question or request
+            temperature: Sampling temperature for generation
+            max_tokens: Maximum tokens in response
+            top_patterns: How many top patterns to use for augmentation
+
+        Yields:
+            StreamEvent objects ("metadata", "chunk"..., "done")
+        """
+        start_time = time.perf_counter()
+
+        system_prompt, user_prompt, detected_patterns, augmentations_applied = \
+            self._prepare_prompts(user_query, top_patterns)
+        messages = self._build_messages(system_prompt, user_prompt)
+
+        use_finetuned = bool(self.finetuned_model_id) and self.finetuned_breaker.allow_request()
+        if use_finetuned:
+            model_to_use = self.finetuned_model_id
+        else:
+            model_to_use = FALLBACK_LABEL if self.finetuned_model_id else BASE_MODEL
+
+        yield StreamEvent("metadata", self._build_metadata(
+            detected_patterns, augmentations_applied, top_patterns, model_to_use
+        ))
+
+        recorder = _StreamRecorder(start_time)
+
+        if use_finetuned:
+            outcome_recorded = False
+            try:
+                for text in self._stream_completion(
+                    self.finetuned_model_id, messages, temperature, max_tokens
+                ):
+                    recorder.add(text)
+                    yield StreamEvent("chunk", text)
+
+            except Exception as e:
+                self.finetuned_breaker.record_failure()
+                outcome_recorded = True
+
+                # Text already sent can't be retracted, so only fall back before the first chunk
+                if recorder.chunks:
+                    raise
+                print(f"⚠️  Fine-tuned model failed, falling back to base GPT-4.1: {e}")
+                model_to_use = FALLBACK_LABEL
+
             else:
-                raise
+                self.finetuned_breaker.record_success()
+                outcome_recorded = True
+
+            finally:
+                # Consumer stopped iterating mid-stream
+                if not outcome_recorded:
+                    self.finetuned_breaker.release()
+
+        if not use_finetuned or model_to_use == FALLBACK_LABEL:
+            for text in self._stream_completion(BASE_MODEL, messages, temperature, max_tokens):
+                recorder.add(text)
+                yield StreamEvent("chunk", text)
+
+        response = self._build_response(
+            recorder.text(), detected_patterns, augmentations_applied, top_patterns, model_to_use
+        )
+        response.stats = recorder.stats()
+        yield StreamEvent("done", response)
+
+    def _stream_completion(
+        self,
+        model: str,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int
+    ) -> Iterator[str]:
+        """Yield non-empty content deltas from a streamed chat completion"""
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def _prepare_prompts(
+        self,
+        user_query: str,
+        top_patterns: int
+    ) -> Tuple[str, str, List[PatternMatch], List[str]]:
+        """
+        Detect patterns and build the (optionally augmented) prompts.
 
-        # Step 4: Return structured response
+        Returns:
+            Tuple of (system_prompt, user_prompt, detected_patterns, augmentations_applied)
+        """
+        if not self.use_pattern_augmentation:
+            # Use simple prompt without pattern augmentation
+            simple_prompt = self.prompt_generator.generate_simple_prompt(user_query)
+            return simple_prompt.system_prompt, simple_prompt.user_prompt, [], []
+
+        detected_patterns = self.pattern_matcher.detect_patterns(user_query)
+        augmented_prompt = self.prompt_generator.generate_augmented_prompt(
+            user_query=user_query,
+            detected_patterns=detected_patterns,
+            top_n=top_patterns
+        )
+
+        return (
+            augmented_prompt.system_prompt,
+            augmented_prompt.user_prompt,
+            detected_patterns,
+            augmented_prompt.augmentation_applied
+        )
+
+    @staticmethod
+    def _build_messages(system_prompt: str, user_prompt: str) -> List[dict]:
+        """Chat messages for the completion request"""
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    @staticmethod
+    def _build_metadata(
+        detected_patterns: List[PatternMatch],
+        augmentations_applied: List[str],
+        top_patterns: int,
+        model: str
+    ) -> Dict[str, Any]:
+        """Pattern metadata sent ahead of a streamed response"""
+        return {
+            "detected_patterns": Level1Agent._summarize_patterns(detected_patterns, top_patterns),
+            "augmentations_applied": augmentations_applied,
+            "model": model
+        }
+
+    @staticmethod
+    def _build_response(
+        response_text: str,
+        detected_patterns: List[PatternMatch],
+        augmentations_applied: List[str],
+        top_patterns: int,
+        model_used: str
+    ) -> AgentResponse:
+        """Package the model output and pattern metadata"""
         return AgentResponse(
             response=response_text,
-            detected_patterns=[
-                {
-                    "pattern": p.pattern_name,
-                    "confidence": p.confidence,
-                    "signals": p.matched_signals
-                }
-                for p in detected_patterns[:top_patterns]
-            ],
+            detected_patterns=Level1Agent._summarize_patterns(detected_patterns, top_patterns),
             augmentations_applied=augmentations_applied,
-            model_used=model_to_use
+            model_used=model_used
         )
 
+    @staticmethod
+    def _summarize_patterns(
+        detected_patterns: List[PatternMatch],
+        top_patterns: int
+    ) -> List[dict]:
+        """Top patterns as plain dicts for responses"""
+        return [
+            {
+                "pattern": p.pattern_name,
+                "confidence": p.confidence,
+                "signals": p.matched_signals
+            }
+            for p in detected_patterns[:top_patterns]
+        ]
+
+    def get_cache_stats(self) -> dict:
+        """
+        Hit/miss counters for the detection, system prompt and response caches.
+
+        Returns:
+            dict with 'pattern_detection' and 'system_prompt' cache stats, plus
+            'response' when a response cache is attached
+        """
+        stats = {
+            "pattern_detection": self.pattern_matcher.detection_cache.stats(),
+            "system_prompt": self.prompt_generator.prompt_cache.stats()
+        }
+        if self.response_cache is not None:
+            stats["response"] = self.response_cache.stats()
+        return stats
+
     def query_simple(self, user_query: str, **kwargs) -> str:
         """
         Simplified query interface that just returns the response text.
@@ -190,6 +624,347 @@ class Level1Agent:
         return agent_response.response
 
 
+class AsyncLevel1Agent(Level1Agent):
+    """
+    Level 1 Agent with non-blocking model calls for serving many users.
+
+    Pattern detection and prompt augmentation are identical to Level1Agent;
+    the model call goes through an AsyncOpenAI client that shares one
+    connection pool across all requests. A semaphore caps in-flight model
+    calls and every call has its own timeout.
+
+    Example:
+        >>> async with AsyncLevel1Agent(max_concurrency=8) as agent:
+        ...     responses = await agent.aquery_many(["Query A", "Query B"])
+    """
+
+    def __init__(
+        self,
+        finetuned_model_id: Optional[str] = None,
+        use_pattern_augmentation: bool = True,
+        api_key: Optional[str] = None,
+        cache_size: int = 1024,
+        max_concurrency: int = 16,
+        request_timeout: float = 60.0,
+        max_connections: Optional[int] = None,
+        breaker_failure_threshold: int = 5,
+        breaker_recovery_timeout: float = 30.0,
+        hedge_after: Optional[float] = None,
+        response_cache: Optional[ResponseCache] = None
+    ):
+        """
+        Initialize the async agent.
+
+        Args:
+            finetuned_model_id: OpenAI fine-tuned model ID (see Level1Agent)
+            use_pattern_augmentation: Whether to use pattern-based prompt augmentation
+            api_key: OpenAI API key (if None, reads from OPENAI_API_KEY env var)
+            cache_size: Max queries whose pattern detection is cached (0 disables)
+            max_concurrency: Max model calls in flight at once
+            request_timeout: Seconds allowed per model call
+            max_connections: Connection pool size (defaults to max_concurrency)
+            breaker_failure_threshold: See Level1Agent
+            breaker_recovery_timeout: See Level1Agent
+            hedge_after: See Level1Agent (the losing request is cancelled)
+            response_cache: See Level1Agent
+        """
+        super().__init__(
+            finetuned_model_id=finetuned_model_id,
+            use_pattern_augmentation=use_pattern_augmentation,
+            api_key=api_key,
+            cache_size=cache_size,
+            breaker_failure_threshold=breaker_failure_threshold,
+            breaker_recovery_timeout=breaker_recovery_timeout,
+            hedge_after=hedge_after,
+            response_cache=response_cache
+        )
+
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+
+        pool_size = max_connections or max_concurrency
+        self.async_client = AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            timeout=request_timeout,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size
+                )
+            )
+        )
+
+        # asyncio primitives belong to one event loop, so the semaphore is
+        # created on first use in whichever loop is running
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limiter for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _acomplete(
+        self,
+        model: str,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int
+    ) -> Tuple[str, Optional[float]]:
+        """One rate-limited, time-limited chat completion; returns (text, cost)"""
+        async with self._get_semaphore():
+            response = await asyncio.wait_for(
+                self.async_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                ),
+                timeout=self.request_timeout
+            )
+        return (
+            response.choices[0].message.content,
+            usage_cost(model, getattr(response, "usage", None))
+        )
+
+    async def _acomplete_with_fallback(
+        self,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int
+    ) -> Tuple[str, Optional[float], str]:
+        """
+        Async version of _complete_with_fallback().
+
+        Unlike the sync path, a fine-tuned call that loses the hedge is
+        cancelled rather than left to finish, so its outcome is recorded
+        as a failure: in the sync path a hung call reaches the breaker
+        when it times out.
+        """
+        args = (messages, temperature, max_tokens)
+
+        if not self.finetuned_model_id:
+            return (*await self._acomplete(BASE_MODEL, *args), BASE_MODEL)
+
+        if not self.finetuned_breaker.allow_request():
+            return (*await self._acomplete(BASE_MODEL, *args), FALLBACK_LABEL)
+
+        primary = asyncio.ensure_future(self._acomplete(self.finetuned_model_id, *args))
+        primary.add_done_callback(self._record_finetuned_outcome)
+
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if primary in done:
+            try:
+                return (*primary.result(), self.finetuned_model_id)
+            except Exception as e:
+                print(f"⚠️  Fine-tuned model failed, falling back to base GPT-4.1: {e!r}")
+                return (*await self._acomplete(BASE_MODEL, *args), FALLBACK_LABEL)
+
+        # Fine-tuned model missed its latency budget: race the base model
+        with self._hedge_lock:
+            self.hedge_stats["fired"] += 1
+        hedge = asyncio.ensure_future(self._acomplete(BASE_MODEL, *args))
+
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in (primary, hedge):
+                    if task not in done:
+                        continue
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+
+                    if task is hedge:
+                        with self._hedge_lock:
+                            self.hedge_stats["fallback_wins"] += 1
+                        if primary in pending:
+                            primary.remove_done_callback(self._record_finetuned_outcome)
+                            self.finetuned_breaker.record_failure()
+                        return (*task.result(), HEDGED_LABEL)
+                    return (*task.result(), self.finetuned_model_id)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        raise error
+
+    async def aquery(
+        self,
+        user_query: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        top_patterns: int = 2
+    ) -> AgentResponse:
+        """
+        Async version of query().
+
+        Falls back to base GPT-4.1 if the fine-tuned model errors or times out.
+
+        Raises:
+            asyncio.TimeoutError: If the final model call exceeds request_timeout
+        """
+        system_prompt, user_prompt, detected_patterns, augmentations_applied = \
+            self._prepare_prompts(user_query, top_patterns)
+        messages = self._build_messages(system_prompt, user_prompt)
+
+        # The cache is SQLite (and may embed the query), so it runs off the loop
+        cached = await asyncio.to_thread(
+            self._cached_response,
+            system_prompt, user_query, detected_patterns, augmentations_applied, top_patterns
+        )
+        if cached is not None:
+            return cached
+
+        response_text, cost, model_to_use = await self._acomplete_with_fallback(
+            messages, temperature, max_tokens
+        )
+        await asyncio.to_thread(
+            self._cache_response, system_prompt, user_query, response_text, model_to_use, cost
+        )
+
+        return self._build_response(
+            response_text, detected_patterns, augmentations_applied, top_patterns, model_to_use
+        )
+
+    async def aquery_stream(
+        self,
+        user_query: str,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        top_patterns: int = 2
+    ) -> AsyncIterator[StreamEvent]:
+        """
+        Async version of query_stream().
+
+        Holds a concurrency slot for the whole stream; request_timeout applies
+        to opening the stream and to each wait for the next chunk.
+        """
+        start_time = time.perf_counter()
+
+        system_prompt, user_prompt, detected_patterns, augmentations_applied = \
+            self._prepare_prompts(user_query, top_patterns)
+        messages = self._build_messages(system_prompt, user_prompt)
+
+        use_finetuned = bool(self.finetuned_model_id) and self.finetuned_breaker.allow_request()
+        if use_finetuned:
+            model_to_use = self.finetuned_model_id
+        else:
+            model_to_use = FALLBACK_LABEL if self.finetuned_model_id else BASE_MODEL
+
+        yield StreamEvent("metadata", self._build_metadata(
+            detected_patterns, augmentations_applied, top_patterns, model_to_use
+        ))
+
+        recorder = _StreamRecorder(start_time)
+
+        async with self._get_semaphore():
+            if use_finetuned:
+                outcome_recorded = False
+                try:
+                    async for text in self._astream_completion(
+                        self.finetuned_model_id, messages, temperature, max_tokens
+                    ):
+                        recorder.add(text)
+                        yield StreamEvent("chunk", text)
+
+                except Exception as e:
+                    self.finetuned_breaker.record_failure()
+                    outcome_recorded = True
+                    if recorder.chunks:
+                        raise
+                    print(f"⚠️  Fine-tuned model failed, falling back to base GPT-4.1: {e!r}")
+                    model_to_use = FALLBACK_LABEL
+
+                else:
+                    self.finetuned_breaker.record_success()
+                    outcome_recorded = True
+
+                finally:
+                    if not outcome_recorded:
+                        self.finetuned_breaker.release()
+
+            if not use_finetuned or model_to_use == FALLBACK_LABEL:
+                async for text in self._astream_completion(
+                    BASE_MODEL, messages, temperature, max_tokens
+                ):
+                    recorder.add(text)
+                    yield StreamEvent("chunk", text)
+
+        response = self._build_response(
+            recorder.text(), detected_patterns, augmentations_applied, top_patterns, model_to_use
+        )
+        response.stats = recorder.stats()
+        yield StreamEvent("done", response)
+
+    async def _astream_completion(
+        self,
+        model: str,
+        messages: List[dict],
+        temperature: float,
+        max_tokens: int
+    ) -> AsyncIterator[str]:
+        """Yield non-empty content deltas, enforcing request_timeout per wait"""
+        stream = await asyncio.wait_for(
+            self.async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            ),
+            timeout=self.request_timeout
+        )
+        chunks = stream.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.request_timeout)
+            except StopAsyncIteration:
+                break
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def aquery_many(
+        self,
+        user_queries: Sequence[str],
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> List[Union[AgentResponse, BaseException]]:
+        """
+        Run many queries concurrently (bounded by max_concurrency).
+
+        Args:
+            user_queries: Queries to answer
+            return_exceptions: Return failures in place instead of raising the first one
+            **kwargs: Additional arguments passed to aquery()
+
+        Returns:
+            Responses in the same order as user_queries
+        """
+        return await asyncio.gather(
+            *(self.aquery(q, **kwargs) for q in user_queries),
+            return_exceptions=return_exceptions
+        )
+
+    async def aclose(self):
+        """Close the shared connection pool"""
+        self.close()
+        await self.async_client.close()
+
+    async def __aenter__(self) -> "AsyncLevel1Agent":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
 # Example usage and testing
 if __name__ == "__main__":
     import sys
@@ -0,0 +1,105 @@
+"""
+Fake OpenAI Client - Offline stand-in for the chat completions API
+
+Mimics the response shapes the Level 1 agents read (streamed and non-streamed)
+so agents can be exercised in tests and demos without network access.
+"""
+
+import time
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (one per four characters) used for fake usage"""
+    return max(1, len(text) // 4)
+
+
+class FakeChatCompletions:
+    """
+    Canned chat.completions endpoint.
+
+    Replies with "<model>: <user prompt>" (or a fixed reply) and records every
+    request in `calls`. Streams split the reply into chunks of `chunk_size`
+    characters. Non-streamed responses report usage, counting one token per
+    four characters.
+    """
+
+    def __init__(
+        self,
+        reply: Optional[str] = None,
+        chunk_size: int = 8,
+        chunk_delay: float = 0.0,
+        failing_models: Optional[List[str]] = None,
+        model_latency: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            reply: Fixed reply text (defaults to echoing model and user prompt)
+            chunk_size: Characters per streamed chunk
+            chunk_delay: Seconds to sleep before each streamed chunk
+            failing_models: Models whose requests raise RuntimeError
+            model_latency: Seconds to sleep before responding, per model
+        """
+        self.reply = reply
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.failing_models = set(failing_models or [])
+        self.model_latency = model_latency or {}
+        self.calls: List[Dict] = []
+
+    def create(self, model: str, messages: List[Dict], stream: bool = False, **kwargs):
+        """Return a completion, or an iterator of chunks when stream=True"""
+        self.calls.append({"model": model, "messages": messages, "stream": stream, **kwargs})
+
+        if model in self.model_latency:
+            time.sleep(self.model_latency[model])
+
+        if model in self.failing_models:
+            raise RuntimeError(f"Model unavailable: {model}")
+
+        text = self.reply if self.reply is not None else f"{model}: {messages[-1]['content']}"
+
+        if stream:
+            return self._stream(text)
+
+        message = SimpleNamespace(role="assistant", content=text)
+        prompt_tokens = count_tokens("".join(m["content"] for m in messages))
+        completion_tokens = count_tokens(text)
+        usage = SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens
+        )
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    def _stream(self, text: str) -> Iterator[SimpleNamespace]:
+        """Yield ChatCompletionChunk-shaped objects, then a final empty delta"""
+        for start in range(0, len(text), self.chunk_size):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            delta = SimpleNamespace(content=text[start:start + self.chunk_size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)])
+
+        yield SimpleNamespace(
+            choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason="stop")]
+        )
+
+
+class FakeOpenAIClient:
+    """
+    Minimal stand-in for openai.OpenAI.
+
+    Example:
+        >>> agent = Level1Agent(api_key="unused")
+        >>> agent.client = FakeOpenAIClient()
+        >>> for event in agent.query_stream("Explain how DNS works"):
+        ...     print(event.type)
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Args:
+            **kwargs: Passed to FakeChatCompletions
+        """
+        self.chat = SimpleNamespace(completions=FakeChatCompletions(**kwargs))
@@ -5,9 +5,14 @@ This component analyzes user queries using keyword matching, semantic patterns,
 and linguistic heuristics to determine which patterns should be applied.
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 from dataclasses import dataclass
-import re
+import copy
+
+import numpy as np
+
+from src.common.pattern_engine import PATTERN_RULES, PatternEngine, get_pattern_engine
+from src.common.utils import LRUCache
 
 
 @dataclass
@@ -18,6 +23,56 @@ class PatternMatch:
     matched_signals: List[str]  # What triggered this pattern
 
 
+@dataclass
+class BatchPatternScores:
+    """
+    Pattern confidences for many queries at once.
+
+    confidences[i, j] is the confidence of pattern_names[j] for query i,
+    identical to what detect_patterns would report (0.0 if not detected).
+    """
+    pattern_names: List[str]
+    confidences: np.ndarray  # shape (n_queries, n_patterns)
+    signals: Optional[List[List[List[str]]]]  # [query][pattern] -> signals, if requested
+
+    def __len__(self) -> int:
+        return self.confidences.shape[0]
+
+    def matches(self, index: int) -> List[PatternMatch]:
+        """Detected patterns for one query, sorted like detect_patterns"""
+        row = self.confidences[index]
+        order = np.argsort(-row, kind="stable")
+        return [self._match(index, j) for j in order if row[j] > 0.0]
+
+    def top_k(self, k: int = 1) -> List[List[PatternMatch]]:
+        """Up to k highest-confidence patterns for every query"""
+        return [self.matches(i)[:k] for i in range(len(self))]
+
+    def top_patterns(self) -> List[Optional[PatternMatch]]:
+        """Single highest-confidence pattern for every query (None if none detected)"""
+        best = np.argmax(self.confidences, axis=1)
+        return [
+            self._match(i, j) if self.confidences[i, j] > 0.0 else None
+            for i, j in enumerate(best)
+        ]
+
+    def above_threshold(self, threshold: float = 0.5) -> List[List[PatternMatch]]:
+        """Patterns with confidence >= threshold for every query"""
+        return [
+            [m for m in self.matches(i) if m.confidence >= threshold]
+            for i in range(len(self))
+        ]
+
+    def _match(self, index: int, pattern_index: int) -> PatternMatch:
+        return PatternMatch(
+            pattern_name=self.pattern_names[pattern_index],
+            confidence=float(self.confidences[index, pattern_index]),
+            matched_signals=(
+                list(self.signals[index][pattern_index]) if self.signals is not None else []
+            )
+        )
+
+
 class PatternMatcher:
     """
     Detects patterns in user queries based on learned characteristics.
@@ -26,166 +81,62 @@ class PatternMatcher:
     determine which patterns apply with confidence scores.
     """
 
-    def __init__(self):
-        """Initialize pattern matchers with keyword sets and heuristics"""
+    def __init__(self, cache_size: int = 1024):
+        """
+        Initialize pattern matchers with keyword sets and heuristics
+
+        Args:
+            cache_size: Max queries whose detection results are cached (0 disables)
+        """
 
         # Pattern detection rules (keywords, phrases, linguistic patterns)
-        self.pattern_rules = {
-            "Hint-Based Learning": {
-                "keywords": [
-                    "help", "debug", "wrong", "error", "issue", "problem",
-                    "not working", "fails", "broken", "bug", "what could",
-                    "where should i look", "how do i troubleshoot"
-                ],
-                "question_words": ["what", "where", "how"],
-                "weight": 1.0
-            },
-
-            "Diminishing Returns": {
-                "keywords": [
-                    "worth", "should i", "is it worth", "optimize",
-                    "improve", "better performance", "faster", "worth the",
-                    "necessary", "overkill", "too much"
-                ],
-                "phrases": [
-                    "is it worth",
-                    "should i optimize",
-                    "worth the effort",
-                    "worth implementing"
-                ],
-                "weight": 1.0
-            },
-
-            "Multi-Dimensional Evaluation": {
-                "keywords": [
-                    "evaluate", "review", "assess", "compare", "analysis",
-                    "pros and cons", "tradeoffs", "consider", "decision",
-                    "approach"
-                ],
-                "phrases": [
-                    "review my",
-                    "evaluate this",
-                    "assess my",
-                    "what do you think"
-                ],
-                "weight": 1.0
-            },
-
-            "Precision Policing": {
-                "keywords": [
-                    "explain", "difference", "what is", "how does",
-                    "what's the difference", "how do", "definition"
-                ],
-                "phrases": [
-                    "what's the difference between",
-                    "difference between",
-                    "explain how",
-                    "how does",
-                    "what is"
-                ],
-                "weight": 1.0
-            },
-
-            "Brutal Accuracy": {
-                "keywords": [
-                    "always", "never", "best practice", "right",
-                    "correct", "true", "agree", "better than",
-                    "superior", "guarantees"
-                ],
-                "phrases": [
-                    "is always",
-                    "always better",
-                    "never use",
-                    "best practice"
-                ],
-                "indicators": [
-                    "ending_with_question_confirmation"  # "Right?", "Agree?", etc.
-                ],
-                "weight": 1.0
-            },
-
-            "Tradeoff Analysis": {
-                "keywords": [
-                    "vs", "versus", "or", "which", "choose", "better",
-                    "comparison", "alternative", "options"
-                ],
-                "phrases": [
-                    " vs ",
-                    " or ",
-                    "which should i",
-                    "should i use"
-                ],
-                "indicators": [
-                    "contains_vs_comparison"
-                ],
-                "weight": 1.0
-            },
-
-            "Gap Analysis": {
-                "keywords": [
-                    "building", "planning", "designing", "creating",
-                    "missing", "overlooking", "consider", "gaps",
-                    "what should i", "what am i missing"
-                ],
-                "phrases": [
-                    "what should i consider",
-                    "what am i missing",
-                    "what gaps",
-                    "i'm building"
-                ],
-                "weight": 1.0
-            },
-
-            "Production Readiness": {
-                "keywords": [
-                    "write", "create", "implement", "build a function",
-                    "endpoint", "api", "production", "robust",
-                    "handle errors", "logging"
-                ],
-                "phrases": [
-                    "write a",
-                    "create a",
-                    "implement a",
-                    "build a function"
-                ],
-                "indicators": [
-                    "requests_code_implementation"
-                ],
-                "weight": 1.0
-            },
-
-            "Mechanistic Understanding": {
-                "keywords": [
-                    "how does", "explain how", "why does", "mechanism",
-                    "works", "internally", "under the hood", "process"
-                ],
-                "phrases": [
-                    "how does",
-                    "explain how",
-                    "how do",
-                    "why does"
-                ],
-                "weight": 1.0
-            },
-
-            "Context-Dependent Recommendations": {
-                "keywords": [
-                    "best", "should i use", "which is better",
-                    "recommend", "what's the best", "for my",
-                    "in my case"
-                ],
-                "phrases": [
-                    "what's the best",
-                    "which is best",
-                    "should i use",
-                    "for my application"
-                ],
-                "indicators": [
-                    "asks_for_recommendation_without_context"
-                ],
-                "weight": 1.0
-            }
-        }
+        self.pattern_rules = copy.deepcopy(PATTERN_RULES)
+
+        # Detection results keyed on the lowercased query (all scoring uses it)
+        self.detection_cache = LRUCache(maxsize=cache_size)
+
+        self.compile_rules()
+
+    def compile_rules(self):
+        """
+        Bind pattern_rules to a compiled PatternEngine.
+
+        Unmodified rules share the process-wide engine, so construction is
+        cheap. Called at construction; call again after mutating pattern_rules.
+        """
+        self.detection_cache.clear()
+
+        if self.pattern_rules == PATTERN_RULES:
+            self._engine = get_pattern_engine()
+        else:
+            self._engine = PatternEngine(pattern_rules=self.pattern_rules)
+
+        # Membership matrices (feature x pattern) for batch scoring
+        self._pattern_names = list(self.pattern_rules.keys())
+        self._question_words = list(dict.fromkeys(
+            q for rules in self.pattern_rules.values() for q in rules.get("question_words", [])
+        ))
+        self._indicators = list(dict.fromkeys(
+            i for rules in self.pattern_rules.values() for i in rules.get("indicators", [])
+        ))
+
+        def membership(features: List[str], key: str) -> np.ndarray:
+            index = {f: n for n, f in enumerate(features)}
+            matrix = np.zeros((len(features), len(self._pattern_names)), dtype=np.int64)
+            for j, rules in enumerate(self.pattern_rules.values()):
+                for feature in rules.get(key, []):
+                    matrix[index[feature], j] += 1
+            return matrix
+
+        terms = self._engine.automaton.terms
+        self._term_index = {t: n for n, t in enumerate(terms)}
+        self._keyword_matrix = membership(terms, "keywords")
+        self._phrase_matrix = membership(terms, "phrases")
+        self._question_word_matrix = membership(self._question_words, "question_words")
+        self._indicator_matrix = membership(self._indicators, "indicators")
+        self._weights = np.array(
+            [rules["weight"] for rules in self.pattern_rules.values()], dtype=np.float64
+        )
 
     def detect_patterns(self, query: str) -> List[PatternMatch]:
         """
@@ -198,11 +149,24 @@ class PatternMatcher:
             List of PatternMatch objects sorted by confidence (highest first)
         """
         query_lower = query.lower()
+
+        cached = self.detection_cache.get(query_lower)
+        if cached is not None:
+            return [
+                PatternMatch(
+                    pattern_name=name, confidence=confidence, matched_signals=list(signals)
+                )
+                for name, confidence, signals in cached
+            ]
+
         matches: List[PatternMatch] = []
 
+        # Single pass over the query finds every keyword/phrase of every pattern
+        term_hits = self._engine.scan(query_lower)
+
         for pattern_name, rules in self.pattern_rules.items():
             confidence, signals = self._calculate_pattern_confidence(
-                query_lower, query, rules
+                query_lower, query, rules, term_hits
             )
 
             if confidence > 0.0:
@@ -214,17 +178,126 @@ class PatternMatcher:
 
         # Sort by confidence (highest first)
         matches.sort(key=lambda x: x.confidence, reverse=True)
+
+        # Cache an immutable snapshot so callers can't mutate cached results
+        self.detection_cache.put(query_lower, tuple(
+            (m.pattern_name, m.confidence, tuple(m.matched_signals)) for m in matches
+        ))
         return matches
 
+    def detect_patterns_batch(
+        self,
+        queries: Sequence[str],
+        include_signals: bool = True
+    ) -> BatchPatternScores:
+        """
+        Score many queries against every pattern in one vectorized pass.
+
+        Each query is scanned once (automaton, question words, indicators);
+        scoring for all queries and patterns is then done with matrix
+        operations. Confidences equal detect_patterns exactly.
+
+        Args:
+            queries: Queries or texts to score
+            include_signals: Also build per-pattern signal lists
+
+        Returns:
+            BatchPatternScores with a (len(queries), n_patterns) confidence matrix
+        """
+        n_queries = len(queries)
+        term_hits = np.zeros((n_queries, len(self._term_index)), dtype=np.int64)
+        question_word_hits = np.zeros((n_queries, len(self._question_words)), dtype=np.int64)
+        indicator_hits = np.zeros((n_queries, len(self._indicators)), dtype=np.int64)
+        features = []
+
+        for i, query in enumerate(queries):
+            query_lower = query.lower()
+            terms = self._engine.scan(query_lower)
+            qwords = {q for q in self._question_words if query_lower.startswith(q)}
+            indicators = {
+                ind for ind in self._indicators
+                if self._check_indicator(ind, query_lower, query)
+            }
+
+            term_hits[i, [self._term_index[t] for t in terms]] = 1
+            question_word_hits[
+                i, [n for n, q in enumerate(self._question_words) if q in qwords]
+            ] = 1
+            indicator_hits[
+                i, [n for n, ind in enumerate(self._indicators) if ind in indicators]
+            ] = 1
+            features.append((terms, qwords, indicators))
+
+        keyword_counts = term_hits @ self._keyword_matrix
+        phrase_counts = term_hits @ self._phrase_matrix
+        question_word_counts = question_word_hits @ self._question_word_matrix
+        indicator_counts = indicator_hits @ self._indicator_matrix
+
+        # Same arithmetic, in the same order, as _calculate_pattern_confidence
+        # so results match bit-for-bit
+        score = np.where(
+            keyword_counts > 0,
+            np.minimum(0.3 + (keyword_counts - 1) * 0.2, 0.7),
+            0.0
+        )
+        for counts, increment in (
+            (phrase_counts, 0.4),
+            (question_word_counts, 0.2),
+            (indicator_counts, 0.3),
+        ):
+            for k in range(1, int(counts.max(initial=0)) + 1):
+                score = score + np.where(counts >= k, increment, 0.0)
+
+        confidences = np.minimum(score * self._weights, 1.0)
+
+        signals = None
+        if include_signals:
+            signals = [
+                [
+                    self._collect_signals(rules, terms, qwords, indicators)
+                    for rules in self.pattern_rules.values()
+                ]
+                for terms, qwords, indicators in features
+            ]
+
+        return BatchPatternScores(
+            pattern_names=list(self._pattern_names),
+            confidences=confidences,
+            signals=signals
+        )
+
+    def _collect_signals(
+        self,
+        rules: Dict,
+        term_hits: Set[str],
+        question_word_hits: Set[str],
+        indicator_hits: Set[str]
+    ) -> List[str]:
+        """Signal list for one pattern, in the order detect_patterns reports it"""
+        return (
+            [f"keyword: {k}" for k in rules.get("keywords", []) if k in term_hits]
+            + [f"phrase: {p}" for p in rules.get("phrases", []) if p in term_hits]
+            + [f"question_word: {q}" for q in rules.get("question_words", [])
+               if q in question_word_hits]
+            + [f"indicator: {i}" for i in rules.get("indicators", []) if i in indicator_hits]
+        )
+
     def _calculate_pattern_confidence(
         self,
         query_lower: str,
         query_original: str,
-        rules: Dict
+        rules: Dict,
+        term_hits: Set[str]
     ) -> Tuple[float, List[str]]:
         """
         Calculate confidence score for a single pattern.
 
+        Args:
+            query_lower: Lowercased query
+            query_original: Query as given
+            rules: Rules for this pattern (from pattern_rules)
+            term_hits: Keywords/phrases found in query_lower by the automaton
+
         Returns:
             Tuple of (confidence_score, matched_signals)
         """
@@ -234,7 +307,7 @@ class PatternMatcher:
         # Check keywords (partial matching, each adds to score)
         keyword_matches = 0
         for keyword in rules.get("keywords", []):
-            if keyword in query_lower:
+            if keyword in term_hits:
                 keyword_matches += 1
                 signals.append(f"keyword: {keyword}")
 
@@ -244,7 +317,7 @@ class PatternMatcher:
 
         # Check phrases (exact matching, stronger signal)
         for phrase in rules.get("phrases", []):
-            if phrase in query_lower:
+            if phrase in term_hits:
                 score += 0.4
                 signals.append(f"phrase: {phrase}")
 
@@ -266,28 +339,8 @@ class PatternMatcher:
         return confidence, signals
 
     def _check_indicator(self, indicator: str, query_lower: str, query_original: str) -> bool:
-        """Check special linguistic indicators"""
-
-        if indicator == "ending_with_question_confirmation":
-            # Ends with "Right?", "Agree?", "True?", "Correct?", "Yes?"
-            return bool(re.search(r'\b(right|agree|true|correct|yes)\?$', query_lower))
-
-        elif indicator == "contains_vs_comparison":
-            # Contains "X vs Y" or "X or Y" pattern
-            return bool(re.search(r'\w+\s+(vs|versus|or)\s+\w+', query_lower))
-
-        elif indicator == "requests_code_implementation":
-            # Starts with imperative verb
-            imperative_verbs = ["write", "create", "implement", "build", "make", "develop"]
-            return any(query_lower.startswith(verb) for verb in imperative_verbs)
-
-        elif indicator == "asks_for_recommendation_without_context":
-            # Asks "what's best" or "which should I" without specifics
-            has_best_question = bool(re.search(r"what'?s\s+the\s+best|which\s+is\s+best", query_lower))
-            lacks_specifics = len(query_lower.split()) < 15  # Short, vague question
-            return has_best_question and lacks_specifics
-
-        return False
+        """Check special linguistic indicators (precompiled in the pattern engine)"""
+        return self._engine.check_indicator(indicator, query_lower)
 
     def get_top_pattern(self, query: str) -> PatternMatch | None:
         """Get the single highest-confidence pattern for a query"""
@@ -325,11 +378,14 @@ if __name__ == "__main__":
     print("Pattern Detection Test Results:\n")
     print("=" * 80)
 
-    for query in test_queries:
+    # One vectorized pass scores every query
+    batch = matcher.detect_patterns_batch(test_queries)
+
+    for i, query in enumerate(test_queries):
         print(f"\nQuery: {query}")
         print("-" * 80)
 
-        matches = matcher.detect_patterns(query)
+        matches = batch.matches(i)
 
         if matches:
             for match in matches[:3]:  # Show top 3
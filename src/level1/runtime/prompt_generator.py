@@ -5,9 +5,10 @@ Takes detected patterns and user queries, then injects relevant context to help
 the fine-tuned model apply the learned patterns effectively.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from dataclasses import dataclass
 
+from src.common.utils import LRUCache
 from src.level1.runtime.pattern_matcher import PatternMatch
 
 
@@ -28,8 +29,13 @@ class PromptGenerator:
     to apply learned behaviors (gap analysis, tradeoff thinking, etc.)
     """
 
-    def __init__(self):
-        """Initialize with pattern-specific augmentation templates"""
+    def __init__(self, cache_size: int = 256):
+        """
+        Initialize with pattern-specific augmentation templates
+
+        Args:
+            cache_size: Max assembled system prompts to memoize (0 disables)
+        """
 
         # Base system prompt (always included)
         self.base_system_prompt = """You are a coding assistant for Kartik, an experienced ML engineer.
@@ -145,6 +151,9 @@ For "what's best" questions, refuse universal answers:
 - Explain why context matters for this decision"""
         }
 
+        # (ordered top pattern names, top_n) -> (system_prompt, augmentations)
+        self.prompt_cache = LRUCache(maxsize=cache_size)
+
     def generate_augmented_prompt(
         self,
         user_query: str,
@@ -162,34 +171,57 @@ For "what's best" questions, refuse universal answers:
         Returns:
             AugmentedPrompt with enhanced system prompt and user query
         """
+        # Prompt depends only on which patterns rank in the top N, in order
+        top_pattern_names = tuple(p.pattern_name for p in detected_patterns[:top_n])
+        system_prompt, augmentations_applied = self._build_system_prompt(
+            top_pattern_names, top_n
+        )
+
+        # User prompt stays the same (augmentation is in system prompt)
+        user_prompt = user_query
+
+        return AugmentedPrompt(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            detected_patterns=detected_patterns,
+            augmentation_applied=augmentations_applied
+        )
+
+    def _build_system_prompt(
+        self,
+        top_pattern_names: Tuple[str, ...],
+        top_n: int
+    ) -> Tuple[str, List[str]]:
+        """
+        Assemble (or fetch memoized) system prompt for the top patterns.
+
+        Returns:
+            Tuple of (system_prompt, augmentations_applied)
+        """
+        key = (top_pattern_names, top_n)
+        cached = self.prompt_cache.get(key)
+        if cached is not None:
+            return cached[0], list(cached[1])
+
         # Start with base system prompt
         system_prompt_parts = [self.base_system_prompt]
         augmentations_applied = []
 
         # Add pattern-specific augmentations for top N patterns
-        top_patterns = detected_patterns[:top_n]
-
-        if top_patterns:
+        if top_pattern_names:
             system_prompt_parts.append("\n**Context for this query:**")
 
-            for pattern in top_patterns:
-                if pattern.pattern_name in self.pattern_augmentations:
-                    augmentation = self.pattern_augmentations[pattern.pattern_name]
+            for pattern_name in top_pattern_names:
+                if pattern_name in self.pattern_augmentations:
+                    augmentation = self.pattern_augmentations[pattern_name]
                     system_prompt_parts.append(augmentation)
-                    augmentations_applied.append(pattern.pattern_name)
+                    augmentations_applied.append(pattern_name)
 
         # Combine into final system prompt
         system_prompt = "\n".join(system_prompt_parts)
 
-        # User prompt stays the same (augmentation is in system prompt)
-        user_prompt = user_query
-
-        return AugmentedPrompt(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            detected_patterns=detected_patterns,
-            augmentation_applied=augmentations_applied
-        )
+        self.prompt_cache.put(key, (system_prompt, tuple(augmentations_applied)))
+        return system_prompt, augmentations_applied
 
     def generate_simple_prompt(self, user_query: str) -> AugmentedPrompt:
         """
@@ -222,12 +254,14 @@ if __name__ == "__main__":
     print("Augmented Prompt Generation Test:\n")
     print("=" * 80)
 
-    for query in test_queries:
+    # Detect patterns for every query in one batch
+    batch = matcher.detect_patterns_batch(test_queries)
+
+    for i, query in enumerate(test_queries):
         print(f"\nQuery: {query}")
         print("-" * 80)
 
-        # Detect patterns
-        matches = matcher.detect_patterns(query)
+        matches = batch.matches(i)
 
         # Generate augmented prompt
         augmented = generator.generate_augmented_prompt(query, matches, top_n=2)
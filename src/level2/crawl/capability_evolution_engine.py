@@ -17,6 +17,7 @@ from pathlib import Path
 
 from src.level2.crawl.build_vs_buy_analyzer import BuildVsBuyAnalyzer
 from src.level2.crawl.approval_workflow import ApprovalWorkflow
+from src.level2.crawl.generation_cache import GenerationCache
 from src.level2.crawl.tool_acquisition_engine import ToolAcquisitionEngine, GeneratedTool
 from src.level2.crawl.unified_agent_pipeline import ToolRegistry, UnifiedAgentPipeline
 
@@ -60,7 +61,8 @@ class CapabilityEvolutionEngine:
         self,
         gemini_api_key: Optional[str] = None,
         tool_registry: Optional[ToolRegistry] = None,
-        config_path: Optional[Path] = None
+        config_path: Optional[Path] = None,
+        generation_cache: Optional[GenerationCache] = None
     ):
         """
         Initialize the evolution engine.
@@ -69,10 +71,17 @@ class CapabilityEvolutionEngine:
             gemini_api_key: Google API key for Gemini 2.5 Pro
             tool_registry: Existing ToolRegistry (or creates new one)
             config_path: Path to approval_settings.yaml
+            generation_cache: Replays tools generated for an identical request
+                (default: none; pass one with a cost_tracker so replays are
+                reported as savings)
         """
         self.analyzer = BuildVsBuyAnalyzer()
         self.workflow = ApprovalWorkflow(config_path=config_path)
-        self.engine = ToolAcquisitionEngine(gemini_api_key=gemini_api_key)
+        self.generation_cache = generation_cache
+        self.engine = ToolAcquisitionEngine(
+            gemini_api_key=gemini_api_key,
+            generation_cache=self.generation_cache
+        )
         self.tool_registry = tool_registry or ToolRegistry()
 
     def evolve_capability(
@@ -135,7 +144,7 @@ class CapabilityEvolutionEngine:
                     approval = self.workflow.approve_with_bypass(recommendation)
 
             # Step 3: Acquire tool
-            tool = self.engine.acquire_tool(pattern, recommendation, approval)
+            tool = self.engine.acquire_tool(pattern, recommendation, approval, missing_capabilities)
 
             # Step 4: Save tool to file
             saved_path = self.engine.save_tool(tool)
@@ -0,0 +1,297 @@
+"""
+Generation Cache - Reuse generated tool code for repeated acquisitions
+
+Tool generation is the most expensive step of capability evolution, and the
+same pattern with the same missing capabilities and the same library or API
+produces an interchangeable tool. Generated code is stored in a SQLite file
+(WAL mode) keyed on a canonical fingerprint of:
+
+- pattern name
+- missing capabilities (normalized and sorted)
+- acquisition type ('build', 'library', 'api')
+- source (library or API name; empty for builds)
+- prompt template version (bumped whenever a prompt changes)
+
+Each entry records whether the code passed validation; only valid entries
+are replayed. In offline mode a miss raises GenerationCacheMiss instead of
+calling the model, so acquisitions can be replayed without network access.
+Hits are counted per entry and reported as savings to the cost tracker.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src.common.config import Config
+from src.common.response_cache import hash_text
+
+
+class GenerationCacheMiss(LookupError):
+    """No valid cached generation exists and the cache is offline"""
+
+
+@dataclass
+class CachedGeneration:
+    """
+    A cached generation.
+
+    Attributes:
+        fingerprint: Canonical key fields (JSON)
+        code: Generated code
+        valid: Whether the code passed validation
+        validation_error: Why validation failed (None if valid)
+        cost: Cost charged for the generation (0 if it wasn't charged),
+            saved again on every hit
+        hit_count: Times the entry has been replayed (including this hit)
+        metadata: Caller metadata stored with the entry
+    """
+    fingerprint: str
+    code: str
+    valid: bool
+    validation_error: Optional[str]
+    cost: float
+    hit_count: int
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def generation_fingerprint(
+    pattern_name: str,
+    capabilities: Iterable[str],
+    acquisition_type: str,
+    source: str = "",
+    template_version: str = "1"
+) -> str:
+    """
+    Canonical JSON fingerprint of a generation request.
+
+    Capabilities are lowercased, whitespace-collapsed, deduplicated and
+    sorted, so the order they were detected in doesn't matter.
+    """
+    return json.dumps({
+        'pattern': pattern_name.strip(),
+        'capabilities': sorted({' '.join(c.lower().split()) for c in capabilities or []}),
+        'acquisition_type': acquisition_type,
+        'source': source or "",
+        'template_version': str(template_version)
+    }, sort_keys=True, separators=(',', ':'))
+
+
+class GenerationCache:
+    """
+    Persistent cache of generated tool code shared across processes.
+
+    Example:
+        >>> cache = GenerationCache(cost_tracker=cost_system)
+        >>> engine = ToolAcquisitionEngine(generation_cache=cache)
+        >>> replay = GenerationCache(offline=True)  # never calls the model
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        offline: bool = False,
+        cost_tracker: Optional[Any] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            db_path: SQLite file (default: data/generation_cache.db)
+            offline: Replay only; misses raise GenerationCacheMiss
+            cost_tracker: Object with record_savings() (e.g. CostManagementSystem)
+            clock: Wall-clock time source (injectable for tests)
+        """
+        if db_path is None:
+            db_path = Config.DATA_DIR / "generation_cache.db"
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.offline = offline
+        self.cost_tracker = cost_tracker
+        self._clock = clock
+
+        # Per-instance counters (the table itself is shared)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.cost_saved = 0.0
+
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30.0)
+
+    def _init_database(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS generation_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    code TEXT NOT NULL,
+                    valid INTEGER NOT NULL,
+                    validation_error TEXT,
+                    cost REAL DEFAULT 0.0,
+                    metadata TEXT,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    hit_count INTEGER DEFAULT 0
+                )
+            """)
+
+    @staticmethod
+    def make_key(fingerprint: str) -> str:
+        """Cache key for a fingerprint from generation_fingerprint()"""
+        return hash_text(fingerprint)
+
+    def get(self, fingerprint: str) -> Optional[CachedGeneration]:
+        """
+        Look up a valid cached generation.
+
+        Args:
+            fingerprint: From generation_fingerprint()
+
+        Returns:
+            CachedGeneration, or None if there is no valid entry
+
+        Raises:
+            GenerationCacheMiss: On a miss in offline mode
+        """
+        key = self.make_key(fingerprint)
+
+        with closing(self._connect()) as conn:
+            # Plain read first; only a hit takes the write lock
+            row = conn.execute("""
+                SELECT code, validation_error, cost, metadata
+                FROM generation_cache
+                WHERE cache_key = ? AND valid = 1
+            """, (key,)).fetchone()
+
+            if row is not None:
+                with conn:
+                    conn.execute("""
+                        UPDATE generation_cache
+                        SET last_used_at = ?, hit_count = hit_count + 1
+                        WHERE cache_key = ?
+                    """, (self._clock(), key))
+                    hit_count = conn.execute(
+                        "SELECT hit_count FROM generation_cache WHERE cache_key = ?", (key,)
+                    ).fetchone()[0]
+
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            if self.offline:
+                raise GenerationCacheMiss(f"No cached generation for {fingerprint}")
+            return None
+
+        hit = CachedGeneration(
+            fingerprint=fingerprint,
+            code=row[0],
+            valid=True,
+            validation_error=row[1],
+            cost=row[2] or 0.0,
+            hit_count=hit_count,
+            metadata=json.loads(row[3]) if row[3] else {}
+        )
+        self._record_hit(hit)
+        return hit
+
+    def put(
+        self,
+        fingerprint: str,
+        code: str,
+        valid: bool,
+        validation_error: Optional[str] = None,
+        cost: float = 0.0,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Store a generation and its validation outcome.
+
+        A valid entry is never replaced by an invalid one.
+
+        Args:
+            fingerprint: From generation_fingerprint()
+            code: Generated code
+            valid: Whether the code passed validation
+            validation_error: Why validation failed
+            cost: Cost of the generation
+            metadata: JSON-serializable extras returned with hits
+        """
+        now = self._clock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                INSERT INTO generation_cache
+                (cache_key, fingerprint, code, valid, validation_error, cost,
+                 metadata, created_at, last_used_at, hit_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    code = excluded.code,
+                    valid = excluded.valid,
+                    validation_error = excluded.validation_error,
+                    cost = excluded.cost,
+                    metadata = excluded.metadata,
+                    created_at = excluded.created_at,
+                    last_used_at = excluded.last_used_at
+                WHERE excluded.valid = 1 OR generation_cache.valid = 0
+            """, (
+                self.make_key(fingerprint),
+                fingerprint,
+                code,
+                int(valid),
+                validation_error,
+                cost,
+                json.dumps(metadata, default=str) if metadata else None,
+                now,
+                now
+            ))
+
+    def _record_hit(self, hit: CachedGeneration):
+        with self._lock:
+            self.hits += 1
+            self.cost_saved += hit.cost
+
+        if self.cost_tracker is not None and hit.cost > 0:
+            self.cost_tracker.record_savings(
+                amount=hit.cost,
+                category="generation_cache",
+                description=f"Replayed cached generation (hit {hit.hit_count})",
+                metadata={"fingerprint": json.loads(hit.fingerprint), "hit_count": hit.hit_count}
+            )
+
+    def clear(self):
+        """Remove every entry"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM generation_cache")
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM generation_cache").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return shared entry/hit totals and this instance's counters"""
+        with closing(self._connect()) as conn:
+            entries, valid, total_hits, total_saved = conn.execute("""
+                SELECT COUNT(*), COALESCE(SUM(valid), 0), COALESCE(SUM(hit_count), 0),
+                       COALESCE(SUM(hit_count * cost), 0.0)
+                FROM generation_cache
+            """).fetchone()
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'valid_entries': valid,
+                'total_hits': total_hits,
+                'total_cost_saved': total_saved,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'cost_saved': self.cost_saved,
+                'offline': self.offline
+            }
@@ -3,12 +3,23 @@ Tool Acquisition Engine - Generates or acquires tools based on approved strategy
 
 Implements both BUILD (internal code generation) and BUY (library wrapper) paths.
 Uses Gemini 2.5 Pro for code generation.
+
+With candidates > 1 the BUILD path requests several generations concurrently,
+validates each as it arrives (compile, `analyze` contract, sandboxed smoke run)
+and keeps the first valid one, cancelling the requests still in flight.
+
+With a GenerationCache attached, code generated for the same pattern,
+capabilities and source is replayed instead of prompting again.
 """
 
+import ast
+import asyncio
+import logging
 import os
 import re
 from dataclasses import dataclass
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Set, Tuple, TypeVar
 from pathlib import Path
 
 from google import genai
@@ -21,6 +32,83 @@ from src.level2.crawl.build_vs_buy_analyzer import (
     AcquisitionType
 )
 from src.level2.crawl.approval_workflow import ApprovalResponse
+from src.level2.crawl.generation_cache import GenerationCache, generation_fingerprint
+from src.level2.crawl.tool_sandbox import SandboxPool, ToolSandboxError
+
+logger = logging.getLogger(__name__)
+
+# Bump when a prompt changes so cached generations from the old prompt aren't replayed
+BUILD_PROMPT_VERSION = "1"
+LIBRARY_PROMPT_VERSION = "1"
+
+# Generation metadata describing what the original request cost; a replay costs nothing
+COST_METADATA_KEYS = ('generation_cost',)
+
+# Input for the sandboxed smoke run of a generated tool
+SMOKE_TEST_INPUT = '''def add(a: int, b: int) -> int:
+    """Add two numbers"""
+    return a + b
+'''
+
+
+T = TypeVar('T')
+
+
+def run_coroutine(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Uses asyncio.run() normally. When the caller is itself inside a running
+    event loop (e.g. acquire_tool() called from async code), the coroutine
+    runs on a private loop in a worker thread instead, since asyncio.run()
+    can't nest.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="candidate-race") as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def validate_tool_code(code: str, class_name: str) -> Optional[str]:
+    """
+    Static checks for the generated tool contract.
+
+    Args:
+        code: Generated Python source
+        class_name: Expected tool class name
+
+    Returns:
+        None if the code compiles and defines a class with an
+        analyze(self, code, ...) method (sync or async), else a description
+        of the problem
+    """
+    try:
+        tree = ast.parse(code)
+        compile(tree, '<generated tool>', 'exec')
+    except (SyntaxError, ValueError) as e:
+        return f"Syntax error: {e}"
+
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+    if not classes:
+        return "No class defined"
+
+    tool_class = next((c for c in classes if c.name == class_name), classes[0])
+    analyze = next(
+        (node for node in tool_class.body
+         if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == 'analyze'),
+        None
+    )
+    if analyze is None:
+        return f"{tool_class.name} has no analyze() method"
+
+    params = analyze.args.posonlyargs + analyze.args.args
+    if len(params) < 2 and analyze.args.vararg is None:
+        return f"{tool_class.name}.analyze() doesn't accept a code argument"
+
+    return None
 
 
 @dataclass
@@ -56,12 +144,31 @@ class ToolAcquisitionEngine:
     - For APIs: Generate client wrapper (future)
     """
 
-    def __init__(self, gemini_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        gemini_api_key: Optional[str] = None,
+        candidates: int = 1,
+        cost_system: Optional[Any] = None,
+        cost_per_generation: float = 1.00,
+        sandbox: Optional[SandboxPool] = None,
+        smoke_timeout: float = 30.0,
+        generation_cache: Optional[GenerationCache] = None
+    ):
         """
         Initialize the tool acquisition engine.
 
         Args:
             gemini_api_key: Google API key. If None, uses GEMINI_API_KEY env var
+            candidates: Concurrent generations per BUILD (first valid one wins)
+            cost_system: CostManagementSystem; each generation's cost is
+                reserved before it is requested (skipped if the budget blocks
+                it), committed once the response arrives and released if the
+                request is cancelled
+            cost_per_generation: Estimated cost of one generation request
+            sandbox: Pool for smoke-running candidates (created on first use
+                when candidates > 1)
+            smoke_timeout: Wall-clock limit for a candidate's smoke run
+            generation_cache: Replays code generated for an identical request
         """
         api_key = gemini_api_key or os.getenv("GEMINI_API_KEY")
         self.client = genai.Client(api_key=api_key)
@@ -70,12 +177,20 @@ class ToolAcquisitionEngine:
             temperature=0.3,
             max_output_tokens=8000,
         )
+        self.candidates = max(1, candidates)
+        self.cost_system = cost_system
+        self.cost_per_generation = cost_per_generation
+        self.sandbox = sandbox
+        self.smoke_timeout = smoke_timeout
+        self._owns_sandbox = False
+        self.generation_cache = generation_cache
 
     def acquire_tool(
         self,
         pattern: Dict,
         recommendation: BuildVsBuyRecommendation,
-        approval: ApprovalResponse
+        approval: ApprovalResponse,
+        missing_capabilities: Optional[List[str]] = None
     ) -> GeneratedTool:
         """
         Implement the approved acquisition strategy.
@@ -84,12 +199,14 @@ class ToolAcquisitionEngine:
             pattern: Pattern dictionary with 'name' and 'description'
             recommendation: BuildVsBuyRecommendation from analyzer
             approval: ApprovalResponse from workflow
+            missing_capabilities: Capabilities the tool should add (part of
+                the generation cache key)
 
         Returns:
             GeneratedTool ready to be registered and used
         """
         if approval.selected_option == 'build':
-            return self._build_tool(pattern, recommendation.build_option)
+            return self._build_tool(pattern, recommendation.build_option, missing_capabilities)
         else:
             # Find the selected buy option
             buy_option = next(
@@ -101,28 +218,88 @@ class ToolAcquisitionEngine:
                 raise ValueError(f"Unknown option: {approval.selected_option}")
 
             if buy_option.acquisition_type == AcquisitionType.LIBRARY:
-                return self._acquire_library(pattern, buy_option)
+                return self._acquire_library(pattern, buy_option, missing_capabilities)
             else:
                 return self._acquire_api(pattern, buy_option)
 
     def _build_tool(
         self,
         pattern: Dict,
-        build_option: BuildOption
+        build_option: BuildOption,
+        missing_capabilities: Optional[List[str]] = None
     ) -> GeneratedTool:
         """
         Generate tool code using Gemini 2.5 Pro.
 
+        With candidates > 1, generations race and the first one passing
+        validation is returned (see _generate_candidates).
+
         Args:
             pattern: Pattern dictionary with 'name' and 'description'
             build_option: BuildOption from analyzer
+            missing_capabilities: Capabilities the tool should add
 
         Returns:
             GeneratedTool with generated code
+
+        Raises:
+            ValueError: If the budget blocks generation or no valid code is produced
+            GenerationCacheMiss: If the generation cache is offline and has no entry
         """
         class_name = self._generate_class_name(pattern['name'])
+        fingerprint = generation_fingerprint(
+            pattern['name'], missing_capabilities or [], 'build',
+            template_version=BUILD_PROMPT_VERSION
+        )
+
+        def generate() -> Tuple[str, Optional[str], Dict[str, Any]]:
+            generation_prompt = self._build_prompt(pattern, class_name)
+            if self.candidates > 1:
+                code, generation = self._generate_candidates(
+                    generation_prompt, class_name, pattern['name']
+                )
+                return code, None, generation
+
+            allowed, reservation = self._reserve_generation(pattern['name'], 0)
+            if not allowed:
+                raise ValueError("Tool generation blocked by budget")
+            completed = False
+            try:
+                response = self.client.models.generate_content(
+                    model=self.model,
+                    contents=generation_prompt,
+                    config=self.generation_config
+                )
+                completed = True
+            finally:
+                self._settle_generation(reservation, completed, pattern['name'], 0)
+
+            code = self._extract_code(response.text)
+            return code, self._syntax_error(code, "code"), {
+                'generation_cost': self._charged_cost(1)
+            }
+
+        tool_code, generation = self.generate_with_cache(fingerprint, generate)
+
+        return GeneratedTool(
+            name=class_name,
+            code=tool_code,
+            pattern_name=pattern['name'],
+            acquisition_type='build',
+            metadata={
+                'build_option': {
+                    'complexity': build_option.complexity,
+                    'estimated_hours': build_option.estimated_hours,
+                    'lines_of_code': build_option.lines_of_code
+                },
+                'generated_by': 'gemini-2.5-pro',
+                **generation
+            }
+        )
 
-        generation_prompt = f"""Generate a production-quality Python tool that automates this pattern.
+    def _build_prompt(self, pattern: Dict, class_name: str) -> str:
+        """Code generation prompt for a BUILD tool"""
+        return f"""Generate a production-quality Python tool that automates this pattern.
 
 # Pattern Information
 **Name:** {pattern['name']}
@@ -168,45 +345,259 @@ class ToolAcquisitionEngine:
 
 Generate ONLY the Python code. No explanation, no markdown except code block."""
 
-        response = self.client.models.generate_content(
+    def _generate_candidates(
+        self,
+        prompt: str,
+        class_name: str,
+        pattern_name: str
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Generate up to `candidates` tools concurrently and keep the first valid one.
+
+        Args:
+            prompt: Generation prompt
+            class_name: Expected tool class name
+            pattern_name: Pattern being built (for cost records)
+
+        Returns:
+            Tuple of (tool code, generation metadata)
+
+        Raises:
+            ValueError: If the budget allows no generation or every candidate fails
+        """
+        reservations = []
+        for index in range(self.candidates):
+            allowed, reservation = self._reserve_generation(pattern_name, index)
+            if not allowed:
+                break
+            reservations.append(reservation)
+
+        launched = len(reservations)
+        if not launched:
+            raise ValueError("Tool generation blocked by budget")
+
+        # Indexes of candidates whose request completed (and so was billed)
+        completed: Set[int] = set()
+        try:
+            code, generation = run_coroutine(
+                self._race_candidates(prompt, class_name, launched, completed)
+            )
+        finally:
+            for index, reservation in enumerate(reservations):
+                self._settle_generation(reservation, index in completed, pattern_name, index)
+
+        generation['generation_cost'] = self._charged_cost(len(completed))
+        return code, generation
+
+    async def _race_candidates(
+        self,
+        prompt: str,
+        class_name: str,
+        count: int,
+        completed: Set[int]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Run `count` generate+validate tasks; cancel the rest once one passes"""
+        tasks = [
+            asyncio.ensure_future(self._generate_candidate(prompt, class_name, index, completed))
+            for index in range(count)
+        ]
+        rejected: List[str] = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    index, code, error = await next_done
+                except Exception as e:
+                    rejected.append(f"{type(e).__name__}: {e}")
+                    continue
+
+                if error is None:
+                    return code, {
+                        'candidates': count,
+                        'winning_candidate': index,
+                        'rejected_candidates': rejected
+                    }
+                rejected.append(f"candidate {index}: {error}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        raise ValueError(f"All {count} generated candidates failed validation: {rejected}")
+
+    async def _generate_candidate(
+        self,
+        prompt: str,
+        class_name: str,
+        index: int,
+        completed: Set[int]
+    ) -> Tuple[int, str, Optional[str]]:
+        """
+        Generate and validate one candidate.
+
+        Adds index to `completed` once the generation request returns.
+
+        Returns:
+            Tuple of (index, code, error) where error is None for a valid tool
+        """
+        # Spread temperatures so candidates differ
+        temperature = min(1.0, (self.generation_config.temperature or 0.0) + 0.2 * index)
+        config = self.generation_config.model_copy(update={'temperature': temperature})
+        response = await self.client.aio.models.generate_content(
             model=self.model,
-            contents=generation_prompt,
-            config=self.generation_config
+            contents=prompt,
+            config=config
         )
+        completed.add(index)
+        code = self._extract_code(response.text)
+
+        error = validate_tool_code(code, class_name)
+        if error is None:
+            error = await asyncio.to_thread(self._smoke_test, class_name, code)
+        if error is not None:
+            logger.info(f"Rejected candidate {index} for {class_name}: {error}")
+        return index, code, error
+
+    def _smoke_test(self, class_name: str, code: str) -> Optional[str]:
+        """Run analyze() on a small input in the sandbox; return an error or None"""
+        try:
+            result, _ = self._get_sandbox().run(
+                class_name, code, SMOKE_TEST_INPUT, timeout=self.smoke_timeout
+            )
+        except (TimeoutError, ToolSandboxError) as e:
+            return f"Smoke run failed: {e}"
 
-        tool_code = response.text
+        if not isinstance(result, dict) or 'score' not in result:
+            return "Smoke run: analyze() didn't return a dict with a 'score'"
+        return None
 
-        # Extract Python code from markdown if present
-        if "```python" in tool_code:
-            tool_code = tool_code.split("```python")[1].split("```")[0].strip()
-        elif "```" in tool_code:
-            tool_code = tool_code.split("```")[1].split("```")[0].strip()
+    def _get_sandbox(self) -> SandboxPool:
+        if self.sandbox is None:
+            self.sandbox = SandboxPool(max_workers=min(self.candidates, 4))
+            self._owns_sandbox = True
+        return self.sandbox
 
-        # Validate syntax
-        try:
-            compile(tool_code, '<string>', 'exec')
-        except SyntaxError as e:
-            raise ValueError(f"Generated code has syntax errors: {e}")
+    def _reserve_generation(self, pattern_name: str, index: int) -> Tuple[bool, Optional[Any]]:
+        """
+        Hold one generation's cost against the budget.
 
-        return GeneratedTool(
-            name=class_name,
-            code=tool_code,
-            pattern_name=pattern['name'],
-            acquisition_type='build',
-            metadata={
-                'build_option': {
-                    'complexity': build_option.complexity,
-                    'estimated_hours': build_option.estimated_hours,
-                    'lines_of_code': build_option.lines_of_code
-                },
-                'generated_by': 'gemini-2.5-pro'
-            }
+        Returns:
+            Tuple of (allowed, reservation); the reservation is None without
+            a cost system
+        """
+        if self.cost_system is None:
+            return True, None
+
+        reservation = self.cost_system.reserve(
+            self.cost_per_generation,
+            category='tool_generation',
+            description=f"Generation candidate {index} for {pattern_name}"
         )
+        return reservation is not None, reservation
+
+    def _settle_generation(self, reservation: Optional[Any], completed: bool,
+                           pattern_name: str, index: int):
+        """Record a completed generation's cost, or release a cancelled one's hold"""
+        if reservation is None:
+            return
+
+        if completed:
+            self.cost_system.commit_reservation(
+                reservation,
+                description=f"Generation candidate {index} for {pattern_name}",
+                pattern_name=pattern_name,
+                acquisition_type='build'
+            )
+        else:
+            self.cost_system.release_reservation(reservation)
+
+    def _charged_cost(self, generations: int) -> float:
+        """Cost booked for completed generations (nothing is booked without a cost system)"""
+        if self.cost_system is None:
+            return 0.0
+        return generations * self.cost_per_generation
+
+    def generate_with_cache(
+        self,
+        fingerprint: str,
+        generate: Callable[[], Tuple[str, Optional[str], Dict[str, Any]]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Replay a cached generation or generate, validate and store a new one.
+
+        The entry's cost is the generation's 'generation_cost' (0 for paths
+        that aren't charged); cost fields are dropped from replayed metadata,
+        since a hit costs nothing.
+
+        Args:
+            fingerprint: From generation_fingerprint()
+            generate: Returns (code, validation error or None, generation metadata)
+
+        Returns:
+            Tuple of (valid code, generation metadata)
+
+        Raises:
+            ValueError: If the generated code fails validation
+            GenerationCacheMiss: If the cache is offline and has no valid entry
+        """
+        if self.generation_cache is not None:
+            cached = self.generation_cache.get(fingerprint)
+            if cached is not None:
+                replayed = {
+                    key: value for key, value in cached.metadata.items()
+                    if key not in COST_METADATA_KEYS
+                }
+                return cached.code, {
+                    **replayed,
+                    'generation_cache': 'hit',
+                    'cache_hit_count': cached.hit_count
+                }
+
+        code, error, generation = generate()
+
+        if self.generation_cache is not None:
+            self.generation_cache.put(
+                fingerprint,
+                code,
+                valid=error is None,
+                validation_error=error,
+                cost=generation.get('generation_cost', 0.0),
+                metadata=generation
+            )
+
+        if error is not None:
+            raise ValueError(error)
+        return code, generation
+
+    @staticmethod
+    def _syntax_error(code: str, kind: str) -> Optional[str]:
+        """Validate syntax; return an error message or None"""
+        try:
+            compile(code, '<string>', 'exec')
+        except SyntaxError as e:
+            return f"Generated {kind} has syntax errors: {e}"
+        return None
+
+    @staticmethod
+    def _extract_code(text: str) -> str:
+        """Extract Python code from markdown if present"""
+        if "```python" in text:
+            return text.split("```python")[1].split("```")[0].strip()
+        if "```" in text:
+            return text.split("```")[1].split("```")[0].strip()
+        return text
+
+    def close(self):
+        """Stop the smoke-test sandbox if this engine created it"""
+        if self._owns_sandbox and self.sandbox is not None:
+            self.sandbox.close()
+            self.sandbox = None
+            self._owns_sandbox = False
 
     def _acquire_library(
         self,
         pattern: Dict,
-        buy_option: BuyOption
+        buy_option: BuyOption,
+        missing_capabilities: Optional[List[str]] = None
     ) -> GeneratedTool:
         """
         Generate wrapper code for library.
@@ -214,6 +605,7 @@ Generate ONLY the Python code. No explanation, no markdown except code block."""
         Args:
             pattern: Pattern dictionary with 'name' and 'description'
             buy_option: BuyOption from analyzer
+            missing_capabilities: Capabilities the wrapper should add
 
         Returns:
             GeneratedTool with wrapper code
@@ -257,25 +649,21 @@ Generate ONLY the Python code. No explanation, no markdown except code block."""
 
 Generate ONLY the Python code including import statements. No explanation."""
 
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=wrapper_prompt,
-            config=self.generation_config
-        )
-
-        wrapper_code = response.text
+        def generate() -> Tuple[str, Optional[str], Dict[str, Any]]:
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=wrapper_prompt,
+                config=self.generation_config
+            )
 
-        # Extract code from markdown
-        if "```python" in wrapper_code:
-            wrapper_code = wrapper_code.split("```python")[1].split("```")[0].strip()
-        elif "```" in wrapper_code:
-            wrapper_code = wrapper_code.split("```")[1].split("```")[0].strip()
+            code = self._extract_code(response.text)
+            return code, self._syntax_error(code, "wrapper"), {}
 
-        # Validate syntax
-        try:
-            compile(wrapper_code, '<string>', 'exec')
-        except SyntaxError as e:
-            raise ValueError(f"Generated wrapper has syntax errors: {e}")
+        fingerprint = generation_fingerprint(
+            pattern['name'], missing_capabilities or [], 'library',
+            source=buy_option.source, template_version=LIBRARY_PROMPT_VERSION
+        )
+        wrapper_code, generation = self.generate_with_cache(fingerprint, generate)
 
         return GeneratedTool(
             name=class_name,
@@ -285,7 +673,8 @@ Generate ONLY the Python code including import statements. No explanation."""
             metadata={
                 'library_name': buy_option.source,
                 'library_cost': buy_option.cost_per_month,
-                'maturity_score': buy_option.maturity_score
+                'maturity_score': buy_option.maturity_score,
+                **generation
             }
         )
 
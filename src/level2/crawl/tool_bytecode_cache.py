@@ -0,0 +1,126 @@
+"""
+Tool Bytecode Cache - Skip recompiling generated tool code on warm starts
+
+Compiled code objects are marshalled to disk keyed by a hash of the source
+and the interpreter's bytecode magic number (marshal output is only valid for
+the Python version that wrote it), so a restart loads tools without calling
+compile(). Compiled objects are also memoized in-process, so registering the
+same code again is free.
+"""
+
+import hashlib
+import importlib.util
+import logging
+import marshal
+import os
+import threading
+from pathlib import Path
+from types import CodeType
+from typing import Any, Dict, Optional
+
+from src.common.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class BytecodeCache:
+    """
+    On-disk cache of compiled tool code.
+
+    Example:
+        >>> registry = ToolRegistry(bytecode_cache=BytecodeCache())
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Args:
+            cache_dir: Directory for .marshal files (default: data/tool_bytecode_cache)
+        """
+        if cache_dir is None:
+            cache_dir = Config.DATA_DIR / "tool_bytecode_cache"
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._memory: Dict[str, CodeType] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.compiles = 0
+
+    @staticmethod
+    def make_key(code: str, filename: str) -> str:
+        """Key for source compiled under this interpreter's bytecode format"""
+        digest = hashlib.sha256(importlib.util.MAGIC_NUMBER)
+        digest.update(filename.encode("utf-8") + b"\x00" + code.encode("utf-8"))
+        return digest.hexdigest()
+
+    def compile(self, code: str, filename: str = "<generated tool>") -> CodeType:
+        """
+        Return the code object for `code`, compiling only on a cold miss.
+
+        Args:
+            code: Python source
+            filename: Filename recorded in tracebacks
+
+        Returns:
+            Compiled module code object
+
+        Raises:
+            SyntaxError: If the source doesn't compile
+        """
+        key = self.make_key(code, filename)
+
+        with self._lock:
+            if key in self._memory:
+                self.memory_hits += 1
+                return self._memory[key]
+
+        path = self.cache_dir / f"{key}.marshal"
+        code_obj = self._read(path)
+        if code_obj is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._memory[key] = code_obj
+            return code_obj
+
+        code_obj = compile(code, filename, "exec")
+        self._write(path, code_obj)
+        with self._lock:
+            self.compiles += 1
+            self._memory[key] = code_obj
+        return code_obj
+
+    @staticmethod
+    def _read(path: Path) -> Optional[CodeType]:
+        try:
+            with open(path, "rb") as f:
+                code_obj = marshal.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable bytecode cache entry {path.name}: {e}")
+            return None
+        return code_obj if isinstance(code_obj, CodeType) else None
+
+    @staticmethod
+    def _write(path: Path, code_obj: CodeType):
+        """Write atomically so concurrent processes never read a partial file"""
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                marshal.dump(code_obj, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write bytecode cache entry {path.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return memory/disk hit and compile counters"""
+        with self._lock:
+            return {
+                'entries': len(self._memory),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'compiles': self.compiles
+            }
@@ -0,0 +1,170 @@
+"""
+Tool Result Cache - Content-addressed cache for tool analysis results
+
+Generated tools are deterministic in their inputs, so a result can be reused
+whenever the same tool code analyzes the same input again. Entries are keyed
+on (tool name, tool code hash, input hash) and stored one JSON file per key,
+so the cache survives restarts.
+
+Tools may declare files their result depends on through a
+`file_dependencies` attribute (a list of paths, or a callable taking the
+analyzed input and returning one). The mtimes are recorded with the entry
+and a changed, created or deleted file invalidates it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from src.common.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 hex digest of a string"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ToolResultCache:
+    """
+    On-disk LRU cache of tool results.
+
+    Example:
+        >>> cache = ToolResultCache(max_entries=256)
+        >>> registry = ToolRegistry(result_cache=cache)
+        >>> registry.register(tool, "Production Readiness")
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_entries: int = 512):
+        """
+        Args:
+            cache_dir: Directory for entry files (default: data/tool_result_cache)
+            max_entries: Entries kept before least-recently-used eviction
+        """
+        if cache_dir is None:
+            cache_dir = Config.DATA_DIR / "tool_result_cache"
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        # Recency index rebuilt from file mtimes (hits touch the file)
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime_ns)
+        self._index: "OrderedDict[str, None]" = OrderedDict((p.stem, None) for p in entries)
+
+    @staticmethod
+    def make_key(tool_name: str, code_hash: str, payload: str) -> str:
+        """Key for one tool version analyzing one input"""
+        return content_hash("\x00".join((tool_name, code_hash, content_hash(payload))))
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    @staticmethod
+    def _mtimes(paths: Iterable) -> Dict[str, Optional[int]]:
+        """Current mtime (ns) per dependency, None if the file doesn't exist"""
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[str(path)] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[str(path)] = None
+        return mtimes
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            The cached result (a fresh copy), or None on a miss or stale entry
+        """
+        path = self._path(key)
+        with self._lock:
+            try:
+                entry = json.loads(path.read_text())
+            except (OSError, ValueError):
+                self._index.pop(key, None)
+                self.misses += 1
+                return None
+
+            dependencies = entry.get("dependencies", {})
+            if dependencies and self._mtimes(dependencies) != dependencies:
+                self._remove(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+
+            self._index[key] = None
+            self._index.move_to_end(key)
+            os.utime(path)
+            self.hits += 1
+            return entry["result"]
+
+    def put(self, key: str, result: Dict[str, Any], dependencies: Iterable = ()):
+        """
+        Store a result.
+
+        Results that aren't JSON-serializable are skipped.
+
+        Args:
+            key: Key from make_key()
+            result: Tool result dict
+            dependencies: Files whose modification invalidates the entry
+        """
+        try:
+            data = json.dumps({"result": result, "dependencies": self._mtimes(dependencies)})
+        except (TypeError, ValueError):
+            logger.debug(f"Skipping cache for non-serializable tool result ({key[:12]})")
+            return
+
+        with self._lock:
+            path = self._path(key)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(data)
+            os.replace(tmp_path, path)
+
+            self._index[key] = None
+            self._index.move_to_end(key)
+            while len(self._index) > self.max_entries:
+                oldest, _ = self._index.popitem(last=False)
+                self._path(oldest).unlink(missing_ok=True)
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        self._path(key).unlink(missing_ok=True)
+
+    def clear(self):
+        """Delete every entry"""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and hit/miss/invalidation counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._index),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,344 @@
+"""
+Tool Sandbox - Run generated tools in a pool of limited worker processes
+
+Generated tool code is untrusted: it can loop forever, exhaust memory or
+crash the interpreter. SandboxPool hosts tools in pre-started worker
+processes instead of the pipeline's own process:
+
+- Each worker caps its address space (RLIMIT_AS) and gives every call its
+  own CPU-time budget (RLIMIT_CPU, raised by cpu_seconds before each call)
+- A call that outlives its wall-clock timeout gets its worker killed
+- Workers exit after max_calls_per_worker calls and are replaced, so leaks
+  in tool code don't accumulate
+- Results come back as compact JSON strings, not pickled objects
+
+Workers are started with forkserver (spawn where unavailable), so they are
+safe to create from the pipeline's tool threads.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows: limits are skipped
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+class ToolSandboxError(RuntimeError):
+    """A sandboxed tool crashed its worker or hit a resource limit"""
+
+
+def find_tool_class(namespace: Dict[str, Any], name: str) -> type:
+    """
+    Find the tool class in a namespace populated by exec'ing tool code.
+
+    Args:
+        namespace: Globals after executing the tool code
+        name: Expected class name
+
+    Returns:
+        The class named `name`, else the first class defined
+
+    Raises:
+        ValueError: If the code defines no class
+    """
+    tool_class = namespace.get(name)
+    if not tool_class:
+        tool_class = next(
+            (v for v in namespace.values() if isinstance(v, type)),
+            None
+        )
+
+    if not tool_class:
+        raise ValueError(f"No class found in generated code for {name}")
+    return tool_class
+
+
+def call_analyze(tool: Any, payload: str) -> Any:
+    """
+    Call tool.analyze(payload), running it to completion if it is a coroutine.
+
+    Must not be called from a thread with a running event loop (tools run
+    in worker processes or the pipeline's tool threads).
+    """
+    result = tool.analyze(payload)
+    if inspect.isawaitable(result):
+        result = asyncio.run(_await(result))
+    return result
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def _set_cpu_budget(cpu_seconds: float):
+    """Allow cpu_seconds more CPU time from now (SIGXCPU kills the worker past it)"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn, cpu_seconds: float, memory_bytes: int, max_calls: int):
+    """
+    Worker loop: receive (name, code, payload), reply (status, data).
+
+    Replies are ("ok", json_string) or ("error", message).
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if resource is not None and memory_bytes:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, hard))
+
+    tools: Dict[Tuple[str, str], Any] = {}
+
+    for _ in range(max_calls):
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        name, code, payload = request
+        try:
+            if resource is not None and cpu_seconds:
+                _set_cpu_budget(cpu_seconds)
+
+            tool = tools.get((name, code))
+            if tool is None:
+                namespace: Dict[str, Any] = {}
+                exec(compile(code, f"<sandboxed tool {name}>", "exec"), namespace)
+                tool = tools[(name, code)] = find_tool_class(namespace, name)()
+
+            result = call_analyze(tool, payload)
+            dependencies = getattr(tool, 'file_dependencies', None) or []
+            if callable(dependencies):
+                dependencies = dependencies(payload) or []
+
+            reply = ("ok", json.dumps(
+                {'result': result, 'file_dependencies': [str(d) for d in dependencies]},
+                separators=(',', ':'),
+                default=str
+            ))
+        except MemoryError:
+            tools.clear()
+            reply = ("error", f"Tool {name} exceeded the memory limit")
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+
+        conn.send(reply)
+
+    conn.close()
+
+
+class _Worker:
+    """Parent-side handle for one worker process"""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.calls = 0
+
+    def stop(self, kill: bool = False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    Pool of resource-limited worker processes for tool execution.
+
+    Example:
+        >>> pool = SandboxPool(max_workers=2, cpu_seconds=10, memory_mb=512)
+        >>> registry = ToolRegistry(sandbox=pool)
+        >>> registry.register(tool, "Production Readiness")  # runs in the pool
+        >>> registry.register(trusted_tool, "Gap Analysis", sandboxed=False)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        cpu_seconds: float = 30.0,
+        memory_mb: int = 1024,
+        max_calls_per_worker: int = 100,
+        timeout: float = 60.0,
+        start_method: Optional[str] = None
+    ):
+        """
+        Args:
+            max_workers: Worker processes (concurrent sandboxed calls)
+            cpu_seconds: CPU time allowed per call (0 disables)
+            memory_mb: Address-space limit per worker (0 disables)
+            max_calls_per_worker: Calls before a worker is replaced
+            timeout: Wall-clock seconds per call before the worker is killed
+            start_method: multiprocessing start method (default: forkserver if available)
+        """
+        if start_method is None:
+            methods = multiprocessing.get_all_start_methods()
+            start_method = "forkserver" if "forkserver" in methods else "spawn"
+
+        self.max_workers = max_workers
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_calls_per_worker = max_calls_per_worker
+        self.timeout = timeout
+        self._context = multiprocessing.get_context(start_method)
+
+        self._idle: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.calls = 0
+        self.recycled = 0
+        self.killed = 0
+        self.crashed = 0
+
+        # Pre-start every worker so the first calls don't pay process startup
+        for _ in range(max_workers):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                self.cpu_seconds,
+                self.memory_mb * 1024 * 1024,
+                self.max_calls_per_worker
+            ),
+            daemon=True,
+            name="tool-sandbox"
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def run(
+        self,
+        name: str,
+        code: str,
+        payload: str,
+        timeout: Optional[float] = None
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Run tool.analyze(payload) in a worker.
+
+        Args:
+            name: Tool class name
+            code: Tool source code
+            payload: Text passed to analyze()
+            timeout: Wall-clock limit (default: pool timeout)
+
+        Returns:
+            Tuple of (result dict, file dependencies the tool declared)
+
+        Raises:
+            TimeoutError: If the call exceeded the timeout (the worker is killed)
+            ToolSandboxError: If the tool raised or its worker died
+        """
+        if self._closed:
+            raise ToolSandboxError("Sandbox pool is closed")
+
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._idle.get()
+        replacement: Optional[_Worker] = worker
+        try:
+            if worker is None or not worker.process.is_alive():
+                if worker is not None:
+                    worker.stop(kill=True)
+                worker = replacement = self._spawn()
+
+            worker.conn.send((name, code, payload))
+            worker.calls += 1
+            with self._lock:
+                self.calls += 1
+
+            if not worker.conn.poll(timeout):
+                worker.stop(kill=True)
+                replacement = None
+                with self._lock:
+                    self.killed += 1
+                raise TimeoutError(f"Tool {name} exceeded {timeout:.1f}s and was killed")
+
+            try:
+                status, data = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.process.join(timeout=5)
+                exitcode = worker.process.exitcode
+                worker.stop(kill=True)
+                replacement = None
+                with self._lock:
+                    self.crashed += 1
+                raise ToolSandboxError(self._describe_exit(name, exitcode))
+
+            if worker.calls >= self.max_calls_per_worker:
+                worker.stop()
+                replacement = None
+                with self._lock:
+                    self.recycled += 1
+
+            if status != "ok":
+                raise ToolSandboxError(data)
+
+            reply = json.loads(data)
+            return reply['result'], reply['file_dependencies']
+        finally:
+            # Keep the pool at max_workers: dead or retired workers are replaced
+            # lazily by the next caller
+            self._idle.put(replacement)
+
+    def _describe_exit(self, name: str, exitcode: Optional[int]) -> str:
+        if exitcode == -signal.SIGXCPU:
+            return f"Tool {name} exceeded the CPU time limit ({self.cpu_seconds:.0f}s)"
+        if exitcode is not None and exitcode < 0:
+            return f"Tool {name} worker killed by signal {-exitcode}"
+        return f"Tool {name} worker exited unexpectedly (exit code {exitcode})"
+
+    def close(self):
+        """Stop all workers"""
+        self._closed = True
+        for _ in range(self.max_workers):
+            worker = self._idle.get()
+            if worker is not None:
+                worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call, recycle, kill and crash counters"""
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'calls': self.calls,
+                'recycled': self.recycled,
+                'killed': self.killed,
+                'crashed': self.crashed
+            }
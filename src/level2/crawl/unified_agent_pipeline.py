@@ -4,41 +4,222 @@ Unified Agent Pipeline - Integrates pattern matching, tool execution, and LLM re
 Combines automated tool execution with Gemini 2.5 Pro for intelligent responses.
 """
 
+import json
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from google import genai
 from google.genai import types
 
+from src.common.model_pricing import usage_cost
+from src.common.pattern_engine import get_pattern_engine
+from src.common.response_cache import ResponseCache
 from src.level2.crawl.tool_acquisition_engine import GeneratedTool
+from src.level2.crawl.tool_bytecode_cache import BytecodeCache
+from src.level2.crawl.tool_result_cache import ToolResultCache, content_hash
+from src.level2.crawl.tool_sandbox import SandboxPool, call_analyze, find_tool_class
+
+
+class RegisteredTool:
+    """
+    A registered tool plus the identity used to cache its results.
+
+    The tool is loaded (compiled and instantiated) on first use. Attribute
+    access (timeout, file_dependencies, ...) falls through to the instance,
+    so the pipeline treats it like the tool itself. Sandboxed tools are never
+    loaded in this process; analyze() runs them in a SandboxPool worker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        code_hash: str,
+        instance: Any = None,
+        result_cache: Optional[ToolResultCache] = None,
+        loader: Optional[Callable[[], Any]] = None,
+        sandbox: Optional[SandboxPool] = None,
+        code: Optional[str] = None
+    ):
+        """
+        Args:
+            name: Tool class name
+            code_hash: Hash of the tool's source code
+            instance: Instantiated tool (or pass loader to load on first use)
+            result_cache: Cache for analyze() results (None disables caching)
+            loader: Returns the tool instance; called once, on first use
+            sandbox: Run the tool in this worker pool instead (requires code)
+            code: Tool source code, sent to sandbox workers
+        """
+        if sandbox is not None and code is None:
+            raise ValueError(f"Sandboxed tool {name} needs its source code")
+        if sandbox is None and instance is None and loader is None:
+            raise ValueError(f"RegisteredTool {name} needs an instance or a loader")
+
+        self.name = name
+        self.code_hash = code_hash
+        self.result_cache = result_cache
+        self.sandbox = sandbox
+        self._code = code
+        self._instance = instance
+        self._loader = loader
+        self._load_lock = threading.Lock()
+
+    @property
+    def sandboxed(self) -> bool:
+        """Whether analyze() runs in a worker process"""
+        return self.sandbox is not None
+
+    @property
+    def instance(self) -> Any:
+        """The tool instance (loaded on first access)"""
+        if self.sandboxed:
+            raise AttributeError(f"{self.name} runs in the sandbox and has no local instance")
+        if self._instance is None:
+            with self._load_lock:
+                if self._instance is None:
+                    self._instance = self._loader()
+        return self._instance
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the tool has been compiled and instantiated yet"""
+        return self._instance is not None
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """The tool's own timeout, without forcing a load (loading happens in the worker)"""
+        return getattr(self._instance, 'timeout', None)
+
+    def __getattr__(self, attr: str):
+        if attr.startswith('_') or attr == 'instance':
+            raise AttributeError(attr)
+        return getattr(self.instance, attr)
+
+    def analyze(self, payload: str) -> Dict:
+        """Run the tool, reusing a cached result for the same code and input"""
+        key = None
+        if self.result_cache is not None:
+            key = self.result_cache.make_key(self.name, self.code_hash, payload)
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                return cached
+
+        if self.sandboxed:
+            result, dependencies = self.sandbox.run(self.name, self._code, payload)
+        else:
+            result = call_analyze(self.instance, payload)
+            dependencies = None
+
+        if key is not None and isinstance(result, dict) and 'error' not in result:
+            if dependencies is None:
+                dependencies = self._file_dependencies(payload)
+            self.result_cache.put(key, result, dependencies)
+        return result
+
+    def _file_dependencies(self, payload: str) -> List:
+        """Files the tool declares its result depends on"""
+        dependencies = getattr(self.instance, 'file_dependencies', None) or []
+        if callable(dependencies):
+            dependencies = dependencies(payload) or []
+        return list(dependencies)
 
 
 class ToolRegistry:
     """
     Registry of available tools mapped to patterns.
 
-    Manages dynamic loading and execution of generated tools.
+    Manages dynamic loading and execution of generated tools. Tools are
+    compiled and instantiated lazily, the first time a matched pattern uses
+    them; with a BytecodeCache, warm starts skip compilation as well.
     """
 
-    def __init__(self):
-        """Initialize empty tool registry."""
+    def __init__(
+        self,
+        result_cache: Optional[ToolResultCache] = None,
+        bytecode_cache: Optional[BytecodeCache] = None,
+        lazy: bool = True,
+        sandbox: Optional[SandboxPool] = None
+    ):
+        """
+        Initialize empty tool registry.
+
+        Args:
+            result_cache: Reuses analysis results for unchanged tool code and input
+            bytecode_cache: Reuses compiled tool code across processes and restarts
+            lazy: Load tools on first use (False loads at register() time,
+                  surfacing broken tool code immediately)
+            sandbox: Worker pool for untrusted tools (see register())
+        """
         self.tools: Dict[str, List] = {}  # pattern_name -> [tool instances]
+        self.result_cache = result_cache
+        self.bytecode_cache = bytecode_cache
+        self.lazy = lazy
+        self.sandbox = sandbox
 
-    def register(self, tool: GeneratedTool, pattern_name: str):
+    def register(
+        self,
+        tool: GeneratedTool,
+        pattern_name: str,
+        sandboxed: Optional[bool] = None
+    ) -> RegisteredTool:
         """
         Register a tool for a specific pattern.
 
+        Re-registering identical code is a no-op; a new version of a tool
+        with the same name replaces the old one.
+
         Args:
             tool: GeneratedTool with code to execute
             pattern_name: Pattern this tool applies to (e.g., "Production Readiness")
+            sandboxed: Run in the registry's sandbox pool. Defaults to True when
+                       the registry has a pool, unless tool.metadata['trusted']
+                       is set; trusted tools run in-process (the fast path)
+
+        Returns:
+            The RegisteredTool for this pattern
         """
         if pattern_name not in self.tools:
             self.tools[pattern_name] = []
 
-        # Load tool code dynamically
-        loaded_tool = self._load_tool(tool)
-        self.tools[pattern_name].append(loaded_tool)
+        if sandboxed is None:
+            sandboxed = self.sandbox is not None and not (tool.metadata or {}).get('trusted')
+        if sandboxed and self.sandbox is None:
+            raise ValueError(f"Cannot sandbox {tool.name}: registry has no sandbox pool")
+
+        code_hash = content_hash(tool.code)
+        if sandboxed:
+            registered = RegisteredTool(
+                name=tool.name,
+                code_hash=code_hash,
+                result_cache=self.result_cache,
+                sandbox=self.sandbox,
+                code=tool.code
+            )
+        else:
+            registered = RegisteredTool(
+                name=tool.name,
+                code_hash=code_hash,
+                result_cache=self.result_cache,
+                loader=lambda: self._load_tool(tool)
+            )
+
+        tools = self.tools[pattern_name]
+        for i, current in enumerate(tools):
+            if isinstance(current, RegisteredTool) and current.name == tool.name:
+                if current.code_hash == code_hash and current.sandboxed == sandboxed:
+                    return current
+                tools[i] = registered
+                break
+        else:
+            tools.append(registered)
+
+        if not self.lazy and not sandboxed:
+            registered.instance
+        return registered
 
     def get_tools_for_pattern(self, pattern_name: str) -> List:
         """
@@ -63,23 +244,16 @@ class ToolRegistry:
             Instance of the generated tool class
         """
         # Execute code in isolated namespace
+        filename = f"<generated tool {tool.name}>"
+        if self.bytecode_cache is not None:
+            code_obj = self.bytecode_cache.compile(tool.code, filename)
+        else:
+            code_obj = compile(tool.code, filename, "exec")
         namespace = {}
-        exec(tool.code, namespace)
-
-        # Find the class (should match tool.name)
-        tool_class = namespace.get(tool.name)
-        if not tool_class:
-            # Find first class in namespace
-            tool_class = next(
-                (v for v in namespace.values() if isinstance(v, type)),
-                None
-            )
-
-        if not tool_class:
-            raise ValueError(f"No class found in generated code for {tool.name}")
+        exec(code_obj, namespace)
 
-        # Instantiate and return
-        return tool_class()
+        # Find the class (should match tool.name), instantiate and return
+        return find_tool_class(namespace, tool.name)()
 
 
 class UnifiedAgentPipeline:
@@ -96,7 +270,10 @@ class UnifiedAgentPipeline:
     def __init__(
         self,
         gemini_api_key: Optional[str],
-        tool_registry: ToolRegistry
+        tool_registry: ToolRegistry,
+        response_cache: Optional[ResponseCache] = None,
+        max_tool_workers: int = 4,
+        tool_timeout: float = 60.0
     ):
         """
         Initialize pipeline.
@@ -104,8 +281,13 @@ class UnifiedAgentPipeline:
         Args:
             gemini_api_key: Google API key (or None to use GEMINI_API_KEY env var)
             tool_registry: ToolRegistry with registered tools
+            response_cache: Reuses answers for the same query, code and tool results
+            max_tool_workers: Tool analyses run concurrently (1 runs them serially)
+            tool_timeout: Seconds a tool may run before it's reported as timed out
+                          (a tool's own `timeout` attribute overrides this)
         """
         self.tool_registry = tool_registry
+        self.pattern_engine = get_pattern_engine()
         api_key = gemini_api_key or os.getenv("GEMINI_API_KEY")
         self.client = genai.Client(api_key=api_key)
         self.model = 'gemini-2.5-pro'
@@ -113,6 +295,13 @@ class UnifiedAgentPipeline:
             temperature=0.7,
             max_output_tokens=2000,
         )
+        self.response_cache = response_cache
+
+        # Tool analyses share one bounded pool across process() calls
+        self.max_tool_workers = max_tool_workers
+        self.tool_timeout = tool_timeout
+        self._tool_executor: Optional[ThreadPoolExecutor] = None
+        self._tool_executor_lock = threading.Lock()
 
     def process(self, query: str, code: Optional[str] = None) -> Dict:
         """
@@ -128,80 +317,183 @@ class UnifiedAgentPipeline:
                 - patterns_applied: List of matched patterns
                 - tools_used: List of tools executed
                 - tool_results: Dict of tool outputs
-                - metadata: Query timestamp, etc.
+                - metadata: Query timestamp, etc. (cache_tier on a cache hit)
         """
         # Step 1: Match patterns (simplified keyword matching)
         patterns = self._match_patterns(query)
 
-        # Step 2: Execute tools for matched patterns
-        tool_results = {}
-        for pattern_name in patterns:
-            tools = self.tool_registry.get_tools_for_pattern(pattern_name)
-            for tool in tools:
-                try:
-                    result = tool.analyze(code or query)
-                    tool_results[f"{pattern_name}_tool"] = result
-                except Exception as e:
-                    tool_results[f"{pattern_name}_tool"] = {
-                        'error': str(e),
-                        'score': 0.0
-                    }
+        # Step 2: Execute tools for matched patterns (concurrently)
+        jobs = [
+            (f"{pattern_name}_tool", tool)
+            for pattern_name in patterns
+            for tool in self.tool_registry.get_tools_for_pattern(pattern_name)
+        ]
+        tool_results, timed_out = self._run_tools(jobs, code or query)
+
+        result = {
+            'patterns_applied': patterns,
+            'tools_used': list(tool_results.keys()),
+            'tool_results': tool_results,
+            'metadata': {
+                'query': query,
+                'timestamp': datetime.now().isoformat(),
+                'timed_out_tools': timed_out
+            }
+        }
 
-        # Step 3: Build augmented prompt with tool results
+        # Step 3: Reuse a cached answer for the same code and tool results
+        context = self._cache_context(code, patterns, tool_results)
+        if self.response_cache is not None:
+            hit = self.response_cache.get(self.model, context, query)
+            if hit is not None:
+                result['metadata']['cache_tier'] = hit.tier
+                return {'answer': hit.response, **result}
+
+        # Step 4: Build augmented prompt with tool results
         prompt = self._build_prompt(query, code, patterns, tool_results)
 
-        # Step 4: Get Gemini response
+        # Step 5: Get Gemini response
         response = self.client.models.generate_content(
             model=self.model,
             contents=prompt,
             config=self.generation_config
         )
 
-        return {
-            'answer': response.text,
-            'patterns_applied': patterns,
-            'tools_used': list(tool_results.keys()),
-            'tool_results': tool_results,
-            'metadata': {
-                'query': query,
-                'timestamp': datetime.now().isoformat()
-            }
+        if self.response_cache is not None:
+            self.response_cache.put(
+                self.model, context, query, response.text,
+                cost=usage_cost(self.model, getattr(response, 'usage_metadata', None))
+            )
+
+        return {'answer': response.text, **result}
+
+    def _run_tools(
+        self,
+        jobs: List[Tuple[str, Any]],
+        payload: str
+    ) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Run tool analyses in the shared pool with per-tool timeouts.
+
+        A tool's timeout counts from when it starts running; a tool still
+        queued for a worker after its timeout is also given up on. Timed-out
+        tools are abandoned: queued ones are cancelled, running ones finish in
+        the background (threads can't be killed) and their results are ignored.
+
+        Args:
+            jobs: (result key, tool) pairs, in pattern/registration order
+            payload: Text passed to tool.analyze()
+
+        Returns:
+            Tuple of (tool_results in job order, keys of timed-out tools)
+        """
+        if not jobs:
+            return {}, []
+
+        executor = self._get_tool_executor()
+        submitted = time.monotonic()
+        started: Dict[int, float] = {}
+
+        def run(index: int, tool) -> Dict:
+            started[index] = time.monotonic()
+            return tool.analyze(payload)
+
+        def deadline(index: int) -> float:
+            return started.get(index, submitted) + self._timeout_for(jobs[index][1])
+
+        futures: Dict[Future, int] = {
+            executor.submit(run, index, tool): index
+            for index, (_, tool) in enumerate(jobs)
         }
+        outcomes: List[Optional[Dict]] = [None] * len(jobs)
+        timed_out = set()
+        pending = set(futures)
+
+        try:
+            while pending:
+                next_deadline = min(deadline(futures[f]) for f in pending)
+                done, pending = wait(
+                    pending,
+                    timeout=max(0.0, next_deadline - time.monotonic()),
+                    return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    index = futures[future]
+                    try:
+                        outcomes[index] = future.result()
+                    except Exception as e:
+                        outcomes[index] = {'error': str(e), 'score': 0.0}
+
+                now = time.monotonic()
+                for future in list(pending):
+                    index = futures[future]
+                    if now < deadline(index):
+                        continue
+                    future.cancel()
+                    pending.discard(future)
+                    timed_out.add(index)
+                    outcomes[index] = {
+                        'error': f"Timed out after {self._timeout_for(jobs[index][1]):.1f}s",
+                        'score': 0.0,
+                        'timed_out': True
+                    }
+        finally:
+            for future in pending:
+                future.cancel()
+
+        # Same key for several tools of one pattern: the last registered wins,
+        # as with serial execution
+        tool_results = {}
+        for (key, _), outcome in zip(jobs, outcomes):
+            tool_results[key] = outcome
+        return tool_results, [jobs[i][0] for i in sorted(timed_out)]
+
+    def _timeout_for(self, tool) -> float:
+        return getattr(tool, 'timeout', None) or self.tool_timeout
+
+    def _get_tool_executor(self) -> ThreadPoolExecutor:
+        """Shared pool for tool analyses (created on first use)"""
+        with self._tool_executor_lock:
+            if self._tool_executor is None:
+                self._tool_executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.max_tool_workers),
+                    thread_name_prefix="tool"
+                )
+            return self._tool_executor
+
+    def close(self):
+        """Shut down the tool pool without waiting for abandoned tools"""
+        with self._tool_executor_lock:
+            if self._tool_executor is not None:
+                self._tool_executor.shutdown(wait=False, cancel_futures=True)
+                self._tool_executor = None
 
     def _match_patterns(self, query: str) -> List[str]:
         """
         Simple keyword-based pattern matching.
 
+        Uses the shared pattern engine's tool-routing table, so the query is
+        scanned once regardless of how many keywords are registered.
+
         Args:
             query: User query string
 
         Returns:
             List of matched pattern names
         """
-        query_lower = query.lower()
-        patterns = []
-
-        # Pattern keywords (from Phase 0 patterns)
-        pattern_keywords = {
-            'Production Readiness': [
-                'test', 'production', 'ready', 'deploy',
-                'error handling', 'type hint', 'documentation'
-            ],
-            'Gap Analysis': [
-                'missing', 'gap', 'what about', 'incomplete',
-                'forgot', 'overlooked'
-            ],
-            'Tradeoff Analysis': [
-                'vs', 'versus', 'compare', 'alternative',
-                'option', 'tradeoff', 'pros', 'cons'
-            ],
-        }
-
-        for pattern_name, keywords in pattern_keywords.items():
-            if any(kw in query_lower for kw in keywords):
-                patterns.append(pattern_name)
-
-        return patterns
+        hits = self.pattern_engine.scan(query.lower())
+        matches = self.pattern_engine.table_matches("tool_routing", hits)
+
+        return [pattern_name for pattern_name, keywords in matches.items() if keywords]
+
+    @staticmethod
+    def _cache_context(code: Optional[str], patterns: List[str], tool_results: Dict) -> str:
+        """Everything besides the query that the answer depends on, as a stable string"""
+        return json.dumps(
+            {'code': code, 'patterns': patterns, 'tool_results': tool_results},
+            sort_keys=True,
+            default=str
+        )
 
     def _build_prompt(
         self,
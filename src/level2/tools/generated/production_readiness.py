@@ -1,14 +1,50 @@
+import ast
+import hashlib
 import subprocess
 import json
 import logging
 import tempfile
 import os
 import sys
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Set
 
 # Configure basic logging
 logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Directories never scanned in fast mode
+EXCLUDED_DIRS = {'.git', '.hg', '.venv', 'venv', 'env', '__pycache__', 'node_modules',
+                 'build', 'dist', '.tox', '.nox', '.mypy_cache', '.pytest_cache'}
+
+
+def _is_test_file(rel_path: str) -> bool:
+    name = os.path.basename(rel_path)
+    return name.startswith('test_') or name.endswith('_test.py')
+
+
+def _module_names(rel_path: str) -> List[str]:
+    """Dotted names a file may be imported as (every suffix, for src/ layouts)"""
+    parts = rel_path[:-3].split(os.sep)
+    if parts[-1] == '__init__':
+        parts = parts[:-1]
+    return ['.'.join(parts[i:]) for i in range(len(parts)) if parts[i:]]
+
+
+def _file_entry(executed: Set[int], missing: Set[int], summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-file coverage entry in pytest-cov's JSON shape"""
+    statements = len(executed) + len(missing)
+    return {
+        'executed_lines': sorted(executed),
+        'missing_lines': sorted(missing),
+        'summary': {
+            **summary,
+            'covered_lines': len(executed),
+            'num_statements': statements,
+            'missing_lines': len(missing),
+            'percent_covered': 100.0 * len(executed) / statements if statements else 100.0,
+        }
+    }
+
+
 class ProductionReadiness:
     """
     A wrapper class for the 'pytest-cov' library to check test coverage.
@@ -16,8 +52,25 @@ class ProductionReadiness:
     This class uses pytest-cov to measure the test coverage of a given Python
     project. It interprets the results to provide a "production readiness" score
     based on the percentage of code covered by tests.
+
+    Fast mode (fast=True) keeps per-project state between calls: file hashes,
+    a test->file map built from imports, per-file coverage and per-file static
+    checks (type hints, docstrings, try/except) computed in-process with ast.
+    Unchanged projects are answered from that state; after edits only the
+    tests that import (transitively) a changed file are re-run and their
+    coverage is merged in.
     """
 
+    def __init__(self, fast: bool = False, state_dir: Optional[str] = None):
+        """
+        Args:
+            fast: Use incremental analysis by default (analyze(fast=...) overrides)
+            state_dir: Where fast-mode state is persisted (default: system temp dir)
+        """
+        self.fast = fast
+        self.state_dir = state_dir or os.path.join(tempfile.gettempdir(), 'production_readiness')
+        self._states: Dict[str, Dict[str, Any]] = {}
+
     def _get_default_result(self) -> Dict[str, Any]:
         """Returns a default result structure for failure cases."""
         return {
@@ -27,9 +80,14 @@ class ProductionReadiness:
             'suggestions': []
         }
 
-    def _run_pytest_cov(self, target_path: str) -> Dict[str, Any]:
+    def _run_pytest_cov(
+        self, target_path: str, test_paths: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Runs pytest-cov as a subprocess and returns the parsed JSON output.
+
+        test_paths limits the run to those test files (coverage is still
+        measured for the whole target).
         """
         with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as tmp_report:
             report_path = tmp_report.name
@@ -44,7 +102,7 @@ class ProductionReadiness:
             sys.executable,
             '-m',
             'pytest',
-            target_path,
+            *(test_paths or [target_path]),
             f'--cov={cov_target}',
             '--cov-report',
             f'json:{report_path}',
@@ -154,7 +212,9 @@ class ProductionReadiness:
             'suggestions': suggestions
         }
 
-    def analyze(self, code: str, file_path: str = None) -> Dict[str, Any]:
+    def analyze(
+        self, code: str, file_path: str = None, fast: Optional[bool] = None
+    ) -> Dict[str, Any]:
         """
         Analyzes a Python project's test coverage using pytest-cov.
 
@@ -168,11 +228,20 @@ class ProductionReadiness:
                                        a specific file to analyze. This path should
                                        contain the source code and associated tests.
                                        Defaults to None.
+            fast (bool, optional): Incremental analysis (see class docstring).
+                                   Without a file_path, fast mode runs the
+                                   static checks on `code` instead.
 
         Returns:
             dict: A dictionary in the standardized format:
                   {'score': float, 'checks': dict, 'issues': list, 'suggestions': list}
         """
+        if self.fast if fast is None else fast:
+            if not file_path and code:
+                return self._analyze_code_static(code)
+            if file_path and os.path.exists(file_path):
+                return self._analyze_fast(file_path)
+
         if not file_path:
             logging.error("A file_path to a project directory is required for pytest-cov analysis.")
             result = self._get_default_result()
@@ -196,4 +265,378 @@ class ProductionReadiness:
             return result
 
         raw_results = self._run_pytest_cov(file_path)
-        return self._format_output(raw_results)
\ No newline at end of file
+        return self._format_output(raw_results)
+
+    # ------------------------------------------------------------------
+    # Fast (incremental) mode
+    # ------------------------------------------------------------------
+
+    def _analyze_fast(self, file_path: str) -> Dict[str, Any]:
+        """Incremental coverage plus in-process static checks for a project."""
+        target = os.path.abspath(file_path)
+        root = target if os.path.isdir(target) else os.path.dirname(target)
+        state = self._load_state(target)
+
+        files, changed = self._scan_files(root, state)
+        deleted = set(state['files']) - set(files)
+
+        # Update a copy: the stored state (and its file hashes) only advance
+        # once coverage has been brought up to date
+        new_state = {
+            'target': target,
+            'files': files,
+            'static': dict(state['static']),
+            'imports': dict(state['imports']),
+            'coverage': dict(state['coverage']) if state['coverage'] is not None else None,
+        }
+        for rel in deleted:
+            for table in ('static', 'imports', 'coverage'):
+                (new_state.get(table) or {}).pop(rel, None)
+
+        for rel in changed:
+            source = self._read(os.path.join(root, rel))
+            new_state['imports'][rel] = self._imports(source, rel)
+            new_state['static'][rel] = self._static_summary(source)
+
+        if os.path.isdir(target):
+            tests = sorted(rel for rel in files if _is_test_file(rel))
+        else:
+            tests = [os.path.relpath(target, root)] if _is_test_file(target) else []
+
+        run_info = {'full_run': False, 'tests_run': 0, 'changed_files': len(changed | deleted)}
+        error = None
+
+        if new_state['coverage'] is None:
+            error = self._full_coverage(file_path, root, new_state, run_info)
+        elif changed or deleted:
+            affected = self._affected_tests(new_state, tests, changed | deleted)
+            if affected is None:
+                error = self._full_coverage(file_path, root, new_state, run_info)
+            elif affected:
+                error = self._partial_coverage(
+                    file_path, root, new_state, affected, changed, run_info
+                )
+
+        if error is not None:
+            # Forget the project so the next call starts over with a full run
+            # instead of treating the failed edits as already measured
+            self._drop_state(target)
+            result = self._format_output(error)
+        else:
+            self._states[target] = new_state
+            result = self._format_output(self._coverage_report(new_state['coverage']))
+            self._save_state(target, new_state)
+
+        self._add_static_checks(result, {
+            rel: summary for rel, summary in new_state['static'].items() if not _is_test_file(rel)
+        })
+        result['run_info'] = run_info
+        return result
+
+    def _full_coverage(self, file_path: str, root: str, state: Dict[str, Any],
+                       run_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run the whole suite and replace stored coverage. Returns an error dict on failure."""
+        raw = self._run_pytest_cov(file_path)
+        run_info['full_run'] = True
+        if 'error' in raw:
+            state['coverage'] = None
+            return raw
+
+        state['coverage'] = self._per_file_coverage(raw, root)
+        return None
+
+    def _partial_coverage(self, file_path: str, root: str, state: Dict[str, Any],
+                          affected: List[str], changed: Set[str],
+                          run_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Re-run affected tests and merge their coverage into the stored data."""
+        raw = self._run_pytest_cov(file_path, [os.path.join(root, rel) for rel in affected])
+        run_info['tests_run'] = len(affected)
+        if 'error' in raw:
+            return raw
+
+        fresh = self._per_file_coverage(raw, root)
+        coverage = state['coverage']
+        for rel in changed:
+            # Old line numbers are meaningless for an edited file; every test
+            # that can reach it was re-run, so the fresh data is complete
+            coverage.pop(rel, None)
+
+        for rel, entry in fresh.items():
+            old = coverage.get(rel)
+            if old is None:
+                coverage[rel] = entry
+                continue
+            executed = set(old['executed_lines']) | set(entry['executed_lines'])
+            missing = set(entry['missing_lines']) - executed
+            coverage[rel] = _file_entry(executed, missing, entry['summary'])
+        return None
+
+    def _affected_tests(self, state: Dict[str, Any], tests: List[str],
+                        touched: Set[str]) -> Optional[List[str]]:
+        """
+        Tests that (transitively) import a changed file.
+
+        Returns None when the change can't be attributed to specific tests,
+        meaning a full run is needed: a test file or conftest.py changed
+        (stored coverage isn't per test, so an edited or deleted test's old
+        contribution can't be removed), a source file was deleted (the
+        tests that imported it are no longer in the import graph), or a
+        changed source file with coverage isn't reachable from any test.
+        """
+        if any(_is_test_file(rel) or os.path.basename(rel) == 'conftest.py' for rel in touched):
+            return None
+        if any(rel not in state['files'] for rel in touched):
+            return None
+
+        module_index: Dict[str, Set[str]] = {}
+        for rel in state['files']:
+            for name in _module_names(rel):
+                module_index.setdefault(name, set()).add(rel)
+
+        closures: Dict[str, Set[str]] = {}
+
+        def reachable(rel: str) -> Set[str]:
+            if rel in closures:
+                return closures[rel]
+            seen = closures[rel] = {rel}
+            for module in state['imports'].get(rel, []):
+                for dep in module_index.get(module, ()):
+                    if dep not in seen:
+                        seen |= reachable(dep)
+            return seen
+
+        affected = [rel for rel in tests if reachable(rel) & touched]
+
+        reached = set().union(*(reachable(rel) for rel in affected)) if affected else set()
+        for rel in touched - reached:
+            if (state['coverage'] or {}).get(rel, {}).get('executed_lines'):
+                return None
+        return affected
+
+    def _per_file_coverage(self, raw: Dict[str, Any], root: str) -> Dict[str, Dict[str, Any]]:
+        """pytest-cov 'files' section keyed by path relative to the project root."""
+        coverage = {}
+        for filename, data in raw.get('files', {}).items():
+            rel = os.path.relpath(os.path.abspath(filename), root)
+            coverage[rel] = _file_entry(
+                set(data.get('executed_lines', [])),
+                set(data.get('missing_lines', [])),
+                data.get('summary', {})
+            )
+        return coverage
+
+    def _coverage_report(self, coverage: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Rebuild a pytest-cov style report (totals + files) from per-file entries."""
+        summaries = [e['summary'] for e in coverage.values()]
+        covered = sum(s['covered_lines'] for s in summaries)
+        statements = sum(s['num_statements'] for s in summaries)
+        return {
+            'totals': {
+                'percent_covered': 100.0 * covered / statements if statements else 0.0,
+                'covered_lines': covered,
+                'num_statements': statements,
+                'missing_lines': statements - covered,
+                'covered_branches': sum(s.get('covered_branches', 0) for s in summaries),
+                'num_branches': sum(s.get('num_branches', 0) for s in summaries),
+            },
+            'files': coverage
+        }
+
+    def _scan_files(self, root: str, state: Dict[str, Any]):
+        """
+        Hash the project's .py files, re-reading only files whose mtime/size changed.
+
+        Returns:
+            (files: rel -> {'mtime_ns', 'size', 'sha'}, changed: set of rel paths)
+        """
+        previous = state['files']
+        files, changed = {}, set()
+
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in EXCLUDED_DIRS and not d.startswith('.')]
+            for filename in filenames:
+                if not filename.endswith('.py'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                rel = os.path.relpath(path, root)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                old = previous.get(rel)
+                if old and old['mtime_ns'] == stat.st_mtime_ns and old['size'] == stat.st_size:
+                    files[rel] = old
+                    continue
+
+                with open(path, 'rb') as f:
+                    sha = hashlib.sha256(f.read()).hexdigest()
+                files[rel] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha': sha}
+                if not old or old['sha'] != sha:
+                    changed.add(rel)
+
+        return files, changed
+
+    @staticmethod
+    def _read(path: str) -> str:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+
+    @staticmethod
+    def _imports(source: str, rel_path: str) -> List[str]:
+        """Dotted module names a file imports (relative imports resolved)."""
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            return []
+
+        package = rel_path[:-3].split(os.sep)[:-1]
+        modules = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    parts = alias.name.split('.')
+                    modules.update('.'.join(parts[:i]) for i in range(1, len(parts) + 1))
+            elif isinstance(node, ast.ImportFrom):
+                base = package[:len(package) - node.level + 1] if node.level else []
+                prefix = '.'.join(base + (node.module.split('.') if node.module else []))
+                if prefix:
+                    modules.add(prefix)
+                for alias in node.names:
+                    modules.add(f"{prefix}.{alias.name}" if prefix else alias.name)
+        return sorted(modules)
+
+    @staticmethod
+    def _static_summary(source: str) -> Dict[str, Any]:
+        """Count functions with full type hints, docstrings and try/except."""
+        try:
+            tree = ast.parse(source)
+        except SyntaxError as e:
+            return {'syntax_error': f"line {e.lineno}: {e.msg}"}
+
+        summary = {'functions': 0, 'typed': 0, 'documented': 0, 'error_handled': 0,
+                   'bare_excepts': 0, 'untyped': [], 'undocumented': []}
+
+        methods = {
+            id(node)
+            for cls in ast.walk(tree) if isinstance(cls, ast.ClassDef)
+            for node in cls.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        }
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ExceptHandler) and node.type is None:
+                summary['bare_excepts'] += 1
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+
+            args = node.args.posonlyargs + node.args.args + node.args.kwonlyargs
+            if id(node) in methods and args and args[0].arg in ('self', 'cls'):
+                args = args[1:]
+            args += [a for a in (node.args.vararg, node.args.kwarg) if a is not None]
+            typed = node.returns is not None and all(a.annotation is not None for a in args)
+
+            summary['functions'] += 1
+            summary['typed'] += typed
+            summary['documented'] += ast.get_docstring(node) is not None
+            summary['error_handled'] += any(isinstance(n, ast.Try) for n in ast.walk(node))
+            if not typed:
+                summary['untyped'].append(node.name)
+            if ast.get_docstring(node) is None:
+                summary['undocumented'].append(node.name)
+
+        return summary
+
+    def _add_static_checks(self, result: Dict[str, Any], summaries: Dict[str, Dict[str, Any]]):
+        """Merge per-file static summaries into a result's checks/issues/suggestions."""
+        totals = {key: sum(s.get(key, 0) for s in summaries.values())
+                  for key in ('functions', 'typed', 'documented', 'error_handled', 'bare_excepts')}
+
+        def percent(key: str) -> float:
+            if not totals['functions']:
+                return 0.0
+            return round(100.0 * totals[key] / totals['functions'], 2)
+
+        result['checks'].update({
+            'type_hint_coverage_percent': percent('typed'),
+            'docstring_coverage_percent': percent('documented'),
+            'error_handling_coverage_percent': percent('error_handled'),
+            'bare_except_count': totals['bare_excepts'],
+        })
+
+        for rel, summary in sorted(summaries.items()):
+            if 'syntax_error' in summary:
+                result['issues'].append({'type': 'Syntax Error', 'file': rel,
+                                         'message': 'File does not parse',
+                                         'details': summary['syntax_error']})
+                continue
+            if summary['untyped']:
+                count = len(summary['untyped'])
+                result['issues'].append({'type': 'Missing Type Hints', 'file': rel,
+                                         'message': f"{count} function(s) without full type hints",
+                                         'details': ', '.join(summary['untyped'][:5])})
+            if summary['undocumented']:
+                count = len(summary['undocumented'])
+                result['issues'].append({'type': 'Missing Docstrings', 'file': rel,
+                                         'message': f"{count} function(s) without docstrings",
+                                         'details': ', '.join(summary['undocumented'][:5])})
+
+        if totals['functions'] and totals['typed'] < totals['functions']:
+            result['suggestions'].append("Add type hints to function parameters and return values.")
+        if totals['functions'] and totals['documented'] < totals['functions']:
+            result['suggestions'].append("Add docstrings describing what each function does.")
+        if totals['bare_excepts']:
+            result['suggestions'].append(
+                "Replace bare 'except:' clauses with specific exception types."
+            )
+
+    def _analyze_code_static(self, code: str) -> Dict[str, Any]:
+        """Static checks only, for a code string with no project to run tests on."""
+        result = self._get_default_result()
+        summary = self._static_summary(code)
+        self._add_static_checks(result, {'<code>': summary})
+
+        checks = result['checks']
+        if summary.get('functions'):
+            result['score'] = round((checks['type_hint_coverage_percent']
+                                     + checks['docstring_coverage_percent']
+                                     + checks['error_handling_coverage_percent']) / 300.0, 4)
+        return result
+
+    def _state_path(self, target: str) -> str:
+        key = hashlib.sha256(target.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.state_dir, f"{key}.json")
+
+    def _load_state(self, target: str) -> Dict[str, Any]:
+        """In-memory state for a project, falling back to the persisted copy."""
+        if target in self._states:
+            return self._states[target]
+
+        state = None
+        try:
+            with open(self._state_path(target), 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        if not state or state.get('target') != target:
+            state = {'target': target, 'files': {}, 'static': {}, 'imports': {}, 'coverage': None}
+        self._states[target] = state
+        return state
+
+    def _drop_state(self, target: str):
+        """Forget a project's state in memory and on disk."""
+        self._states.pop(target, None)
+        try:
+            os.unlink(self._state_path(target))
+        except OSError:
+            pass
+
+    def _save_state(self, target: str, state: Dict[str, Any]):
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            tmp_path = f"{self._state_path(target)}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self._state_path(target))
+        except OSError as e:
+            logging.warning(f"Could not persist production readiness state: {e}")
@@ -7,19 +7,114 @@ Implements comprehensive cost management:
 3. Cost optimization recommendations
 4. Spend analytics and forecasting
 5. Alert system for approaching budget limits
+6. Atomic budget reservations shared by concurrent worker processes
+
+Transaction times are stored as integer epoch seconds (ts) and rolled up into
+hourly and daily totals per category, which the spend analytics read instead
+of the transaction log.
 """
 
 import sqlite3
 import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from src.common.time_buckets import (
+    GRANULARITIES,
+    HOUR,
+    bucket_start,
+    from_epoch,
+    parse_iso_epoch,
+    to_epoch
+)
+from src.level2.walk.spend_forecaster import BudgetForecast, SpendForecaster
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Statements on the record_cost path are module constants so the connection's
+# statement cache reuses the prepared statement on every call
+INSERT_TRANSACTION_SQL = """
+    INSERT INTO cost_transactions
+    (timestamp, category, description, amount, tool_name, pattern_name, acquisition_type,
+     metadata, ts)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Spend is incremented in SQL (never written back from memory) so processes
+# sharing the database don't overwrite each other's spend
+INCREMENT_BUDGET_SPEND_SQL = """
+    UPDATE budgets
+    SET current_spend = current_spend + ?, updated_at = ?
+"""
+
+INSERT_RESERVATION_SQL = """
+    INSERT INTO budget_reservations
+    (amount, category, description, status, created_at, expires_at, pid)
+    VALUES (?, ?, ?, 'pending', ?, ?, ?)
+"""
+
+# Pending holds count against every budget until they expire
+PENDING_RESERVED_SQL = """
+    SELECT COALESCE(SUM(amount), 0.0)
+    FROM budget_reservations
+    WHERE status = 'pending' AND expires_at > ?
+"""
+
+SETTLE_RESERVATION_SQL = """
+    UPDATE budget_reservations
+    SET status = ?, settled_at = ?
+    WHERE id = ? AND status = 'pending'
+"""
+
+# Alert dedup state lives in the budgets row so every process sharing the
+# database reads it with the ledger
+SELECT_BUDGETS_SQL = """
+    SELECT period, limit_amount, current_spend, start_date, end_date,
+           alert_level, alert_period_start, alerted_at, blocked_alerted_at
+    FROM budgets
+"""
+
+UPDATE_ALERT_STATE_SQL = """
+    UPDATE budgets
+    SET alert_level = ?, alert_period_start = ?, alerted_at = ?
+    WHERE period = ?
+"""
+
+UPDATE_BLOCKED_ALERTED_AT_SQL = """
+    UPDATE budgets SET blocked_alerted_at = ?
+"""
+
+# Columns added to budgets after it was first created
+BUDGET_ALERT_COLUMNS = {
+    'alert_level': 'TEXT',
+    'alert_period_start': 'TEXT',
+    'alerted_at': 'REAL',
+    'blocked_alerted_at': 'REAL'
+}
+
+INSERT_ALERT_SQL = """
+    INSERT INTO cost_alerts
+    (timestamp, level, message, budget_period, current_spend, budget_limit)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Adds a transaction to its hourly and daily category totals
+UPSERT_COST_ROLLUP_SQL = """
+    INSERT INTO cost_rollups (granularity, bucket_start, category, amount, transactions)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(granularity, bucket_start, category) DO UPDATE SET
+        amount = amount + excluded.amount,
+        transactions = transactions + excluded.transactions
+"""
+
 
 class BudgetPeriod(Enum):
     """Budget period types"""
@@ -35,6 +130,16 @@ class AlertLevel(Enum):
     CRITICAL = "critical"
 
 
+# Utilization thresholds (percent) that raise budget alerts, highest first
+ALERT_THRESHOLDS = ((95.0, AlertLevel.CRITICAL), (80.0, AlertLevel.WARNING))
+
+ALERT_LOG_LEVELS = {
+    AlertLevel.INFO: logging.INFO,
+    AlertLevel.WARNING: logging.WARNING,
+    AlertLevel.CRITICAL: logging.CRITICAL
+}
+
+
 @dataclass
 class Budget:
     """
@@ -46,12 +151,14 @@ class Budget:
         current_spend: Current spend in this period
         start_date: Period start date
         end_date: Period end date
+        reserved: Amount held by pending reservations
     """
     period: BudgetPeriod
     limit: float
     current_spend: float = 0.0
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
+    reserved: float = 0.0
 
     def __post_init__(self):
         if self.start_date is None:
@@ -70,8 +177,8 @@ class Budget:
         return self.start_date
 
     def remaining(self) -> float:
-        """Calculate remaining budget"""
-        return max(0.0, self.limit - self.current_spend)
+        """Calculate remaining budget (excluding reserved amounts)"""
+        return max(0.0, self.limit - self.current_spend - self.reserved)
 
     def utilization_percent(self) -> float:
         """Calculate budget utilization percentage"""
@@ -109,6 +216,33 @@ class CostAlert:
             self.timestamp = datetime.now()
 
 
+@dataclass
+class _AlertState:
+    """Last threshold alert raised for a budget period"""
+    period_start: datetime
+    level: AlertLevel
+    alerted_at: float
+
+
+@dataclass
+class BudgetReservation:
+    """
+    A hold on budget for work whose final cost isn't known yet.
+
+    Attributes:
+        reservation_id: Row id in budget_reservations
+        amount: Amount held
+        category: Cost category the hold is for
+        created_at: When the hold was taken
+        expires_at: When the hold stops counting against budgets
+    """
+    reservation_id: int
+    amount: float
+    category: str
+    created_at: datetime
+    expires_at: datetime
+
+
 @dataclass
 class CostOptimization:
     """
@@ -143,26 +277,139 @@ class CostManagementSystem:
     - Spend forecasting
     - Optimization recommendations
     - Alert system
+
+    Writes go through one persistent connection (WAL, synchronous=NORMAL)
+    shared by all threads under a lock, so a cost record, its budget-spend
+    updates and any alerts commit together. The connection is reopened
+    after a fork or if db_path changes.
+
+    Several processes can share the database. Every budget check runs
+    under BEGIN IMMEDIATE (one writer at a time across processes). It
+    refreshes the in-memory ledger (self.budgets) from the budgets table
+    and pending reservations, and spend is incremented in SQL, so
+    concurrent workers never overspend or lose each other's updates.
+    Between transactions the ledger is a cache for reporting.
+
+    For work whose cost is only known afterwards, reserve() holds budget
+    up front; commit_reservation() records the actual cost and
+    release_reservation() returns the hold.
+
+    Budget alerts fire when utilization crosses 80% (warning) or 95%
+    (critical) and when a budget moves to a new period (info). While a
+    budget stays above a threshold, the same alert repeats at most once per
+    alert_cooldown seconds, and so do blocked-transaction alerts. The last
+    alert per budget (level, period and time) and the last blocked alert
+    are stored in the budgets row and loaded with the ledger, so restarts
+    and other processes don't repeat them; checking after each cost is
+    O(budgets) with no extra reads.
     """
 
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        synchronous: str = "NORMAL",
+        reservation_ttl: float = 3600.0,
+        alert_cooldown: float = 3600.0,
+        clock: Callable[[], float] = time.time
+    ):
         """
         Initialize cost management system.
 
         Args:
             db_path: Path to SQLite database (default: data/cost_management.db)
+            synchronous: SQLite synchronous level (FULL also survives power loss)
+            reservation_ttl: Seconds a pending reservation holds budget (so
+                holds from crashed workers don't block spend forever)
+            alert_cooldown: Minimum seconds between repeats of the same
+                alert (0 repeats on every transaction)
+            clock: Wall-clock time source for alert cooldowns (injectable for tests)
         """
         if db_path is None:
             project_root = self._find_project_root()
             db_path = project_root / "data" / "cost_management.db"
 
-        self.db_path = db_path
+        self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.synchronous = synchronous.upper()
+        self.reservation_ttl = reservation_ttl
+        self.alert_cooldown = alert_cooldown
+        self._clock = clock
+
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_owner: Optional[Tuple[int, Path]] = None
 
         self._init_database()
         self.budgets: Dict[BudgetPeriod, Budget] = {}
+        self._next_expiry: Optional[datetime] = None
+        self._alert_state: Dict[BudgetPeriod, _AlertState] = {}
+        self._blocked_alerted_at: Optional[float] = None
         self._load_budgets()
 
+        # Time-series forecasts over the daily rollups, cached per day
+        self.forecaster = SpendForecaster(self)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30.0,
+            check_same_thread=False,  # Access is serialized by self._lock
+            cached_statements=256
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        return conn
+
+    @contextmanager
+    def _connection(
+        self, immediate: bool = False, snapshot: bool = False
+    ) -> Iterator[sqlite3.Connection]:
+        """
+        The shared connection, inside a transaction (committed on exit).
+
+        Re-entrant, so helpers can be called while a transaction is open.
+
+        Args:
+            immediate: Start with BEGIN IMMEDIATE, taking the database write
+                lock up front so a read-check-write sequence is atomic across
+                processes (ignored inside an open transaction)
+            snapshot: Start with a deferred BEGIN, so several reads see one
+                snapshot without taking the write lock
+        """
+        with self._lock:
+            # Reopen after a fork (an inherited connection must not be used)
+            # or if db_path was reassigned
+            owner = (os.getpid(), Path(self.db_path))
+            if self._conn is None or self._conn_owner != owner:
+                if self._conn is not None and self._conn_owner[0] == owner[0]:
+                    self._conn.close()
+                self._conn = self._connect()
+                self._conn_owner = owner
+
+            if self._conn.in_transaction:
+                yield self._conn
+            else:
+                if immediate:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                elif snapshot:
+                    self._conn.execute("BEGIN")
+                with self._conn:
+                    yield self._conn
+
+    def close(self):
+        """Close the connection (it is reopened on next use)"""
+        with self._lock:
+            if self._conn is not None and self._conn_owner[0] == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._conn_owner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def _find_project_root(self) -> Path:
         """Find project root by locating pyproject.toml"""
         current = Path(__file__).resolve()
@@ -174,7 +421,7 @@ class CostManagementSystem:
 
     def _init_database(self):
         """Initialize SQLite database with schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             # Cost transactions table
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS cost_transactions (
@@ -186,7 +433,26 @@ class CostManagementSystem:
                     tool_name TEXT,
                     pattern_name TEXT,
                     acquisition_type TEXT,
-                    metadata TEXT
+                    metadata TEXT,
+                    ts INTEGER
+                )
+            """)
+
+            # Databases created before ts: convert the ISO timestamps once
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cost_transactions)")}
+            if 'ts' not in columns:
+                self._migrate_epoch_timestamps(conn)
+
+            # Hourly and daily spend per category; bucket_start is the epoch
+            # start of the local hour or day
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cost_rollups (
+                    granularity TEXT NOT NULL,
+                    bucket_start INTEGER NOT NULL,
+                    category TEXT NOT NULL,
+                    amount REAL NOT NULL DEFAULT 0.0,
+                    transactions INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (granularity, bucket_start, category)
                 )
             """)
 
@@ -199,7 +465,11 @@ class CostManagementSystem:
                     current_spend REAL DEFAULT 0.0,
                     start_date TEXT NOT NULL,
                     end_date TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
+                    updated_at TEXT NOT NULL,
+                    alert_level TEXT,
+                    alert_period_start TEXT,
+                    alerted_at REAL,
+                    blocked_alerted_at REAL
                 )
             """)
 
@@ -217,39 +487,171 @@ class CostManagementSystem:
                 )
             """)
 
-            # Indexes
+            # Databases created before the alert state columns: add them and
+            # seed them from the alerts already raised
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(budgets)")}
+            if 'alert_level' not in columns:
+                self._migrate_alert_state(conn, columns)
+
+            # Budget holds taken by reserve(); status is pending, committed or released
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS budget_reservations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    amount REAL NOT NULL,
+                    category TEXT,
+                    description TEXT,
+                    status TEXT NOT NULL,
+                    created_at INTEGER NOT NULL,
+                    expires_at INTEGER NOT NULL,
+                    settled_at INTEGER,
+                    pid INTEGER
+                )
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_reservations_pending
+                ON budget_reservations(expires_at) WHERE status = 'pending'
+            """)
+
+            # Savings table (spend avoided, e.g. cached LLM responses)
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_transactions_timestamp
-                ON cost_transactions(timestamp)
+                CREATE TABLE IF NOT EXISTS cost_savings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    description TEXT,
+                    amount REAL NOT NULL,
+                    metadata TEXT
+                )
             """)
 
+            # Indexes
+            # Time-range reads use ts; the ISO column is kept for display only
+            conn.execute("DROP INDEX IF EXISTS idx_transactions_timestamp")
+
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_transactions_category
                 ON cost_transactions(category)
             """)
 
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_transactions_ts
+                ON cost_transactions(ts)
+            """)
+
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_alerts_timestamp
                 ON cost_alerts(timestamp)
             """)
 
-            conn.commit()
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_savings_timestamp
+                ON cost_savings(timestamp)
+            """)
 
-    def _load_budgets(self):
-        """Load budgets from database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT * FROM budgets")
+            # Build the rollups once for existing transaction history
+            has_transactions = conn.execute("SELECT 1 FROM cost_transactions LIMIT 1").fetchone()
+            has_rollups = conn.execute("SELECT 1 FROM cost_rollups LIMIT 1").fetchone()
+            if has_transactions and not has_rollups:
+                self._rebuild_rollups(conn)
+
+    @staticmethod
+    def _migrate_epoch_timestamps(conn: sqlite3.Connection):
+        """Add the ts column and fill it from the ISO timestamp column"""
+        conn.execute("ALTER TABLE cost_transactions ADD COLUMN ts INTEGER")
+        rows = conn.execute("SELECT id, timestamp FROM cost_transactions").fetchall()
+        conn.executemany(
+            "UPDATE cost_transactions SET ts = ? WHERE id = ?",
+            [(parse_iso_epoch(timestamp), row_id) for row_id, timestamp in rows]
+        )
+        logger.info(f"Migrated {len(rows)} cost transaction timestamps to epoch seconds")
+
+    @staticmethod
+    def _rollup_rows(timestamp: datetime, category: str, amount: float) -> List[tuple]:
+        """UPSERT_COST_ROLLUP_SQL parameters for one transaction"""
+        return [
+            (granularity, bucket_start(timestamp, granularity), category, amount, 1)
+            for granularity in GRANULARITIES
+        ]
+
+    def _rebuild_rollups(self, conn: sqlite3.Connection):
+        rows = []
+        transactions = conn.execute("SELECT ts, category, amount FROM cost_transactions")
+        for ts, category, amount in transactions:
+            rows.extend(self._rollup_rows(from_epoch(ts), category, amount))
+        conn.executemany(UPSERT_COST_ROLLUP_SQL, rows)
+
+    def rebuild_rollups(self):
+        """Recompute cost_rollups from the full transaction history"""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cost_rollups")
+            self._rebuild_rollups(conn)
+
+    @staticmethod
+    def _migrate_alert_state(conn: sqlite3.Connection, columns: Set[str]):
+        """Add the alert state columns and fill them from cost_alerts"""
+        for name, column_type in BUDGET_ALERT_COLUMNS.items():
+            if name not in columns:
+                conn.execute(f"ALTER TABLE budgets ADD COLUMN {name} {column_type}")
+
+        budgets = conn.execute("SELECT period, start_date FROM budgets").fetchall()
+        for period, start_date in budgets:
+            rows = conn.execute("""
+                SELECT level, MAX(timestamp)
+                FROM cost_alerts
+                WHERE budget_period = ? AND timestamp >= ? AND level IN (?, ?)
+                GROUP BY level
+            """, (period, start_date, AlertLevel.WARNING.value, AlertLevel.CRITICAL.value))
+
+            # The critical alert wins over a warning in the same period
+            last = {level: timestamp for level, timestamp in rows}
+            level = next(
+                (lvl.value for _, lvl in ALERT_THRESHOLDS if lvl.value in last), None
+            )
+            if level is not None:
+                conn.execute(UPDATE_ALERT_STATE_SQL, (
+                    level, start_date, datetime.fromisoformat(last[level]).timestamp(), period
+                ))
 
-            for row in cursor.fetchall():
-                period = BudgetPeriod(row[1])
-                budget = Budget(
-                    period=period,
-                    limit=row[2],
-                    current_spend=row[3],
-                    start_date=datetime.fromisoformat(row[4]),
-                    end_date=datetime.fromisoformat(row[5])
+    def _load_budgets(self):
+        """Load budgets, and the last alert raised for each, from database"""
+        with self._connection() as conn:
+            self._sync_ledger(conn, datetime.now())
+
+    def _sync_ledger(self, conn: sqlite3.Connection, now: datetime):
+        """Replace the in-memory ledger and alert state with the budgets table and pending holds"""
+        reserved = conn.execute(PENDING_RESERVED_SQL, (to_epoch(now),)).fetchone()[0]
+
+        budgets = {}
+        alert_state = {}
+        blocked_alerts = []
+        for row in conn.execute(SELECT_BUDGETS_SQL).fetchall():
+            period = BudgetPeriod(row[0])
+            budgets[period] = Budget(
+                period=period,
+                limit=row[1],
+                current_spend=row[2],
+                start_date=datetime.fromisoformat(row[3]),
+                end_date=datetime.fromisoformat(row[4]),
+                reserved=reserved
+            )
+            if row[5] is not None:
+                alert_state[period] = _AlertState(
+                    period_start=datetime.fromisoformat(row[6]),
+                    level=AlertLevel(row[5]),
+                    alerted_at=row[7]
                 )
-                self.budgets[period] = budget
+            if row[8] is not None:
+                blocked_alerts.append(row[8])
+
+        self.budgets = budgets
+        self._alert_state = alert_state
+        self._blocked_alerted_at = max(blocked_alerts, default=None)
+        self._update_next_expiry()
+
+    def _update_next_expiry(self):
+        """Cache the earliest budget end so expiry checks are one comparison"""
+        self._next_expiry = min((b.end_date for b in self.budgets.values()), default=None)
 
     def set_budget(self, period: BudgetPeriod, limit: float) -> Budget:
         """
@@ -263,10 +665,14 @@ class CostManagementSystem:
             Budget object
         """
         budget = Budget(period=period, limit=limit)
-        self.budgets[period] = budget
 
         # Save to database
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
+            budget.reserved = conn.execute(
+                PENDING_RESERVED_SQL, (to_epoch(datetime.now()),)
+            ).fetchone()[0]
+            self.budgets[period] = budget
+            self._update_next_expiry()
             conn.execute("""
                 INSERT OR REPLACE INTO budgets
                 (period, limit_amount, current_spend, start_date, end_date, updated_at)
@@ -279,7 +685,6 @@ class CostManagementSystem:
                 budget.end_date.isoformat(),
                 datetime.now().isoformat()
             ))
-            conn.commit()
 
         logger.info(f"Set {period.value} budget: ${limit:.2f}")
         return budget
@@ -309,50 +714,269 @@ class CostManagementSystem:
         Returns:
             True if recorded successfully (within budget), False otherwise
         """
+        timestamp = datetime.now()
+
+        try:
+            with self._connection(immediate=True) as conn:
+                self._sync_ledger(conn, timestamp)
+                self._reset_expired_budgets(timestamp)
+
+                # Check budget enforcement
+                if not self._check_budget_enforcement(amount):
+                    logger.warning(f"Cost ${amount:.2f} blocked by budget enforcement")
+                    self._create_blocked_alert(
+                        f"Transaction blocked: ${amount:.2f} would exceed budget"
+                    )
+                    return False
+
+                self._apply_cost(
+                    conn, timestamp, amount, category, description,
+                    tool_name, pattern_name, acquisition_type, metadata
+                )
+        except BaseException:
+            # The transaction was rolled back: reload the ledger to match
+            self._load_budgets()
+            raise
+
+        logger.debug(f"Recorded cost: ${amount:.2f} ({category})")
+        return True
+
+    def _apply_cost(
+        self,
+        conn: sqlite3.Connection,
+        timestamp: datetime,
+        amount: float,
+        category: str,
+        description: Optional[str],
+        tool_name: Optional[str],
+        pattern_name: Optional[str],
+        acquisition_type: Optional[str],
+        metadata: Optional[Dict]
+    ):
+        """Write a cost, its rollups, the budget spend and any alerts (caller holds the lock)"""
         import json
 
+        # Record transaction
+        conn.execute(INSERT_TRANSACTION_SQL, (
+            timestamp.isoformat(),
+            category,
+            description,
+            amount,
+            tool_name,
+            pattern_name,
+            acquisition_type,
+            json.dumps(metadata) if metadata else None,
+            to_epoch(timestamp)
+        ))
+        conn.executemany(UPSERT_COST_ROLLUP_SQL, self._rollup_rows(timestamp, category, amount))
+
+        # Update budget spend
+        self._update_budget_spend(amount, timestamp)
+
+        # Check for alerts
+        self._check_budget_alerts()
+
+    def _create_blocked_alert(self, message: str):
+        """Alert on a blocked transaction, at most once per alert_cooldown"""
+        now = self._clock()
+        last = self._blocked_alerted_at
+        if last is not None and now - last < self.alert_cooldown:
+            return
+        self._blocked_alerted_at = now
+        with self._connection() as conn:
+            conn.execute(UPDATE_BLOCKED_ALERTED_AT_SQL, (now,))
+
+        monthly = self.budgets.get(BudgetPeriod.MONTHLY, Budget(BudgetPeriod.MONTHLY, 0))
+        self._create_alert(
+            level=AlertLevel.CRITICAL,
+            message=message,
+            budget_period=BudgetPeriod.MONTHLY,
+            current_spend=monthly.current_spend,
+            budget_limit=monthly.limit
+        )
+
+    def reserve(
+        self,
+        amount: float,
+        category: str = "",
+        description: Optional[str] = None
+    ) -> Optional[BudgetReservation]:
+        """
+        Atomically hold budget for work whose final cost isn't known yet.
+
+        The hold counts against every budget (in this and other processes)
+        until it is committed, released or reservation_ttl passes.
+
+        Args:
+            amount: Maximum expected cost
+            category: Cost category the hold is for
+            description: Optional description
+
+        Returns:
+            BudgetReservation, or None if the hold would exceed a budget
+        """
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=self.reservation_ttl)
+
+        try:
+            with self._connection(immediate=True) as conn:
+                self._sync_ledger(conn, now)
+                self._reset_expired_budgets(now)
+
+                if not self._check_budget_enforcement(amount):
+                    logger.warning(f"Reservation of ${amount:.2f} blocked by budget enforcement")
+                    self._create_blocked_alert(
+                        f"Reservation blocked: ${amount:.2f} would exceed budget"
+                    )
+                    return None
+
+                cursor = conn.execute(INSERT_RESERVATION_SQL, (
+                    amount, category, description, to_epoch(now), to_epoch(expires_at), os.getpid()
+                ))
+                for budget in self.budgets.values():
+                    budget.reserved += amount
+        except BaseException:
+            self._load_budgets()
+            raise
+
+        return BudgetReservation(
+            reservation_id=cursor.lastrowid,
+            amount=amount,
+            category=category,
+            created_at=now,
+            expires_at=expires_at
+        )
+
+    def commit_reservation(
+        self,
+        reservation: BudgetReservation,
+        amount: Optional[float] = None,
+        category: Optional[str] = None,
+        description: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        pattern_name: Optional[str] = None,
+        acquisition_type: Optional[str] = None,
+        metadata: Optional[Dict] = None
+    ) -> bool:
+        """
+        Record the actual cost of reserved work and drop the hold.
+
+        The cost is recorded even if it exceeds the reserved amount: the
+        work has already been done.
+
+        Args:
+            reservation: From reserve()
+            amount: Actual cost (default: the reserved amount)
+            category: Cost category (default: the reservation's)
+            description: Optional description
+            tool_name: Tool associated with cost
+            pattern_name: Pattern associated with cost
+            acquisition_type: Type of acquisition (build, library, api)
+            metadata: Additional metadata
+
+        Returns:
+            True if recorded, False if the reservation was already committed or released
+        """
+        amount = reservation.amount if amount is None else amount
+        category = category or reservation.category
         timestamp = datetime.now()
 
-        # Check budget enforcement
-        can_proceed = self._check_budget_enforcement(amount)
+        try:
+            with self._connection(immediate=True) as conn:
+                settled = conn.execute(SETTLE_RESERVATION_SQL, (
+                    'committed', to_epoch(timestamp), reservation.reservation_id
+                )).rowcount
+                if not settled:
+                    return False
+
+                self._sync_ledger(conn, timestamp)
+                self._reset_expired_budgets(timestamp)
+                self._apply_cost(
+                    conn, timestamp, amount, category, description,
+                    tool_name, pattern_name, acquisition_type, metadata
+                )
+        except BaseException:
+            self._load_budgets()
+            raise
 
-        if not can_proceed:
-            logger.warning(f"Cost ${amount:.2f} blocked by budget enforcement")
-            self._create_alert(
-                level=AlertLevel.CRITICAL,
-                message=f"Transaction blocked: ${amount:.2f} would exceed budget",
-                budget_period=BudgetPeriod.MONTHLY,
-                current_spend=self.budgets.get(BudgetPeriod.MONTHLY, Budget(BudgetPeriod.MONTHLY, 0)).current_spend,
-                budget_limit=self.budgets.get(BudgetPeriod.MONTHLY, Budget(BudgetPeriod.MONTHLY, 0)).limit
-            )
-            return False
+        logger.debug(
+            f"Committed reservation {reservation.reservation_id}: ${amount:.2f} ({category})"
+        )
+        return True
 
-        # Record transaction
-        with sqlite3.connect(self.db_path) as conn:
+    def release_reservation(self, reservation: BudgetReservation) -> bool:
+        """
+        Drop a hold without recording a cost (e.g. the work failed).
+
+        Args:
+            reservation: From reserve()
+
+        Returns:
+            True if released, False if it was already committed or released
+        """
+        now = datetime.now()
+        with self._connection(immediate=True) as conn:
+            released = conn.execute(SETTLE_RESERVATION_SQL, (
+                'released', to_epoch(now), reservation.reservation_id
+            )).rowcount
+            self._sync_ledger(conn, now)
+
+        return bool(released)
+
+    def record_savings(
+        self,
+        amount: float,
+        category: str,
+        description: Optional[str] = None,
+        metadata: Optional[Dict] = None
+    ):
+        """
+        Record spend that was avoided (doesn't count against budgets).
+
+        Args:
+            amount: Cost that would have been incurred
+            category: Savings source (e.g., 'response_cache')
+            description: Optional description
+            metadata: Additional metadata
+        """
+        import json
+
+        with self._connection() as conn:
             conn.execute("""
-                INSERT INTO cost_transactions
-                (timestamp, category, description, amount, tool_name, pattern_name, acquisition_type, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO cost_savings (timestamp, category, description, amount, metadata)
+                VALUES (?, ?, ?, ?, ?)
             """, (
-                timestamp.isoformat(),
+                datetime.now().isoformat(),
                 category,
                 description,
                 amount,
-                tool_name,
-                pattern_name,
-                acquisition_type,
                 json.dumps(metadata) if metadata else None
             ))
-            conn.commit()
 
-        # Update budget spend
-        self._update_budget_spend(amount)
+        logger.debug(f"Recorded savings: ${amount:.4f} ({category})")
 
-        # Check for alerts
-        self._check_budget_alerts()
+    def get_savings_by_category(self, days: int = 30) -> Dict[str, float]:
+        """
+        Get avoided spend by category.
 
-        logger.info(f"Recorded cost: ${amount:.2f} ({category})")
-        return True
+        Args:
+            days: Number of days to analyze
+
+        Returns:
+            Dict mapping category to total savings
+        """
+        since = datetime.now() - timedelta(days=days)
+
+        with self._connection() as conn:
+            cursor = conn.execute("""
+                SELECT category, SUM(amount) as total
+                FROM cost_savings
+                WHERE timestamp >= ?
+                GROUP BY category
+                ORDER BY total DESC
+            """, (since.isoformat(),))
+
+            return {row[0]: row[1] for row in cursor.fetchall()}
 
     def _check_budget_enforcement(self, amount: float) -> bool:
         """
@@ -364,45 +988,46 @@ class CostManagementSystem:
         Returns:
             True if allowed, False if blocked
         """
-        # Check all active budgets
+        # Check all active budgets (expired ones are reset by the caller)
         for period, budget in self.budgets.items():
-            # Reset expired budgets
-            if budget.is_expired():
-                self._reset_budget(period)
-                budget = self.budgets[period]
-
-            # Check if transaction would exceed budget
-            if budget.current_spend + amount > budget.limit:
+            # Check if transaction would exceed budget (including holds)
+            if budget.current_spend + budget.reserved + amount > budget.limit:
                 logger.warning(
                     f"{period.value} budget would be exceeded: "
-                    f"${budget.current_spend:.2f} + ${amount:.2f} > ${budget.limit:.2f}"
+                    f"${budget.current_spend:.2f} + ${budget.reserved:.2f} reserved + "
+                    f"${amount:.2f} > ${budget.limit:.2f}"
                 )
                 return False
 
         return True
 
-    def _update_budget_spend(self, amount: float):
-        """Update budget spend for all active periods"""
-        with sqlite3.connect(self.db_path) as conn:
-            for period, budget in self.budgets.items():
-                budget.current_spend += amount
+    def _reset_expired_budgets(self, now: Optional[datetime] = None):
+        """Start a new period for every budget that has expired"""
+        now = now or datetime.now()
+        if self._next_expiry is None or now <= self._next_expiry:
+            return
 
-                # Update database
-                conn.execute("""
-                    UPDATE budgets
-                    SET current_spend = ?, updated_at = ?
-                    WHERE period = ?
-                """, (budget.current_spend, datetime.now().isoformat(), period.value))
+        for period, budget in list(self.budgets.items()):
+            if budget.is_expired():
+                self._reset_budget(period)
 
-            conn.commit()
+    def _update_budget_spend(self, amount: float, timestamp: Optional[datetime] = None):
+        """Update budget spend for all active periods"""
+        updated_at = (timestamp or datetime.now()).isoformat()
+
+        with self._connection() as conn:
+            conn.execute(INCREMENT_BUDGET_SPEND_SQL, (amount, updated_at))
+            for budget in self.budgets.values():
+                budget.current_spend += amount
 
     def _reset_budget(self, period: BudgetPeriod):
         """Reset budget for new period"""
         old_budget = self.budgets[period]
-        new_budget = Budget(period=period, limit=old_budget.limit)
-        self.budgets[period] = new_budget
+        new_budget = Budget(period=period, limit=old_budget.limit, reserved=old_budget.reserved)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
+            self.budgets[period] = new_budget
+            self._update_next_expiry()
             conn.execute("""
                 UPDATE budgets
                 SET current_spend = ?, start_date = ?, end_date = ?, updated_at = ?
@@ -414,34 +1039,60 @@ class CostManagementSystem:
                 datetime.now().isoformat(),
                 period.value
             ))
-            conn.commit()
+
+            self._create_alert(
+                level=AlertLevel.INFO,
+                message=(
+                    f"{period.value.capitalize()} budget reset for new period "
+                    f"(previous spend ${old_budget.current_spend:.2f}/${old_budget.limit:.2f})"
+                ),
+                budget_period=period,
+                current_spend=old_budget.current_spend,
+                budget_limit=old_budget.limit
+            )
 
         logger.info(f"Reset {period.value} budget for new period")
 
     def _check_budget_alerts(self):
-        """Check if budget thresholds are crossed and create alerts"""
+        """Create alerts for budgets that crossed a threshold (or are due a repeat)"""
+        now = self._clock()
+
         for period, budget in self.budgets.items():
             utilization = budget.utilization_percent()
-
-            # 80% threshold - warning
-            if 80 <= utilization < 95:
-                self._create_alert(
-                    level=AlertLevel.WARNING,
-                    message=f"{period.value.capitalize()} budget at {utilization:.1f}% ({budget.current_spend:.2f}/${budget.limit:.2f})",
-                    budget_period=period,
-                    current_spend=budget.current_spend,
-                    budget_limit=budget.limit
+            level = next(
+                (lvl for threshold, lvl in ALERT_THRESHOLDS if utilization >= threshold), None
+            )
+            if level is None:
+                continue
+
+            # Same period: skip levels already alerted, unless the cooldown has passed
+            state = self._alert_state.get(period)
+            if state is not None and state.period_start == budget.start_date:
+                if level == AlertLevel.WARNING and state.level == AlertLevel.CRITICAL:
+                    continue
+                if level == state.level and now - state.alerted_at < self.alert_cooldown:
+                    continue
+
+            spend = f"({budget.current_spend:.2f}/${budget.limit:.2f})"
+            if level == AlertLevel.CRITICAL:
+                message = (
+                    f"{period.value.capitalize()} budget CRITICAL at {utilization:.1f}% {spend}"
                 )
+            else:
+                message = f"{period.value.capitalize()} budget at {utilization:.1f}% {spend}"
 
-            # 95% threshold - critical
-            elif utilization >= 95:
-                self._create_alert(
-                    level=AlertLevel.CRITICAL,
-                    message=f"{period.value.capitalize()} budget CRITICAL at {utilization:.1f}% ({budget.current_spend:.2f}/${budget.limit:.2f})",
-                    budget_period=period,
-                    current_spend=budget.current_spend,
-                    budget_limit=budget.limit
-                )
+            self._create_alert(
+                level=level,
+                message=message,
+                budget_period=period,
+                current_spend=budget.current_spend,
+                budget_limit=budget.limit
+            )
+            self._alert_state[period] = _AlertState(budget.start_date, level, now)
+            with self._connection() as conn:
+                conn.execute(UPDATE_ALERT_STATE_SQL, (
+                    level.value, budget.start_date.isoformat(), now, period.value
+                ))
 
     def _create_alert(
         self,
@@ -460,12 +1111,8 @@ class CostManagementSystem:
             budget_limit=budget_limit
         )
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO cost_alerts
-                (timestamp, level, message, budget_period, current_spend, budget_limit)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
+        with self._connection() as conn:
+            conn.execute(INSERT_ALERT_SQL, (
                 alert.timestamp.isoformat(),
                 alert.level.value,
                 alert.message,
@@ -473,32 +1120,36 @@ class CostManagementSystem:
                 alert.current_spend,
                 alert.budget_limit
             ))
-            conn.commit()
 
-        logger.log(
-            logging.WARNING if level == AlertLevel.WARNING else logging.CRITICAL,
-            f"COST ALERT [{level.value.upper()}]: {message}"
-        )
+        logger.log(ALERT_LOG_LEVELS[level], f"COST ALERT [{level.value.upper()}]: {message}")
 
     def get_budget_status(self) -> Dict[str, Dict]:
         """
         Get current budget status for all periods.
 
+        A read-only snapshot: it doesn't take the write lock. A budget whose
+        period has ended is reported as its new, empty period; the stored
+        budget is reset by the next write (record_cost, reserve, ...).
+
         Returns:
             Dict with budget status for each period
         """
         status = {}
 
-        for period, budget in self.budgets.items():
-            # Reset if expired
+        now = datetime.now()
+        with self._connection(snapshot=True) as conn:
+            self._sync_ledger(conn, now)
+            budgets = list(self.budgets.items())
+
+        for period, budget in budgets:
             if budget.is_expired():
-                self._reset_budget(period)
-                budget = self.budgets[period]
+                budget = Budget(period=period, limit=budget.limit, reserved=budget.reserved)
 
             status[period.value] = {
                 'limit': budget.limit,
                 'current_spend': budget.current_spend,
                 'remaining': budget.remaining(),
+                'reserved': budget.reserved,
                 'utilization_percent': budget.utilization_percent(),
                 'start_date': budget.start_date.isoformat(),
                 'end_date': budget.end_date.isoformat(),
@@ -511,41 +1162,83 @@ class CostManagementSystem:
         """
         Get spending breakdown by category.
 
+        Reads the hourly rollups, so the window starts at the top of the
+        hour `days` days ago.
+
         Args:
             days: Number of days to analyze
 
         Returns:
             Dict mapping category to total spend
         """
-        since = datetime.now() - timedelta(days=days)
+        since = bucket_start(datetime.now() - timedelta(days=days), HOUR)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute("""
                 SELECT category, SUM(amount) as total
-                FROM cost_transactions
-                WHERE timestamp >= ?
+                FROM cost_rollups
+                WHERE granularity = ? AND bucket_start >= ?
                 GROUP BY category
                 ORDER BY total DESC
-            """, (since.isoformat(),))
+            """, (HOUR, since))
 
             return {row[0]: row[1] for row in cursor.fetchall()}
 
+    def get_spending_series(
+        self,
+        days: int = 30,
+        granularity: str = 'day'
+    ) -> Dict[str, List[Tuple[datetime, float]]]:
+        """
+        Get spend per category over time, bucketed by hour or day.
+
+        Args:
+            days: Number of days to analyze
+            granularity: 'hour' or 'day'
+
+        Returns:
+            Dict mapping category to list of (bucket_start, amount) tuples in time order
+        """
+        since = bucket_start(datetime.now() - timedelta(days=days), granularity)
+
+        with self._connection() as conn:
+            cursor = conn.execute("""
+                SELECT category, bucket_start, amount
+                FROM cost_rollups
+                WHERE granularity = ? AND bucket_start >= ?
+                ORDER BY bucket_start
+            """, (granularity, since))
+
+            series: Dict[str, List[Tuple[datetime, float]]] = {}
+            for category, start, amount in cursor.fetchall():
+                series.setdefault(category, []).append((from_epoch(start), amount))
+
+            return series
+
     def forecast_monthly_spend(self) -> float:
         """
         Forecast monthly spend based on recent trends.
 
+        With at least a week of complete days of history this is the
+        forecaster's 30-day total (trend and weekday seasonality, cached
+        per day); before that, the last 7 days' run rate extrapolated to 30.
+
         Returns:
             Forecasted monthly spend
         """
+        forecast = self.forecaster.forecast(horizon_days=30)
+        if forecast.history_days >= 7:
+            return forecast.point
+
         # Get spend for last 7 days
-        since = datetime.now() - timedelta(days=7)
+        since = bucket_start(datetime.now() - timedelta(days=7), HOUR)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute("""
                 SELECT SUM(amount) as total
-                FROM cost_transactions
-                WHERE timestamp >= ?
-            """, (since.isoformat(),))
+                FROM cost_rollups
+                WHERE granularity = ? AND bucket_start >= ?
+            """, (HOUR, since))
 
             row = cursor.fetchone()
             weekly_spend = row[0] if row[0] else 0.0
@@ -556,10 +1249,16 @@ class CostManagementSystem:
 
         return monthly_forecast
 
-    def get_optimization_recommendations(self) -> List[CostOptimization]:
+    def get_optimization_recommendations(
+        self, budget_forecasts: Optional[Dict[str, BudgetForecast]] = None
+    ) -> List[CostOptimization]:
         """
         Generate cost optimization recommendations.
 
+        Args:
+            budget_forecasts: forecaster.forecast_budgets() result, if the
+                caller already has it
+
         Returns:
             List of CostOptimization recommendations
         """
@@ -612,6 +1311,30 @@ class CostManagementSystem:
             }
         ))
 
+        # Recommendation 4: Budgets projected to run out before their period ends.
+        # The overrun is spend the budget won't cover, not a saving.
+        if budget_forecasts is None:
+            budget_forecasts = self.forecaster.forecast_budgets()
+        for period, projection in budget_forecasts.items():
+            if projection.will_exceed:
+                overrun = projection.projected_spend - projection.limit
+                recommendations.append(CostOptimization(
+                    recommendation=(
+                        f"Reduce spend or raise the {period} budget: "
+                        f"projected to exceed it by ${overrun:.2f}"
+                    ),
+                    potential_savings=0.0,
+                    implementation_effort="low",
+                    priority=0.95,
+                    details={
+                        'projected_overrun': overrun,
+                        'projected_spend': projection.projected_spend,
+                        'limit': projection.limit,
+                        'interval': (projection.lower, projection.upper),
+                        'days_remaining': projection.days_remaining
+                    }
+                ))
+
         # Sort by priority
         recommendations.sort(key=lambda r: r.priority, reverse=True)
 
@@ -627,7 +1350,7 @@ class CostManagementSystem:
         Returns:
             List of recent CostAlert objects
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute("""
                 SELECT timestamp, level, message, budget_period, current_spend, budget_limit
                 FROM cost_alerts
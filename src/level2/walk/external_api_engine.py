@@ -12,11 +12,15 @@ from pathlib import Path
 
 from src.level2.walk.api_discovery_engine import APIDiscoveryEngine, APICandidate, AuthType
 from src.level2.crawl.tool_acquisition_engine import ToolAcquisitionEngine, GeneratedTool
+from src.level2.crawl.generation_cache import GenerationCache, generation_fingerprint
 from src.level2.crawl.build_vs_buy_analyzer import BuyOption, AcquisitionType
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump when the wrapper prompt changes so cached wrappers aren't replayed
+API_WRAPPER_PROMPT_VERSION = "1"
+
 
 @dataclass
 class ExternalAPIIntegrationResult:
@@ -48,15 +52,23 @@ class ExternalAPIEngine:
     This extends WALK phase from libraries to APIs.
     """
 
-    def __init__(self, gemini_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        gemini_api_key: Optional[str] = None,
+        generation_cache: Optional[GenerationCache] = None
+    ):
         """
         Initialize external API engine.
 
         Args:
             gemini_api_key: Google API key for Gemini 2.5 Pro
+            generation_cache: Replays wrappers generated for the same request
         """
         self.search_engine = APIDiscoveryEngine()
-        self.tool_engine = ToolAcquisitionEngine(gemini_api_key=gemini_api_key)
+        self.tool_engine = ToolAcquisitionEngine(
+            gemini_api_key=gemini_api_key,
+            generation_cache=generation_cache
+        )
 
     def integrate_api(
         self,
@@ -105,7 +117,7 @@ class ExternalAPIEngine:
 
             # Step 3: Generate enhanced wrapper with auth, rate limiting, retry logic
             logger.info("  [2/3] Generating API wrapper with Gemini 2.5 Pro...")
-            tool = self._generate_api_wrapper(pattern, best_api, buy_option)
+            tool = self._generate_api_wrapper(pattern, best_api, buy_option, missing_capabilities)
 
             logger.info(f"  ✓ Wrapper generated: {tool.name}")
             logger.info(f"    Code length: {len(tool.code)} characters")
@@ -191,7 +203,8 @@ class ExternalAPIEngine:
         self,
         pattern: Dict,
         api: APICandidate,
-        buy_option: BuyOption
+        buy_option: BuyOption,
+        missing_capabilities: Optional[List[str]] = None
     ) -> GeneratedTool:
         """
         Generate enhanced API wrapper with authentication, rate limiting, and retry logic.
@@ -200,43 +213,40 @@ class ExternalAPIEngine:
             pattern: Pattern dictionary
             api: API candidate
             buy_option: BuyOption for metadata
+            missing_capabilities: Capabilities the wrapper should add
 
         Returns:
             GeneratedTool with wrapper code
         """
         class_name = self.tool_engine._generate_class_name(pattern['name'])
 
-        # Build enhanced prompt for API wrapper
-        wrapper_prompt = self._build_api_wrapper_prompt(
-            class_name=class_name,
-            pattern=pattern,
-            api=api
-        )
-
-        # Generate using Gemini
-        from google.genai import types
-        response = self.tool_engine.client.models.generate_content(
-            model=self.tool_engine.model,
-            contents=wrapper_prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.3,
-                max_output_tokens=10000,  # API wrappers can be longer
+        def generate():
+            # Build enhanced prompt for API wrapper
+            wrapper_prompt = self._build_api_wrapper_prompt(
+                class_name=class_name,
+                pattern=pattern,
+                api=api
             )
-        )
 
-        wrapper_code = response.text
+            # Generate using Gemini
+            from google.genai import types
+            response = self.tool_engine.client.models.generate_content(
+                model=self.tool_engine.model,
+                contents=wrapper_prompt,
+                config=types.GenerateContentConfig(
+                    temperature=0.3,
+                    max_output_tokens=10000,  # API wrappers can be longer
+                )
+            )
 
-        # Extract code from markdown
-        if "```python" in wrapper_code:
-            wrapper_code = wrapper_code.split("```python")[1].split("```")[0].strip()
-        elif "```" in wrapper_code:
-            wrapper_code = wrapper_code.split("```")[1].split("```")[0].strip()
+            code = self.tool_engine._extract_code(response.text)
+            return code, self.tool_engine._syntax_error(code, "wrapper"), {}
 
-        # Validate syntax
-        try:
-            compile(wrapper_code, '<string>', 'exec')
-        except SyntaxError as e:
-            raise ValueError(f"Generated wrapper has syntax errors: {e}")
+        fingerprint = generation_fingerprint(
+            pattern['name'], missing_capabilities or [], 'api',
+            source=api.name, template_version=API_WRAPPER_PROMPT_VERSION
+        )
+        wrapper_code, generation = self.tool_engine.generate_with_cache(fingerprint, generate)
 
         return GeneratedTool(
             name=class_name,
@@ -248,7 +258,8 @@ class ExternalAPIEngine:
                 'base_url': api.base_url,
                 'auth_type': api.auth_type.value,
                 'pricing': api.pricing,
-                'maturity_score': api.maturity_score
+                'maturity_score': api.maturity_score,
+                **generation
             }
         )
 
@@ -12,6 +12,7 @@ from dataclasses import dataclass
 from src.level2.walk.pypi_search_engine import PyPISearchEngine, LibraryCandidate
 from src.level2.walk.library_installer import LibraryInstaller, InstallationResult
 from src.level2.crawl.tool_acquisition_engine import ToolAcquisitionEngine, GeneratedTool
+from src.level2.crawl.generation_cache import GenerationCache
 from src.level2.crawl.build_vs_buy_analyzer import BuyOption, AcquisitionType
 
 logging.basicConfig(level=logging.INFO)
@@ -51,16 +52,24 @@ class ExternalLibraryEngine:
     This is the WALK phase extension of the CRAWL capabilities.
     """
 
-    def __init__(self, gemini_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        gemini_api_key: Optional[str] = None,
+        generation_cache: Optional[GenerationCache] = None
+    ):
         """
         Initialize external library engine.
 
         Args:
             gemini_api_key: Google API key for Gemini 2.5 Pro
+            generation_cache: Replays wrappers generated for the same request
         """
         self.search_engine = PyPISearchEngine()
         self.installer = LibraryInstaller()
-        self.tool_engine = ToolAcquisitionEngine(gemini_api_key=gemini_api_key)
+        self.tool_engine = ToolAcquisitionEngine(
+            gemini_api_key=gemini_api_key,
+            generation_cache=generation_cache
+        )
 
     def integrate_library(
         self,
@@ -153,7 +162,7 @@ class ExternalLibraryEngine:
 
             # Step 4: Generate wrapper code
             logger.info("  [3/4] Generating wrapper code with Gemini 2.5 Pro...")
-            tool = self.tool_engine._acquire_library(pattern, buy_option)
+            tool = self.tool_engine._acquire_library(pattern, buy_option, missing_capabilities)
 
             logger.info(f"  ✓ Wrapper generated: {tool.name}")
             logger.info(f"    Code length: {len(tool.code)} characters")
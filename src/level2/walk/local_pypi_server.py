@@ -0,0 +1,140 @@
+"""
+Local PyPI Server - Offline stand-in for PyPI's JSON API
+
+Serves GET /pypi/{package}/json from an in-memory dict on a background
+thread, with optional per-request latency, so PyPISearchEngine can be tested
+and benchmarked without network access. It counts requests and the peak
+number of concurrent connections.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+JSON_PATH = re.compile(r"^/pypi/([^/]+)/json/?$")
+
+
+def make_metadata(name: str, version: str = "1.0.0", summary: str = "", releases: int = 1) -> Dict:
+    """Minimal PyPI JSON API document for a package"""
+    upload_time = "2024-01-01T00:00:00Z"
+    return {
+        'info': {
+            'name': name,
+            'version': version,
+            'summary': summary,
+            'author': 'Local',
+            'license': 'MIT',
+            'home_page': f"https://example.com/{name}",
+            'project_urls': {'Source': f"https://example.com/{name}/src"},
+            'requires_python': '>=3.8',
+            'requires_dist': [],
+            'description': summary,
+        },
+        'releases': {
+            f"0.{i}.0" if i < releases - 1 else version: [{'upload_time_iso_8601': upload_time}]
+            for i in range(releases)
+        }
+    }
+
+
+class LocalPyPIServer:
+    """
+    Threaded HTTP server answering PyPI JSON API requests.
+
+    Example:
+        >>> with LocalPyPIServer({'requests': make_metadata('requests')}, latency=0.05) as server:
+        ...     engine = PyPISearchEngine(base_url=server.url)
+    """
+
+    def __init__(self, packages: Optional[Dict[str, Dict]] = None, latency: float = 0.0):
+        """
+        Args:
+            packages: Package name (lowercase) to JSON metadata
+            latency: Seconds to wait before answering each request
+        """
+        self.packages = dict(packages or {})
+        self.latency = latency
+
+        self._lock = threading.Lock()
+        self.requests: List[str] = []
+        self.active = 0
+        self.peak_active = 0
+        self.connections = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so pooled connections are reused
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append(self.path)
+                    server.active += 1
+                    server.peak_active = max(server.peak_active, server.active)
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    match = JSON_PATH.match(self.path)
+                    metadata = server.packages.get(match.group(1).lower()) if match else None
+                    if metadata is None:
+                        self._send(404, {'message': 'Not Found'})
+                    else:
+                        self._send(200, metadata)
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+            def _send(self, status: int, payload: Dict):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass as PyPISearchEngine(base_url=...)"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalPyPIServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def reset_stats(self):
+        """Clear request and connection counters"""
+        with self._lock:
+            self.requests = []
+            self.peak_active = self.active
+            self.connections = 0
+
+    def __enter__(self) -> "LocalPyPIServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -3,11 +3,20 @@ PyPI Search Engine - Discovers and ranks Python libraries from PyPI
 
 Enables the system to search for external libraries that can fulfill
 capability gaps instead of generating code from scratch.
+
+Package metadata is fetched concurrently: name variants are probed on a
+small thread pool over one pooled HTTP session, whose per-host pool is
+bounded (requests beyond it wait for a free connection rather than opening
+new ones). Probing stops as soon as enough hits are known, and probes that
+haven't started are cancelled.
 """
 
 import requests
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from typing import Iterable, List, Dict, Optional
 from datetime import datetime
 import logging
 
@@ -62,15 +71,76 @@ class PyPISearchEngine:
     then ranks them by relevance, maturity, and popularity.
     """
 
+    PYPI_BASE_URL = "https://pypi.org"
     PYPI_SEARCH_URL = "https://pypi.org/search/"
     PYPI_JSON_URL = "https://pypi.org/pypi/{package}/json"
 
-    def __init__(self):
-        """Initialize PyPI search engine."""
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_workers: int = 6,
+        max_connections: int = 6,
+        timeout: float = 5.0,
+        probe_hits: Optional[int] = None
+    ):
+        """
+        Initialize PyPI search engine.
+
+        Args:
+            base_url: PyPI root URL (default: https://pypi.org; point it at a
+                mirror or a local stand-in server)
+            max_workers: Concurrent metadata requests
+            max_connections: Pooled connections per host (requests beyond it
+                wait for a free connection)
+            timeout: Per-request timeout in seconds
+            probe_hits: Optional cap on the packages found by name-variant
+                probing, below the search's max_results (default: none, so
+                every variant is ranked up to max_results)
+        """
+        self.base_url = (base_url or self.PYPI_BASE_URL).rstrip('/')
+        self.json_url = self.base_url + "/pypi/{package}/json"
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.probe_hits = probe_hits
+
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'self-evolving-agent/1.0 (capability-evolution)'
         })
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max(1, max_connections),
+            pool_block=True
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Shared pool for metadata requests (created on first use)"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, self.max_workers),
+                    thread_name_prefix="pypi"
+                )
+            return self._executor
+
+    def close(self):
+        """Shut down the request pool and close pooled connections"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def search_libraries(
         self,
@@ -94,8 +164,8 @@ class PyPISearchEngine:
 
         logger.info(f"Searching PyPI for: {search_query}")
 
-        # Search PyPI
-        raw_results = self._search_pypi(search_query, max_results * 2)
+        # Search PyPI (metadata for every hit is fetched here, concurrently)
+        raw_results = self._search_pypi(search_query, limit=max_results)
 
         if not raw_results:
             logger.warning(f"No PyPI results found for query: {search_query}")
@@ -103,7 +173,7 @@ class PyPISearchEngine:
 
         # Enrich with detailed metadata
         candidates = []
-        for result in raw_results[:max_results * 2]:
+        for result in raw_results:
             try:
                 candidate = self._enrich_package_data(result)
                 if candidate:
@@ -150,60 +220,101 @@ class PyPISearchEngine:
 
     def _search_pypi(self, query: str, limit: int = 20) -> List[Dict]:
         """
-        Search PyPI using their search API.
+        Search PyPI by probing likely package names for the query.
+
+        PyPI's JSON API has no search endpoint, so the exact name and common
+        variants are looked up directly, concurrently. Probing stops once
+        `limit` packages are found (capped by probe_hits if set); results
+        follow priority order, so the exact-name probe is always resolved
+        first.
 
         Args:
             query: Search query
             limit: Max results to fetch
 
         Returns:
-            List of raw package search results
+            List of raw package search results ('name', 'metadata'), exact
+            match first
         """
         try:
-            # PyPI search endpoint (using their RSS feed for simplicity)
-            # Alternative: could scrape search results or use PyPI XML-RPC (deprecated)
-            # For production, consider using PyPI's BigQuery dataset
-
-            # Using PyPI JSON API with search approximation
-            # We'll search via package names and descriptions heuristically
-
-            # For now, use a simple approach: try common package patterns
-            # In production, would integrate with PyPI Warehouse API or BigQuery
-
-            # Simplified approach: construct likely package names
-            results = []
-
-            # Try exact match first
-            package_name = query.replace(' ', '-').lower()
-            metadata = self._get_package_metadata(package_name)
-            if metadata:
-                results.append({'name': package_name, 'metadata': metadata})
-
-            # Try variations
-            variations = [
-                query.replace(' ', '-'),
-                query.replace(' ', '_'),
-                query.replace(' ', ''),
-                f"python-{query.replace(' ', '-')}",
-                f"{query.replace(' ', '-')}-python",
-            ]
-
-            for variant in variations[:5]:
-                variant = variant.lower()
-                if variant != package_name:  # Skip duplicates
-                    metadata = self._get_package_metadata(variant)
-                    if metadata:
-                        results.append({'name': variant, 'metadata': metadata})
-
-            # Note: In production, would use proper PyPI search API
-            # or integrate with libraries like pypi-simple or warehouse
-
-            return results
+            if self.probe_hits is not None:
+                limit = min(limit, self.probe_hits)
+            metadata = self.fetch_metadata(self._name_variants(query), limit=limit)
+            return [{'name': name, 'metadata': data} for name, data in metadata.items()]
 
         except Exception as e:
             logger.error(f"PyPI search failed: {e}")
             return []
 
+    @staticmethod
+    def _name_variants(query: str) -> List[str]:
+        """Candidate package names for a query, most likely first"""
+        words = query.lower().split()
+        variants = [
+            '-'.join(words),
+            '_'.join(words),
+            ''.join(words),
+            f"python-{'-'.join(words)}",
+            f"{'-'.join(words)}-python",
+        ]
+        return list(dict.fromkeys(variants))
+
+    def fetch_metadata(
+        self, package_names: Iterable[str], limit: Optional[int] = None
+    ) -> Dict[str, Dict]:
+        """
+        Fetch metadata for several packages concurrently.
+
+        With a limit, fetching stops once the first `limit` packages found
+        (in the given order) are known: probes that haven't started are
+        cancelled and in-flight ones are ignored. Results therefore don't
+        depend on response timing.
+
+        Args:
+            package_names: Names to look up, in priority order
+            limit: Stop after this many packages are found (None for all)
+
+        Returns:
+            Dict mapping package name to metadata, in priority order
+            (missing packages are omitted)
+        """
+        names = list(dict.fromkeys(package_names))
+        if not names or limit == 0:
+            return {}
+
+        executor = self._get_executor()
+        futures = {
+            executor.submit(self._get_package_metadata, name): i for i, name in enumerate(names)
+        }
+        results: List[Optional[Dict]] = [None] * len(names)
+        resolved = [False] * len(names)
+        prefix = 0  # names[:prefix] are all resolved
+        found = 0   # hits within names[:prefix]
+
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = futures[future]
+                    results[index] = future.result()
+                    resolved[index] = True
+
+                while prefix < len(names) and resolved[prefix]:
+                    found += results[prefix] is not None
+                    prefix += 1
+
+                if limit is not None and found >= limit:
+                    break
+        finally:
+            for future in pending:
+                future.cancel()
+
+        hits = {name: data for name, data in zip(names[:prefix], results) if data is not None}
+        if limit is not None:
+            hits = dict(list(hits.items())[:limit])
+        return hits
+
     def _get_package_metadata(self, package_name: str) -> Optional[Dict]:
         """
         Get package metadata from PyPI JSON API.
@@ -215,8 +326,8 @@ class PyPISearchEngine:
             Package metadata dict or None if not found
         """
         try:
-            url = self.PYPI_JSON_URL.format(package=package_name)
-            response = self.session.get(url, timeout=5)
+            url = self.json_url.format(package=package_name)
+            response = self.session.get(url, timeout=self.timeout)
 
             if response.status_code == 200:
                 return response.json()
@@ -0,0 +1,414 @@
+"""
+Spend Forecaster - Time-series forecasts over daily cost rollups
+
+Forecasts daily spend per category (and in total) from the cost_rollups
+daily buckets, using exponential smoothing fitted in NumPy:
+
+- Holt-Winters (additive trend and weekly seasonality) once there are two
+  full seasons of history
+- Holt (level and trend) with at least three days of history
+- EWMA (level only) below that
+
+Smoothing parameters are picked by grid search on one-step-ahead squared
+error, with the recursion vectorized across the whole grid. Prediction
+intervals come from the one-step residual spread, widened with the
+horizon as for simple exponential smoothing. They are approximate and
+assume independent daily errors.
+
+Only complete days (up to yesterday) are used, so a forecast can't change
+during the day. Results are cached until the date changes, which makes
+repeated calls from dashboards free.
+"""
+
+import math
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Category key for all categories combined
+TOTAL = "total"
+
+# Smoothing parameter grids (level, trend, season)
+ALPHAS = np.array([0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+BETAS = np.array([0.0, 0.05, 0.1, 0.2])
+GAMMAS = np.array([0.05, 0.1, 0.3, 0.5])
+
+
+@dataclass
+class SpendForecast:
+    """
+    Forecast of spend over the coming days.
+
+    Attributes:
+        category: Cost category, or 'total'
+        horizon_days: Days forecast (day 0 is today)
+        point: Forecast spend over the horizon
+        lower: Lower bound of the prediction interval (never below 0)
+        upper: Upper bound of the prediction interval
+        daily: Point forecast per day
+        daily_variance: Forecast error variance per day
+        method: 'holt_winters', 'holt', 'mean' (under 3 days of history) or
+            'none' (no history)
+        history_days: Complete days of history used (from the first spend)
+        confidence: Prediction interval coverage
+    """
+    category: str
+    horizon_days: int
+    point: float
+    lower: float
+    upper: float
+    daily: List[float] = field(default_factory=list)
+    daily_variance: List[float] = field(default_factory=list)
+    method: str = 'none'
+    history_days: int = 0
+    confidence: float = 0.9
+
+    def window(self, start: int, days: int) -> Tuple[float, float, float]:
+        """
+        Point forecast and interval for `days` days from day `start`.
+
+        Returns:
+            Tuple of (point, lower, upper)
+        """
+        point = float(sum(self.daily[start:start + days]))
+        spread = _z(self.confidence) * math.sqrt(sum(self.daily_variance[start:start + days]))
+        return point, max(0.0, point - spread), point + spread
+
+
+@dataclass
+class BudgetForecast:
+    """
+    Projected spend at the end of a budget period.
+
+    Attributes:
+        period: Budget period ('daily', 'weekly', 'monthly')
+        limit: Budget limit
+        current_spend: Spend so far in the period
+        projected_spend: Current spend plus forecast spend until the period ends
+        lower: Lower bound of the projection
+        upper: Upper bound of the projection
+        days_remaining: Whole days left after today
+        will_exceed: Whether the projection exceeds the limit
+    """
+    period: str
+    limit: float
+    current_spend: float
+    projected_spend: float
+    lower: float
+    upper: float
+    days_remaining: int
+    will_exceed: bool
+
+
+def _z(confidence: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def _fit(
+    y: np.ndarray,
+    season_length: int,
+    alphas: np.ndarray,
+    betas: np.ndarray,
+    gammas: np.ndarray
+):
+    """
+    Fit additive exponential smoothing for every parameter combination at once.
+
+    Args:
+        y: Daily values (at least 2)
+        season_length: Season length in days (0 for no seasonality)
+        alphas, betas, gammas: Parameter grids (betas=[0] with no trend
+            estimate gives EWMA)
+
+    Returns:
+        Tuple of (alpha, level, trend, season array, one-step residuals) for
+        the combination with the lowest squared error
+    """
+    m = season_length
+    a, b, g = (x.ravel() for x in np.meshgrid(alphas, betas, gammas, indexing='ij'))
+    combos = a.size
+
+    if m:
+        level0 = y[:m].mean()
+        trend0 = (y[m:2 * m].mean() - level0) / m
+        season = np.tile(y[:m] - level0, (combos, 1))
+        start = m
+    else:
+        level0 = y[0]
+        trend0 = (y[1] - y[0]) if betas.any() else 0.0
+        season = None
+        start = 1
+
+    level = np.full(combos, level0, dtype=float)
+    trend = np.full(combos, trend0, dtype=float)
+    errors = np.zeros((combos, len(y) - start))
+
+    for t in range(start, len(y)):
+        s = season[:, t % m] if m else 0.0
+        errors[:, t - start] = y[t] - (level + trend + s)
+        new_level = a * (y[t] - s) + (1 - a) * (level + trend)
+        trend = b * (new_level - level) + (1 - b) * trend
+        if m:
+            season[:, t % m] = g * (y[t] - new_level) + (1 - g) * s
+        level = new_level
+
+    best = int(np.argmin((errors ** 2).sum(axis=1)))
+    return (
+        a[best],
+        level[best],
+        trend[best],
+        season[best] if m else None,
+        errors[best]
+    )
+
+
+def forecast_series(
+    y: np.ndarray,
+    horizon_days: int,
+    season_length: int = 7,
+    confidence: float = 0.9,
+    category: str = TOTAL
+) -> SpendForecast:
+    """
+    Forecast a daily series.
+
+    Args:
+        y: Daily spend for complete days, oldest first, ending yesterday
+        horizon_days: Days to forecast, starting today
+        season_length: Seasonality in days (weekly by default)
+        confidence: Prediction interval coverage
+        category: Category label for the result
+
+    Returns:
+        SpendForecast
+    """
+    y = np.asarray(y, dtype=float)
+    nonzero = np.flatnonzero(y)
+    if not nonzero.size:
+        return SpendForecast(
+            category=category, horizon_days=horizon_days, point=0.0, lower=0.0, upper=0.0,
+            daily=[0.0] * horizon_days, daily_variance=[0.0] * horizon_days, confidence=confidence
+        )
+    y = y[nonzero[0]:]  # History starts at the first spend
+    n = len(y)
+
+    if n < 3:
+        # Too short to choose a smoothing factor: with two days every alpha
+        # has the same one-step error, so the grid search would always pick
+        # the smallest and stick to the first day
+        method, alpha, level, trend, season = 'mean', 0.0, y.mean(), 0.0, None
+        residuals = y - level
+    else:
+        if season_length and n >= 2 * season_length:
+            method, m, gammas = 'holt_winters', season_length, GAMMAS
+        else:
+            method, m, gammas = 'holt', 0, np.zeros(1)
+        alpha, level, trend, season, residuals = _fit(y, m, ALPHAS, BETAS, gammas)
+
+    steps = np.arange(1, horizon_days + 1)
+    daily = level + steps * trend
+    if season is not None:
+        daily = daily + season[(n - 1 + steps) % len(season)]
+    daily = np.clip(daily, 0.0, None)
+
+    sigma2 = float((residuals ** 2).sum() / max(1, residuals.size - 1))
+    daily_variance = sigma2 * (1 + (steps - 1) * alpha ** 2)
+
+    result = SpendForecast(
+        category=category,
+        horizon_days=horizon_days,
+        point=0.0,
+        lower=0.0,
+        upper=0.0,
+        daily=daily.tolist(),
+        daily_variance=daily_variance.tolist(),
+        method=method,
+        history_days=n,
+        confidence=confidence
+    )
+    result.point, result.lower, result.upper = result.window(0, horizon_days)
+    return result
+
+
+class SpendForecaster:
+    """
+    Daily-cached spend forecasts for a CostManagementSystem.
+
+    Example:
+        >>> forecaster = SpendForecaster(cost_system)
+        >>> forecaster.forecast(horizon_days=30).point
+        >>> forecaster.forecast_budgets()['monthly'].will_exceed
+    """
+
+    def __init__(
+        self,
+        cost_system: Any,
+        history_days: int = 56,
+        season_length: int = 7,
+        confidence: float = 0.9,
+        today: Callable[[], date] = date.today
+    ):
+        """
+        Args:
+            cost_system: CostManagementSystem (get_spending_series, get_budget_status)
+            history_days: Complete days of history to fit on
+            season_length: Seasonality in days (0 disables)
+            confidence: Prediction interval coverage
+            today: Current date source (injectable for tests)
+        """
+        self.cost_system = cost_system
+        self.history_days = history_days
+        self.season_length = season_length
+        self.confidence = confidence
+        self._today = today
+
+        self._lock = threading.Lock()
+        self._cache_day: Optional[date] = None
+        self._cache: Dict[Tuple, Any] = {}
+
+    def _cached(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for today, computing it on first use"""
+        today = self._today()
+        with self._lock:
+            if self._cache_day != today:
+                self._cache_day = today
+                self._cache = {}
+            if key in self._cache:
+                return self._cache[key]
+
+        value = compute()
+        with self._lock:
+            if self._cache_day == today:
+                self._cache[key] = value
+        return value
+
+    def clear(self):
+        """Drop cached forecasts (e.g. after backfilling history)"""
+        with self._lock:
+            self._cache = {}
+
+    def _history(self) -> Dict[str, np.ndarray]:
+        """Daily spend per category (and total) for the complete days in the window"""
+        def load():
+            today = self._today()
+            first_day = today - timedelta(days=self.history_days)
+            series = self.cost_system.get_spending_series(
+                days=self.history_days + 1, granularity='day'
+            )
+
+            history = {}
+            for category, points in series.items():
+                values = np.zeros(self.history_days)
+                for start, amount in points:
+                    index = (start.date() - first_day).days
+                    if 0 <= index < self.history_days:
+                        values[index] += amount
+                history[category] = values
+
+            history[TOTAL] = sum(history.values(), np.zeros(self.history_days))
+            return history
+
+        return self._cached(('history',), load)
+
+    def forecast(self, horizon_days: int = 30, category: Optional[str] = None) -> SpendForecast:
+        """
+        Forecast spend for the next horizon_days days (starting today).
+
+        Args:
+            horizon_days: Days to forecast
+            category: Cost category (default: all categories combined)
+
+        Returns:
+            SpendForecast (zero if the category has no history)
+        """
+        category = category or TOTAL
+
+        def compute():
+            y = self._history().get(category, np.zeros(self.history_days))
+            return forecast_series(y, horizon_days, self.season_length, self.confidence, category)
+
+        return self._cached(('forecast', category, horizon_days), compute)
+
+    def forecast_by_category(self, horizon_days: int = 30) -> Dict[str, SpendForecast]:
+        """
+        Forecast every category with history.
+
+        Returns:
+            Dict mapping category to SpendForecast (excluding the total)
+        """
+        return {
+            category: self.forecast(horizon_days, category)
+            for category in self._history()
+            if category != TOTAL
+        }
+
+    def forecast_budgets(
+        self, status: Optional[Dict[str, Dict]] = None
+    ) -> Dict[str, BudgetForecast]:
+        """
+        Project each budget's spend at the end of its period.
+
+        Combines the live spend so far with the cached daily forecast: the
+        rest of today (forecast minus today's spend, if positive) plus each
+        remaining day of the period. The rest of today is a point estimate,
+        added to the lower and upper bounds as well as the projection. Only
+        the budget status and today's spend are read per call; the
+        per-period forecast windows are cached for the day.
+
+        Args:
+            status: get_budget_status() result, if the caller already has it
+
+        Returns:
+            Dict mapping budget period to BudgetForecast
+        """
+        today = self._today()
+        if status is None:
+            status = self.cost_system.get_budget_status()
+        if not status:
+            return {}
+
+        days_left = tuple(sorted(
+            (period, max(0, (datetime.fromisoformat(info['end_date']).date() - today).days))
+            for period, info in status.items()
+        ))
+
+        def daily_part():
+            forecast = self.forecast(horizon_days=max(days for _, days in days_left) + 1)
+            windows = {period: forecast.window(1, days) for period, days in days_left}
+            return forecast.daily[0], windows
+
+        forecast_today, windows = self._cached(('budget_windows', days_left), daily_part)
+
+        rest_of_today = 0.0
+        if forecast_today > 0:
+            today_series = self.cost_system.get_spending_series(days=1, granularity='day')
+            spent_today = sum(
+                amount
+                for points in today_series.values()
+                for start, amount in points
+                if start.date() == today
+            )
+            rest_of_today = max(0.0, forecast_today - spent_today)
+
+        projections = {}
+        remaining_days = dict(days_left)
+        for period, info in status.items():
+            remaining = remaining_days[period]
+            point, lower, upper = windows[period]
+            projected = info['current_spend'] + rest_of_today + point
+            projections[period] = BudgetForecast(
+                period=period,
+                limit=info['limit'],
+                current_spend=info['current_spend'],
+                projected_spend=projected,
+                lower=info['current_spend'] + rest_of_today + lower,
+                upper=info['current_spend'] + rest_of_today + upper,
+                days_remaining=remaining,
+                will_exceed=projected > info['limit']
+            )
+
+        return projections
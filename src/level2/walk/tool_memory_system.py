@@ -7,20 +7,118 @@ Implements a learning system that:
 3. Learns which tools work best for which patterns
 4. Recommends tool retirement/replacement based on performance
 5. Provides insights for future acquisition decisions
+
+Latency percentiles (p50/p95/p99) come from DDSketch quantile sketches kept
+per (tool, pattern), both all-time and per day, so tail latency is reported
+without sorting the usage history.
+
+Usage times are stored as integer epoch seconds (ts) and rolled up into
+hourly and daily buckets per (tool, pattern), so trend queries read the
+rollups instead of the raw log.
 """
 
+import atexit
 import sqlite3
 import json
 import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from collections import defaultdict
 
+from src.common.quantile_sketch import DDSketch
+from src.common.time_buckets import (
+    GRANULARITIES,
+    bucket_start,
+    from_epoch,
+    parse_iso_epoch,
+    to_epoch
+)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Statements on the hot path are module constants so the connection's
+# statement cache reuses the prepared statement on every call
+INSERT_USAGE_SQL = """
+    INSERT INTO tool_usage
+    (tool_name, pattern_name, query, success, latency_ms, cost, score, error, timestamp, ts)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Folds a batch's per-(tool, pattern) totals into the materialized aggregates
+UPSERT_AGGREGATE_SQL = """
+    INSERT INTO tool_aggregates
+    (tool_name, pattern_name, uses, successes, latency_sum, cost_sum, score_sum, last_used)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(tool_name, pattern_name) DO UPDATE SET
+        uses = uses + excluded.uses,
+        successes = successes + excluded.successes,
+        latency_sum = latency_sum + excluded.latency_sum,
+        cost_sum = cost_sum + excluded.cost_sum,
+        score_sum = score_sum + excluded.score_sum,
+        last_used = MAX(last_used, excluded.last_used)
+"""
+
+# Folds a batch's per-(granularity, bucket, tool, pattern) totals into the rollups
+UPSERT_ROLLUP_SQL = """
+    INSERT INTO tool_usage_rollups
+    (granularity, bucket_start, tool_name, pattern_name, uses, successes, latency_sum, cost_sum)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(granularity, bucket_start, tool_name, pattern_name) DO UPDATE SET
+        uses = uses + excluded.uses,
+        successes = successes + excluded.successes,
+        latency_sum = latency_sum + excluded.latency_sum,
+        cost_sum = cost_sum + excluded.cost_sum
+"""
+
+# Columns read back into ToolPerformanceMetrics (with the all-time latency sketch)
+AGGREGATE_COLUMNS = """
+    a.tool_name, a.pattern_name, a.uses,
+    CAST(a.successes AS REAL) / a.uses,
+    a.latency_sum / a.uses, a.cost_sum, a.score_sum / a.uses, a.last_used,
+    s.sketch
+"""
+
+AGGREGATE_SOURCE = """
+    tool_aggregates a
+    LEFT JOIN tool_latency_sketches s
+    ON s.tool_name = a.tool_name AND s.pattern_name = a.pattern_name AND s.bucket = ''
+"""
+
+# Latency sketch bucket holding all history (other buckets are days, YYYY-MM-DD)
+ALL_TIME_BUCKET = ''
+
+# Write-behind queue control items
+_STOP = object()
+
+
+class _FlushRequest:
+    """Queued behind pending records; set once they are written"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+# Open systems, reset in a forked child by ToolMemorySystem._after_fork
+_live_systems: "weakref.WeakSet[ToolMemorySystem]" = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    for system in list(_live_systems):
+        system._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
 
 @dataclass
 class ToolUsageRecord:
@@ -68,6 +166,9 @@ class ToolPerformanceMetrics:
         avg_score: Average quality score
         last_used: Most recent usage timestamp
         recommendation: 'keep', 'monitor', or 'retire'
+        p50_latency_ms: Median execution time
+        p95_latency_ms: 95th percentile execution time
+        p99_latency_ms: 99th percentile execution time
     """
     tool_name: str
     pattern_name: str
@@ -78,31 +179,177 @@ class ToolPerformanceMetrics:
     avg_score: float
     last_used: datetime
     recommendation: str = 'keep'
+    p50_latency_ms: float = 0.0
+    p95_latency_ms: float = 0.0
+    p99_latency_ms: float = 0.0
 
 
 class ToolMemorySystem:
     """
     Persistent memory system for tool usage tracking and learning.
 
-    Uses SQLite to store usage history and provide analytics.
+    Uses SQLite to store usage history and provide analytics. One connection
+    is kept open (WAL journaling, synchronous=NORMAL) and shared by all
+    threads under a lock, so recording a usage doesn't pay connection setup
+    or an fsync per row. The connection is reopened if db_path changes.
+
+    Instances survive fork(): the child gets fresh locks, its own
+    connection and, with write-behind, its own writer thread. Records the
+    parent had queued stay with the parent. A child that leaves with
+    os._exit() (as multiprocessing workers do) must call close() first.
+
+    With write_behind=True, record_usage only enqueues the record; a
+    background thread writes batches with executemany once batch_size
+    records are queued or flush_interval seconds pass. The queue is bounded
+    (record_usage blocks while it is full), reads flush pending records
+    first, and close() or interpreter exit flushes everything.
+
+    Latency sketches are merged in the same transaction as the aggregates:
+    once per record without write-behind, once per batch with it.
     """
 
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        synchronous: str = "NORMAL",
+        write_behind: bool = False,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10_000,
+        latency_slo_ms: float = 10_000.0
+    ):
         """
         Initialize tool memory system.
 
         Args:
             db_path: Path to SQLite database (default: data/tool_memory.db)
+            synchronous: SQLite synchronous level (NORMAL is durable across
+                application crashes in WAL mode; FULL also across power loss)
+            write_behind: Buffer usage records and write them in a background thread
+            batch_size: Records per write-behind batch
+            flush_interval: Max seconds a buffered record waits to be written
+            max_queue_size: Buffered records before record_usage blocks
+            latency_slo_ms: p99 latency above which a tool is flagged for monitoring
         """
         if db_path is None:
             project_root = self._find_project_root()
             db_path = project_root / "data" / "tool_memory.db"
 
-        self.db_path = db_path
+        self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.synchronous = synchronous.upper()
+        self.latency_slo_ms = latency_slo_ms
+
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_owner: Optional[Tuple[int, Path]] = None
 
         self._init_database()
 
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped_records = 0
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+
+        if write_behind:
+            self._queue = queue.Queue(maxsize=max_queue_size)
+            self._start_writer()
+            atexit.register(self.close)
+        _live_systems.add(self)
+
+    def _start_writer(self):
+        self._writer = threading.Thread(
+            target=self._write_loop, name="tool-memory-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _after_fork(self):
+        """
+        Reset state inherited by a forked child.
+
+        Parent threads holding a lock at fork time don't exist in the child,
+        and neither does the writer thread, so both locks are replaced and a
+        new writer started on an empty queue. The inherited connection is
+        left alone; _connection() opens a new one for this process.
+        """
+        self._lock = threading.RLock()
+        self._pending_lock = threading.Lock()
+        self._pending = 0
+        if self._writer is not None:
+            self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._start_writer()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30.0,
+            check_same_thread=False,  # Access is serialized by self._lock
+            cached_statements=256
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        The shared connection, inside a transaction (committed on exit).
+
+        Re-entrant, so helpers can be called while a transaction is open.
+        """
+        with self._lock:
+            # Reopen after a fork (an inherited connection must not be used)
+            # or if db_path was reassigned
+            owner = (os.getpid(), Path(self.db_path))
+            if self._conn is None or self._conn_owner != owner:
+                if self._conn is not None and self._conn_owner[0] == owner[0]:
+                    self._conn.close()
+                self._conn = self._connect()
+                self._conn_owner = owner
+
+            if self._conn.in_transaction:
+                yield self._conn
+            else:
+                with self._conn:
+                    yield self._conn
+
+    def close(self):
+        """
+        Flush and stop the write-behind thread, then close the connection.
+
+        The connection is reopened on next use; later records are written
+        synchronously.
+        """
+        atexit.unregister(self.close)
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(_STOP)
+            writer.join()
+
+            # Records queued concurrently with the stop request
+            leftovers = []
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if isinstance(item, ToolUsageRecord):
+                    leftovers.append(item)
+            if leftovers:
+                self._insert_usage(leftovers)
+
+        with self._lock:
+            if self._conn is not None and self._conn_owner[0] == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._conn_owner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def _find_project_root(self) -> Path:
         """Find project root by locating pyproject.toml."""
         current = Path(__file__).resolve()
@@ -114,7 +361,7 @@ class ToolMemorySystem:
 
     def _init_database(self):
         """Initialize SQLite database with schema."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS tool_usage (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -126,48 +373,307 @@ class ToolMemorySystem:
                     cost REAL DEFAULT 0.0,
                     score REAL DEFAULT 0.0,
                     error TEXT,
-                    timestamp TEXT NOT NULL
+                    timestamp TEXT NOT NULL,
+                    ts INTEGER
                 )
             """)
 
+            # Databases created before ts: convert the ISO timestamps once
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tool_usage)")}
+            if 'ts' not in columns:
+                self._migrate_epoch_timestamps(conn)
+
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_tool_pattern
                 ON tool_usage(tool_name, pattern_name)
             """)
 
+            # Time-range reads use ts; the ISO column is kept for display only
+            conn.execute("DROP INDEX IF EXISTS idx_timestamp")
+
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_timestamp
-                ON tool_usage(timestamp)
+                CREATE INDEX IF NOT EXISTS idx_usage_ts
+                ON tool_usage(ts)
             """)
 
-            conn.commit()
+            # Hourly and daily totals per (tool, pattern); bucket_start is the
+            # epoch start of the local hour or day
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tool_usage_rollups (
+                    granularity TEXT NOT NULL,
+                    bucket_start INTEGER NOT NULL,
+                    tool_name TEXT NOT NULL,
+                    pattern_name TEXT NOT NULL,
+                    uses INTEGER NOT NULL DEFAULT 0,
+                    successes INTEGER NOT NULL DEFAULT 0,
+                    latency_sum REAL NOT NULL DEFAULT 0.0,
+                    cost_sum REAL NOT NULL DEFAULT 0.0,
+                    PRIMARY KEY (granularity, bucket_start, tool_name, pattern_name)
+                )
+            """)
+
+            # One row per (tool, pattern), kept in step with tool_usage so
+            # metric reads don't scan the usage history
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tool_aggregates (
+                    tool_name TEXT NOT NULL,
+                    pattern_name TEXT NOT NULL,
+                    uses INTEGER NOT NULL DEFAULT 0,
+                    successes INTEGER NOT NULL DEFAULT 0,
+                    latency_sum REAL NOT NULL DEFAULT 0.0,
+                    cost_sum REAL NOT NULL DEFAULT 0.0,
+                    score_sum REAL NOT NULL DEFAULT 0.0,
+                    last_used TEXT,
+                    PRIMARY KEY (tool_name, pattern_name)
+                )
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_aggregates_pattern
+                ON tool_aggregates(pattern_name)
+            """)
+
+            # Mergeable latency sketches per (tool, pattern, day), plus an
+            # all-time bucket ('')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tool_latency_sketches (
+                    tool_name TEXT NOT NULL,
+                    pattern_name TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    sketch TEXT NOT NULL,
+                    PRIMARY KEY (tool_name, pattern_name, bucket)
+                )
+            """)
+
+            # Databases created before these tables: build them once
+            has_usage = conn.execute("SELECT 1 FROM tool_usage LIMIT 1").fetchone()
+            if has_usage:
+                if not conn.execute("SELECT 1 FROM tool_aggregates LIMIT 1").fetchone():
+                    self._rebuild_aggregates(conn)
+                if not conn.execute("SELECT 1 FROM tool_latency_sketches LIMIT 1").fetchone():
+                    self._rebuild_sketches(conn)
+                if not conn.execute("SELECT 1 FROM tool_usage_rollups LIMIT 1").fetchone():
+                    self._rebuild_rollups(conn)
+
+    @staticmethod
+    def _migrate_epoch_timestamps(conn: sqlite3.Connection):
+        """Add the ts column and fill it from the ISO timestamp column"""
+        conn.execute("ALTER TABLE tool_usage ADD COLUMN ts INTEGER")
+        rows = conn.execute("SELECT id, timestamp FROM tool_usage").fetchall()
+        conn.executemany(
+            "UPDATE tool_usage SET ts = ? WHERE id = ?",
+            [(parse_iso_epoch(timestamp), row_id) for row_id, timestamp in rows]
+        )
+        logger.info(f"Migrated {len(rows)} usage timestamps to epoch seconds")
+
+    def rebuild_aggregates(self):
+        """Recompute tool_aggregates, the latency sketches and the rollups from all usage"""
+        self.flush()
+        with self._connection() as conn:
+            conn.execute("DELETE FROM tool_aggregates")
+            conn.execute("DELETE FROM tool_latency_sketches")
+            conn.execute("DELETE FROM tool_usage_rollups")
+            self._rebuild_aggregates(conn)
+            self._rebuild_sketches(conn)
+            self._rebuild_rollups(conn)
+
+    @staticmethod
+    def _rebuild_aggregates(conn: sqlite3.Connection):
+        conn.execute("""
+            INSERT INTO tool_aggregates
+            (tool_name, pattern_name, uses, successes, latency_sum, cost_sum, score_sum, last_used)
+            SELECT tool_name, pattern_name, COUNT(*), SUM(success), SUM(latency_ms),
+                   SUM(cost), SUM(score), MAX(timestamp)
+            FROM tool_usage
+            GROUP BY tool_name, pattern_name
+        """)
+
+    def _rebuild_sketches(self, conn: sqlite3.Connection):
+        sketches: Dict[Tuple[str, str, str], DDSketch] = {}
+        cursor = conn.execute(
+            "SELECT tool_name, pattern_name, latency_ms, timestamp FROM tool_usage"
+        )
+        for tool_name, pattern_name, latency_ms, timestamp in cursor:
+            for bucket in (ALL_TIME_BUCKET, timestamp[:10]):
+                key = (tool_name, pattern_name, bucket)
+                sketches.setdefault(key, DDSketch()).add(latency_ms)
+
+        self._merge_sketches(conn, sketches)
+
+    def _rebuild_rollups(self, conn: sqlite3.Connection):
+        records = [
+            ToolUsageRecord(
+                tool_name=tool_name, pattern_name=pattern_name, query='',
+                success=bool(success), latency_ms=latency_ms, cost=cost,
+                timestamp=from_epoch(ts)
+            )
+            for tool_name, pattern_name, success, latency_ms, cost, ts in conn.execute(
+                "SELECT tool_name, pattern_name, success, latency_ms, cost, ts FROM tool_usage"
+            )
+        ]
+        conn.executemany(UPSERT_ROLLUP_SQL, self._rollup_rows(records))
+
+    @staticmethod
+    def _rollup_rows(records: List[ToolUsageRecord]) -> List[tuple]:
+        """Per-(granularity, bucket, tool, pattern) totals for UPSERT_ROLLUP_SQL"""
+        totals: Dict[tuple, list] = {}
+        for record in records:
+            for granularity in GRANULARITIES:
+                key = (
+                    granularity,
+                    bucket_start(record.timestamp, granularity),
+                    record.tool_name,
+                    record.pattern_name
+                )
+                entry = totals.setdefault(key, [0, 0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += 1 if record.success else 0
+                entry[2] += record.latency_ms
+                entry[3] += record.cost
+
+        return [key + tuple(entry) for key, entry in totals.items()]
+
+    @staticmethod
+    def _merge_sketches(conn: sqlite3.Connection, sketches: Dict[Tuple[str, str, str], DDSketch]):
+        """Merge sketches into the stored ones for the same (tool, pattern, bucket)"""
+        rows = []
+        for key, sketch in sketches.items():
+            stored = conn.execute("""
+                SELECT sketch FROM tool_latency_sketches
+                WHERE tool_name = ? AND pattern_name = ? AND bucket = ?
+            """, key).fetchone()
+            if stored:
+                sketch.merge(DDSketch.from_json(stored[0]))
+            rows.append(key + (sketch.to_json(),))
+
+        conn.executemany("""
+            INSERT OR REPLACE INTO tool_latency_sketches (tool_name, pattern_name, bucket, sketch)
+            VALUES (?, ?, ?, ?)
+        """, rows)
 
     def record_usage(self, record: ToolUsageRecord):
         """
         Record a tool usage event.
 
+        In write-behind mode the record is queued (blocking while the queue
+        is full) and written by the background thread.
+
         Args:
             record: ToolUsageRecord to store
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO tool_usage
-                (tool_name, pattern_name, query, success, latency_ms, cost, score, error, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                record.tool_name,
-                record.pattern_name,
-                record.query,
-                1 if record.success else 0,
-                record.latency_ms,
-                record.cost,
-                record.score,
-                record.error,
-                record.timestamp.isoformat()
-            ))
-            conn.commit()
-
-        logger.info(f"Recorded usage: {record.tool_name} (success={record.success}, latency={record.latency_ms:.0f}ms)")
+        if self._writer is not None:
+            with self._pending_lock:
+                self._pending += 1
+            self._queue.put(record)
+            return
+
+        self._insert_usage([record])
+        logger.debug(
+            f"Recorded usage: {record.tool_name} "
+            f"(success={record.success}, latency={record.latency_ms:.0f}ms)"
+        )
+
+    def _insert_usage(self, records: List[ToolUsageRecord]):
+        """
+        Insert records and fold them into the aggregates, latency sketches
+        and rollups in one transaction.
+        """
+        totals: Dict[Tuple[str, str], list] = {}
+        sketches: Dict[Tuple[str, str, str], DDSketch] = {}
+        for record in records:
+            key = (record.tool_name, record.pattern_name)
+            timestamp = record.timestamp.isoformat()
+            for bucket in (ALL_TIME_BUCKET, timestamp[:10]):
+                sketches.setdefault(key + (bucket,), DDSketch()).add(record.latency_ms)
+
+            entry = totals.setdefault(key, [0, 0, 0.0, 0.0, 0.0, timestamp])
+            entry[0] += 1
+            entry[1] += 1 if record.success else 0
+            entry[2] += record.latency_ms
+            entry[3] += record.cost
+            entry[4] += record.score
+            entry[5] = max(entry[5], timestamp)
+
+        with self._connection() as conn:
+            conn.executemany(
+                UPSERT_AGGREGATE_SQL, [key + tuple(entry) for key, entry in totals.items()]
+            )
+            conn.executemany(UPSERT_ROLLUP_SQL, self._rollup_rows(records))
+            conn.executemany(INSERT_USAGE_SQL, [
+                (
+                    record.tool_name,
+                    record.pattern_name,
+                    record.query,
+                    1 if record.success else 0,
+                    record.latency_ms,
+                    record.cost,
+                    record.score,
+                    record.error,
+                    record.timestamp.isoformat(),
+                    to_epoch(record.timestamp)
+                )
+                for record in records
+            ])
+            self._merge_sketches(conn, sketches)
+
+    def flush(self):
+        """Block until every record queued so far is written (no-op without write-behind)"""
+        writer = self._writer
+        if writer is None:
+            return
+        with self._pending_lock:
+            if not self._pending:
+                return
+
+        request = _FlushRequest()
+        self._queue.put(request)
+        while not request.done.wait(timeout=1.0):
+            if not writer.is_alive():
+                break
+
+    def _write_loop(self):
+        """Background writer: batch records by size or age, honour flush/stop requests"""
+        batch: List[ToolUsageRecord] = []
+        waiters: List[_FlushRequest] = []
+        deadline = None
+        stopping = False
+
+        while not stopping:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+            elif isinstance(item, _FlushRequest):
+                waiters.append(item)
+            elif item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (len(batch) >= self.batch_size or due or waiters or stopping):
+                self._write_batch(batch)
+                batch = []
+                deadline = None
+
+            for request in waiters:
+                request.done.set()
+            waiters = []
+
+    def _write_batch(self, batch: List[ToolUsageRecord]):
+        try:
+            self._insert_usage(batch)
+            logger.debug(f"Wrote {len(batch)} usage records")
+        except sqlite3.Error as e:
+            self.dropped_records += len(batch)
+            logger.error(f"Dropped {len(batch)} usage records: {e}")
+        finally:
+            with self._pending_lock:
+                self._pending -= len(batch)
 
     def get_tool_metrics(self, tool_name: str, pattern_name: str) -> Optional[ToolPerformanceMetrics]:
         """
@@ -180,41 +686,45 @@ class ToolMemorySystem:
         Returns:
             ToolPerformanceMetrics or None if no data
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT
-                    COUNT(*) as total_uses,
-                    AVG(CASE WHEN success = 1 THEN 1.0 ELSE 0.0 END) as success_rate,
-                    AVG(latency_ms) as avg_latency,
-                    SUM(cost) as total_cost,
-                    AVG(score) as avg_score,
-                    MAX(timestamp) as last_used
-                FROM tool_usage
-                WHERE tool_name = ? AND pattern_name = ?
-            """, (tool_name, pattern_name))
+        self.flush()
 
-            row = cursor.fetchone()
+        with self._connection() as conn:
+            row = conn.execute(f"""
+                SELECT {AGGREGATE_COLUMNS}
+                FROM {AGGREGATE_SOURCE}
+                WHERE a.tool_name = ? AND a.pattern_name = ? AND a.uses > 0
+            """, (tool_name, pattern_name)).fetchone()
 
-            if row[0] == 0:  # No usage records
-                return None
+        if row is None:  # No usage records
+            return None
 
-            last_used = datetime.fromisoformat(row[5]) if row[5] else datetime.now()
+        return self._metrics_from_row(row)
+
+    def _metrics_from_row(self, row: tuple) -> ToolPerformanceMetrics:
+        """Build metrics (with recommendation) from an AGGREGATE_COLUMNS row"""
+        last_used = datetime.fromisoformat(row[7]) if row[7] else datetime.now()
+
+        metrics = ToolPerformanceMetrics(
+            tool_name=row[0],
+            pattern_name=row[1],
+            total_uses=row[2],
+            success_rate=row[3] * 100,  # Convert to percentage
+            avg_latency_ms=row[4],
+            total_cost=row[5],
+            avg_score=row[6],
+            last_used=last_used
+        )
 
-            metrics = ToolPerformanceMetrics(
-                tool_name=tool_name,
-                pattern_name=pattern_name,
-                total_uses=row[0],
-                success_rate=row[1] * 100,  # Convert to percentage
-                avg_latency_ms=row[2],
-                total_cost=row[3],
-                avg_score=row[4],
-                last_used=last_used
-            )
+        if row[8]:
+            sketch = DDSketch.from_json(row[8])
+            metrics.p50_latency_ms = sketch.quantile(0.50)
+            metrics.p95_latency_ms = sketch.quantile(0.95)
+            metrics.p99_latency_ms = sketch.quantile(0.99)
 
-            # Determine recommendation
-            metrics.recommendation = self._determine_recommendation(metrics)
+        # Determine recommendation
+        metrics.recommendation = self._determine_recommendation(metrics)
 
-            return metrics
+        return metrics
 
     def get_best_tool_for_pattern(self, pattern_name: str) -> Optional[str]:
         """
@@ -226,18 +736,18 @@ class ToolMemorySystem:
         Returns:
             Tool name or None if no tools found
         """
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+
+        with self._connection() as conn:
             cursor = conn.execute("""
                 SELECT
                     tool_name,
-                    COUNT(*) as total_uses,
-                    AVG(CASE WHEN success = 1 THEN 1.0 ELSE 0.0 END) as success_rate,
-                    AVG(score) as avg_score,
-                    AVG(latency_ms) as avg_latency
-                FROM tool_usage
-                WHERE pattern_name = ?
-                GROUP BY tool_name
-                HAVING total_uses >= 3
+                    uses as total_uses,
+                    CAST(successes AS REAL) / uses as success_rate,
+                    score_sum / uses as avg_score,
+                    latency_sum / uses as avg_latency
+                FROM tool_aggregates
+                WHERE pattern_name = ? AND uses >= 3
                 ORDER BY
                     (success_rate * 0.5 + avg_score * 0.4 - (avg_latency / 10000) * 0.1) DESC
                 LIMIT 1
@@ -258,19 +768,57 @@ class ToolMemorySystem:
         Returns:
             List of ToolPerformanceMetrics
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT DISTINCT tool_name, pattern_name
-                FROM tool_usage
-            """)
+        self.flush()
+
+        with self._connection() as conn:
+            rows = conn.execute(f"""
+                SELECT {AGGREGATE_COLUMNS}
+                FROM {AGGREGATE_SOURCE}
+                WHERE a.uses > 0
+            """).fetchall()
+
+        return [self._metrics_from_row(row) for row in rows]
+
+    def get_latency_percentiles(
+        self,
+        tool_name: str,
+        pattern_name: str,
+        since: Optional[datetime] = None,
+        quantiles: Tuple[float, ...] = (0.50, 0.95, 0.99)
+    ) -> Dict[str, float]:
+        """
+        Latency percentiles for a tool, over all history or since a date.
 
-            metrics_list = []
-            for row in cursor.fetchall():
-                metrics = self.get_tool_metrics(row[0], row[1])
-                if metrics:
-                    metrics_list.append(metrics)
+        Args:
+            tool_name: Name of the tool
+            pattern_name: Pattern name
+            since: Only include days from this date on (default: all time)
+            quantiles: Quantiles to report
 
-            return metrics_list
+        Returns:
+            Dict like {'p50': 120.0, 'p95': 480.0, 'p99': 900.0}, empty if no data
+        """
+        self.flush()
+
+        with self._connection() as conn:
+            if since is None:
+                rows = conn.execute("""
+                    SELECT sketch FROM tool_latency_sketches
+                    WHERE tool_name = ? AND pattern_name = ? AND bucket = ''
+                """, (tool_name, pattern_name)).fetchall()
+            else:
+                rows = conn.execute("""
+                    SELECT sketch FROM tool_latency_sketches
+                    WHERE tool_name = ? AND pattern_name = ? AND bucket >= ?
+                """, (tool_name, pattern_name, since.date().isoformat())).fetchall()
+
+        merged = DDSketch()
+        for (data,) in rows:
+            merged.merge(DDSketch.from_json(data))
+        if not merged.count:
+            return {}
+
+        return {f"p{q * 100:g}": merged.quantile(q) for q in quantiles}
 
     def get_tools_to_retire(self, min_uses: int = 10) -> List[ToolPerformanceMetrics]:
         """
@@ -310,6 +858,10 @@ class ToolMemorySystem:
         if metrics.success_rate < 70 or metrics.avg_score < 0.5:
             return 'monitor'
 
+        # Monitor if: tail latency breaches the SLO (averages hide slow outliers)
+        if metrics.p99_latency_ms > self.latency_slo_ms:
+            return 'monitor'
+
         # Keep if: good performance
         return 'keep'
 
@@ -317,32 +869,38 @@ class ToolMemorySystem:
         """Calculate days since last use."""
         return (datetime.now() - last_used).days
 
-    def get_usage_trends(self, days: int = 30) -> Dict[str, List[Tuple[datetime, float]]]:
+    def get_usage_trends(
+        self,
+        days: int = 30,
+        granularity: str = 'day'
+    ) -> Dict[str, List[Tuple[datetime, float]]]:
         """
-        Get usage trends over time.
+        Get usage trends over time, bucketed by hour or day.
 
         Args:
             days: Number of days to analyze
+            granularity: 'hour' or 'day'
 
         Returns:
-            Dict mapping tool_name to list of (timestamp, success_rate) tuples
+            Dict mapping tool_name to list of (bucket_start, success_rate)
+            tuples in time order (success_rate is a 0.0-1.0 fraction)
         """
-        since = datetime.now() - timedelta(days=days)
+        self.flush()
+
+        since = bucket_start(datetime.now() - timedelta(days=days), granularity)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute("""
-                SELECT tool_name, timestamp, success
-                FROM tool_usage
-                WHERE timestamp >= ?
-                ORDER BY timestamp
-            """, (since.isoformat(),))
+                SELECT tool_name, bucket_start, CAST(SUM(successes) AS REAL) / SUM(uses)
+                FROM tool_usage_rollups
+                WHERE granularity = ? AND bucket_start >= ?
+                GROUP BY tool_name, bucket_start
+                ORDER BY bucket_start
+            """, (granularity, since))
 
             trends = defaultdict(list)
-            for row in cursor.fetchall():
-                tool_name = row[0]
-                timestamp = datetime.fromisoformat(row[1])
-                success = row[2]
-                trends[tool_name].append((timestamp, float(success)))
+            for tool_name, start, success_rate in cursor.fetchall():
+                trends[tool_name].append((from_epoch(start), success_rate))
 
             return dict(trends)
 
@@ -353,10 +911,12 @@ class ToolMemorySystem:
         Returns:
             Dict mapping tool_name to total cost
         """
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+
+        with self._connection() as conn:
             cursor = conn.execute("""
-                SELECT tool_name, SUM(cost) as total_cost
-                FROM tool_usage
+                SELECT tool_name, SUM(cost_sum) as total_cost
+                FROM tool_aggregates
                 GROUP BY tool_name
                 ORDER BY total_cost DESC
             """)
@@ -15,9 +15,10 @@ performance tracking, and intelligent decision-making.
 import logging
 import time
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from enum import Enum
 
+from src.level2.crawl.generation_cache import GenerationCache
 from src.level2.walk.external_library_engine import ExternalLibraryEngine, ExternalLibraryIntegrationResult
 from src.level2.walk.external_api_engine import ExternalAPIEngine, ExternalAPIIntegrationResult
 from src.level2.walk.tool_memory_system import ToolMemorySystem, ToolUsageRecord
@@ -83,7 +84,8 @@ class UnifiedWALKOrchestrator:
         self,
         gemini_api_key: Optional[str] = None,
         enable_cost_tracking: bool = True,
-        enable_tool_memory: bool = True
+        enable_tool_memory: bool = True,
+        generation_cache: Optional[GenerationCache] = None
     ):
         """
         Initialize unified WALK orchestrator.
@@ -92,11 +94,10 @@ class UnifiedWALKOrchestrator:
             gemini_api_key: Google API key for Gemini 2.5 Pro
             enable_cost_tracking: Enable cost management
             enable_tool_memory: Enable tool memory and learning
+            generation_cache: Replays wrappers generated for an identical
+                request (default: the shared cache in data/generation_cache.db,
+                reporting savings to the cost system)
         """
-        # Core engines
-        self.library_engine = ExternalLibraryEngine(gemini_api_key=gemini_api_key)
-        self.api_engine = ExternalAPIEngine(gemini_api_key=gemini_api_key)
-
         # Support systems
         self.enable_cost_tracking = enable_cost_tracking
         self.enable_tool_memory = enable_tool_memory
@@ -106,8 +107,21 @@ class UnifiedWALKOrchestrator:
         else:
             self.cost_system = None
 
+        self.generation_cache = generation_cache or GenerationCache(cost_tracker=self.cost_system)
+
+        # Core engines
+        self.library_engine = ExternalLibraryEngine(
+            gemini_api_key=gemini_api_key,
+            generation_cache=self.generation_cache
+        )
+        self.api_engine = ExternalAPIEngine(
+            gemini_api_key=gemini_api_key,
+            generation_cache=self.generation_cache
+        )
+
         if enable_tool_memory:
-            self.tool_memory = ToolMemorySystem()
+            # Usage is recorded on the request path; write it behind
+            self.tool_memory = ToolMemorySystem(write_behind=True)
         else:
             self.tool_memory = None
 
@@ -134,15 +148,22 @@ class UnifiedWALKOrchestrator:
         logger.info(f"WALK acquisition for: {pattern_name}")
 
         start_time = time.time()
+        reservation = None
 
         try:
-            # Step 1: Check budget
-            if self.cost_system and not self._check_budget_allowance(max_cost or 50.0):
-                return WALKAcquisitionResult(
-                    success=False,
-                    pattern_name=pattern_name,
-                    error="Insufficient budget for acquisition"
+            # Step 1: Reserve budget (atomic across concurrent workers)
+            if self.cost_system:
+                reservation = self.cost_system.reserve(
+                    max_cost or 50.0,
+                    category="acquisition",
+                    description=f"Acquisition for {pattern_name}"
                 )
+                if reservation is None:
+                    return WALKAcquisitionResult(
+                        success=False,
+                        pattern_name=pattern_name,
+                        error="Insufficient budget for acquisition"
+                    )
 
             # Step 2: Get recommendation from tool memory
             recommended_tool = None
@@ -170,9 +191,10 @@ class UnifiedWALKOrchestrator:
                     result = self._acquire_api(pattern, missing_capabilities)
 
                 if result.success:
-                    # Record cost
-                    if self.cost_system:
-                        cost_recorded = self.cost_system.record_cost(
+                    # Record the actual cost against the reservation
+                    if reservation is not None:
+                        cost_recorded = self.cost_system.commit_reservation(
+                            reservation,
                             amount=result.cost,
                             category=f"{source.value}_acquisition",
                             description=f"Acquired {result.tool_name} for {pattern_name}",
@@ -180,9 +202,10 @@ class UnifiedWALKOrchestrator:
                             pattern_name=pattern_name,
                             acquisition_type=source.value
                         )
+                        reservation = None
 
                         if not cost_recorded:
-                            logger.warning("Cost recording failed (budget exceeded)")
+                            logger.warning("Cost recording failed (reservation already settled)")
                             # Acquisition succeeded but cost couldn't be recorded
                             # This is a warning, not a failure
 
@@ -217,32 +240,10 @@ class UnifiedWALKOrchestrator:
                 error=str(e)
             )
 
-    def _check_budget_allowance(self, estimated_cost: float) -> bool:
-        """
-        Check if estimated cost is within budget.
-
-        Args:
-            estimated_cost: Estimated cost of acquisition
-
-        Returns:
-            True if cost is allowed, False otherwise
-        """
-        if not self.cost_system:
-            return True
-
-        # Check against all active budgets
-        status = self.cost_system.get_budget_status()
-
-        for period, info in status.items():
-            remaining = info['remaining']
-            if estimated_cost > remaining:
-                logger.warning(
-                    f"{period} budget insufficient: "
-                    f"${estimated_cost:.2f} > ${remaining:.2f} remaining"
-                )
-                return False
-
-        return True
+        finally:
+            # Nothing was acquired: return the hold
+            if reservation is not None:
+                self.cost_system.release_reservation(reservation)
 
     def _acquire_library(
         self,
@@ -276,7 +277,7 @@ class UnifiedWALKOrchestrator:
 
         # Calculate costs
         # Libraries are typically free, but wrapper generation has cost
-        wrapper_generation_cost = 0.02  # ~$0.02 for Gemini 2.5 Pro call
+        wrapper_generation_cost = self._wrapper_generation_cost(result.tool)
         monthly_cost = 0.0  # Most PyPI libraries are free
 
         return WALKAcquisitionResult(
@@ -325,7 +326,7 @@ class UnifiedWALKOrchestrator:
             )
 
         # Calculate costs
-        wrapper_generation_cost = 0.02  # ~$0.02 for Gemini 2.5 Pro call
+        wrapper_generation_cost = self._wrapper_generation_cost(result.tool)
 
         # Estimate monthly cost based on pricing
         monthly_cost = 0.0
@@ -351,6 +352,13 @@ class UnifiedWALKOrchestrator:
             }
         )
 
+    @staticmethod
+    def _wrapper_generation_cost(tool) -> float:
+        """Cost of generating a wrapper; a replay from the generation cache is free"""
+        if (tool.metadata or {}).get('generation_cache') == 'hit':
+            return 0.0
+        return 0.02  # ~$0.02 for Gemini 2.5 Pro call
+
     def record_tool_performance(
         self,
         tool_name: str,
@@ -384,33 +392,61 @@ class UnifiedWALKOrchestrator:
             error=error
         ))
 
-        logger.info(
+        logger.debug(
             f"Recorded performance: {tool_name} on {pattern_name} "
             f"(success={success}, score={score:.2f})"
         )
 
+    def close(self):
+        """Flush buffered tool usage records and release database connections"""
+        if self.tool_memory:
+            self.tool_memory.close()
+        if self.cost_system:
+            self.cost_system.close()
+
     def get_cost_summary(self) -> Dict:
         """
         Get cost management summary.
 
         Returns:
-            Dict with budget status and spending analysis
+            Dict with budget status, spending analysis and forecasts
         """
         if not self.cost_system:
             return {'enabled': False}
 
+        forecaster = self.cost_system.forecaster
+
+        # One status read feeds the budget forecasts and the recommendations
+        budgets = self.cost_system.get_budget_status()
+        budget_forecasts = forecaster.forecast_budgets(status=budgets)
+
         return {
             'enabled': True,
-            'budgets': self.cost_system.get_budget_status(),
+            'budgets': budgets,
             'spending_by_category': self.cost_system.get_spending_by_category(days=30),
             'monthly_forecast': self.cost_system.forecast_monthly_spend(),
+            'forecast_by_category': {
+                category: {
+                    'point': f.point,
+                    'lower': f.lower,
+                    'upper': f.upper,
+                    'method': f.method
+                }
+                for category, f in forecaster.forecast_by_category(horizon_days=30).items()
+            },
+            'budget_forecasts': {
+                period: asdict(projection)
+                for period, projection in budget_forecasts.items()
+            },
             'optimization_recommendations': [
                 {
                     'recommendation': r.recommendation,
                     'potential_savings': r.potential_savings,
                     'priority': r.priority
                 }
-                for r in self.cost_system.get_optimization_recommendations()
+                for r in self.cost_system.get_optimization_recommendations(
+                    budget_forecasts=budget_forecasts
+                )
             ]
         }
 
@@ -0,0 +1,113 @@
+"""
+Tests for the circuit breaker
+
+Tests:
+1. Closed -> open after consecutive failures
+2. Open -> half-open after the recovery timeout, probe limits
+3. Metrics
+"""
+
+import pytest
+
+from src.common.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, recovery_timeout=10.0, clock=clock)
+
+
+class TestCircuitBreaker:
+    """Test state transitions"""
+
+    def test_opens_after_threshold(self, breaker):
+        """Test the circuit opens after N consecutive failures"""
+        for _ in range(2):
+            assert breaker.allow_request()
+            breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+
+    def test_success_resets_failure_count(self, breaker):
+        """Test failures must be consecutive"""
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_probe_closes(self, breaker, clock):
+        """Test a successful probe after the timeout closes the circuit"""
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now = 10.0
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request(), "Only one probe at a time"
+
+        breaker.record_success()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_request()
+
+    def test_half_open_probe_failure_reopens(self, breaker, clock):
+        """Test a failed probe re-opens the circuit for another timeout"""
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 10.0
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        clock.now = 15.0
+        assert not breaker.allow_request()
+        clock.now = 20.0
+        assert breaker.allow_request()
+
+    def test_release_frees_probe(self, breaker, clock):
+        """Test a released probe lets another probe through"""
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 10.0
+        assert breaker.allow_request()
+
+        breaker.release()
+
+        assert breaker.allow_request()
+
+    def test_metrics(self, breaker, clock):
+        """Test trip and rejection counters"""
+        for _ in range(3):
+            breaker.record_failure()
+        breaker.allow_request()
+        breaker.allow_request()
+
+        metrics = breaker.metrics()
+
+        assert metrics["state"] == CircuitBreaker.OPEN
+        assert metrics["trips"] == 1
+        assert metrics["rejected"] == 2
+        assert metrics["total_failures"] == 3
+        assert metrics["consecutive_failures"] == 3
@@ -0,0 +1,55 @@
+"""
+Tests for model pricing
+
+Tests:
+1. Price lookup for dated, fine-tuned and unknown model ids
+2. Cost from OpenAI and Gemini usage objects
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.common.model_pricing import DEFAULT_PRICE, call_cost, model_price, usage_cost
+
+
+class TestModelPrice:
+    """Test price lookup"""
+
+    def test_dated_model_matches_family(self):
+        """Test dated ids use the longest matching family prefix"""
+        assert model_price("gpt-4.1-2025-04-14") == (2.00, 8.00)
+        assert model_price("gpt-4.1-mini-2025-04-14") == (0.40, 1.60)
+
+    def test_finetuned_model_uses_finetuned_price(self):
+        """Test ft: ids are priced as fine-tuned inference of their base model"""
+        assert model_price("ft:gpt-4.1-2025-04-14:org::abc123") == (3.00, 12.00)
+
+    def test_unknown_model_uses_default(self):
+        """Test unknown models fall back to the default price"""
+        assert model_price("ft:test-model") == DEFAULT_PRICE
+        assert model_price("some-model") == DEFAULT_PRICE
+
+
+class TestUsageCost:
+    """Test cost from response usage"""
+
+    def test_openai_usage(self):
+        """Test prompt and completion tokens are priced separately"""
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=500)
+
+        assert usage_cost("gpt-4.1", usage) == pytest.approx(0.002 + 0.004)
+
+    def test_gemini_usage_counts_thoughts_as_output(self):
+        """Test Gemini thinking tokens are billed as output"""
+        usage = SimpleNamespace(
+            prompt_token_count=2000, candidates_token_count=300, thoughts_token_count=700
+        )
+
+        expected = call_cost("gemini-2.5-pro", 2000, 1000)
+        assert usage_cost("gemini-2.5-pro", usage) == pytest.approx(expected)
+
+    def test_missing_usage(self):
+        """Test responses without usage have no cost estimate"""
+        assert usage_cost("gpt-4.1", None) is None
+        assert usage_cost("gpt-4.1", SimpleNamespace()) is None
@@ -0,0 +1,154 @@
+"""
+Tests for the shared pattern engine
+
+Tests:
+1. Keyword index over rules and keyword tables
+2. Precompiled indicator predicates
+3. Call sites that use the engine (crawl matcher, conversation scoring)
+"""
+
+import json
+
+import pytest
+
+from src.common.pattern_engine import (
+    CONVERSATION_KEYWORDS,
+    INDICATORS,
+    PATTERN_RULES,
+    TOOL_ROUTING_KEYWORDS,
+    PatternEngine,
+    get_pattern_engine,
+)
+from src.level1.crawl.pattern_matcher import PatternMatcher as CrawlPatternMatcher
+from src.level1.run.parse_real_conversations import score_conversation_against_patterns
+from src.level1.runtime.pattern_matcher import PatternMatcher
+
+
+class TestPatternEngine:
+    """Test the shared keyword index"""
+
+    def test_shared_instance(self):
+        """Test the default engine is compiled once per process"""
+        assert get_pattern_engine() is get_pattern_engine()
+
+    def test_runtime_matcher_uses_shared_engine(self):
+        """Test matchers with default rules share the process-wide engine"""
+        assert PatternMatcher()._engine is get_pattern_engine()
+
+    def test_index_covers_all_tables(self):
+        """Test every rule term and table keyword is indexed"""
+        terms = set(get_pattern_engine().automaton.terms)
+
+        for rules in PATTERN_RULES.values():
+            assert set(rules.get("keywords", [])) <= terms
+            assert set(rules.get("phrases", [])) <= terms
+        for table in (TOOL_ROUTING_KEYWORDS, CONVERSATION_KEYWORDS):
+            for keywords in table.values():
+                assert {k.lower() for k in keywords} <= terms
+
+    def test_register_table(self):
+        """Test a registered table is indexed and re-registering it is a no-op"""
+        engine = PatternEngine(pattern_rules={}, keyword_tables={})
+        engine.register_table("triggers", {"Cache": ["Redis"]})
+        automaton = engine.automaton
+
+        engine.register_table("triggers", {"Cache": ["redis"]})
+
+        assert engine.automaton is automaton
+        assert engine.table_matches("triggers", engine.scan("use redis"))["Cache"] == ["redis"]
+
+    def test_tool_routing_table(self):
+        """Test tool routing matches the old any-keyword semantics"""
+        engine = get_pattern_engine()
+        query = "is this production ready? compare it with the alternative"
+        matches = engine.table_matches("tool_routing", engine.scan(query))
+
+        expected = {
+            pattern for pattern, keywords in TOOL_ROUTING_KEYWORDS.items()
+            if any(kw in query for kw in keywords)
+        }
+        assert {p for p, kws in matches.items() if kws} == expected
+        assert matches["Production Readiness"] == ["production", "ready"]
+
+    def test_custom_tables_are_lowercased(self):
+        """Test table keywords match case-insensitively"""
+        engine = PatternEngine(pattern_rules={}, keyword_tables={"t": {"P": ["Cache"]}})
+
+        assert engine.table_matches("t", engine.scan("add a cache"))["P"] == ["cache"]
+
+
+class TestIndicators:
+    """Test the precompiled indicator predicates"""
+
+    @pytest.mark.parametrize("indicator,query,expected", [
+        ("ending_with_question_confirmation", "sql is always faster. agree?", True),
+        ("ending_with_question_confirmation", "agree? no", False),
+        ("contains_vs_comparison", "react vs vue", True),
+        ("contains_vs_comparison", "tea or coffee", True),
+        ("contains_vs_comparison", "vs", False),
+        ("requests_code_implementation", "write a parser", True),
+        ("requests_code_implementation", "please write a parser", False),
+        ("asks_for_recommendation_without_context", "what's the best database?", True),
+        ("asks_for_recommendation_without_context", "whats the best db", True),
+        ("asks_for_recommendation_without_context", "which database is fastest?", False),
+    ])
+    def test_indicator(self, indicator, query, expected):
+        """Test each indicator against representative queries"""
+        assert get_pattern_engine().check_indicator(indicator, query) is expected
+
+    def test_unknown_indicator(self):
+        """Test unknown indicators are False"""
+        assert get_pattern_engine().check_indicator("nonexistent", "anything") is False
+
+    def test_all_rule_indicators_compiled(self):
+        """Test every indicator named in the rules has a predicate"""
+        for rules in PATTERN_RULES.values():
+            for indicator in rules.get("indicators", []):
+                assert indicator in INDICATORS
+
+
+class TestCallSites:
+    """Test call sites that delegate to the engine"""
+
+    def test_crawl_matcher(self, tmp_path):
+        """Test trigger keyword matching plus precision policing, by priority"""
+        patterns = [
+            {"name": "Tradeoff Analysis First", "priority": 2, "trigger_keywords": ["Implement"]},
+            {"name": "Production Readiness Checker", "priority": 1,
+             "trigger_keywords": ["implement", "cache"]},
+            {"name": "Hint-Based Debugging", "priority": 1, "trigger_keywords": ["debug"]},
+            {"name": "Precision Policing", "priority": 3, "trigger_keywords": []},
+        ]
+        patterns_file = tmp_path / "patterns.json"
+        patterns_file.write_text(json.dumps(patterns))
+        matcher = CrawlPatternMatcher(patterns_file=patterns_file)
+
+        names = matcher.get_pattern_names(matcher.match("Implement a cache"))
+
+        assert names == [
+            "Production Readiness Checker", "Tradeoff Analysis First", "Precision Policing"
+        ]
+        assert matcher.get_pattern_names(matcher.match("nothing")) == ["Precision Policing"]
+        assert matcher.engine is get_pattern_engine()
+
+    def test_crawl_matcher_without_patterns_file(self, tmp_path):
+        """Test a missing patterns.json yields no matches"""
+        matcher = CrawlPatternMatcher(patterns_file=tmp_path / "missing.json")
+
+        assert matcher.match("Implement a cache") == []
+
+    def test_conversation_scoring(self):
+        """Test conversation scores equal the per-keyword substring count"""
+        conversation = {"messages": [
+            {"role": "user", "content": "What is missing?"},
+            {"role": "assistant", "content": "✓ Tests. ✗ Error handling is MISSING; "
+                                             "tradeoff: pros and cons depend on context."},
+        ]}
+        text = conversation["messages"][1]["content"].lower()
+
+        scores = score_conversation_against_patterns(conversation)
+
+        for pattern, keywords in CONVERSATION_KEYWORDS.items():
+            expected = min(1.0, sum(k.lower() in text for k in keywords) / len(keywords))
+            assert scores[pattern] == expected
+        assert scores["Gap Analysis"] > 0
@@ -0,0 +1,119 @@
+"""
+Tests for the DDSketch quantile sketch
+
+Tests:
+1. Quantile accuracy against exact percentiles
+2. Merging sketches
+3. JSON round-trip and edge cases
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from src.common.quantile_sketch import DDSketch
+
+
+def latencies(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.lognormvariate(5, 1) for _ in range(n)]
+
+
+class TestAccuracy:
+    """Test quantile estimates against numpy percentiles"""
+
+    @pytest.mark.parametrize("q", [0.5, 0.9, 0.95, 0.99])
+    def test_within_relative_accuracy(self, q):
+        """Test estimates stay within the relative accuracy"""
+        values = latencies(20_000)
+        sketch = DDSketch(relative_accuracy=0.01)
+        sketch.update(values)
+
+        exact = np.quantile(values, q, method="lower")
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+
+    def test_extremes_are_exact(self):
+        """Test q=0 and q=1 return the exact min and max"""
+        values = latencies(1000)
+        sketch = DDSketch()
+        sketch.update(values)
+
+        assert sketch.quantile(0) == min(values)
+        assert sketch.quantile(1) == max(values)
+
+    def test_zero_and_negative_values(self):
+        """Test non-positive values land in the zero bucket"""
+        sketch = DDSketch()
+        sketch.update([0, -5, 0, 10])
+
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.min == 0.0
+        assert sketch.quantile(1) == 10
+
+    def test_empty_sketch(self):
+        """Test an empty sketch has no quantiles"""
+        assert DDSketch().quantile(0.99) is None
+        assert len(DDSketch()) == 0
+
+    def test_invalid_quantile(self):
+        """Test quantiles outside [0, 1] are rejected"""
+        with pytest.raises(ValueError):
+            DDSketch().quantile(1.5)
+
+    def test_bucket_cap(self):
+        """Test collapsing low buckets keeps high quantiles accurate"""
+        sketch = DDSketch(max_buckets=50)
+        sketch.update(10 ** (i / 100) for i in range(1000))
+
+        assert len(sketch.buckets) <= 50
+        assert sketch.quantile(0.99) == pytest.approx(10 ** 9.89, rel=0.011)
+
+
+class TestMerge:
+    """Test combining sketches"""
+
+    def test_merge_equals_combined(self):
+        """Test merging equals sketching the combined values"""
+        first, second = latencies(5000, seed=1), latencies(5000, seed=2)
+        a, b, combined = DDSketch(), DDSketch(), DDSketch()
+        a.update(first)
+        b.update(second)
+        combined.update(first + second)
+
+        a.merge(b)
+
+        assert a.buckets == combined.buckets
+        assert a.count == combined.count
+        assert (a.min, a.max) == (combined.min, combined.max)
+
+    def test_merge_empty(self):
+        """Test merging with an empty sketch in either direction"""
+        sketch = DDSketch()
+        sketch.add(3.0)
+        sketch.merge(DDSketch())
+        DDSketch().merge(sketch)
+
+        assert sketch.count == 1
+
+    def test_merge_rejects_different_accuracy(self):
+        """Test sketches with different accuracy can not merge"""
+        with pytest.raises(ValueError):
+            DDSketch(0.01).merge(DDSketch(0.02))
+
+
+class TestSerialization:
+    """Test the JSON encoding"""
+
+    def test_round_trip(self):
+        """Test to_json() and from_json() preserve the sketch"""
+        sketch = DDSketch()
+        sketch.update(latencies(500))
+        sketch.add(0)
+
+        restored = DDSketch.from_json(sketch.to_json())
+
+        assert restored.buckets == sketch.buckets
+        assert restored.zero_count == 1
+        for q in (0.5, 0.95, 0.99):
+            assert restored.quantile(q) == sketch.quantile(q)
@@ -0,0 +1,250 @@
+"""
+Tests for the response cache
+
+Tests:
+1. Exact tier keyed on (model, system prompt, normalized query)
+2. Semantic tier with a similarity threshold
+3. TTL expiry and LRU eviction
+4. Sharing across processes and cost savings reporting
+5. UnifiedAgentPipeline integration
+"""
+
+import multiprocessing
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.common.model_pricing import call_cost
+from src.common.response_cache import ResponseCache, normalize_query
+from src.level2.crawl.unified_agent_pipeline import ToolRegistry, UnifiedAgentPipeline
+from src.level2.walk.cost_management_system import CostManagementSystem
+
+
+VOCABULARY = ["react", "vue", "angular", "project", "new", "use", "database", "sql"]
+
+
+def bag_of_words(text):
+    """Tiny deterministic embedding: vocabulary word counts"""
+    words = text.split()
+    return [float(words.count(w)) for w in VOCABULARY]
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return ResponseCache(db_path=tmp_path / "cache.db", clock=clock, default_cost=0.02)
+
+
+def _put_from_child(db_path):
+    ResponseCache(db_path=db_path).put("m", "sys", "shared question", "from child")
+
+
+class TestExactTier:
+    """Test exact-match lookups"""
+
+    def test_miss_then_hit(self, cache):
+        """Test a stored response is returned for the same key"""
+        assert cache.get("m", "sys", "What is DNS?") is None
+
+        cache.put("m", "sys", "What is DNS?", "A naming system", metadata={"k": 1})
+        hit = cache.get("m", "sys", "What is DNS?")
+
+        assert hit.response == "A naming system"
+        assert hit.tier == "exact"
+        assert hit.similarity == 1.0
+        assert hit.metadata == {"k": 1}
+
+    def test_query_is_normalized(self, cache):
+        """Test case, whitespace and trailing punctuation don't matter"""
+        cache.put("m", "sys", "What is  DNS?", "answer")
+
+        assert normalize_query("  What is\\nDNS?! ") == "what is\\ndns"
+        assert cache.get("m", "sys", "what is dns") is not None
+
+    def test_model_and_system_prompt_scope(self, cache):
+        """Test different models or system prompts don't share entries"""
+        cache.put("m", "sys", "q", "answer")
+
+        assert cache.get("other", "sys", "q") is None
+        assert cache.get("m", "other sys", "q") is None
+
+    def test_stats(self, cache):
+        """Test hit/miss counters and cost saved"""
+        cache.put("m", "sys", "q", "answer")
+        cache.get("m", "sys", "q")
+        cache.get("m", "sys", "q")
+        cache.get("m", "sys", "miss")
+
+        stats = cache.stats()
+
+        assert stats["entries"] == 1
+        assert stats["exact_hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["cost_saved"] == pytest.approx(0.04)
+
+
+class TestSemanticTier:
+    """Test embedding-similarity lookups"""
+
+    @pytest.fixture
+    def semantic_cache(self, tmp_path, clock):
+        return ResponseCache(
+            db_path=tmp_path / "cache.db", clock=clock,
+            embed_fn=bag_of_words, similarity_threshold=0.9
+        )
+
+    def test_similar_query_hits(self, semantic_cache):
+        """Test a reworded query above the threshold hits"""
+        semantic_cache.put("m", "sys", "use react or vue for new project", "React")
+
+        hit = semantic_cache.get("m", "sys", "for a new project use vue or react")
+
+        assert hit.response == "React"
+        assert hit.tier == "semantic"
+        assert hit.similarity == pytest.approx(1.0)
+
+    def test_dissimilar_query_misses(self, semantic_cache):
+        """Test a query below the threshold misses"""
+        semantic_cache.put("m", "sys", "use react or vue for new project", "React")
+
+        assert semantic_cache.get("m", "sys", "which sql database") is None
+
+    def test_best_match_wins(self, semantic_cache):
+        """Test the most similar entry is returned"""
+        semantic_cache.put("m", "sys", "react project", "A")
+        semantic_cache.put("m", "sys", "react vue project", "B")
+
+        hit = semantic_cache.get("m", "sys", "react vue project project")
+
+        assert hit.response == "B"
+        expected = 4 / (np.sqrt(3) * np.sqrt(6))
+        assert hit.similarity == pytest.approx(expected, rel=1e-5)
+
+    def test_semantic_respects_scope(self, semantic_cache):
+        """Test semantic hits never cross system prompts"""
+        semantic_cache.put("m", "sys", "react vue project", "B")
+
+        assert semantic_cache.get("m", "other", "vue react project") is None
+
+
+class TestEviction:
+    """Test TTL expiry and size bound"""
+
+    def test_ttl_expiry(self, tmp_path, clock):
+        """Test entries older than the TTL are ignored"""
+        cache = ResponseCache(db_path=tmp_path / "cache.db", clock=clock, ttl_seconds=60)
+        cache.put("m", "sys", "q", "answer")
+
+        clock.now += 59
+        assert cache.get("m", "sys", "q") is not None
+        clock.now += 2
+        assert cache.get("m", "sys", "q") is None
+
+    def test_lru_eviction(self, tmp_path, clock):
+        """Test the least recently used entries are evicted beyond max_entries"""
+        cache = ResponseCache(db_path=tmp_path / "cache.db", clock=clock, max_entries=2)
+        cache.put("m", "sys", "a", "A")
+        clock.now += 1
+        cache.put("m", "sys", "b", "B")
+        clock.now += 1
+        cache.get("m", "sys", "a")
+        clock.now += 1
+        cache.put("m", "sys", "c", "C")
+
+        assert len(cache) == 2
+        assert cache.get("m", "sys", "b") is None
+        assert cache.get("m", "sys", "a") is not None
+
+
+class TestSharingAndSavings:
+    """Test cross-process sharing and cost reporting"""
+
+    def test_shared_across_processes(self, tmp_path):
+        """Test an entry written by another process is a hit here"""
+        db_path = tmp_path / "cache.db"
+        cache = ResponseCache(db_path=db_path)
+
+        process = multiprocessing.get_context("spawn").Process(
+            target=_put_from_child, args=(db_path,)
+        )
+        process.start()
+        process.join(timeout=60)
+
+        assert process.exitcode == 0
+        assert cache.get("m", "sys", "shared question").response == "from child"
+
+    def test_savings_reported_to_cost_system(self, tmp_path):
+        """Test each hit records the avoided cost"""
+        cost_system = CostManagementSystem(db_path=tmp_path / "cost.db")
+        cache = ResponseCache(db_path=tmp_path / "cache.db", cost_tracker=cost_system)
+        cache.put("m", "sys", "q", "answer", cost=0.05)
+
+        cache.get("m", "sys", "q")
+        cache.get("m", "sys", "q")
+
+        savings = cost_system.get_savings_by_category()
+        assert savings["response_cache"] == pytest.approx(0.10)
+        assert cost_system.get_spending_by_category() == {}
+
+
+class TestPipelineIntegration:
+    """Test UnifiedAgentPipeline serves repeated queries from the cache"""
+
+    def test_repeat_query_skips_llm(self, cache):
+        """Test the second identical query doesn't call Gemini"""
+        calls = []
+
+        def generate_content(model, contents, config):
+            calls.append(contents)
+            return SimpleNamespace(text="Gemini answer")
+
+        pipeline = UnifiedAgentPipeline(
+            gemini_api_key="test-key", tool_registry=ToolRegistry(), response_cache=cache
+        )
+        pipeline.client = SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+
+        first = pipeline.process("Is this production ready?", "x = 1")
+        second = pipeline.process("is this production ready", "x = 1")
+        other_code = pipeline.process("Is this production ready?", "x = 2")
+
+        assert first["answer"] == second["answer"] == other_code["answer"] == "Gemini answer"
+        assert second["metadata"]["cache_tier"] == "exact"
+        assert "cache_tier" not in other_code["metadata"]
+        assert len(calls) == 2
+
+    def test_savings_use_gemini_usage(self, tmp_path):
+        """Test a hit saves the cost of the Gemini call that produced the answer"""
+        cost_system = CostManagementSystem(db_path=tmp_path / "cost.db")
+        cache = ResponseCache(db_path=tmp_path / "cache.db", cost_tracker=cost_system)
+        usage = SimpleNamespace(prompt_token_count=4000, candidates_token_count=1000)
+
+        pipeline = UnifiedAgentPipeline(
+            gemini_api_key="test-key", tool_registry=ToolRegistry(), response_cache=cache
+        )
+        pipeline.client = SimpleNamespace(models=SimpleNamespace(
+            generate_content=lambda model, contents, config: SimpleNamespace(
+                text="Gemini answer", usage_metadata=usage
+            )
+        ))
+
+        pipeline.process("Is this production ready?", "x = 1")
+        pipeline.process("Is this production ready?", "x = 1")
+
+        expected = call_cost(pipeline.model, 4000, 1000)
+        assert cost_system.get_savings_by_category()["response_cache"] == pytest.approx(expected)
+        cost_system.close()
@@ -0,0 +1,67 @@
+"""
+Tests for common utilities
+
+Tests:
+1. LRUCache eviction order and hit/miss counters
+"""
+
+from src.common.utils import LRUCache
+
+
+class TestLRUCache:
+    """Test the bounded LRU cache"""
+
+    def test_get_put(self):
+        """Test basic get/put and default on miss"""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("b", 0) == 0
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted first"""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_counters(self):
+        """Test hit/miss counters and hit rate"""
+        cache = LRUCache(maxsize=4)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 2 / 3
+        assert stats["size"] == 1
+        assert stats["maxsize"] == 4
+
+    def test_zero_size_disables(self):
+        """Test maxsize=0 stores nothing"""
+        cache = LRUCache(maxsize=0)
+        cache.put("a", 1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_clear_keeps_counters(self):
+        """Test clear drops entries but keeps counters"""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+
+        assert cache.get("a") is None
+        assert cache.stats()["hits"] == 1
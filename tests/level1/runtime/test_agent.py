@@ -0,0 +1,576 @@
+"""
+Tests for the Level 1 agent
+
+Uses a fake OpenAI client so no network access or API key is needed.
+
+Tests:
+1. Query flow and response metadata
+2. Detection and system prompt caching
+3. Async agent concurrency limit, timeouts and fallback
+4. Streaming output
+5. Circuit breaker and hedged requests on the fine-tuned model path
+6. Response cache
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.common.circuit_breaker import CircuitBreaker
+from src.common.model_pricing import call_cost
+from src.common.response_cache import ResponseCache
+from src.level1.runtime.agent import (
+    BASE_MODEL,
+    FALLBACK_LABEL,
+    HEDGED_LABEL,
+    AgentResponse,
+    AsyncLevel1Agent,
+    Level1Agent,
+    StreamEvent,
+)
+from src.level1.runtime.fake_client import FakeOpenAIClient, count_tokens
+from src.level2.walk.cost_management_system import CostManagementSystem
+
+
+class FakeAsyncCompletions:
+    """Async completions with configurable latency per model; tracks concurrency"""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = []
+
+    async def create(self, stream=False, **kwargs):
+        self.calls.append(kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(kwargs["model"], 0.01))
+        finally:
+            self.in_flight -= 1
+        text = f"{kwargs['model']}: {kwargs['messages'][1]['content']}"
+        if stream:
+            return self._stream(text)
+        message = SimpleNamespace(content=text)
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=len(text) // 4)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    async def _stream(self, text):
+        for start in range(0, len(text), 4):
+            await asyncio.sleep(0)
+            delta = SimpleNamespace(content=text[start:start + 4])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+@pytest.fixture
+def agent():
+    """Create a Level1Agent backed by a fake client"""
+    agent = Level1Agent(finetuned_model_id="ft:test-model", api_key="test-key")
+    agent.client = FakeOpenAIClient(reply="Fake response")
+    return agent
+
+
+class TestQuery:
+    """Test the synchronous query path"""
+
+    def test_query_returns_agent_response(self, agent):
+        """Test response text, patterns and model are reported"""
+        response = agent.query("Should I use React or Vue for my new project?")
+
+        assert isinstance(response, AgentResponse)
+        assert response.response == "Fake response"
+        assert response.model_used == "ft:test-model"
+        assert response.detected_patterns[0]["pattern"] == "Tradeoff Analysis"
+        assert len(response.detected_patterns) == 2
+
+    def test_system_prompt_is_augmented(self, agent):
+        """Test the augmented system prompt is sent to the model"""
+        response = agent.query("Should I use React or Vue for my new project?")
+        messages = agent.client.chat.completions.calls[0]["messages"]
+
+        assert messages[1] == {
+            "role": "user", "content": "Should I use React or Vue for my new project?"
+        }
+        for pattern_name in response.augmentations_applied:
+            augmentation = agent.prompt_generator.pattern_augmentations[pattern_name]
+            assert augmentation in messages[0]["content"]
+
+
+class TestCaching:
+    """Test that repeated queries skip detection and prompt assembly"""
+
+    def test_repeat_query_hits_both_caches(self, agent):
+        """Test hit/miss counters after a repeated query"""
+        first = agent.query("Explain how HTTPS encryption works")
+        second = agent.query("Explain how HTTPS encryption works")
+        stats = agent.get_cache_stats()
+
+        assert first == second
+        assert stats["pattern_detection"]["hits"] == 1
+        assert stats["pattern_detection"]["misses"] == 1
+        assert stats["system_prompt"]["hits"] == 1
+
+    def test_cache_can_be_disabled(self):
+        """Test cache_size=0 disables detection caching"""
+        agent = Level1Agent(finetuned_model_id="ft:test-model", api_key="test-key", cache_size=0)
+        agent.client = FakeOpenAIClient(reply="Fake response")
+
+        agent.query("Explain how HTTPS encryption works")
+        agent.query("Explain how HTTPS encryption works")
+
+        assert agent.get_cache_stats()["pattern_detection"]["hits"] == 0
+
+
+@pytest.fixture
+def async_agent():
+    """Create an AsyncLevel1Agent backed by a fake async client"""
+    agent = AsyncLevel1Agent(
+        finetuned_model_id="ft:test-model",
+        api_key="test-key",
+        max_concurrency=3,
+        request_timeout=0.2
+    )
+    agent.async_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=FakeAsyncCompletions())
+    )
+    return agent
+
+
+class TestAsyncAgent:
+    """Test aquery / aquery_many"""
+
+    @pytest.mark.asyncio
+    async def test_aquery_matches_sync_metadata(self, async_agent):
+        """Test aquery returns the same pattern metadata as query"""
+        async_agent.client = FakeOpenAIClient(reply="Fake response")
+        query = "Should I use React or Vue for my new project?"
+
+        async_response = await async_agent.aquery(query)
+        sync_response = async_agent.query(query)
+
+        assert async_response.detected_patterns == sync_response.detected_patterns
+        assert async_response.augmentations_applied == sync_response.augmentations_applied
+        assert async_response.model_used == "ft:test-model"
+
+    @pytest.mark.asyncio
+    async def test_aquery_many_preserves_order(self, async_agent):
+        """Test responses come back in input order"""
+        queries = [f"Explain how thing {i} works" for i in range(10)]
+
+        responses = await async_agent.aquery_many(queries)
+
+        assert [r.response for r in responses] == [f"ft:test-model: {q}" for q in queries]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self, async_agent):
+        """Test in-flight model calls never exceed max_concurrency"""
+        completions = async_agent.async_client.chat.completions
+
+        await async_agent.aquery_many([f"query {i}" for i in range(12)])
+
+        assert completions.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_timeout_falls_back_to_base_model(self, async_agent):
+        """Test a slow fine-tuned call times out and falls back"""
+        async_agent.async_client.chat.completions.delays["ft:test-model"] = 1.0
+
+        response = await async_agent.aquery("query")
+
+        assert response.model_used == f"{BASE_MODEL} (fallback)"
+
+    @pytest.mark.asyncio
+    async def test_timeout_without_fallback_raises(self, async_agent):
+        """Test a timeout surfaces when there is no fine-tuned model to fall back from"""
+        async_agent.finetuned_model_id = None
+        async_agent.async_client.chat.completions.delays[BASE_MODEL] = 1.0
+
+        with pytest.raises(asyncio.TimeoutError):
+            await async_agent.aquery("query")
+
+    @pytest.mark.asyncio
+    async def test_return_exceptions(self, async_agent):
+        """Test failures can be returned in place"""
+        async_agent.finetuned_model_id = None
+        async_agent.async_client.chat.completions.delays[BASE_MODEL] = 1.0
+
+        results = await async_agent.aquery_many(["a", "b"], return_exceptions=True)
+
+        assert all(isinstance(r, asyncio.TimeoutError) for r in results)
+
+    def test_reusable_across_event_loops(self, async_agent):
+        """Test the agent works from separate asyncio.run calls"""
+        first = asyncio.run(async_agent.aquery_many(["a", "b", "c", "d"]))
+        second = asyncio.run(async_agent.aquery_many(["a", "b", "c", "d"]))
+
+        assert [r.response for r in first] == [r.response for r in second]
+
+
+class FailingStream:
+    """Stream that yields some chunks and then raises"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        for text in self.chunks:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+        raise RuntimeError("connection reset")
+
+
+class TestStreaming:
+    """Test query_stream / aquery_stream"""
+
+    def test_event_order(self, agent):
+        """Test metadata first, then chunks, then the final response"""
+        agent.client = FakeOpenAIClient(chunk_size=5)
+
+        events = list(agent.query_stream("Explain how HTTPS encryption works"))
+
+        assert [e.type for e in events[:1]] == ["metadata"]
+        assert {e.type for e in events[1:-1]} == {"chunk"}
+        assert events[-1].type == "done"
+        assert all(isinstance(e, StreamEvent) for e in events)
+
+    def test_chunks_assemble_response(self, agent):
+        """Test the final response is the concatenated chunks and matches query()"""
+        agent.client = FakeOpenAIClient(chunk_size=5)
+        query = "Explain how HTTPS encryption works"
+
+        events = list(agent.query_stream(query))
+        chunks = [e.data for e in events if e.type == "chunk"]
+        final = events[-1].data
+
+        assert "".join(chunks) == final.response == f"ft:test-model: {query}"
+        assert final.stats["chunks"] == len(chunks) > 1
+        assert final.stats["characters"] == len(final.response)
+        assert 0 <= final.stats["time_to_first_token_ms"] <= final.stats["total_time_ms"]
+
+        final.stats = None
+        assert final == agent.query(query)
+
+    def test_metadata_before_model_call(self, agent):
+        """Test pattern metadata is available before the model is called"""
+        agent.client = FakeOpenAIClient()
+        stream = agent.query_stream("Should I use React or Vue for my new project?")
+
+        metadata = next(stream)
+
+        assert agent.client.chat.completions.calls == []
+        assert metadata.data["detected_patterns"][0]["pattern"] == "Tradeoff Analysis"
+        assert metadata.data["model"] == "ft:test-model"
+
+    def test_fallback_before_first_chunk(self, agent):
+        """Test a fine-tuned failure before any text falls back to the base model"""
+        agent.client = FakeOpenAIClient(failing_models=["ft:test-model"])
+
+        final = list(agent.query_stream("query"))[-1].data
+
+        assert final.model_used == f"{BASE_MODEL} (fallback)"
+        assert final.response == f"{BASE_MODEL}: query"
+
+    def test_mid_stream_failure_raises(self, agent):
+        """Test a failure after text was sent is raised, not retried"""
+        agent.client = FakeOpenAIClient()
+        agent.client.chat.completions.create = lambda **kwargs: FailingStream(["partial"])
+
+        events = agent.query_stream("query")
+        assert next(events).type == "metadata"
+        assert next(events).data == "partial"
+        with pytest.raises(RuntimeError):
+            next(events)
+
+    @pytest.mark.asyncio
+    async def test_aquery_stream(self, async_agent):
+        """Test the async stream yields the same event sequence"""
+        events = [e async for e in async_agent.aquery_stream("Explain how DNS works")]
+        chunks = [e.data for e in events if e.type == "chunk"]
+
+        assert events[0].type == "metadata"
+        assert events[-1].type == "done"
+        assert "".join(chunks) == events[-1].data.response == "ft:test-model: Explain how DNS works"
+
+
+class TestCircuitBreaker:
+    """Test the breaker around the fine-tuned model"""
+
+    def test_open_circuit_skips_finetuned_model(self, agent):
+        """Test the fine-tuned model isn't called once the circuit opens"""
+        agent.finetuned_breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60.0)
+        agent.client = FakeOpenAIClient(failing_models=["ft:test-model"])
+        calls = agent.client.chat.completions.calls
+
+        for _ in range(4):
+            assert agent.query("query").model_used == FALLBACK_LABEL
+
+        finetuned_calls = [c for c in calls if c["model"] == "ft:test-model"]
+        assert len(finetuned_calls) == 2
+        metrics = agent.get_model_metrics()["finetuned_breaker"]
+        assert metrics["state"] == CircuitBreaker.OPEN
+        assert metrics["trips"] == 1
+        assert metrics["rejected"] == 2
+
+    def test_half_open_probe_recovers(self, agent):
+        """Test a successful probe closes the circuit again"""
+        now = [0.0]
+        agent.finetuned_breaker = CircuitBreaker(
+            failure_threshold=1, recovery_timeout=30.0, clock=lambda: now[0]
+        )
+        agent.client = FakeOpenAIClient(failing_models=["ft:test-model"])
+        agent.query("query")
+        assert agent.finetuned_breaker.state == CircuitBreaker.OPEN
+
+        agent.client.chat.completions.failing_models.clear()
+        now[0] = 30.0
+
+        assert agent.query("query").model_used == "ft:test-model"
+        assert agent.finetuned_breaker.state == CircuitBreaker.CLOSED
+
+    def test_stream_respects_breaker(self, agent):
+        """Test streaming goes straight to the base model while the circuit is open"""
+        agent.finetuned_breaker = CircuitBreaker(failure_threshold=1)
+        agent.finetuned_breaker.record_failure()
+        agent.client = FakeOpenAIClient()
+
+        events = list(agent.query_stream("query"))
+
+        assert events[0].data["model"] == FALLBACK_LABEL
+        assert {c["model"] for c in agent.client.chat.completions.calls} == {BASE_MODEL}
+
+    def test_abandoned_stream_releases_probe(self, agent):
+        """Test closing a stream early doesn't leak a half-open probe slot"""
+        now = [0.0]
+        agent.finetuned_breaker = CircuitBreaker(
+            failure_threshold=1, recovery_timeout=1.0, clock=lambda: now[0]
+        )
+        agent.finetuned_breaker.record_failure()
+        now[0] = 1.0
+        agent.client = FakeOpenAIClient(chunk_size=1)
+
+        stream = agent.query_stream("query")
+        next(stream)
+        next(stream)
+        stream.close()
+
+        assert agent.finetuned_breaker.allow_request()
+
+
+class TestHedging:
+    """Test hedged requests against the base model"""
+
+    def test_fast_finetuned_no_hedge(self, agent):
+        """Test no hedge fires when the fine-tuned model is within budget"""
+        agent.hedge_after = 0.5
+        agent.client = FakeOpenAIClient()
+
+        response = agent.query("query")
+
+        assert response.model_used == "ft:test-model"
+        assert agent.get_model_metrics()["hedging"] == {"fired": 0, "fallback_wins": 0}
+
+    def test_slow_finetuned_hedged(self, agent):
+        """Test the base model answers when the fine-tuned model is slow"""
+        agent.hedge_after = 0.05
+        agent.client = FakeOpenAIClient(model_latency={"ft:test-model": 0.5})
+
+        response = agent.query("query")
+
+        assert response.model_used == HEDGED_LABEL
+        assert response.response == f"{BASE_MODEL}: query"
+        assert agent.get_model_metrics()["hedging"] == {"fired": 1, "fallback_wins": 1}
+
+    def test_finetuned_wins_after_hedge(self, agent):
+        """Test the fine-tuned answer is kept if it beats the hedge"""
+        agent.hedge_after = 0.05
+        agent.client = FakeOpenAIClient(
+            model_latency={"ft:test-model": 0.1, BASE_MODEL: 1.0}
+        )
+
+        response = agent.query("query")
+
+        assert response.model_used == "ft:test-model"
+        assert agent.get_model_metrics()["hedging"] == {"fired": 1, "fallback_wins": 0}
+
+    def test_fast_failure_falls_back(self, agent):
+        """Test a fine-tuned failure within budget falls back without hedging"""
+        agent.hedge_after = 0.5
+        agent.client = FakeOpenAIClient(failing_models=["ft:test-model"])
+
+        response = agent.query("query")
+
+        assert response.model_used == FALLBACK_LABEL
+        assert agent.get_model_metrics()["finetuned_breaker"]["total_failures"] == 1
+
+    def test_hedge_not_queued_behind_hung_primaries(self):
+        """Test hedges answer while hung fine-tuned calls fill their pool"""
+        agent = Level1Agent(
+            finetuned_model_id="ft:test-model", api_key="test-key",
+            hedge_after=0.05, hedge_workers=2
+        )
+        agent.client = FakeOpenAIClient(model_latency={"ft:test-model": 1.0})
+        responses = []
+
+        start = time.perf_counter()
+        workers = [
+            threading.Thread(target=lambda i=i: responses.append(agent.query(f"query {i}")))
+            for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        agent.close()
+
+        assert [r.model_used for r in responses] == [HEDGED_LABEL] * 3
+        assert elapsed < 0.5
+        assert agent.get_model_metrics()["hedging"] == {"fired": 3, "fallback_wins": 3}
+
+    def test_close_shuts_down_pools(self, agent):
+        """Test close() drops the hedge pools and later queries recreate them"""
+        agent.hedge_after = 0.5
+        agent.query("query")
+
+        agent.close()
+
+        assert agent._hedge_executors == {}
+        assert agent.query("query").model_used == "ft:test-model"
+
+    @pytest.mark.asyncio
+    async def test_async_hedge_cancels_loser(self, async_agent):
+        """Test the async hedge returns the base answer and cancels the slow call"""
+        async_agent.request_timeout = 5.0
+        async_agent.hedge_after = 0.05
+        async_agent.async_client.chat.completions.delays["ft:test-model"] = 1.0
+
+        response = await async_agent.aquery("query")
+
+        assert response.model_used == HEDGED_LABEL
+        assert async_agent.async_client.chat.completions.in_flight == 0
+        metrics = async_agent.get_model_metrics()
+        assert metrics["hedging"] == {"fired": 1, "fallback_wins": 1}
+        assert metrics["finetuned_breaker"]["total_failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_hedge_losses_open_breaker(self, async_agent):
+        """Test slow fine-tuned calls that keep losing the hedge open the circuit"""
+        async_agent.finetuned_breaker = CircuitBreaker(failure_threshold=2)
+        async_agent.request_timeout = 5.0
+        async_agent.hedge_after = 0.05
+        async_agent.async_client.chat.completions.delays["ft:test-model"] = 1.0
+
+        for query in ("a", "b"):
+            assert (await async_agent.aquery(query)).model_used == HEDGED_LABEL
+        third = await async_agent.aquery("c")
+
+        metrics = async_agent.get_model_metrics()
+        assert metrics["finetuned_breaker"]["state"] == CircuitBreaker.OPEN
+        assert third.model_used == FALLBACK_LABEL
+        assert metrics["hedging"]["fired"] == 2
+
+    @pytest.mark.asyncio
+    async def test_async_breaker_opens(self, async_agent):
+        """Test async timeouts count as fine-tuned failures"""
+        async_agent.finetuned_breaker = CircuitBreaker(failure_threshold=2)
+        async_agent.request_timeout = 0.05
+        async_agent.async_client.chat.completions.delays["ft:test-model"] = 1.0
+
+        await async_agent.aquery_many(["a", "b", "c"])
+
+        metrics = async_agent.get_model_metrics()["finetuned_breaker"]
+        assert metrics["state"] == CircuitBreaker.OPEN
+
+
+class TestResponseCache:
+    """Test Level1Agent with a response cache attached"""
+
+    def test_repeat_query_served_from_cache(self, agent, tmp_path):
+        """Test a repeated query doesn't call the model again"""
+        agent.response_cache = ResponseCache(db_path=tmp_path / "cache.db", default_cost=0.01)
+        calls = agent.client.chat.completions.calls
+
+        first = agent.query("Should I use React or Vue?")
+        second = agent.query("should I use react or vue")
+
+        assert len(calls) == 1
+        assert second.response == first.response
+        assert second.model_used == first.model_used == "ft:test-model"
+        assert second.detected_patterns == first.detected_patterns
+        assert second.stats == {"cache_tier": "exact", "similarity": 1.0}
+        # Priced from the call's usage; default_cost only covers calls without usage
+        cost_saved = agent.get_cache_stats()["response"]["cost_saved"]
+        assert cost_saved > 0
+        assert cost_saved != pytest.approx(0.01)
+
+    def test_fallback_answer_not_cached(self, agent, tmp_path):
+        """Test a fallback answer isn't served later as a fine-tuned one"""
+        agent.response_cache = ResponseCache(db_path=tmp_path / "cache.db")
+        agent.client = FakeOpenAIClient(failing_models=["ft:test-model"])
+
+        first = agent.query("query")
+        agent.client = FakeOpenAIClient()
+        second = agent.query("query")
+
+        assert first.model_used == FALLBACK_LABEL
+        assert second.model_used == "ft:test-model"
+        assert second.stats is None
+        assert agent.response_cache.stats()["entries"] == 1
+
+    def test_hedged_answer_not_cached(self, agent, tmp_path):
+        """Test a hedge win isn't stored under the fine-tuned model"""
+        agent.response_cache = ResponseCache(db_path=tmp_path / "cache.db")
+        agent.hedge_after = 0.05
+        agent.client = FakeOpenAIClient(model_latency={"ft:test-model": 0.5})
+
+        assert agent.query("query").model_used == HEDGED_LABEL
+        assert agent.response_cache.stats()["entries"] == 0
+        agent.close()
+
+    def test_savings_reported_through_agent(self, tmp_path):
+        """Test a cached answer records the priced cost of the call it replaced"""
+        model = "ft:gpt-4.1-2025-04-14:org::abc123"
+        cost_system = CostManagementSystem(db_path=tmp_path / "cost.db")
+        agent = Level1Agent(
+            finetuned_model_id=model,
+            api_key="test-key",
+            response_cache=ResponseCache(db_path=tmp_path / "cache.db", cost_tracker=cost_system)
+        )
+        agent.client = FakeOpenAIClient()
+
+        agent.query("Should I use React or Vue?")
+        agent.query("Should I use React or Vue?")
+
+        request = agent.client.chat.completions.calls[0]
+        reply = f"{model}: {request['messages'][-1]['content']}"
+        expected = call_cost(
+            model,
+            count_tokens("".join(m["content"] for m in request["messages"])),
+            count_tokens(reply)
+        )
+        assert expected > 0
+        assert cost_system.get_savings_by_category()["response_cache"] == pytest.approx(expected)
+        cost_system.close()
+
+    @pytest.mark.asyncio
+    async def test_async_agent_uses_cache(self, tmp_path):
+        """Test aquery serves a repeated query from the cache"""
+        agent = AsyncLevel1Agent(
+            finetuned_model_id="ft:test-model",
+            api_key="test-key",
+            response_cache=ResponseCache(db_path=tmp_path / "cache.db")
+        )
+        agent.async_client = SimpleNamespace(
+            chat=SimpleNamespace(completions=FakeAsyncCompletions())
+        )
+
+        first = await agent.aquery("Should I use React or Vue?")
+        second = await agent.aquery("should I use react or vue")
+
+        assert len(agent.async_client.chat.completions.calls) == 1
+        assert second.response == first.response
+        assert second.stats["cache_tier"] == "exact"
+        assert agent.get_cache_stats()["response"]["cost_saved"] > 0
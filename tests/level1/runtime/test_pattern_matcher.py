@@ -0,0 +1,224 @@
+"""
+Tests for Level 1 runtime pattern detection
+
+Tests:
+1. Aho-Corasick keyword automaton matches substring semantics
+2. PatternMatcher scoring and signals
+3. Batch detection with a query x pattern confidence matrix
+"""
+
+import numpy as np
+import pytest
+
+from src.common.keyword_automaton import KeywordAutomaton
+from src.level1.runtime.pattern_matcher import PatternMatcher
+
+
+SAMPLE_QUERIES = [
+    "My API is returning 500 errors intermittently. What could be wrong?",
+    "Should I optimize my algorithm from O(n log n) to O(n)?",
+    "Review my plan to use GraphQL instead of REST for our API",
+    "How do closures work in JavaScript?",
+    "NoSQL is faster than SQL, so we should always use it. Agree?",
+    "Should I use React or Vue for my new project?",
+    "I'm building a payment processing system. What should I consider?",
+    "Write a function to handle file uploads",
+    "Explain how HTTPS encryption works",
+    "What's the best database for my application?",
+    "",
+]
+
+
+@pytest.fixture
+def matcher():
+    """Create a PatternMatcher"""
+    return PatternMatcher()
+
+
+def reference_signals(rules, query_lower):
+    """Keyword/phrase signals computed with plain substring scans"""
+    signals = [f"keyword: {k}" for k in rules.get("keywords", []) if k in query_lower]
+    signals += [f"phrase: {p}" for p in rules.get("phrases", []) if p in query_lower]
+    return signals
+
+
+class TestKeywordAutomaton:
+    """Test the Aho-Corasick automaton"""
+
+    def test_overlapping_and_nested_terms(self):
+        """Test that overlapping and nested terms are all reported"""
+        automaton = KeywordAutomaton(["worth", "worth the", "is it worth", "the effort"])
+
+        assert automaton.find("is it worth the effort?") == {
+            "worth", "worth the", "is it worth", "the effort"
+        }
+
+    def test_failure_links(self):
+        """Test matches that require following failure links"""
+        automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+
+        assert automaton.find("ushers") == {"she", "he", "hers"}
+
+    def test_no_match(self):
+        """Test text with no terms"""
+        automaton = KeywordAutomaton(["debug", "error"])
+
+        assert automaton.find("hello world") == set()
+        assert automaton.find("") == set()
+
+    def test_duplicate_and_empty_terms_ignored(self):
+        """Test that duplicates and empty strings don't affect the vocabulary"""
+        automaton = KeywordAutomaton(["vs", "", "vs", " or "])
+
+        assert automaton.terms == ["vs", " or "]
+
+    def test_matches_substring_semantics(self):
+        """Test equivalence with `term in text` for every pattern term"""
+        matcher = PatternMatcher()
+        terms = matcher._engine.automaton.terms
+
+        for query in SAMPLE_QUERIES:
+            text = query.lower()
+            assert matcher._engine.automaton.find(text) == {t for t in terms if t in text}
+
+
+class TestPatternMatcher:
+    """Test pattern detection on top of the automaton"""
+
+    def test_signals_match_substring_scan(self, matcher):
+        """Test keyword/phrase signals equal the per-term substring scan, in rule order"""
+        for query in SAMPLE_QUERIES:
+            matches = {m.pattern_name: m for m in matcher.detect_patterns(query)}
+
+            for pattern_name, rules in matcher.pattern_rules.items():
+                expected = reference_signals(rules, query.lower())
+                actual = [
+                    s for s in matches[pattern_name].matched_signals
+                    if s.startswith(("keyword:", "phrase:"))
+                ] if pattern_name in matches else []
+                assert actual == expected
+
+    def test_sorted_by_confidence(self, matcher):
+        """Test results are sorted highest confidence first"""
+        for query in SAMPLE_QUERIES:
+            confidences = [m.confidence for m in matcher.detect_patterns(query)]
+            assert confidences == sorted(confidences, reverse=True)
+
+    def test_known_scores(self, matcher):
+        """Test scoring for a representative query"""
+        top = matcher.get_top_pattern("Should I use React or Vue for my new project?")
+
+        assert top.pattern_name == "Tradeoff Analysis"
+        assert top.confidence == pytest.approx(1.0)
+
+    def test_compile_rules_after_mutation(self, matcher):
+        """Test that recompiling picks up new keywords"""
+        matcher.pattern_rules["Gap Analysis"]["keywords"].append("blind spot")
+        matcher.compile_rules()
+
+        top = matcher.get_top_pattern("any blind spot here")
+        assert top.pattern_name == "Gap Analysis"
+        assert "keyword: blind spot" in top.matched_signals
+
+
+class TestBatchDetection:
+    """Test detect_patterns_batch and the matrix helpers"""
+
+    def test_matrix_shape(self, matcher):
+        """Test one row per query and one column per pattern"""
+        batch = matcher.detect_patterns_batch(SAMPLE_QUERIES)
+
+        assert batch.confidences.shape == (len(SAMPLE_QUERIES), len(matcher.pattern_rules))
+        assert batch.pattern_names == list(matcher.pattern_rules.keys())
+        assert len(batch) == len(SAMPLE_QUERIES)
+
+    def test_matches_per_query_detection(self, matcher):
+        """Test batch results equal detect_patterns exactly, including signals"""
+        batch = matcher.detect_patterns_batch(SAMPLE_QUERIES)
+
+        for i, query in enumerate(SAMPLE_QUERIES):
+            assert batch.matches(i) == matcher.detect_patterns(query)
+
+    def test_top_patterns(self, matcher):
+        """Test top pattern per query equals get_top_pattern"""
+        batch = matcher.detect_patterns_batch(SAMPLE_QUERIES)
+
+        for query, top in zip(SAMPLE_QUERIES, batch.top_patterns()):
+            assert top == matcher.get_top_pattern(query)
+
+    def test_top_k(self, matcher):
+        """Test top-k truncates the sorted matches"""
+        batch = matcher.detect_patterns_batch(SAMPLE_QUERIES)
+
+        for i, top in enumerate(batch.top_k(2)):
+            assert top == matcher.detect_patterns(SAMPLE_QUERIES[i])[:2]
+
+    def test_above_threshold(self, matcher):
+        """Test thresholding equals get_patterns_above_threshold"""
+        batch = matcher.detect_patterns_batch(SAMPLE_QUERIES)
+
+        for query, above in zip(SAMPLE_QUERIES, batch.above_threshold(0.5)):
+            assert above == matcher.get_patterns_above_threshold(query, 0.5)
+
+    def test_without_signals(self, matcher):
+        """Test confidences are unchanged when signals are skipped"""
+        with_signals = matcher.detect_patterns_batch(SAMPLE_QUERIES)
+        without_signals = matcher.detect_patterns_batch(SAMPLE_QUERIES, include_signals=False)
+
+        assert without_signals.signals is None
+        assert np.array_equal(with_signals.confidences, without_signals.confidences)
+        assert all(m.matched_signals == [] for m in without_signals.matches(0))
+
+    def test_empty_batch(self, matcher):
+        """Test an empty batch"""
+        batch = matcher.detect_patterns_batch([])
+
+        assert batch.confidences.shape == (0, len(matcher.pattern_rules))
+        assert batch.top_patterns() == []
+
+
+class TestDetectionCache:
+    """Test the LRU cache in front of detect_patterns"""
+
+    def test_repeat_query_hits_cache(self, matcher):
+        """Test a repeated query is served from the cache with identical results"""
+        first = matcher.detect_patterns(SAMPLE_QUERIES[0])
+        second = matcher.detect_patterns(SAMPLE_QUERIES[0])
+
+        assert first == second
+        assert matcher.detection_cache.hits == 1
+        assert matcher.detection_cache.misses == 1
+
+    def test_key_is_case_insensitive(self, matcher):
+        """Test queries differing only in case share an entry"""
+        matcher.detect_patterns("Should I use React or Vue?")
+        matcher.detect_patterns("should i use react or vue?")
+
+        assert matcher.detection_cache.hits == 1
+
+    def test_cached_results_are_isolated(self, matcher):
+        """Test mutating returned matches doesn't corrupt the cache"""
+        first = matcher.detect_patterns(SAMPLE_QUERIES[0])
+        first[0].matched_signals.append("tampered")
+        first.clear()
+
+        assert matcher.detect_patterns(SAMPLE_QUERIES[0]) == PatternMatcher(
+            cache_size=0
+        ).detect_patterns(SAMPLE_QUERIES[0])
+
+    def test_compile_rules_clears_cache(self, matcher):
+        """Test recompiling invalidates cached results"""
+        matcher.detect_patterns("any blind spot here")
+        matcher.pattern_rules["Gap Analysis"]["keywords"].append("blind spot")
+        matcher.compile_rules()
+
+        top = matcher.get_top_pattern("any blind spot here")
+        assert top.pattern_name == "Gap Analysis"
+
+    def test_bounded(self):
+        """Test the cache never exceeds its configured size"""
+        matcher = PatternMatcher(cache_size=3)
+        for query in SAMPLE_QUERIES:
+            matcher.detect_patterns(query)
+
+        assert len(matcher.detection_cache) == 3
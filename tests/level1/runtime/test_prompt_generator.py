@@ -0,0 +1,87 @@
+"""
+Tests for augmented prompt generation
+
+Tests:
+1. System prompt assembly from top patterns
+2. Memoization per (ordered patterns, top_n)
+"""
+
+import pytest
+
+from src.level1.runtime.pattern_matcher import PatternMatch
+from src.level1.runtime.prompt_generator import PromptGenerator
+
+
+def make_matches(*names):
+    """Build PatternMatch objects with descending confidence"""
+    return [
+        PatternMatch(pattern_name=name, confidence=1.0 - i * 0.1, matched_signals=[])
+        for i, name in enumerate(names)
+    ]
+
+
+@pytest.fixture
+def generator():
+    """Create a PromptGenerator"""
+    return PromptGenerator()
+
+
+class TestPromptGeneration:
+    """Test system prompt assembly"""
+
+    def test_augmentations_in_order(self, generator):
+        """Test top-N augmentations are appended in ranking order"""
+        prompt = generator.generate_augmented_prompt(
+            "query", make_matches("Gap Analysis", "Tradeoff Analysis", "Brutal Accuracy"), top_n=2
+        )
+
+        assert prompt.augmentation_applied == ["Gap Analysis", "Tradeoff Analysis"]
+        assert prompt.system_prompt == "\n".join([
+            generator.base_system_prompt,
+            "\n**Context for this query:**",
+            generator.pattern_augmentations["Gap Analysis"],
+            generator.pattern_augmentations["Tradeoff Analysis"],
+        ])
+        assert prompt.user_prompt == "query"
+
+    def test_no_patterns(self, generator):
+        """Test the base prompt is used when nothing is detected"""
+        prompt = generator.generate_augmented_prompt("query", [], top_n=2)
+
+        assert prompt.system_prompt == generator.base_system_prompt
+        assert prompt.augmentation_applied == []
+
+
+class TestPromptMemoization:
+    """Test the system prompt cache"""
+
+    def test_same_patterns_reuse_prompt(self, generator):
+        """Test the same ordered patterns reuse the assembled string"""
+        first = generator.generate_augmented_prompt("a", make_matches("Gap Analysis"), top_n=2)
+        second = generator.generate_augmented_prompt("b", make_matches("Gap Analysis"), top_n=2)
+
+        assert second.system_prompt is first.system_prompt
+        assert second.user_prompt == "b"
+        assert generator.prompt_cache.hits == 1
+
+    def test_order_and_top_n_are_part_of_key(self, generator):
+        """Test different order or top_n produce separate entries"""
+        generator.generate_augmented_prompt("q", make_matches("Gap Analysis", "Brutal Accuracy"))
+        reordered = generator.generate_augmented_prompt(
+            "q", make_matches("Brutal Accuracy", "Gap Analysis")
+        )
+        generator.generate_augmented_prompt(
+            "q", make_matches("Gap Analysis", "Brutal Accuracy"), top_n=3
+        )
+
+        assert reordered.augmentation_applied == ["Brutal Accuracy", "Gap Analysis"]
+        assert generator.prompt_cache.hits == 0
+        assert len(generator.prompt_cache) == 3
+
+    def test_returned_augmentations_are_isolated(self, generator):
+        """Test mutating the returned list doesn't corrupt the cache"""
+        first = generator.generate_augmented_prompt("q", make_matches("Gap Analysis"))
+        first.augmentation_applied.append("tampered")
+
+        second = generator.generate_augmented_prompt("q", make_matches("Gap Analysis"))
+        assert second.augmentation_applied == ["Gap Analysis"]
@@ -0,0 +1,253 @@
+"""
+Tests for the generation cache
+
+Tests:
+1. Canonical fingerprints
+2. Replaying valid generations instead of prompting
+3. Invalid generations are stored but never replayed
+4. Offline (replay-only) mode
+5. Hit counts and cost savings
+"""
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from src.common.config import Config
+from src.level2.crawl.build_vs_buy_analyzer import AcquisitionType, BuildOption, BuyOption
+from src.level2.crawl.generation_cache import (
+    GenerationCache,
+    GenerationCacheMiss,
+    generation_fingerprint
+)
+from src.level2.crawl.capability_evolution_engine import CapabilityEvolutionEngine
+from src.level2.crawl.tool_acquisition_engine import ToolAcquisitionEngine
+from src.level2.walk.cost_management_system import CostManagementSystem
+from src.level2.walk.unified_walk_orchestrator import UnifiedWALKOrchestrator
+
+
+VALID = "class ProductionReadiness:\n    def analyze(self, code):\n        return {'score': 1.0}\n"
+
+PATTERN = {'name': 'Production Readiness', 'description': 'Tests, type hints, docs'}
+CAPABILITIES = ['Type hint checking', 'docstring  coverage']
+BUILD_OPTION = BuildOption(
+    complexity=3, estimated_hours=2.0, lines_of_code=100,
+    dependencies=[], testing_effort=2, maintenance_score=2
+)
+LIBRARY = BuyOption(
+    source='pylint', acquisition_type=AcquisitionType.LIBRARY,
+    cost_per_month=0.0, setup_hours=1.0, learning_curve=3,
+    vendor_lock_in=2, maturity_score=9
+)
+
+
+class FakeModels:
+    """models stand-in replying with the given texts in order"""
+
+    def __init__(self, *texts):
+        self.texts = list(texts)
+        self.calls = 0
+
+    def generate_content(self, model, contents, config):
+        text = self.texts[min(self.calls, len(self.texts) - 1)]
+        self.calls += 1
+        return SimpleNamespace(text=f"```python\n{text}\n```")
+
+
+def make_engine(cache, *texts):
+    engine = ToolAcquisitionEngine(gemini_api_key="test-key", generation_cache=cache)
+    models = FakeModels(*texts)
+    engine.client = SimpleNamespace(models=models)
+    return engine, models
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GenerationCache(db_path=tmp_path / "generation_cache.db")
+
+
+class TestFingerprint:
+    """Test canonical keys"""
+
+    def test_capability_order_and_spacing_ignored(self):
+        """Test capability order, case and spacing share a key"""
+        a = generation_fingerprint('Production Readiness', ['B cap', 'a  cap'], 'build')
+        b = generation_fingerprint('Production Readiness ', ['A cap', 'b cap', 'a cap'], 'build')
+        assert a == b
+
+    def test_source_and_version_distinguish(self):
+        """Test library source and template version change the key"""
+        base = generation_fingerprint('P', ['x'], 'library', source='pylint')
+        assert base != generation_fingerprint('P', ['x'], 'library', source='mypy')
+        assert base != generation_fingerprint(
+            'P', ['x'], 'library', source='pylint', template_version='2'
+        )
+
+
+class TestGenerationReplay:
+    """Test replay through ToolAcquisitionEngine"""
+
+    def test_build_replayed(self, cache):
+        """A second identical BUILD doesn't prompt again"""
+        engine, models = make_engine(cache, VALID)
+
+        first = engine._build_tool(PATTERN, BUILD_OPTION, CAPABILITIES)
+        second = engine._build_tool(PATTERN, BUILD_OPTION, list(reversed(CAPABILITIES)))
+
+        assert models.calls == 1
+        assert second.code == first.code
+        assert second.metadata['generation_cache'] == 'hit'
+        assert second.metadata['cache_hit_count'] == 1
+
+    def test_different_capabilities_miss(self, cache):
+        """Test different capabilities prompt again"""
+        engine, models = make_engine(cache, VALID)
+
+        engine._build_tool(PATTERN, BUILD_OPTION, CAPABILITIES)
+        engine._build_tool(PATTERN, BUILD_OPTION, ['security scanning'])
+
+        assert models.calls == 2
+
+    def test_library_wrapper_replayed(self, cache):
+        """Test a second identical library wrapper is replayed"""
+        engine, models = make_engine(cache, VALID)
+
+        engine._acquire_library(PATTERN, LIBRARY, CAPABILITIES)
+        tool = engine._acquire_library(PATTERN, LIBRARY, CAPABILITIES)
+
+        assert models.calls == 1
+        assert tool.metadata['library_name'] == 'pylint'
+        assert tool.metadata['generation_cache'] == 'hit'
+
+    def test_invalid_generation_not_replayed(self, cache):
+        """Code failing validation is stored but the next call regenerates"""
+        engine, models = make_engine(cache, "def broken(:", VALID)
+
+        with pytest.raises(ValueError, match="syntax errors"):
+            engine._build_tool(PATTERN, BUILD_OPTION, CAPABILITIES)
+        assert cache.stats()['entries'] == 1
+        assert cache.stats()['valid_entries'] == 0
+
+        tool = engine._build_tool(PATTERN, BUILD_OPTION, CAPABILITIES)
+        assert tool.code == VALID.strip()
+        assert models.calls == 2
+        assert cache.stats()['valid_entries'] == 1
+
+    def test_offline_replay(self, cache, tmp_path):
+        """Offline mode replays hits and raises on misses without calling the model"""
+        make_engine(cache, VALID)[0]._build_tool(PATTERN, BUILD_OPTION, CAPABILITIES)
+
+        offline = GenerationCache(db_path=tmp_path / "generation_cache.db", offline=True)
+        engine, models = make_engine(offline, VALID)
+
+        assert engine._build_tool(PATTERN, BUILD_OPTION, CAPABILITIES).code == VALID.strip()
+        with pytest.raises(GenerationCacheMiss):
+            engine._build_tool(PATTERN, BUILD_OPTION, ['something new'])
+        assert models.calls == 0
+
+
+class TestGenerationSavings:
+    """Test hit counts and savings reporting"""
+
+    def test_hits_recorded_as_savings(self, tmp_path):
+        """Test each hit records the charged cost as a saving"""
+        costs = CostManagementSystem(db_path=tmp_path / "costs.db")
+        cache = GenerationCache(db_path=tmp_path / "generation_cache.db", cost_tracker=costs)
+        engine, _ = make_engine(cache, VALID)
+        engine.cost_system = costs
+        engine.cost_per_generation = 1.5
+
+        for _ in range(3):
+            engine._build_tool(PATTERN, BUILD_OPTION, CAPABILITIES)
+
+        stats = cache.stats()
+        assert stats['hits'] == 2
+        assert stats['total_hits'] == 2
+        assert stats['total_cost_saved'] == pytest.approx(3.0)
+        assert costs.get_savings_by_category()['generation_cache'] == pytest.approx(3.0)
+
+    def test_uncharged_generations_save_nothing(self, tmp_path):
+        """Test that hits on generations nobody was charged for report no savings"""
+        costs = CostManagementSystem(db_path=tmp_path / "costs.db")
+        cache = GenerationCache(db_path=tmp_path / "generation_cache.db", cost_tracker=costs)
+        engine, _ = make_engine(cache, VALID)
+
+        for _ in range(2):
+            engine._build_tool(PATTERN, BUILD_OPTION, CAPABILITIES)
+            engine._acquire_library(PATTERN, LIBRARY, CAPABILITIES)
+
+        assert cache.stats()['hits'] == 2
+        assert cache.stats()['cost_saved'] == 0.0
+        assert costs.get_savings_by_category() == {}
+
+    def test_replayed_metadata_has_no_cost(self, tmp_path):
+        """Test that a replayed BUILD doesn't carry the original generation cost"""
+        costs = CostManagementSystem(db_path=tmp_path / "costs.db")
+        cache = GenerationCache(db_path=tmp_path / "generation_cache.db")
+        engine, _ = make_engine(cache, VALID)
+        engine.cost_system = costs
+
+        first = engine._build_tool(PATTERN, BUILD_OPTION, CAPABILITIES)
+        second = engine._build_tool(PATTERN, BUILD_OPTION, CAPABILITIES)
+
+        assert first.metadata['generation_cost'] == engine.cost_per_generation
+        assert 'generation_cost' not in second.metadata
+
+
+class TestCacheLocking:
+    """Test that lookups only write on a hit"""
+
+    def test_miss_does_not_take_write_lock(self, cache):
+        """Test that a miss returns while another connection holds the write lock"""
+        writer = sqlite3.connect(cache.db_path, isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            assert cache.get(generation_fingerprint('P', ['x'], 'build')) is None
+        finally:
+            writer.execute("ROLLBACK")
+            writer.close()
+
+        assert cache.stats()['misses'] == 1
+
+    def test_hit_updates_count(self, cache):
+        """Test that each hit bumps the shared hit count"""
+        fingerprint = generation_fingerprint('P', ['x'], 'build')
+        cache.put(fingerprint, VALID, valid=True)
+
+        assert cache.get(fingerprint).hit_count == 1
+        assert cache.get(fingerprint).hit_count == 2
+
+
+class TestDefaultWiring:
+    """Test that the shipped entry points construct a generation cache"""
+
+    def test_evolution_engine_cache_is_opt_in(self, tmp_path, monkeypatch):
+        """Test that CapabilityEvolutionEngine only replays through a cache it's given"""
+        monkeypatch.setattr(Config, 'DATA_DIR', tmp_path)
+        config_path = tmp_path / "approval_settings.yaml"
+        config_path.write_text("bypass_approval: {}\n")
+        costs = CostManagementSystem(db_path=tmp_path / "costs.db")
+        cache = GenerationCache(db_path=tmp_path / "gen.db", cost_tracker=costs)
+
+        default = CapabilityEvolutionEngine(gemini_api_key="test-key", config_path=config_path)
+        evolution = CapabilityEvolutionEngine(
+            gemini_api_key="test-key", config_path=config_path, generation_cache=cache
+        )
+
+        assert default.engine.generation_cache is None
+        assert not (tmp_path / "generation_cache.db").exists()
+        assert evolution.engine.generation_cache is cache
+
+    def test_orchestrator_shares_cache(self, tmp_path, monkeypatch):
+        """Test that both WALK engines share one cache reporting to the cost system"""
+        monkeypatch.setattr(Config, 'DATA_DIR', tmp_path)
+
+        orchestrator = UnifiedWALKOrchestrator(
+            gemini_api_key="test-key", enable_tool_memory=False
+        )
+        cache = orchestrator.generation_cache
+
+        assert orchestrator.library_engine.tool_engine.generation_cache is cache
+        assert orchestrator.api_engine.tool_engine.generation_cache is cache
+        assert cache.cost_tracker is orchestrator.cost_system
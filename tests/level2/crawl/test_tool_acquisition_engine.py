@@ -0,0 +1,211 @@
+"""
+Tests for ToolAcquisitionEngine multi-candidate generation
+
+Tests:
+1. Static validation of the tool contract
+2. First valid candidate wins, slower requests are cancelled
+3. Invalid candidates (syntax, contract, smoke run) are rejected
+4. Generation cost is capped by the budget
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.level2.crawl.build_vs_buy_analyzer import BuildOption
+from src.level2.crawl.tool_acquisition_engine import ToolAcquisitionEngine, validate_tool_code
+from src.level2.crawl.tool_sandbox import SandboxPool
+from src.level2.walk.cost_management_system import BudgetPeriod, CostManagementSystem
+
+
+VALID = '''
+class ProductionReadiness:
+    def analyze(self, code, file_path=None):
+        return {'score': 0.5, 'checks': {}, 'issues': [], 'suggestions': []}
+'''
+
+RAISES = '''
+class ProductionReadiness:
+    def analyze(self, code, file_path=None):
+        raise RuntimeError("broken")
+'''
+
+ASYNC_VALID = '''
+import asyncio
+
+class ProductionReadiness:
+    async def analyze(self, code, file_path=None):
+        await asyncio.sleep(0)
+        return {'score': 0.5, 'checks': {}, 'issues': [], 'suggestions': []}
+'''
+
+NO_ANALYZE = '''
+class ProductionReadiness:
+    def check(self, code):
+        return {}
+'''
+
+PATTERN = {'name': 'Production Readiness', 'description': 'Tests, type hints, docs'}
+BUILD_OPTION = BuildOption(
+    complexity=3, estimated_hours=2.0, lines_of_code=100,
+    dependencies=[], testing_effort=2, maintenance_score=2
+)
+
+
+class FakeAsyncModels:
+    """aio.models stand-in replying with (delay, text) per request, in order"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def generate_content(self, model, contents, config):
+        delay, text = self.replies[self.calls]
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return SimpleNamespace(text=f"```python\n{text}\n```")
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with SandboxPool(max_workers=2, cpu_seconds=10, memory_mb=0, timeout=30) as sandbox:
+        yield sandbox
+
+
+def make_engine(replies, pool, **kwargs):
+    engine = ToolAcquisitionEngine(gemini_api_key="test-key", sandbox=pool, **kwargs)
+    models = FakeAsyncModels(replies)
+    engine.client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    return engine, models
+
+
+class TestValidateToolCode:
+    """Test static contract checks"""
+
+    def test_valid(self):
+        """Test a well-formed tool passes"""
+        assert validate_tool_code(VALID, 'ProductionReadiness') is None
+
+    def test_syntax_error(self):
+        """Test unparseable code is rejected"""
+        assert validate_tool_code("class X(:\n", 'X').startswith("Syntax error")
+
+    def test_missing_analyze(self):
+        """Test a class without analyze() is rejected"""
+        assert "no analyze()" in validate_tool_code(NO_ANALYZE, 'ProductionReadiness')
+
+    def test_analyze_without_code_argument(self):
+        """Test analyze() must accept the code argument"""
+        code = "class T:\n    def analyze(self):\n        return {}\n"
+        assert "code argument" in validate_tool_code(code, 'T')
+
+    def test_async_analyze(self):
+        """Test an async analyze() satisfies the contract"""
+        assert validate_tool_code(ASYNC_VALID, 'ProductionReadiness') is None
+
+
+class TestCandidateGeneration:
+    """Test racing several generations"""
+
+    def test_first_valid_candidate_wins(self, pool):
+        """Fast invalid candidates are skipped; the slow one is cancelled"""
+        engine, models = make_engine(
+            [(0.0, "class Broken(:"), (0.0, NO_ANALYZE), (0.05, VALID), (5.0, VALID)],
+            pool, candidates=4
+        )
+
+        tool = engine._build_tool(PATTERN, BUILD_OPTION)
+
+        assert tool.code == VALID.strip()
+        assert tool.metadata['winning_candidate'] == 2
+        assert tool.metadata['candidates'] == 4
+        assert len(tool.metadata['rejected_candidates']) == 2
+        assert models.cancelled == 1
+
+    def test_smoke_run_failure_rejected(self, pool):
+        """A candidate whose analyze() raises in the sandbox loses"""
+        engine, _ = make_engine([(0.0, RAISES), (0.1, VALID)], pool, candidates=2)
+
+        tool = engine._build_tool(PATTERN, BUILD_OPTION)
+
+        assert tool.metadata['winning_candidate'] == 1
+        assert "Smoke run failed" in tool.metadata['rejected_candidates'][0]
+
+    def test_async_candidate_smoke_run(self, pool):
+        """Test an async analyze() is awaited in the sandbox smoke run"""
+        engine, _ = make_engine([(0.0, ASYNC_VALID), (5.0, VALID)], pool, candidates=2)
+
+        tool = engine._build_tool(PATTERN, BUILD_OPTION)
+
+        assert tool.metadata['winning_candidate'] == 0
+        assert tool.code == ASYNC_VALID.strip()
+
+    def test_called_from_running_event_loop(self, pool):
+        """Test acquisition works when the caller is inside an event loop"""
+        engine, _ = make_engine([(0.0, VALID), (5.0, VALID)], pool, candidates=2)
+
+        async def caller():
+            return engine._build_tool(PATTERN, BUILD_OPTION)
+
+        tool = asyncio.run(caller())
+
+        assert tool.metadata['winning_candidate'] == 0
+
+    def test_all_candidates_invalid(self, pool):
+        """Test generation fails when no candidate validates"""
+        engine, _ = make_engine([(0.0, NO_ANALYZE), (0.0, "def f(:")], pool, candidates=2)
+
+        with pytest.raises(ValueError, match="All 2 generated candidates failed"):
+            engine._build_tool(PATTERN, BUILD_OPTION)
+
+
+class TestGenerationBudget:
+    """Test cost cap enforcement"""
+
+    def test_budget_limits_candidates(self, pool, tmp_path):
+        """Only as many candidates as the budget covers are requested"""
+        costs = CostManagementSystem(db_path=tmp_path / "costs.db")
+        costs.set_budget(BudgetPeriod.MONTHLY, 2.0)
+        engine, models = make_engine(
+            [(0.0, VALID)] * 4, pool, candidates=4, cost_system=costs, cost_per_generation=1.0
+        )
+
+        tool = engine._build_tool(PATTERN, BUILD_OPTION)
+
+        assert models.calls == 2
+        assert tool.metadata['generation_cost'] == 2.0
+        assert costs.get_spending_by_category()['tool_generation'] == 2.0
+
+    def test_cancelled_candidates_release_their_hold(self, pool, tmp_path):
+        """Only candidates whose request completed are charged"""
+        costs = CostManagementSystem(db_path=tmp_path / "costs.db")
+        costs.set_budget(BudgetPeriod.MONTHLY, 10.0)
+        engine, models = make_engine(
+            [(0.0, VALID), (5.0, VALID), (5.0, VALID)], pool,
+            candidates=3, cost_system=costs, cost_per_generation=1.0
+        )
+
+        tool = engine._build_tool(PATTERN, BUILD_OPTION)
+
+        assert models.cancelled == 2
+        assert tool.metadata['generation_cost'] == 1.0
+        assert costs.get_spending_by_category()['tool_generation'] == 1.0
+        assert costs.get_budget_status()['monthly']['reserved'] == 0.0
+
+    def test_exhausted_budget_blocks_generation(self, pool, tmp_path):
+        """Test no candidate is requested once the budget is spent"""
+        costs = CostManagementSystem(db_path=tmp_path / "costs.db")
+        costs.set_budget(BudgetPeriod.MONTHLY, 0.5)
+        engine, models = make_engine(
+            [(0.0, VALID)], pool, candidates=2, cost_system=costs, cost_per_generation=1.0
+        )
+
+        with pytest.raises(ValueError, match="blocked by budget"):
+            engine._build_tool(PATTERN, BUILD_OPTION)
+        assert models.calls == 0
@@ -0,0 +1,530 @@
+"""
+Tests for UnifiedAgentPipeline tool execution
+
+Tests:
+1. Tools run concurrently in a bounded pool
+2. Deterministic result order
+3. Per-tool timeouts and error reporting
+4. Content-addressed tool result cache
+5. Lazy registration and the bytecode cache
+6. Sandboxed worker-process execution
+"""
+
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.level2.crawl.tool_acquisition_engine import GeneratedTool
+from src.level2.crawl.tool_bytecode_cache import BytecodeCache
+from src.level2.crawl.tool_result_cache import ToolResultCache
+from src.level2.crawl.tool_sandbox import SandboxPool, ToolSandboxError
+from src.level2.crawl.unified_agent_pipeline import ToolRegistry, UnifiedAgentPipeline
+
+
+class SleepyTool:
+    """Tool that sleeps, then returns its name; tracks concurrency"""
+
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def __init__(self, name, delay=0.0, fail=False, timeout=None):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        if timeout is not None:
+            self.timeout = timeout
+
+    def analyze(self, code):
+        with SleepyTool.lock:
+            SleepyTool.active += 1
+            SleepyTool.max_active = max(SleepyTool.max_active, SleepyTool.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError(f"{self.name} failed")
+            return {'score': 1.0, 'tool': self.name, 'input': code}
+        finally:
+            with SleepyTool.lock:
+                SleepyTool.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def reset_counters():
+    SleepyTool.active = 0
+    SleepyTool.max_active = 0
+
+
+def make_pipeline(tools_by_pattern, **kwargs):
+    """Pipeline with tools registered directly and a fake Gemini client"""
+    registry = ToolRegistry()
+    registry.tools = tools_by_pattern
+
+    pipeline = UnifiedAgentPipeline(gemini_api_key="test-key", tool_registry=registry, **kwargs)
+    pipeline.client = SimpleNamespace(models=SimpleNamespace(
+        generate_content=lambda model, contents, config: SimpleNamespace(text="answer")
+    ))
+    return pipeline
+
+
+# "production ready" routes to Production Readiness; "tradeoff" to Tradeoff Analysis
+QUERY = "Is this production ready? What's the tradeoff?"
+
+
+class TestParallelTools:
+    """Test concurrent tool execution"""
+
+    def test_tools_run_concurrently(self):
+        """Test total latency is close to the slowest tool, not the sum"""
+        pipeline = make_pipeline({
+            'Production Readiness': [SleepyTool("a", delay=0.3)],
+            'Tradeoff Analysis': [SleepyTool("b", delay=0.3)],
+        })
+
+        start = time.monotonic()
+        result = pipeline.process(QUERY, "x = 1")
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.55
+        assert SleepyTool.max_active == 2
+        assert result['tool_results']['Production Readiness_tool']['input'] == "x = 1"
+
+    def test_pool_is_bounded(self):
+        """Test no more than max_tool_workers tools run at once"""
+        pipeline = make_pipeline({
+            'Production Readiness': [SleepyTool(str(i), delay=0.05) for i in range(3)],
+            'Tradeoff Analysis': [SleepyTool(str(i), delay=0.05) for i in range(3)],
+        }, max_tool_workers=2)
+
+        pipeline.process(QUERY)
+
+        assert SleepyTool.max_active == 2
+
+    def test_deterministic_order(self):
+        """Test results follow pattern order even when later tools finish first"""
+        pipeline = make_pipeline({
+            'Production Readiness': [SleepyTool("slow", delay=0.2)],
+            'Tradeoff Analysis': [SleepyTool("fast")],
+        })
+
+        result = pipeline.process(QUERY)
+
+        assert result['tools_used'] == ['Production Readiness_tool', 'Tradeoff Analysis_tool']
+        assert list(result['tool_results']) == result['tools_used']
+
+    def test_last_tool_of_pattern_wins(self):
+        """Test several tools for one pattern keep serial overwrite semantics"""
+        pipeline = make_pipeline({
+            'Production Readiness': [SleepyTool("first"), SleepyTool("second", delay=0.1)],
+        })
+
+        result = pipeline.process("production ready?")
+
+        assert result['tool_results']['Production Readiness_tool']['tool'] == "second"
+
+    def test_tool_error_reported(self):
+        """Test a failing tool is reported without affecting others"""
+        pipeline = make_pipeline({
+            'Production Readiness': [SleepyTool("bad", fail=True)],
+            'Tradeoff Analysis': [SleepyTool("good")],
+        })
+
+        result = pipeline.process(QUERY)
+
+        assert result['tool_results']['Production Readiness_tool'] == {
+            'error': "bad failed", 'score': 0.0
+        }
+        assert result['tool_results']['Tradeoff Analysis_tool']['score'] == 1.0
+
+
+class TestToolTimeouts:
+    """Test slow tools are reported instead of stalling the response"""
+
+    def test_slow_tool_times_out(self):
+        """Test a tool past the timeout is reported as timed out"""
+        pipeline = make_pipeline({
+            'Production Readiness': [SleepyTool("slow", delay=2.0)],
+            'Tradeoff Analysis': [SleepyTool("fast")],
+        }, tool_timeout=0.1)
+
+        start = time.monotonic()
+        result = pipeline.process(QUERY)
+
+        assert time.monotonic() - start < 1.0
+        assert result['tool_results']['Production Readiness_tool']['timed_out'] is True
+        assert result['tool_results']['Tradeoff Analysis_tool']['score'] == 1.0
+        assert result['metadata']['timed_out_tools'] == ['Production Readiness_tool']
+
+    def test_tool_timeout_override(self):
+        """Test a tool's own timeout attribute overrides the pipeline default"""
+        pipeline = make_pipeline({
+            'Production Readiness': [SleepyTool("slow", delay=0.3, timeout=1.0)],
+        }, tool_timeout=0.05)
+
+        result = pipeline.process("production ready?")
+
+        assert result['metadata']['timed_out_tools'] == []
+        assert result['tool_results']['Production Readiness_tool']['score'] == 1.0
+
+    def test_queued_tool_not_stalled(self):
+        """Test a tool stuck behind an abandoned one still times out"""
+        pipeline = make_pipeline({
+            'Production Readiness': [SleepyTool("stuck", delay=2.0)],
+            'Tradeoff Analysis': [SleepyTool("queued")],
+        }, max_tool_workers=1, tool_timeout=0.1)
+
+        start = time.monotonic()
+        result = pipeline.process(QUERY)
+
+        assert time.monotonic() - start < 1.0
+        assert result['metadata']['timed_out_tools'] == [
+            'Production Readiness_tool', 'Tradeoff Analysis_tool'
+        ]
+        pipeline.close()
+
+
+COUNTING_TOOL = """
+class CountingTool:
+    calls = []
+    file_dependencies = DEPENDENCIES
+
+    def analyze(self, code):
+        CountingTool.calls.append(code)
+        if code == "boom":
+            return {'error': 'boom', 'score': 0.0}
+        return {'score': 0.5, 'length': len(code)}
+"""
+
+
+def counting_tool(dependencies=(), version=1):
+    """GeneratedTool whose class records every analyze() call"""
+    code = COUNTING_TOOL.replace("DEPENDENCIES", repr([str(d) for d in dependencies]))
+    return GeneratedTool(
+        name="CountingTool",
+        code=code + f"\n# version {version}\n",
+        pattern_name="Production Readiness",
+        acquisition_type="build",
+        metadata={}
+    )
+
+
+def register(cache, tool):
+    """Register a tool and return (registered tool, its analyze() call log)"""
+    registry = ToolRegistry(result_cache=cache)
+    registry.register(tool, "Production Readiness")
+    registered = registry.get_tools_for_pattern("Production Readiness")[0]
+    return registered, registered.instance.calls
+
+
+class TestToolResultCache:
+    """Test cached tool analyses"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return ToolResultCache(cache_dir=tmp_path / "results")
+
+    def test_same_input_runs_once(self, cache):
+        """Test a repeated input is served from the cache"""
+        tool, calls = register(cache, counting_tool())
+
+        assert tool.analyze("x = 1") == {'score': 0.5, 'length': 5}
+        assert tool.analyze("x = 1") == {'score': 0.5, 'length': 5}
+        tool.analyze("x = 22")
+
+        assert calls == ["x = 1", "x = 22"]
+        assert cache.stats()['hits'] == 1
+
+    def test_code_change_misses(self, cache):
+        """Test a new version of the tool code doesn't reuse old results"""
+        first, first_calls = register(cache, counting_tool(version=1))
+        second, second_calls = register(cache, counting_tool(version=2))
+
+        first.analyze("x = 1")
+        second.analyze("x = 1")
+
+        assert first_calls == ["x = 1"]
+        assert second_calls == ["x = 1"]
+
+    def test_persists_across_instances(self, cache, tmp_path):
+        """Test results written by one cache are hits for a new one on the same directory"""
+        tool, _ = register(cache, counting_tool())
+        tool.analyze("x = 1")
+
+        tool, calls = register(ToolResultCache(cache_dir=tmp_path / "results"), counting_tool())
+
+        assert tool.analyze("x = 1") == {'score': 0.5, 'length': 5}
+        assert calls == []
+
+    def test_lru_eviction(self, tmp_path):
+        """Test least recently used entries are evicted, on disk too"""
+        cache = ToolResultCache(cache_dir=tmp_path / "results", max_entries=2)
+        tool, calls = register(cache, counting_tool())
+
+        tool.analyze("a")
+        tool.analyze("b")
+        tool.analyze("a")
+        tool.analyze("c")
+        tool.analyze("a")
+        tool.analyze("b")
+
+        assert calls == ["a", "b", "c", "b"]
+        assert len(list((tmp_path / "results").glob("*.json"))) == 2
+
+    def test_file_dependency_invalidates(self, cache, tmp_path):
+        """Test modifying a declared dependency re-runs the tool"""
+        dependency = tmp_path / "module.py"
+        dependency.write_text("x = 1")
+        tool, calls = register(cache, counting_tool(dependencies=[dependency]))
+
+        tool.analyze("payload")
+        tool.analyze("payload")
+        stat = dependency.stat()
+        os.utime(dependency, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        tool.analyze("payload")
+
+        assert calls == ["payload", "payload"]
+        assert cache.stats()['invalidations'] == 1
+
+    def test_errors_not_cached(self, cache):
+        """Test error results are re-run next time"""
+        tool, calls = register(cache, counting_tool())
+
+        tool.analyze("boom")
+        tool.analyze("boom")
+
+        assert calls == ["boom", "boom"]
+
+    def test_pipeline_uses_cache(self, cache):
+        """Test process() reuses tool results for the same code"""
+        registry = ToolRegistry(result_cache=cache)
+        registry.register(counting_tool(), "Production Readiness")
+        pipeline = make_pipeline(registry.tools)
+
+        pipeline.process("production ready?", "x = 1")
+        result = pipeline.process("production ready?", "x = 1")
+
+        assert result['tool_results']['Production Readiness_tool'] == {'score': 0.5, 'length': 5}
+        assert registry.tools["Production Readiness"][0].instance.calls == ["x = 1"]
+
+
+BROKEN_TOOL = GeneratedTool(
+    name="BrokenTool",
+    code="raise RuntimeError('import-time failure')",
+    pattern_name="Tradeoff Analysis",
+    acquisition_type="build",
+    metadata={}
+)
+
+
+class TestLazyRegistration:
+    """Test tools are compiled and instantiated on first use"""
+
+    def test_register_does_not_load(self):
+        """Test register() defers executing tool code"""
+        registry = ToolRegistry()
+
+        registered = registry.register(BROKEN_TOOL, "Tradeoff Analysis")
+
+        assert registered.loaded is False
+
+    def test_eager_registration_surfaces_errors(self):
+        """Test lazy=False loads at register() time"""
+        with pytest.raises(RuntimeError, match="import-time failure"):
+            ToolRegistry(lazy=False).register(BROKEN_TOOL, "Tradeoff Analysis")
+
+    def test_only_matched_patterns_load(self):
+        """Test process() loads tools for matched patterns only"""
+        registry = ToolRegistry()
+        used = registry.register(counting_tool(), "Production Readiness")
+        unused = registry.register(BROKEN_TOOL, "Tradeoff Analysis")
+        pipeline = make_pipeline(registry.tools)
+
+        result = pipeline.process("production ready?", "x = 1")
+
+        assert used.loaded and not unused.loaded
+        assert result['tool_results']['Production Readiness_tool']['score'] == 0.5
+
+    def test_load_failure_reported_as_tool_error(self):
+        """Test a broken tool surfaces as a tool error on first use"""
+        registry = ToolRegistry()
+        registry.register(BROKEN_TOOL, "Tradeoff Analysis")
+        pipeline = make_pipeline(registry.tools)
+
+        result = pipeline.process("what's the tradeoff?")
+
+        assert result['tool_results']['Tradeoff Analysis_tool'] == {
+            'error': "import-time failure", 'score': 0.0
+        }
+
+    def test_reregistration(self):
+        """Test identical code is registered once and new versions replace old ones"""
+        registry = ToolRegistry()
+
+        first = registry.register(counting_tool(version=1), "Production Readiness")
+        again = registry.register(counting_tool(version=1), "Production Readiness")
+        assert again is first
+        assert registry.tools["Production Readiness"] == [first]
+
+        evolved = registry.register(counting_tool(version=2), "Production Readiness")
+        assert registry.tools["Production Readiness"] == [evolved]
+
+
+class TestBytecodeCache:
+    """Test compiled tool code is reused"""
+
+    def test_warm_start_skips_compile(self, tmp_path):
+        """Test a new process (cache instance) loads marshalled bytecode"""
+        cold = BytecodeCache(cache_dir=tmp_path / "bytecode")
+        ToolRegistry(bytecode_cache=cold, lazy=False).register(
+            counting_tool(), "Production Readiness"
+        )
+
+        warm = BytecodeCache(cache_dir=tmp_path / "bytecode")
+        registered = ToolRegistry(bytecode_cache=warm, lazy=False).register(
+            counting_tool(), "Production Readiness"
+        )
+
+        assert cold.stats()['compiles'] == 1
+        assert warm.stats()['compiles'] == 0
+        assert warm.stats()['disk_hits'] == 1
+        assert registered.analyze("x") == {'score': 0.5, 'length': 1}
+
+    def test_memoized_in_process(self, tmp_path):
+        """Test the same code compiles once per cache instance"""
+        cache = BytecodeCache(cache_dir=tmp_path / "bytecode")
+
+        assert cache.compile("x = 1") is cache.compile("x = 1")
+        assert cache.stats()['memory_hits'] == 1
+
+    def test_corrupt_entry_recompiled(self, tmp_path):
+        """Test an unreadable cache file falls back to compiling"""
+        cache = BytecodeCache(cache_dir=tmp_path / "bytecode")
+        path = tmp_path / "bytecode" / f"{cache.make_key('x = 1', '<t>')}.marshal"
+        path.write_bytes(b"not marshal data")
+
+        namespace = {}
+        exec(cache.compile("x = 1", "<t>"), namespace)
+
+        assert namespace['x'] == 1
+        assert cache.stats()['compiles'] == 1
+
+
+SANDBOX_TOOL = """
+import os
+
+class SandboxTool:
+    file_dependencies = ["/nonexistent/dependency.py"]
+
+    def analyze(self, code):
+        if code == "spin":
+            while True:
+                pass
+        if code == "sleep":
+            import time
+            time.sleep(30)
+        if code == "hog":
+            blob = bytearray(512 * 1024 * 1024)
+        if code == "raise":
+            raise ValueError("bad input")
+        return {'score': 1.0, 'pid': os.getpid(), 'input': code}
+"""
+
+
+def sandbox_tool(trusted=False):
+    """GeneratedTool that reports the pid it ran in"""
+    return GeneratedTool(
+        name="SandboxTool",
+        code=SANDBOX_TOOL,
+        pattern_name="Production Readiness",
+        acquisition_type="build",
+        metadata={'trusted': trusted}
+    )
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """Small sandbox pool shared by the sandbox tests"""
+    with SandboxPool(
+        max_workers=2, cpu_seconds=1, memory_mb=256,
+        max_calls_per_worker=3, timeout=5.0
+    ) as pool:
+        yield pool
+
+
+class TestSandbox:
+    """Test tools hosted in the worker-process pool"""
+
+    def test_runs_out_of_process(self, pool):
+        """Test a sandboxed tool runs in a worker and returns a plain dict"""
+        registered = ToolRegistry(sandbox=pool).register(sandbox_tool(), "Production Readiness")
+
+        result = registered.analyze("x = 1")
+
+        assert registered.sandboxed
+        assert result['input'] == "x = 1"
+        assert result['pid'] != os.getpid()
+
+    def test_trusted_tool_runs_in_process(self, pool):
+        """Test trusted tools keep the in-process fast path"""
+        registry = ToolRegistry(sandbox=pool)
+
+        trusted = registry.register(sandbox_tool(trusted=True), "Production Readiness")
+        forced = registry.register(sandbox_tool(trusted=True), "Gap Analysis", sandboxed=True)
+
+        assert trusted.analyze("x")['pid'] == os.getpid()
+        assert forced.analyze("x")['pid'] != os.getpid()
+
+    def test_workers_recycled(self, pool):
+        """Test a worker is replaced after max_calls_per_worker calls"""
+        pids = {pool.run("SandboxTool", SANDBOX_TOOL, str(i))[0]['pid'] for i in range(8)}
+
+        assert len(pids) > 2
+        assert pool.stats()['recycled'] >= 2
+
+    def test_tool_exception(self, pool):
+        """Test an exception in tool code is raised in the caller"""
+        with pytest.raises(ToolSandboxError, match="ValueError: bad input"):
+            pool.run("SandboxTool", SANDBOX_TOOL, "raise")
+
+    def test_cpu_limit(self, pool):
+        """Test a CPU-bound tool is stopped by the CPU rlimit"""
+        with pytest.raises(ToolSandboxError, match="CPU time limit"):
+            pool.run("SandboxTool", SANDBOX_TOOL, "spin")
+
+        assert pool.run("SandboxTool", SANDBOX_TOOL, "ok")[0]['score'] == 1.0
+
+    def test_memory_limit(self, pool):
+        """Test allocations beyond the address-space limit fail"""
+        with pytest.raises(ToolSandboxError, match="memory limit"):
+            pool.run("SandboxTool", SANDBOX_TOOL, "hog")
+
+    def test_timeout_kills_worker(self, pool):
+        """Test a stalled tool's worker is killed and the pool keeps working"""
+        killed = pool.stats()['killed']
+
+        with pytest.raises(TimeoutError):
+            pool.run("SandboxTool", SANDBOX_TOOL, "sleep", timeout=0.2)
+
+        assert pool.stats()['killed'] == killed + 1
+        assert pool.run("SandboxTool", SANDBOX_TOOL, "ok")[0]['score'] == 1.0
+
+    def test_dependencies_returned(self, pool):
+        """Test file dependencies declared in the worker come back for caching"""
+        _, dependencies = pool.run("SandboxTool", SANDBOX_TOOL, "ok")
+
+        assert dependencies == ["/nonexistent/dependency.py"]
+
+    def test_pipeline_reports_sandbox_errors(self, pool):
+        """Test sandbox failures become tool errors in process()"""
+        registry = ToolRegistry(sandbox=pool)
+        registry.register(sandbox_tool(), "Production Readiness")
+        pipeline = make_pipeline(registry.tools)
+
+        result = pipeline.process("production ready?", "raise")
+
+        assert result['tool_results']['Production Readiness_tool'] == {
+            'error': "ValueError: bad input", 'score': 0.0
+        }
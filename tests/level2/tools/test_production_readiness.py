@@ -0,0 +1,217 @@
+"""
+Tests for ProductionReadiness fast mode
+
+Coverage runs are replaced by a recorder returning canned pytest-cov JSON,
+so these tests check which tests get re-run and how results are merged.
+"""
+
+import os
+
+import pytest
+
+from src.level2.tools.generated.production_readiness import ProductionReadiness
+
+
+CALC = '''
+def add(a: int, b: int) -> int:
+    """Add two numbers"""
+    return a + b
+'''
+
+OTHER = '''
+def parse(text):
+    try:
+        return int(text)
+    except:
+        return None
+'''
+
+# Lines each test file executes, per source file
+TEST_COVERAGE = {
+    'test_calc.py': {'pkg/calc.py': ([1, 2], [3])},
+    'test_other.py': {'pkg/other.py': ([1, 2, 3], [4, 5])},
+}
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    # Bump the mtime so edits within one clock tick are still noticed
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Minimal project: two modules, one test file each"""
+    root = tmp_path / "project"
+    write(root / "pkg" / "__init__.py", "")
+    write(root / "pkg" / "calc.py", CALC)
+    write(root / "pkg" / "other.py", OTHER)
+    write(root / "tests" / "test_calc.py",
+          "from pkg.calc import add\n\ndef test_add():\n    assert add(1, 2) == 3\n")
+    write(root / "tests" / "test_other.py",
+          "from pkg import other\n\ndef test_parse():\n    assert other.parse('1') == 1\n")
+    return root
+
+
+def make_checker(tmp_path, runs, fail_runs=()):
+    """ProductionReadiness whose coverage runs are recorded in `runs`"""
+    checker = ProductionReadiness(fast=True, state_dir=str(tmp_path / "state"))
+
+    def fake_run(target_path, test_paths=None):
+        if test_paths:
+            names = [os.path.basename(p) for p in test_paths]
+        else:
+            tests_dir = os.path.join(target_path, "tests")
+            names = [n for n in TEST_COVERAGE if os.path.exists(os.path.join(tests_dir, n))]
+        runs.append(test_paths)
+        if len(runs) in fail_runs:
+            return {'error': 'pytest timed out'}
+        files = {}
+        for name in names:
+            for rel, (executed, missing) in TEST_COVERAGE[name].items():
+                files[os.path.join(target_path, rel)] = {
+                    'executed_lines': executed,
+                    'missing_lines': missing,
+                    'summary': {}
+                }
+        return {'totals': {}, 'files': files}
+
+    checker._run_pytest_cov = fake_run
+    return checker
+
+
+class TestIncrementalCoverage:
+    """Only tests reaching changed files are re-run"""
+
+    def test_first_run_is_full(self, tmp_path, project):
+        """No prior state runs the whole suite"""
+        runs = []
+        result = make_checker(tmp_path, runs).analyze("", file_path=str(project))
+
+        assert runs == [None]
+        assert result['run_info']['full_run'] is True
+        assert result['checks']['covered_lines'] == 5
+        assert result['checks']['total_statements'] == 8
+
+    def test_unchanged_project_runs_nothing(self, tmp_path, project):
+        """A second call with no edits is answered from state"""
+        runs = []
+        checker = make_checker(tmp_path, runs)
+        first = checker.analyze("", file_path=str(project))
+        second = checker.analyze("", file_path=str(project))
+
+        assert runs == [None]
+        assert second['run_info'] == {'full_run': False, 'tests_run': 0, 'changed_files': 0}
+        assert second['score'] == first['score']
+
+    def test_edit_reruns_only_importing_tests(self, tmp_path, project):
+        """Editing pkg/other.py re-runs test_other.py only"""
+        runs = []
+        checker = make_checker(tmp_path, runs)
+        checker.analyze("", file_path=str(project))
+
+        write(project / "pkg" / "other.py", OTHER + "\n# edited\n")
+        result = checker.analyze("", file_path=str(project))
+
+        assert runs[1] == [str(project / "tests" / "test_other.py")]
+        assert result['run_info']['tests_run'] == 1
+        assert result['checks']['covered_lines'] == 5
+
+    def test_conftest_change_forces_full_run(self, tmp_path, project):
+        """conftest.py can affect every test"""
+        runs = []
+        checker = make_checker(tmp_path, runs)
+        checker.analyze("", file_path=str(project))
+
+        write(project / "tests" / "conftest.py", "import pytest\n")
+        result = checker.analyze("", file_path=str(project))
+
+        assert runs == [None, None]
+        assert result['run_info']['full_run'] is True
+
+    def test_failed_partial_run_is_not_committed(self, tmp_path, project):
+        """A failed re-run leaves the edit unmeasured, so the next call runs again"""
+        runs = []
+        checker = make_checker(tmp_path, runs, fail_runs={2})
+        checker.analyze("", file_path=str(project))
+
+        write(project / "pkg" / "other.py", OTHER + "\n# edited\n")
+        failed = checker.analyze("", file_path=str(project))
+        retried = checker.analyze("", file_path=str(project))
+
+        assert failed['score'] == 0.0
+        assert failed['issues'][0]['type'] == 'Execution Error'
+        assert runs[2] is None
+        assert retried['run_info']['full_run'] is True
+        assert retried['checks']['covered_lines'] == 5
+
+    def test_test_file_change_forces_full_run(self, tmp_path, project):
+        """An edited test file's old coverage can't be separated out"""
+        runs = []
+        checker = make_checker(tmp_path, runs)
+        checker.analyze("", file_path=str(project))
+
+        write(project / "tests" / "test_calc.py", "def test_nothing():\n    pass\n")
+        result = checker.analyze("", file_path=str(project))
+
+        assert runs == [None, None]
+        assert result['run_info']['full_run'] is True
+
+    def test_deleted_test_coverage_is_dropped(self, tmp_path, project):
+        """Coverage only a deleted test provided no longer counts"""
+        runs = []
+        checker = make_checker(tmp_path, runs)
+        checker.analyze("", file_path=str(project))
+
+        (project / "tests" / "test_other.py").unlink()
+        result = checker.analyze("", file_path=str(project))
+
+        assert runs == [None, None]
+        assert result['checks']['covered_lines'] == 2
+
+    def test_deleted_source_forces_full_run(self, tmp_path, project):
+        """Tests importing a deleted module can't be found, so everything re-runs"""
+        runs = []
+        checker = make_checker(tmp_path, runs)
+        checker.analyze("", file_path=str(project))
+
+        (project / "pkg" / "other.py").unlink()
+        result = checker.analyze("", file_path=str(project))
+
+        assert runs == [None, None]
+        assert result['run_info']['full_run'] is True
+        assert result['run_info']['changed_files'] == 1
+
+    def test_state_persists_across_instances(self, tmp_path, project):
+        """A new instance with the same state_dir reuses stored coverage"""
+        runs = []
+        make_checker(tmp_path, runs).analyze("", file_path=str(project))
+        result = make_checker(tmp_path, runs).analyze("", file_path=str(project))
+
+        assert runs == [None]
+        assert result['checks']['covered_lines'] == 5
+
+
+class TestStaticChecks:
+    """In-process ast checks"""
+
+    def test_project_static_checks(self, tmp_path, project):
+        """Static checks cover source files only, not tests"""
+        result = make_checker(tmp_path, []).analyze("", file_path=str(project))
+        checks = result['checks']
+
+        assert checks['type_hint_coverage_percent'] == 50.0
+        assert checks['docstring_coverage_percent'] == 50.0
+        assert checks['error_handling_coverage_percent'] == 50.0
+        assert checks['bare_except_count'] == 1
+        assert any(i.get('type') == 'Missing Docstrings' for i in result['issues'])
+
+    def test_code_string_without_path(self):
+        """Fast mode scores a code string statically"""
+        result = ProductionReadiness().analyze(CALC, fast=True)
+
+        assert result['checks']['type_hint_coverage_percent'] == 100.0
+        assert result['checks']['error_handling_coverage_percent'] == 0.0
+        assert result['score'] == pytest.approx(2 / 3, abs=1e-4)
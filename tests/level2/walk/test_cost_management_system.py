@@ -10,7 +10,9 @@ Tests all functionality:
 6. Analytics and forecasting
 """
 
+import multiprocessing
 import pytest
+import sqlite3
 import tempfile
 import shutil
 from pathlib import Path
@@ -22,7 +24,8 @@ from src.level2.walk.cost_management_system import (
     BudgetPeriod,
     AlertLevel,
     CostAlert,
-    CostOptimization
+    CostOptimization,
+    BudgetReservation
 )
 
 
@@ -325,6 +328,17 @@ class TestAnalytics:
         spending_1d = cost_system.get_spending_by_category(days=1)
         assert sum(spending_1d.values()) == 30.0
 
+    def test_savings_by_category(self, cost_system):
+        """Test savings are tracked separately from spend and budgets"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+
+        cost_system.record_savings(0.5, "response_cache", metadata={"tier": "exact"})
+        cost_system.record_savings(0.25, "response_cache")
+
+        assert cost_system.get_savings_by_category(days=30) == {'response_cache': 0.75}
+        assert cost_system.get_spending_by_category(days=30) == {}
+        assert cost_system.budgets[BudgetPeriod.MONTHLY].current_spend == 0.0
+
     def test_monthly_forecast(self, cost_system):
         """Test monthly spend forecasting"""
         cost_system.set_budget(BudgetPeriod.MONTHLY, 300.0)  # Higher budget
@@ -523,5 +537,452 @@ class TestIntegrationScenarios:
         assert total_savings > 10.0
 
 
+class TestRollups:
+    """Test epoch timestamps and the hourly/daily spend rollups"""
+
+    def test_spending_series(self, cost_system):
+        """Test daily and hourly spend series per category"""
+        cost_system.record_cost(1.5, "api")
+        cost_system.record_cost(2.0, "api")
+        cost_system.record_cost(4.0, "library")
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        series = cost_system.get_spending_series(days=30)
+
+        assert series == {'api': [(today, 3.5)], 'library': [(today, 4.0)]}
+        hourly = cost_system.get_spending_series(days=1, granularity='hour')
+        assert sum(amount for _, amount in hourly['api']) == 3.5
+
+    def test_transactions_stored_as_epoch(self, cost_system, temp_db):
+        """Test that transactions store epoch seconds in ts"""
+        before = int(datetime.now().timestamp())
+        cost_system.record_cost(1.0, "api")
+
+        with sqlite3.connect(temp_db) as conn:
+            ts = conn.execute("SELECT ts FROM cost_transactions").fetchone()[0]
+
+        assert before <= ts <= int(datetime.now().timestamp())
+
+    def test_legacy_transactions_migrated(self, temp_db):
+        """A database with only ISO timestamps gets ts and rollups on open"""
+        old = datetime.now() - timedelta(days=10)
+        recent = datetime.now() - timedelta(days=2)
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("""
+                CREATE TABLE cost_transactions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL,
+                    category TEXT NOT NULL, description TEXT, amount REAL NOT NULL,
+                    tool_name TEXT, pattern_name TEXT, acquisition_type TEXT, metadata TEXT
+                )
+            """)
+            conn.executemany(
+                "INSERT INTO cost_transactions (timestamp, category, amount) VALUES (?, 'api', ?)",
+                [(old.isoformat(), 5.0), (recent.isoformat(), 2.0), (recent.isoformat(), 1.0)]
+            )
+
+        cost_system = CostManagementSystem(db_path=temp_db)
+
+        assert cost_system.get_spending_by_category(days=7) == {'api': 3.0}
+        assert cost_system.get_spending_by_category(days=30) == {'api': 8.0}
+        series = cost_system.get_spending_series(days=30)['api']
+        assert [amount for _, amount in series] == [5.0, 3.0]
+
+    def test_rebuild_rollups(self, cost_system, temp_db):
+        """Test that rebuild_rollups recomputes spend from the transactions"""
+        cost_system.record_cost(2.0, "api")
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("UPDATE cost_rollups SET amount = 0")
+
+        cost_system.rebuild_rollups()
+
+        assert cost_system.get_spending_by_category() == {'api': 2.0}
+
+    def test_iso_timestamp_index_dropped(self, temp_db):
+        """Test that opening a database drops the old ISO timestamp index"""
+        CostManagementSystem(db_path=temp_db).close()
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("CREATE INDEX idx_transactions_timestamp ON cost_transactions(timestamp)")
+
+        CostManagementSystem(db_path=temp_db).close()
+
+        with sqlite3.connect(temp_db) as conn:
+            rows = conn.execute("SELECT name FROM sqlite_master WHERE type='index'")
+            indexes = {row[0] for row in rows}
+        assert 'idx_transactions_timestamp' not in indexes
+
+
+class TestLedger:
+    """Test the single-transaction write path and in-memory budget ledger"""
+
+    @staticmethod
+    def trace(cost_system):
+        """Collect the SQL statements run on the shared connection"""
+        statements = []
+        with cost_system._connection() as conn:
+            conn.set_trace_callback(statements.append)
+        return statements
+
+    def test_cost_budgets_and_alerts_commit_once(self, cost_system):
+        """Test that a cost, its budget updates and alerts commit in one transaction"""
+        cost_system.set_budget(BudgetPeriod.DAILY, 100.0)
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+        statements = self.trace(cost_system)
+
+        cost_system.record_cost(90.0, "api")
+
+        assert sum(1 for s in statements if s.strip().upper() == "COMMIT") == 1
+        assert any("INSERT INTO cost_alerts" in s for s in statements)
+        assert len(cost_system.get_recent_alerts()) == 2
+
+    def test_connection_reused(self, cost_system):
+        """Test that calls share one connection"""
+        cost_system.record_cost(1.0, "api")
+        conn = cost_system._conn
+
+        cost_system.record_cost(1.0, "api")
+        cost_system.get_spending_by_category()
+
+        assert cost_system._conn is conn
+
+    def test_budget_table_follows_ledger(self, cost_system, temp_db):
+        """Test that the stored budget matches the in-memory ledger"""
+        cost_system.set_budget(BudgetPeriod.WEEKLY, 50.0)
+        cost_system.record_cost(12.5, "api")
+        cost_system.close()
+
+        reloaded = CostManagementSystem(db_path=temp_db)
+
+        assert reloaded.budgets[BudgetPeriod.WEEKLY].current_spend == 12.5
+
+    def test_failed_write_rolls_back_ledger(self, cost_system, monkeypatch):
+        """Test that a failed write leaves the ledger and the database unchanged"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+        cost_system.record_cost(10.0, "api")
+
+        def fail():
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(cost_system, "_check_budget_alerts", fail)
+        with pytest.raises(sqlite3.OperationalError):
+            cost_system.record_cost(5.0, "api")
+
+        assert cost_system.budgets[BudgetPeriod.MONTHLY].current_spend == 10.0
+        assert cost_system.get_spending_by_category() == {'api': 10.0}
+
+    def test_expired_budget_reset_before_enforcement(self, cost_system, temp_db):
+        """Test that an expired budget is reset before the new cost is checked"""
+        cost_system.set_budget(BudgetPeriod.DAILY, 10.0)
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("UPDATE budgets SET current_spend = 10.0, end_date = ?", (
+                (datetime.now() - timedelta(seconds=1)).isoformat(),
+            ))
+
+        assert cost_system.record_cost(5.0, "api") == True
+        assert cost_system.budgets[BudgetPeriod.DAILY].current_spend == 5.0
+
+
+def _spend_worker(db_path, attempts, use_reservations, results):
+    """Stress worker: spend $1 per attempt against the shared database"""
+    cost_system = CostManagementSystem(db_path=db_path)
+    recorded = 0
+    for i in range(attempts):
+        if use_reservations:
+            reservation = cost_system.reserve(1.0, category="api")
+            if reservation is None:
+                continue
+            if i % 3 == 0:
+                cost_system.release_reservation(reservation)
+            elif cost_system.commit_reservation(reservation):
+                recorded += 1
+        elif cost_system.record_cost(1.0, "api"):
+            recorded += 1
+    cost_system.close()
+    results.put(recorded)
+
+
+class TestReservations:
+    """Test atomic reserve/commit/release and multi-process spend"""
+
+    def test_reserve_holds_budget(self, cost_system):
+        """Test that a hold counts against the budget until settled"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 10.0)
+
+        reservation = cost_system.reserve(8.0, category="api")
+
+        assert isinstance(reservation, BudgetReservation)
+        assert cost_system.get_budget_status()['monthly']['reserved'] == 8.0
+        assert cost_system.get_budget_status()['monthly']['remaining'] == 2.0
+        assert cost_system.reserve(5.0) is None
+        assert cost_system.record_cost(5.0, "api") == False
+
+    def test_commit_records_actual_cost(self, cost_system):
+        """Test that committing records the actual cost and drops the hold"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 10.0)
+        reservation = cost_system.reserve(8.0, category="api")
+
+        assert cost_system.commit_reservation(reservation, amount=3.0, tool_name="Tool") == True
+
+        status = cost_system.get_budget_status()['monthly']
+        assert status['current_spend'] == 3.0
+        assert status['reserved'] == 0.0
+        assert cost_system.get_spending_by_category() == {'api': 3.0}
+
+    def test_settle_only_once(self, cost_system):
+        """Test that a reservation can be committed or released only once"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 10.0)
+        committed = cost_system.reserve(2.0, category="api")
+        released = cost_system.reserve(2.0, category="api")
+
+        assert cost_system.commit_reservation(committed) == True
+        assert cost_system.commit_reservation(committed) == False
+        assert cost_system.release_reservation(released) == True
+        assert cost_system.commit_reservation(released) == False
+        assert cost_system.budgets[BudgetPeriod.MONTHLY].current_spend == 2.0
+
+    def test_expired_hold_stops_counting(self, temp_db):
+        """Test that a hold past reservation_ttl no longer blocks spend"""
+        cost_system = CostManagementSystem(db_path=temp_db, reservation_ttl=0)
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 10.0)
+
+        cost_system.reserve(9.0)
+
+        assert cost_system.record_cost(9.0, "api") == True
+
+    def test_other_instance_sees_spend(self, cost_system, temp_db):
+        """Spend is incremented in SQL, not overwritten from each ledger"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 10.0)
+        other = CostManagementSystem(db_path=temp_db)
+
+        cost_system.record_cost(4.0, "api")
+        other.record_cost(4.0, "api")
+
+        assert cost_system.record_cost(4.0, "api") == False
+        assert cost_system.get_budget_status()['monthly']['current_spend'] == 8.0
+
+    @pytest.mark.parametrize("use_reservations", [False, True])
+    def test_concurrent_processes_never_overspend(
+        self, cost_system, temp_db, use_reservations
+    ):
+        """Test that forked workers sharing the database never exceed the budget"""
+        if "fork" not in multiprocessing.get_all_start_methods():
+            pytest.skip("needs the fork start method")
+
+        limit, workers, attempts = 60, 6, 20
+        cost_system.set_budget(BudgetPeriod.MONTHLY, float(limit))
+        cost_system.close()
+
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=_spend_worker, args=(temp_db, attempts, use_reservations, results)
+            )
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        recorded = sum(results.get(timeout=120) for _ in processes)
+        for process in processes:
+            process.join(timeout=30)
+
+        with sqlite3.connect(temp_db) as conn:
+            spend = conn.execute("SELECT current_spend FROM budgets").fetchone()[0]
+            transactions = conn.execute(
+                "SELECT COUNT(*), SUM(amount) FROM cost_transactions"
+            ).fetchone()
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM budget_reservations WHERE status = 'pending'"
+            ).fetchone()[0]
+
+        assert recorded == transactions[0] == spend == transactions[1]
+        assert spend <= limit
+        assert pending == 0
+        if not use_reservations:
+            assert spend == limit
+
+
+class TestBudgetStatusReads:
+    """Test that reading budget status never writes"""
+
+    def test_status_while_another_writer_holds_lock(self, cost_system, temp_db):
+        """Test that status is read without waiting for the write lock"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 10.0)
+        cost_system.record_cost(4.0, "api")
+        writer = sqlite3.connect(temp_db, isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            status = cost_system.get_budget_status()
+        finally:
+            writer.execute("ROLLBACK")
+            writer.close()
+
+        assert status['monthly']['current_spend'] == 4.0
+
+    def test_expired_budget_reported_as_new_period(self, cost_system, temp_db):
+        """Test that status shows an expired budget's new period but leaves the reset to writes"""
+        cost_system.set_budget(BudgetPeriod.DAILY, 10.0)
+        cost_system.record_cost(6.0, "api")
+        ended = (datetime.now() - timedelta(seconds=1)).isoformat()
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("UPDATE budgets SET end_date = ?", (ended,))
+
+        status = cost_system.get_budget_status()['daily']
+
+        assert status['current_spend'] == 0.0
+        assert status['end_date'] > datetime.now().isoformat()
+        with sqlite3.connect(temp_db) as conn:
+            assert conn.execute("SELECT current_spend, end_date FROM budgets").fetchone() == (
+                6.0, ended
+            )
+        assert not [a for a in cost_system.get_recent_alerts() if a.level == AlertLevel.INFO]
+
+        assert cost_system.record_cost(1.0, "api") == True
+        assert cost_system.get_budget_status()['daily']['current_spend'] == 1.0
+
+
+class TestAlertDeduplication:
+    """Test threshold-crossing alerts and cooldowns"""
+
+    class Clock:
+        """Settable time source"""
+
+        def __init__(self):
+            self.now = 1_000_000.0
+
+        def __call__(self):
+            return self.now
+
+    @staticmethod
+    def levels(cost_system):
+        """Sorted levels of every stored alert"""
+        return sorted(a.level.value for a in cost_system.get_recent_alerts(limit=100))
+
+    def test_alert_once_per_crossing(self, cost_system):
+        """Test that each threshold alerts once while spend stays above it"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+
+        for _ in range(5):
+            cost_system.record_cost(17.0, "api")  # 85%
+        assert self.levels(cost_system) == ['warning']
+
+        cost_system.record_cost(11.0, "api")  # 96%
+        cost_system.record_cost(1.0, "api")
+        assert self.levels(cost_system) == ['critical', 'warning']
+
+    def test_repeat_after_cooldown(self, temp_db):
+        """Test that an alert repeats once alert_cooldown has passed"""
+        clock = self.Clock()
+        cost_system = CostManagementSystem(db_path=temp_db, alert_cooldown=600, clock=clock)
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+
+        cost_system.record_cost(85.0, "api")
+        clock.now += 599
+        cost_system.record_cost(1.0, "api")
+        assert self.levels(cost_system) == ['warning']
+
+        clock.now += 1
+        cost_system.record_cost(1.0, "api")
+        assert self.levels(cost_system) == ['warning', 'warning']
+
+    def test_zero_cooldown_repeats(self, temp_db):
+        """Test that a zero cooldown repeats the alert on every cost"""
+        cost_system = CostManagementSystem(db_path=temp_db, alert_cooldown=0)
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+
+        for _ in range(3):
+            cost_system.record_cost(30.0, "api")
+
+        assert self.levels(cost_system) == ['warning']
+        cost_system.record_cost(1.0, "api")
+        assert self.levels(cost_system) == ['warning', 'warning']
+
+    def test_new_period_rearms_alerts(self, cost_system, temp_db):
+        """Test that a budget's new period alerts again"""
+        cost_system.set_budget(BudgetPeriod.DAILY, 10.0)
+        cost_system.record_cost(9.0, "api")
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("UPDATE budgets SET end_date = ?", (
+                (datetime.now() - timedelta(seconds=1)).isoformat(),
+            ))
+
+        cost_system.record_cost(9.0, "api")
+
+        assert self.levels(cost_system) == ['info', 'warning', 'warning']
+        assert any("reset" in a.message for a in cost_system.get_recent_alerts())
+
+    def test_restart_does_not_repeat(self, cost_system, temp_db):
+        """Test that a restarted instance doesn't repeat an alert"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+        cost_system.record_cost(85.0, "api")
+        cost_system.close()
+
+        restarted = CostManagementSystem(db_path=temp_db)
+        restarted.record_cost(1.0, "api")
+
+        assert self.levels(restarted) == ['warning']
+
+    def test_blocked_alerts_rate_limited(self, cost_system):
+        """Test that blocked transactions alert at most once per cooldown"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 10.0)
+
+        for _ in range(5):
+            assert cost_system.record_cost(20.0, "api") == False
+
+        assert sum("blocked" in a.message.lower() for a in cost_system.get_recent_alerts()) == 1
+
+    def test_no_writes_without_alert(self, cost_system):
+        """Test that a cost raising no alert doesn't write alert rows"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+        cost_system.record_cost(85.0, "api")
+        statements = TestLedger.trace(cost_system)
+
+        cost_system.record_cost(1.0, "api")
+
+        assert not any("cost_alerts" in s for s in statements)
+
+    def test_instances_share_alert_state(self, temp_db):
+        """Test that two instances on one database don't repeat each other's alerts"""
+        first = CostManagementSystem(db_path=temp_db)
+        second = CostManagementSystem(db_path=temp_db)
+        first.set_budget(BudgetPeriod.MONTHLY, 100.0)
+
+        first.record_cost(85.0, "api")
+        second.record_cost(1.0, "api")
+        assert self.levels(second) == ['warning']
+
+        second.record_cost(10.0, "api")  # 96%
+        first.record_cost(1.0, "api")
+        assert self.levels(first) == ['critical', 'warning']
+
+        for system in (first, second, first):
+            assert system.record_cost(50.0, "api") == False
+        assert sum("blocked" in a.message.lower() for a in first.get_recent_alerts()) == 1
+
+    def test_restart_keeps_blocked_cooldown(self, cost_system, temp_db):
+        """Test that a restarted instance doesn't repeat a blocked alert"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 10.0)
+        cost_system.record_cost(20.0, "api")
+        cost_system.close()
+
+        restarted = CostManagementSystem(db_path=temp_db)
+        restarted.record_cost(20.0, "api")
+
+        assert sum("blocked" in a.message.lower() for a in restarted.get_recent_alerts()) == 1
+
+    def test_alert_state_migrated_from_alerts(self, cost_system, temp_db):
+        """Test that a database without the state columns is seeded from its alerts"""
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+        cost_system.record_cost(96.0, "api")
+        cost_system.close()
+        with sqlite3.connect(temp_db) as conn:
+            for column in ('alert_level', 'alert_period_start', 'alerted_at', 'blocked_alerted_at'):
+                conn.execute(f"ALTER TABLE budgets DROP COLUMN {column}")
+
+        restarted = CostManagementSystem(db_path=temp_db)
+        restarted.record_cost(1.0, "api")
+
+        assert self.levels(restarted) == ['critical']
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,154 @@
+"""
+Tests for concurrent PyPI metadata fetching
+
+Tests:
+1. Search and enrichment against a local stand-in PyPI server
+2. Concurrent variant probing bounded by the connection pool
+3. Early cancellation once enough packages are found
+"""
+
+import time
+
+import pytest
+
+from src.level2.walk.local_pypi_server import LocalPyPIServer, make_metadata
+from src.level2.walk.pypi_search_engine import PyPISearchEngine
+
+PATTERN = {
+    'name': 'Email Validation',
+    'description': 'Validate email addresses according to RFC standards'
+}
+CAPABILITIES = ['Validate']  # filtered out of the query, which stays "email validation"
+
+
+@pytest.fixture
+def server():
+    packages = {
+        'email-validation': make_metadata(
+            'email-validation', '2.1.0', 'Email validation for Python', releases=12
+        ),
+        'python-email-validation': make_metadata(
+            'python-email-validation', '0.3.0', 'Validate email addresses'
+        ),
+    }
+    with LocalPyPIServer(packages) as server:
+        yield server
+
+
+@pytest.fixture
+def engine(server):
+    engine = PyPISearchEngine(base_url=server.url)
+    yield engine
+    engine.close()
+
+
+class TestLocalSearch:
+    """Test search against the local server"""
+
+    def test_search_finds_served_packages(self, engine):
+        """Test that existing variants are found and ranked"""
+        results = engine.search_libraries(PATTERN, CAPABILITIES, max_results=5)
+
+        names = [candidate.name for candidate in results]
+        assert sorted(names) == ['email-validation', 'python-email-validation']
+        assert results[0].overall_score >= results[1].overall_score
+        assert results[0].repository.endswith('/src')
+
+    def test_variants_are_deduplicated(self, engine, server):
+        """Test that each distinct variant is requested once"""
+        engine.fetch_metadata(engine._name_variants("email validation"))
+
+        assert len(server.requests) == len(set(server.requests)) == 5
+
+    def test_missing_packages_and_unreachable_host(self, engine):
+        """Test that 404s and connection errors yield no results"""
+        assert engine.fetch_metadata(['does-not-exist']) == {}
+
+        unreachable = PyPISearchEngine(base_url="http://127.0.0.1:9", timeout=1)
+        try:
+            assert unreachable.search_libraries(PATTERN, CAPABILITIES) == []
+        finally:
+            unreachable.close()
+
+    def test_results_keep_priority_order(self, engine):
+        """Test that results follow the requested order, not completion order"""
+        names = ['missing-a', 'python-email-validation', 'missing-b', 'email-validation']
+
+        metadata = engine.fetch_metadata(names)
+
+        assert list(metadata) == ['python-email-validation', 'email-validation']
+
+
+class TestConcurrentFetch:
+    """Test concurrency, pooling and early cancellation"""
+
+    def test_variants_are_probed_concurrently(self, server):
+        """Test that probing takes about one round trip instead of five"""
+        server.latency = 0.2
+        with PyPISearchEngine(base_url=server.url) as engine:
+            start = time.perf_counter()
+            engine._search_pypi("email validation", limit=10)
+            elapsed = time.perf_counter() - start
+
+        assert server.peak_active > 1
+        assert elapsed < 5 * 0.2
+
+    def test_connections_are_bounded_and_reused(self, server):
+        """Test that in-flight requests never exceed the per-host pool"""
+        server.latency = 0.05
+        names = [f"package-{i}" for i in range(12)]
+        with PyPISearchEngine(base_url=server.url, max_workers=8, max_connections=2) as engine:
+            engine.fetch_metadata(names)
+            engine.fetch_metadata(names)
+
+        assert len(server.requests) == 24
+        assert server.peak_active <= 2
+        assert server.connections <= 2
+
+    def test_stops_once_enough_packages_found(self, server):
+        """Test that remaining probes are cancelled after the limit is reached"""
+        server.latency = 0.1
+        names = ['email-validation'] + [f"missing-{i}" for i in range(10)]
+        with PyPISearchEngine(base_url=server.url, max_workers=2) as engine:
+            metadata = engine.fetch_metadata(names, limit=1)
+
+        assert list(metadata) == ['email-validation']
+        assert len(server.requests) < len(names)
+
+    def test_limit_waits_for_higher_priority_names(self, server):
+        """Test that a fast low-priority hit doesn't pre-empt an earlier name"""
+        names = ['missing-a', 'missing-b', 'python-email-validation', 'email-validation']
+        with PyPISearchEngine(base_url=server.url) as engine:
+            metadata = engine.fetch_metadata(names, limit=1)
+
+        assert list(metadata) == ['python-email-validation']
+
+    def test_search_stops_after_exact_name(self, server):
+        """Test that search_libraries stops probing once max_results are found"""
+        server.latency = 0.1
+        with PyPISearchEngine(base_url=server.url, max_workers=1) as engine:
+            results = engine.search_libraries(PATTERN, CAPABILITIES, max_results=1)
+
+        assert [candidate.name for candidate in results] == ['email-validation']
+        assert len(server.requests) < 5
+
+    def test_search_ranks_every_variant(self, server):
+        """Test that all published variants are ranked when max_results allows"""
+        variants = ['email_validation', 'emailvalidation', 'email-validation-python']
+        for name in variants:
+            server.packages[name] = make_metadata(name)
+        with PyPISearchEngine(base_url=server.url) as engine:
+            results = engine.search_libraries(PATTERN, CAPABILITIES, max_results=5)
+
+        expected = ['email-validation', 'python-email-validation'] + variants
+        assert sorted(c.name for c in results) == sorted(expected)
+
+    def test_search_stops_after_probe_hits(self, server):
+        """Test that probing stops at probe_hits packages even for a larger max_results"""
+        server.latency = 0.1
+        server.packages['emailvalidation'] = make_metadata('emailvalidation')
+        with PyPISearchEngine(base_url=server.url, max_workers=1, probe_hits=2) as engine:
+            results = engine.search_libraries(PATTERN, CAPABILITIES, max_results=5)
+
+        assert sorted(c.name for c in results) == ['email-validation', 'emailvalidation']
+        assert len(server.requests) < 5
@@ -0,0 +1,217 @@
+"""
+Tests for the spend forecaster
+
+Tests:
+1. Model selection and forecasts on synthetic series
+2. Forecasts over a CostManagementSystem's daily rollups
+3. Per-day caching and budget projections
+"""
+
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.level2.crawl.generation_cache import GenerationCache
+from src.level2.walk.cost_management_system import BudgetPeriod, CostManagementSystem
+from src.level2.walk.spend_forecaster import TOTAL, SpendForecaster, forecast_series
+from src.level2.walk.unified_walk_orchestrator import UnifiedWALKOrchestrator
+
+
+@pytest.fixture
+def cost_system(tmp_path):
+    system = CostManagementSystem(db_path=tmp_path / "costs.db")
+    yield system
+    system.close()
+
+
+def add_history(cost_system, daily_amounts, category="api"):
+    """Insert one transaction per past day (the last amount is yesterday's)"""
+    today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    days = len(daily_amounts)
+    rows = []
+    for i, amount in enumerate(daily_amounts):
+        timestamp = today - timedelta(days=days - i)
+        rows.append((timestamp.isoformat(), category, amount, int(timestamp.timestamp())))
+
+    with sqlite3.connect(cost_system.db_path) as conn:
+        conn.executemany(
+            "INSERT INTO cost_transactions (timestamp, category, amount, ts) VALUES (?, ?, ?, ?)",
+            rows
+        )
+    cost_system.rebuild_rollups()
+    cost_system.forecaster.clear()
+
+
+class TestForecastSeries:
+    """Test the smoothing models on synthetic series"""
+
+    def test_no_history(self):
+        """Test that an empty series forecasts zero"""
+        forecast = forecast_series(np.zeros(10), horizon_days=30)
+
+        assert forecast.method == 'none'
+        assert forecast.point == forecast.upper == 0.0
+
+    def test_single_day_uses_mean(self):
+        """Test that one day of history is repeated"""
+        forecast = forecast_series(np.array([0, 0, 4.0]), horizon_days=10)
+
+        assert forecast.method == 'mean'
+        assert forecast.history_days == 1
+        assert forecast.point == pytest.approx(40.0)
+
+    def test_two_days_use_mean(self):
+        """Test that two days forecast their mean rather than the first day"""
+        forecast = forecast_series(np.array([1.0, 2.0]), horizon_days=10)
+
+        assert forecast.method == 'mean'
+        assert forecast.daily == pytest.approx([1.5] * 10)
+        assert forecast.lower < forecast.point < forecast.upper
+
+    def test_constant_spend(self):
+        """Test that constant spend forecasts the same amount per day"""
+        forecast = forecast_series(np.full(20, 5.0), horizon_days=30)
+
+        assert forecast.point == pytest.approx(150.0)
+        assert forecast.lower == pytest.approx(150.0)
+        assert forecast.upper == pytest.approx(150.0)
+
+    def test_trend(self):
+        """Test that a linear trend is extrapolated with Holt"""
+        forecast = forecast_series(np.arange(1.0, 11.0), horizon_days=5)
+
+        assert forecast.method == 'holt'
+        assert forecast.daily == pytest.approx([11, 12, 13, 14, 15], rel=0.05)
+
+    def test_weekly_seasonality(self):
+        """Test that two weeks of history pick up the weekly pattern"""
+        rng = np.random.default_rng(0)
+        week = np.array([10, 10, 10, 10, 10, 2, 2], dtype=float)
+        y = np.tile(week, 8) + rng.normal(0, 0.5, 56)
+
+        forecast = forecast_series(y, horizon_days=7)
+
+        assert forecast.method == 'holt_winters'
+        assert forecast.daily == pytest.approx(week.tolist(), abs=1.5)
+        assert forecast.lower < forecast.point < forecast.upper
+        assert forecast.point == pytest.approx(week.sum(), rel=0.1)
+
+    def test_forecasts_never_negative(self):
+        """Test that a falling trend never forecasts negative spend"""
+        forecast = forecast_series(np.arange(10.0, 0.0, -1.0), horizon_days=30)
+
+        assert min(forecast.daily) == 0.0
+        assert forecast.lower >= 0.0
+
+
+class TestSpendForecaster:
+    """Test forecasts over the cost rollups"""
+
+    def test_forecast_by_category(self, cost_system):
+        """Test forecasts per category and for the total"""
+        add_history(cost_system, [2.0] * 14, category="api")
+        add_history(cost_system, [1.0] * 14, category="library")
+
+        by_category = cost_system.forecaster.forecast_by_category(horizon_days=10)
+
+        assert set(by_category) == {"api", "library"}
+        assert by_category["api"].point == pytest.approx(20.0)
+        assert cost_system.forecaster.forecast(horizon_days=10).point == pytest.approx(30.0)
+        assert cost_system.forecaster.forecast(category=TOTAL).category == TOTAL
+
+    def test_today_excluded(self, cost_system):
+        """Test that today's partial spend isn't used as history"""
+        cost_system.record_cost(100.0, "api")
+
+        assert cost_system.forecaster.forecast().history_days == 0
+
+    def test_cached_per_day(self, cost_system):
+        """Test that forecasts are cached until the date changes"""
+        today = [date.today()]
+        forecaster = SpendForecaster(cost_system, today=lambda: today[0])
+        add_history(cost_system, [2.0] * 10)
+        first = forecaster.forecast(horizon_days=30)
+
+        add_history(cost_system, [50.0] * 3)
+        assert forecaster.forecast(horizon_days=30) is first
+
+        today[0] += timedelta(days=1)
+        assert forecaster.forecast(horizon_days=30) is not first
+
+    def test_monthly_forecast_uses_model(self, cost_system):
+        """Test that forecast_monthly_spend uses the fitted model"""
+        add_history(cost_system, [3.0] * 14)
+
+        assert cost_system.forecast_monthly_spend() == pytest.approx(90.0)
+
+    def test_budget_projection(self, cost_system):
+        """Test a budget projected to run out before its period ends"""
+        add_history(cost_system, [10.0] * 14)
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+        cost_system.record_cost(4.0, "api")
+
+        projection = cost_system.forecaster.forecast_budgets()['monthly']
+
+        assert projection.days_remaining == 30
+        assert projection.projected_spend == pytest.approx(4.0 + 6.0 + 300.0)
+        # Constant history: no spread, and the rest of today is in every bound
+        assert projection.lower == pytest.approx(projection.projected_spend)
+        assert projection.upper == pytest.approx(projection.projected_spend)
+        assert projection.will_exceed
+
+        overrun = [
+            r for r in cost_system.get_optimization_recommendations()
+            if "monthly budget" in r.recommendation
+        ]
+        assert len(overrun) == 1
+        assert overrun[0].potential_savings == 0.0
+        assert overrun[0].details['projected_overrun'] == pytest.approx(310.0 - 100.0)
+
+    def test_no_budgets(self, cost_system):
+        """Test that there are no projections without budgets"""
+        assert cost_system.forecaster.forecast_budgets() == {}
+
+    def test_budget_windows_cached_per_day(self, cost_system, monkeypatch):
+        """Test that repeat projections read only the live status and today's spend"""
+        add_history(cost_system, [10.0] * 14)
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+        first = cost_system.forecaster.forecast_budgets()
+
+        calls = []
+        real_series = cost_system.get_spending_series
+        monkeypatch.setattr(cost_system, "get_spending_series", lambda **kwargs: (
+            calls.append(kwargs) or real_series(**kwargs)
+        ))
+        monkeypatch.setattr(cost_system.forecaster, "forecast", None)  # must come from the cache
+
+        assert cost_system.forecaster.forecast_budgets() == first
+        assert calls == [{'days': 1, 'granularity': 'day'}]
+
+    def test_cost_summary_reads_status_once(self, cost_system, monkeypatch):
+        """Test that the cost summary shares one status read and one projection"""
+        add_history(cost_system, [10.0] * 14)
+        cost_system.set_budget(BudgetPeriod.MONTHLY, 100.0)
+        orchestrator = UnifiedWALKOrchestrator(
+            gemini_api_key="test-key",
+            enable_cost_tracking=False,
+            enable_tool_memory=False,
+            generation_cache=GenerationCache(db_path=cost_system.db_path.parent / "gen.db")
+        )
+        orchestrator.cost_system = cost_system
+
+        reads = []
+        real_status = cost_system.get_budget_status
+        monkeypatch.setattr(cost_system, "get_budget_status", lambda: (
+            reads.append(1) or real_status()
+        ))
+
+        summary = orchestrator.get_cost_summary()
+
+        assert len(reads) == 1
+        assert summary['budget_forecasts']['monthly']['will_exceed']
+        assert any(
+            r['potential_savings'] == 0.0 and "monthly budget" in r['recommendation']
+            for r in summary['optimization_recommendations']
+        )
@@ -10,12 +10,18 @@ Tests all functionality:
 6. Cost analysis and analytics
 """
 
+import json
+import os
 import pytest
+import sqlite3
 import tempfile
+import threading
+import time
 import shutil
 from pathlib import Path
 from datetime import datetime, timedelta
 
+from src.common.quantile_sketch import DDSketch
 from src.level2.walk.tool_memory_system import (
     ToolMemorySystem,
     ToolUsageRecord,
@@ -77,8 +83,8 @@ class TestDatabaseInitialization:
 
         assert any('tool_pattern' in idx for idx in indexes), \
             "Tool-pattern index should exist"
-        assert any('timestamp' in idx for idx in indexes), \
-            "Timestamp index should exist"
+        assert 'idx_usage_ts' in indexes, "Epoch timestamp index should exist"
+        assert 'idx_timestamp' not in indexes, "ISO timestamp index should be dropped"
 
 
 class TestUsageRecording:
@@ -441,7 +447,8 @@ class TestAnalytics:
         trends = memory_system.get_usage_trends(days=10)
 
         assert "TrendTool" in trends
-        assert len(trends["TrendTool"]) == 21  # 7 days * 3 usages
+        assert len(trends["TrendTool"]) == 7  # One daily bucket per day
+        assert [rate for _, rate in trends["TrendTool"]] == [0.0] * 4 + [1.0] * 3
 
     def test_get_all_tool_metrics(self, memory_system):
         """Test getting metrics for all tools"""
@@ -622,5 +629,500 @@ class TestIntegrationScenarios:
         assert best_b == "SameTool"
 
 
+class TestConnection:
+    """Test the shared long-lived connection"""
+
+    def test_wal_journal_mode(self, memory_system, temp_db):
+        """Test the database is opened in WAL mode"""
+        with sqlite3.connect(temp_db) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+    def test_connection_reused(self, memory_system):
+        """Recording doesn't open a new connection per call"""
+        for i in range(3):
+            memory_system.record_usage(ToolUsageRecord(
+                tool_name="Tool", pattern_name="Pattern", query=f"q{i}",
+                success=True, latency_ms=10
+            ))
+            if i == 0:
+                conn = memory_system._conn
+
+        assert memory_system._conn is conn
+        assert memory_system.get_tool_metrics("Tool", "Pattern").total_uses == 3
+
+    def test_concurrent_recording(self, memory_system):
+        """Threads share the connection safely"""
+        def record(thread_id):
+            for i in range(50):
+                memory_system.record_usage(ToolUsageRecord(
+                    tool_name=f"Tool{thread_id}", pattern_name="Pattern",
+                    query=f"q{i}", success=True, latency_ms=10
+                ))
+
+        threads = [threading.Thread(target=record, args=(t,)) for t in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        totals = [
+            memory_system.get_tool_metrics(f"Tool{t}", "Pattern").total_uses for t in range(4)
+        ]
+        assert totals == [50] * 4
+
+    def test_close_and_reopen(self, memory_system):
+        """Test reads after close() reopen the connection"""
+        memory_system.record_usage(ToolUsageRecord(
+            tool_name="Tool", pattern_name="Pattern", query="q", success=True, latency_ms=10
+        ))
+        memory_system.close()
+
+        assert memory_system.get_tool_metrics("Tool", "Pattern").total_uses == 1
+
+
+class TestWriteBehind:
+    """Test buffered background writes"""
+
+    @staticmethod
+    def record(memory, i=0):
+        memory.record_usage(ToolUsageRecord(
+            tool_name="Tool", pattern_name="Pattern", query=f"q{i}",
+            success=True, latency_ms=10
+        ))
+
+    @staticmethod
+    def stored_rows(db_path):
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute("SELECT COUNT(*) FROM tool_usage").fetchone()[0]
+
+    @staticmethod
+    def wait_for_rows(db_path, expected, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if TestWriteBehind.stored_rows(db_path) == expected:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_records_buffered_until_flush(self, temp_db):
+        """Test queued records reach the database on flush()"""
+        memory = ToolMemorySystem(db_path=temp_db, write_behind=True, flush_interval=60)
+        for i in range(5):
+            self.record(memory, i)
+
+        assert self.stored_rows(temp_db) == 0
+        memory.flush()
+        assert self.stored_rows(temp_db) == 5
+        memory.close()
+
+    def test_batch_size_triggers_write(self, temp_db):
+        """Test a full batch is written without a flush"""
+        memory = ToolMemorySystem(
+            db_path=temp_db, write_behind=True, batch_size=10, flush_interval=60
+        )
+        for i in range(10):
+            self.record(memory, i)
+
+        assert self.wait_for_rows(temp_db, 10)
+        memory.close()
+
+    def test_flush_interval_triggers_write(self, temp_db):
+        """Test a partial batch is written after flush_interval"""
+        memory = ToolMemorySystem(db_path=temp_db, write_behind=True, flush_interval=0.05)
+        self.record(memory)
+
+        assert self.wait_for_rows(temp_db, 1)
+        memory.close()
+
+    def test_reads_see_buffered_records(self, temp_db):
+        """Test reads flush queued records first"""
+        memory = ToolMemorySystem(db_path=temp_db, write_behind=True, flush_interval=60)
+        for i in range(3):
+            self.record(memory, i)
+
+        assert memory.get_tool_metrics("Tool", "Pattern").total_uses == 3
+        assert memory.get_cost_analysis() == {"Tool": 0.0}
+        memory.close()
+
+    def test_full_queue_blocks_producer(self, temp_db):
+        """record_usage waits while the queue is full"""
+        memory = ToolMemorySystem(
+            db_path=temp_db, write_behind=True, batch_size=1, max_queue_size=2
+        )
+        producer = threading.Thread(target=lambda: [self.record(memory, i) for i in range(4)])
+
+        with memory._lock:  # Stall the writer mid-batch
+            producer.start()
+            producer.join(timeout=0.3)
+            assert producer.is_alive()
+
+        producer.join(timeout=5)
+        assert not producer.is_alive()
+        memory.close()
+        assert self.stored_rows(temp_db) == 4
+
+    def test_close_flushes(self, temp_db):
+        """Test close() writes queued records and later records go direct"""
+        memory = ToolMemorySystem(db_path=temp_db, write_behind=True, flush_interval=60)
+        for i in range(7):
+            self.record(memory, i)
+        memory.close()
+
+        assert self.stored_rows(temp_db) == 7
+        # After close, records are written synchronously
+        self.record(memory, 7)
+        assert self.stored_rows(temp_db) == 8
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+    def test_forked_child_writes_its_records(self, temp_db):
+        """Test a forked child gets its own writer and the parent's queue isn't copied"""
+        memory = ToolMemorySystem(db_path=temp_db, write_behind=True, flush_interval=60)
+        for i in range(3):
+            self.record(memory, i)
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                for i in range(3, 5):
+                    self.record(memory, i)
+                memory.close()
+                status = 0
+            finally:
+                os._exit(status)
+
+        _, status = os.waitpid(pid, 0)
+        memory.close()
+
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert self.stored_rows(temp_db) == 5
+
+
+class TestAggregates:
+    """Test the materialized per-(tool, pattern) aggregates"""
+
+    @staticmethod
+    def record_mix(memory):
+        for i in range(18):
+            memory.record_usage(ToolUsageRecord(
+                tool_name=f"Tool{i % 3}", pattern_name=f"Pattern{i % 2}", query=f"q{i}",
+                success=i % 4 != 0, latency_ms=100 + i, cost=0.01 * i, score=0.1 * (i % 10)
+            ))
+
+    @staticmethod
+    def scanned_totals(db_path):
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute("""
+                SELECT tool_name, pattern_name, COUNT(*), SUM(success),
+                       SUM(latency_ms), SUM(cost), SUM(score), MAX(timestamp)
+                FROM tool_usage GROUP BY tool_name, pattern_name ORDER BY 1, 2
+            """).fetchall()
+
+    @staticmethod
+    def aggregate_rows(db_path):
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute("""
+                SELECT tool_name, pattern_name, uses, successes,
+                       latency_sum, cost_sum, score_sum, last_used
+                FROM tool_aggregates ORDER BY 1, 2
+            """).fetchall()
+
+    def test_aggregates_match_history(self, memory_system, temp_db):
+        """Test aggregates equal a full scan of the usage history"""
+        self.record_mix(memory_system)
+
+        assert self.aggregate_rows(temp_db) == pytest.approx(self.scanned_totals(temp_db))
+
+    def test_write_behind_batches_aggregated(self, temp_db):
+        """Test write-behind batches update the aggregates too"""
+        memory = ToolMemorySystem(db_path=temp_db, write_behind=True, flush_interval=60)
+        self.record_mix(memory)
+        memory.close()
+
+        assert self.aggregate_rows(temp_db) == pytest.approx(self.scanned_totals(temp_db))
+
+    def test_reads_use_aggregates(self, memory_system, temp_db):
+        """Metrics come from tool_aggregates, not a scan of tool_usage"""
+        self.record_mix(memory_system)
+        expected = {
+            (m.tool_name, m.pattern_name): m.total_uses
+            for m in memory_system.get_all_tool_metrics()
+        }
+
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("DELETE FROM tool_usage")
+
+        metrics = memory_system.get_all_tool_metrics()
+        assert {(m.tool_name, m.pattern_name): m.total_uses for m in metrics} == expected
+        assert memory_system.get_best_tool_for_pattern("Pattern0") is not None
+
+    def test_existing_history_backfilled(self, temp_db):
+        """A database without the aggregates table gets it built on open"""
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("""
+                CREATE TABLE tool_usage (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, tool_name TEXT NOT NULL,
+                    pattern_name TEXT NOT NULL, query TEXT, success INTEGER NOT NULL,
+                    latency_ms REAL NOT NULL, cost REAL DEFAULT 0.0, score REAL DEFAULT 0.0,
+                    error TEXT, timestamp TEXT NOT NULL
+                )
+            """)
+            conn.executemany("""
+                INSERT INTO tool_usage
+                    (tool_name, pattern_name, query, success, latency_ms, score, timestamp)
+                VALUES ('Legacy', 'Pattern', 'q', ?, 100, 0.8, ?)
+            """, [(1, datetime.now().isoformat()) for _ in range(4)])
+
+        memory = ToolMemorySystem(db_path=temp_db)
+        metrics = memory.get_tool_metrics("Legacy", "Pattern")
+
+        assert metrics.total_uses == 4
+        assert metrics.success_rate == 100.0
+
+    def test_rebuild_aggregates(self, memory_system, temp_db):
+        """Test rebuild_aggregates() repairs drifted rows from history"""
+        self.record_mix(memory_system)
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("UPDATE tool_aggregates SET uses = 999")
+
+        memory_system.rebuild_aggregates()
+
+        assert self.aggregate_rows(temp_db) == pytest.approx(self.scanned_totals(temp_db))
+
+
+class TestLatencyPercentiles:
+    """Test latency percentiles from the stored sketches"""
+
+    @staticmethod
+    def record_latencies(memory, latencies, tool_name="Tool", timestamp=None):
+        for i, latency in enumerate(latencies):
+            record = ToolUsageRecord(
+                tool_name=tool_name, pattern_name="Pattern", query=f"q{i}",
+                success=True, latency_ms=latency, score=0.9
+            )
+            if timestamp is not None:
+                record.timestamp = timestamp
+            memory.record_usage(record)
+
+    def test_metrics_include_percentiles(self, memory_system):
+        """Test that metrics report p50/p95/p99 from the sketch"""
+        self.record_latencies(memory_system, range(1, 101))
+
+        metrics = memory_system.get_tool_metrics("Tool", "Pattern")
+
+        assert metrics.p50_latency_ms == pytest.approx(50, rel=0.02)
+        assert metrics.p95_latency_ms == pytest.approx(95, rel=0.02)
+        assert metrics.p99_latency_ms == pytest.approx(99, rel=0.02)
+
+    def test_export_includes_percentiles(self, memory_system, temp_db):
+        """Test that the JSON export includes percentiles"""
+        self.record_latencies(memory_system, [100] * 10)
+        output = Path(temp_db).parent / "metrics.json"
+
+        memory_system.export_metrics_to_json(output)
+
+        exported = json.loads(output.read_text())
+        assert exported['tools'][0]['p99_latency_ms'] == pytest.approx(100, rel=0.01)
+
+    def test_tail_latency_flags_monitor(self, temp_db):
+        """A tool with a fast average but a slow tail is monitored"""
+        memory = ToolMemorySystem(db_path=temp_db, latency_slo_ms=1000)
+        self.record_latencies(memory, [50] * 95 + [5000] * 5)
+
+        metrics = memory.get_tool_metrics("Tool", "Pattern")
+        memory.close()
+
+        assert metrics.avg_latency_ms < 1000
+        assert metrics.p99_latency_ms > 1000
+        assert metrics.recommendation == 'monitor'
+
+    def test_daily_buckets_merge(self, memory_system):
+        """Test that daily buckets merge into windowed and all-time percentiles"""
+        now = datetime.now()
+        self.record_latencies(memory_system, [10] * 50, timestamp=now - timedelta(days=3))
+        self.record_latencies(memory_system, [1000] * 50, timestamp=now)
+
+        percentiles = memory_system.get_latency_percentiles
+        recent = percentiles("Tool", "Pattern", since=now - timedelta(days=1))
+        overall = percentiles("Tool", "Pattern")
+        window = percentiles("Tool", "Pattern", since=now - timedelta(days=7))
+
+        assert recent['p50'] == pytest.approx(1000, rel=0.01)
+        assert overall['p50'] == pytest.approx(10, rel=0.01)
+        assert window == overall
+
+    def test_unknown_tool_has_no_percentiles(self, memory_system):
+        """Test that a tool without usage has no percentiles"""
+        assert memory_system.get_latency_percentiles("Missing", "Pattern") == {}
+
+    def test_backfill_existing_history(self, memory_system, temp_db):
+        """Databases without sketches are backfilled from tool_usage"""
+        self.record_latencies(memory_system, range(1, 101))
+        expected = memory_system.get_latency_percentiles("Tool", "Pattern")
+        memory_system.close()
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("DROP TABLE tool_latency_sketches")
+
+        reopened = ToolMemorySystem(db_path=temp_db)
+        assert reopened.get_latency_percentiles("Tool", "Pattern") == expected
+        reopened.close()
+
+    @staticmethod
+    def stored_sketches(temp_db):
+        with sqlite3.connect(temp_db) as conn:
+            return conn.execute("SELECT COUNT(*) FROM tool_latency_sketches").fetchone()[0]
+
+    @staticmethod
+    def stored_counts(temp_db):
+        """(uses from tool_aggregates, count of the all-time sketch) on disk"""
+        with sqlite3.connect(temp_db) as conn:
+            uses = conn.execute("SELECT uses FROM tool_aggregates").fetchone()[0]
+            sketch = conn.execute(
+                "SELECT sketch FROM tool_latency_sketches WHERE bucket = ''"
+            ).fetchone()[0]
+        return uses, DDSketch.from_json(sketch).count
+
+    def test_sync_records_persist_sketches(self, temp_db):
+        """Test that each synchronous record commits its sketches with the aggregates"""
+        memory = ToolMemorySystem(db_path=temp_db, batch_size=5)
+
+        self.record_latencies(memory, [10])
+        assert self.stored_sketches(temp_db) == 2  # all-time and today
+        self.record_latencies(memory, [10] * 2)
+        assert self.stored_counts(temp_db) == (3, 3)
+        memory.close()
+
+    def test_close_leaves_sketches_consistent(self, temp_db):
+        """Test that close() leaves sketch counts equal to the aggregates"""
+        memory = ToolMemorySystem(db_path=temp_db, write_behind=True, flush_interval=60)
+        self.record_latencies(memory, [100] * 7)
+        memory.close()
+
+        assert self.stored_counts(temp_db) == (7, 7)
+
+    def test_sketches_merge_with_other_writers(self, temp_db):
+        """Test that each instance merges into sketches another instance stored"""
+        first = ToolMemorySystem(db_path=temp_db)
+        second = ToolMemorySystem(db_path=temp_db)
+        self.record_latencies(first, [10] * 50)
+        self.record_latencies(second, [1000] * 50)
+        first.close()
+        second.close()
+
+        reopened = ToolMemorySystem(db_path=temp_db)
+        percentiles = reopened.get_latency_percentiles("Tool", "Pattern")
+        reopened.close()
+
+        assert percentiles['p50'] == pytest.approx(10, rel=0.01)
+        assert percentiles['p99'] == pytest.approx(1000, rel=0.01)
+
+    def test_write_behind_persists_per_batch(self, temp_db):
+        """Test that a write-behind batch persists its sketches"""
+        memory = ToolMemorySystem(db_path=temp_db, write_behind=True, batch_size=3)
+        self.record_latencies(memory, [10] * 3)
+
+        deadline = time.time() + 5
+        while self.stored_sketches(temp_db) == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        memory.close()
+
+        assert self.stored_sketches(temp_db) == 2
+
+
+class TestRollups:
+    """Test epoch timestamps and the hourly/daily usage rollups"""
+
+    def test_usage_stored_as_epoch(self, memory_system, temp_db):
+        """Test that usage rows store epoch seconds in ts"""
+        timestamp = datetime(2026, 3, 1, 12, 30, 15)
+        memory_system.record_usage(ToolUsageRecord(
+            tool_name="Tool", pattern_name="Pattern", query="q",
+            success=True, latency_ms=10, timestamp=timestamp
+        ))
+
+        with sqlite3.connect(temp_db) as conn:
+            ts = conn.execute("SELECT ts FROM tool_usage").fetchone()[0]
+
+        assert ts == int(timestamp.timestamp())
+
+    def test_hourly_trends(self, memory_system):
+        """Test that hourly trends come from the hourly rollups"""
+        base = datetime.now().replace(minute=5, second=0, microsecond=0) - timedelta(hours=3)
+        for hour in range(3):
+            for i in range(4):
+                memory_system.record_usage(ToolUsageRecord(
+                    tool_name="Tool", pattern_name=f"Pattern{i % 2}", query="q",
+                    success=i < hour + 1, latency_ms=10,
+                    timestamp=base + timedelta(hours=hour, minutes=i)
+                ))
+
+        trends = memory_system.get_usage_trends(days=1, granularity='hour')
+
+        assert trends["Tool"] == [
+            (base.replace(minute=0) + timedelta(hours=hour), (hour + 1) / 4)
+            for hour in range(3)
+        ]
+
+    def test_unknown_granularity(self, memory_system):
+        """Test that an unsupported granularity raises ValueError"""
+        with pytest.raises(ValueError):
+            memory_system.get_usage_trends(granularity='week')
+
+    def test_legacy_timestamps_migrated(self, temp_db):
+        """A database with only ISO timestamps gets ts and rollups on open"""
+        timestamp = datetime.now() - timedelta(days=2)
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("""
+                CREATE TABLE tool_usage (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, tool_name TEXT NOT NULL,
+                    pattern_name TEXT NOT NULL, query TEXT, success INTEGER NOT NULL,
+                    latency_ms REAL NOT NULL, cost REAL DEFAULT 0.0, score REAL DEFAULT 0.0,
+                    error TEXT, timestamp TEXT NOT NULL
+                )
+            """)
+            conn.executemany("""
+                INSERT INTO tool_usage
+                    (tool_name, pattern_name, query, success, latency_ms, timestamp)
+                VALUES ('Legacy', 'Pattern', 'q', ?, 100, ?)
+            """, [(i % 2, timestamp.isoformat()) for i in range(4)])
+
+        memory = ToolMemorySystem(db_path=temp_db)
+        trends = memory.get_usage_trends(days=7)
+        memory.close()
+
+        with sqlite3.connect(temp_db) as conn:
+            stamps = {row[0] for row in conn.execute("SELECT ts FROM tool_usage")}
+        assert stamps == {int(timestamp.timestamp())}
+        day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+        assert trends["Legacy"] == [(day, 0.5)]
+
+    def test_iso_timestamp_index_dropped(self, temp_db):
+        """Test that opening a database drops the old ISO timestamp index"""
+        ToolMemorySystem(db_path=temp_db).close()
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("CREATE INDEX idx_timestamp ON tool_usage(timestamp)")
+
+        ToolMemorySystem(db_path=temp_db).close()
+
+        with sqlite3.connect(temp_db) as conn:
+            rows = conn.execute("SELECT name FROM sqlite_master WHERE type='index'")
+            indexes = {row[0] for row in rows}
+        assert 'idx_timestamp' not in indexes
+
+    def test_rebuild_rollups(self, memory_system, temp_db):
+        """Test that rebuild_aggregates recomputes the rollups"""
+        for i in range(6):
+            memory_system.record_usage(ToolUsageRecord(
+                tool_name="Tool", pattern_name="Pattern", query="q", success=True, latency_ms=10
+            ))
+        expected = memory_system.get_usage_trends(days=1, granularity='hour')
+        with sqlite3.connect(temp_db) as conn:
+            conn.execute("UPDATE tool_usage_rollups SET successes = 0")
+
+        memory_system.rebuild_aggregates()
+
+        assert memory_system.get_usage_trends(days=1, granularity='hour') == expected
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "-s"])
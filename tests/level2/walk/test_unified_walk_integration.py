@@ -27,6 +27,13 @@ from src.level2.walk.external_api_engine import ExternalAPIIntegrationResult
 from src.level2.walk.pypi_search_engine import LibraryCandidate
 from src.level2.walk.api_discovery_engine import APICandidate, AuthType
 from src.level2.crawl.tool_acquisition_engine import GeneratedTool
+from src.common.config import Config
+
+
+@pytest.fixture(autouse=True)
+def isolated_generation_cache(tmp_path, monkeypatch):
+    """Keep the orchestrator's default generation cache out of data/."""
+    monkeypatch.setattr(Config, 'DATA_DIR', tmp_path)
 
 
 @pytest.fixture